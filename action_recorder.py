@@ -2,20 +2,222 @@ import json
 import time
 import os
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from browser_pool import get_browser_pool, RECORDER_CHROME_ARGS
+from replay_profile import ReplayProfile
+from recording_catalog import get_catalog
+from recording_format import load_recording, recording_extension, save_recording
 import logging
+import queue
 import threading
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SELECTOR_BY = {'xpath': By.XPATH, 'id': By.ID, 'class_name': By.CLASS_NAME}
+
+# Проверка всех селекторов шага за один запрос к браузеру; семантика как у find_element + is_displayed:
+# берется первый найденный по селектору элемент, и он должен быть видимым
+RESOLVE_SELECTORS_JS = """
+const candidates = arguments[0];
+for (let i = 0; i < candidates.length; i++) {
+    const [type, value] = candidates[i];
+    let el = null;
+    try {
+        if (type === 'xpath') {
+            el = document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else if (type === 'id') {
+            el = document.getElementById(value);
+        } else if (type === 'class_name') {
+            el = document.getElementsByClassName(value)[0] || null;
+        }
+    } catch (e) {
+        el = null;
+    }
+    if (el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length)) {
+        return [el, i];
+    }
+}
+return null;
+"""
+
+# Сбор событий при записи: сколько ждать событий в одном опросе (секунды) и размер очереди
+EVENT_POLL_TIMEOUT = 2.0
+EVENT_QUEUE_SIZE = 10000
+# Таймаут асинхронных скриптов Selenium по умолчанию - восстанавливается перед возвратом браузера в пул
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+# Скрипт записи действий. Выполняется в начале каждого документа (Page.addScriptToEvaluateOnNewDocument):
+# копит клики, ввод, выбор и навигацию в ограниченной очереди, отдает их пачками долгому опросу
+# и при уходе со страницы сохраняет неотданные события в sessionStorage для следующего документа.
+RECORDER_JS = """
+(function () {
+    if (window.__recorder || window.top !== window) {
+        return;
+    }
+    var MAX_QUEUE = 1000;
+    var STORAGE_KEY = '__recorderPending';
+    var recorder = window.__recorder = {queue: [], dropped: 0, waiter: null, active: true};
+
+    try {
+        var pending = sessionStorage.getItem(STORAGE_KEY);
+        if (pending) {
+            sessionStorage.removeItem(STORAGE_KEY);
+            recorder.queue = JSON.parse(pending);
+        }
+    } catch (e) {}
+
+    recorder.take = function () {
+        var batch = {events: recorder.queue, dropped: recorder.dropped};
+        recorder.queue = [];
+        recorder.dropped = 0;
+        return batch;
+    };
+
+    recorder.wait = function (timeoutMs, callback) {
+        if (recorder.queue.length) {
+            callback(recorder.take());
+            return;
+        }
+        recorder.waiter = callback;
+        setTimeout(function () {
+            if (recorder.waiter === callback) {
+                recorder.waiter = null;
+                callback({events: [], dropped: 0});
+            }
+        }, timeoutMs);
+    };
+
+    function emit(event) {
+        if (!recorder.active) {
+            return;
+        }
+        event.timestamp = Date.now();
+        if (recorder.queue.length >= MAX_QUEUE) {
+            recorder.queue.shift();
+            recorder.dropped++;
+        }
+        recorder.queue.push(event);
+        if (recorder.waiter) {
+            var waiter = recorder.waiter;
+            recorder.waiter = null;
+            waiter(recorder.take());
+        }
+    }
+
+    function emitNavigation(url) {
+        if (url && String(url).indexOf('http') === 0) {
+            emit({type: 'navigation', url: String(url)});
+        }
+    }
+
+    function getXPath(element) {
+        if (element.id !== '') {
+            return 'id("' + element.id + '")';
+        }
+        if (element === document.body || !element.parentNode) {
+            return element.tagName;
+        }
+        var ix = 0;
+        var siblings = element.parentNode.childNodes;
+        for (var i = 0; i < siblings.length; i++) {
+            var sibling = siblings[i];
+            if (sibling === element) {
+                return getXPath(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';
+            }
+            if (sibling.nodeType === 1 && sibling.tagName === element.tagName) {
+                ix++;
+            }
+        }
+    }
+
+    function describe(type, target) {
+        return {
+            type: type,
+            xpath: getXPath(target),
+            text: target.textContent || target.value || '',
+            tagName: target.tagName,
+            className: typeof target.className === 'string' ? target.className : '',
+            id: target.id,
+            url: window.location.href
+        };
+    }
+
+    document.addEventListener('click', function (e) {
+        var event = describe('click', e.target);
+        var rect = e.target.getBoundingClientRect();
+        event.coordinates = {
+            x: Math.round(rect.left + rect.width / 2),
+            y: Math.round(rect.top + rect.height / 2)
+        };
+        emit(event);
+    }, true);
+
+    document.addEventListener('input', function (e) {
+        var event = describe('input', e.target);
+        event.value = e.target.value;
+        event.placeholder = e.target.placeholder || '';
+        emit(event);
+    }, true);
+
+    document.addEventListener('change', function (e) {
+        if (e.target.tagName === 'SELECT') {
+            var event = describe('select', e.target);
+            event.text = e.target.textContent || '';
+            event.value = e.target.value;
+            event.selectedText = (e.target.options[e.target.selectedIndex] || {}).text || '';
+            emit(event);
+        }
+    }, true);
+
+    ['pushState', 'replaceState'].forEach(function (name) {
+        var original = history[name];
+        history[name] = function () {
+            var result = original.apply(this, arguments);
+            emitNavigation(window.location.href);
+            return result;
+        };
+    });
+    window.addEventListener('popstate', function () { emitNavigation(window.location.href); });
+    window.addEventListener('hashchange', function () { emitNavigation(window.location.href); });
+
+    window.addEventListener('pagehide', function () {
+        try {
+            if (recorder.active && recorder.queue.length) {
+                sessionStorage.setItem(STORAGE_KEY, JSON.stringify(recorder.queue));
+            }
+        } catch (e) {}
+    });
+
+    // Каждый новый документ - навигация (в том числе после быстрых редиректов и перезагрузок)
+    emitNavigation(window.location.href);
+})();
+"""
+
+# Долгий опрос: ответ приходит, как только в странице появились события, или по таймауту.
+# null - в документе нет скрипта записи.
+WAIT_EVENTS_JS = """
+var done = arguments[arguments.length - 1];
+if (!window.__recorder) {
+    done(null);
+    return;
+}
+window.__recorder.wait(arguments[0], done);
+"""
+
+STOP_RECORDER_JS = """
+if (!window.__recorder) {
+    return null;
+}
+window.__recorder.active = false;
+return window.__recorder.take();
+"""
+
 class ActionRecorder:
     """Система записи и воспроизведения действий пользователя"""
     
@@ -27,30 +229,29 @@ class ActionRecorder:
         self.recordings_dir = "recorded_actions"
         self.recording_thread = None
         self.last_url = None
+        self.event_queue = queue.Queue(maxsize=EVENT_QUEUE_SIZE)  # События страницы, ожидающие переноса в actions
+        self.dropped_events = 0
+        self._recorder_script_id = None  # Идентификатор скрипта записи, зарегистрированного через CDP
+        self.recording_path = None  # Файл загруженной записи (рядом хранится профиль воспроизведения)
+        self.last_replay_report = None
+        self._replay_profile = None
+        self._compiled_selectors = {}
         
         # Создаем директорию для записей
         if not os.path.exists(self.recordings_dir):
             os.makedirs(self.recordings_dir)
     
     def setup_driver(self, headless=False):
-        """Настройка веб-драйвера"""
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--allow-running-insecure-content")
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
+        """Получить веб-драйвер из пула браузеров"""
+        self.driver = get_browser_pool().acquire(headless=headless, extra_args=RECORDER_CHROME_ARGS)
         return self.driver
-    
+
+    def release_driver(self):
+        """Вернуть браузер в пул"""
+        if self.driver:
+            get_browser_pool().release(self.driver)
+            self.driver = None
+
     def get_element_info(self, element):
         """Получить информацию об элементе"""
         try:
@@ -85,144 +286,115 @@ class ActionRecorder:
         except:
             return ""
     
+    def _install_page_recorder(self):
+        """
+        Зарегистрировать скрипт записи через CDP: браузер сам выполняет его в каждом новом
+        документе, поэтому запись переживает перезагрузки и переходы без участия Python
+        """
+        try:
+            result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': RECORDER_JS})
+            self._recorder_script_id = result.get('identifier')
+        except Exception as e:
+            # Не Chrome или CDP недоступен - поток сбора событий внедряет скрипт после каждого перехода
+            logger.warning(f"CDP недоступен, скрипт записи будет внедряться после каждого перехода: {e}")
+
+    def _remove_page_recorder(self):
+        """Убрать скрипт записи из браузера (браузер вернется в пул и достанется другим)"""
+        if self._recorder_script_id is not None:
+            try:
+                self.driver.execute_cdp_cmd(
+                    'Page.removeScriptToEvaluateOnNewDocument', {'identifier': self._recorder_script_id}
+                )
+            except Exception as e:
+                logger.warning(f"Не удалось убрать скрипт записи: {e}")
+            self._recorder_script_id = None
+        try:
+            self.driver.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT)
+        except Exception:
+            pass
+
+    def _enqueue_events(self, batch):
+        """Положить пачку событий страницы в очередь"""
+        if not batch:
+            return
+        if batch.get('dropped'):
+            logger.warning(f"Страница отбросила {batch['dropped']} событий: очередь в браузере переполнена")
+        for event in batch.get('events') or []:
+            try:
+                self.event_queue.put_nowait(event)
+            except queue.Full:
+                self.dropped_events += 1
+
+    def drain_events(self):
+        """Перенести накопленные события из очереди в записанные действия"""
+        drained = 0
+        while True:
+            try:
+                event = self.event_queue.get_nowait()
+            except queue.Empty:
+                break
+            drained += 1
+            if event.get('type') == 'navigation':
+                # pushState и загрузка того же документа дают одну навигацию
+                if event.get('url') == self.last_url:
+                    continue
+                self.last_url = event.get('url')
+                logger.info(f"Записана навигация: {self.last_url}")
+            self.actions.append(event)
+        return drained
+
     def monitor_page_changes(self):
-        """Мониторинг изменений страницы"""
+        """
+        Сбор событий страницы
+
+        Скрипт в странице копит клики, ввод и навигацию; поток ждет их долгим опросом
+        (execute_async_script возвращается, как только появилось событие, или по таймауту),
+        поэтому в простое браузер опрашивается раз в EVENT_POLL_TIMEOUT, а при активности
+        события забираются пачками сразу.
+        """
+        self.driver.set_script_timeout(EVENT_POLL_TIMEOUT + 5)
         while self.recording:
             try:
-                current_url = self.driver.current_url
-                if current_url != self.last_url:
-                    self.actions.append({
-                        'type': 'navigation',
-                        'url': current_url,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    self.last_url = current_url
-                    logger.info(f"Записана навигация: {current_url}")
-                
-                time.sleep(0.5)  # Проверяем каждые 500мс
-                
+                batch = self.driver.execute_async_script(WAIT_EVENTS_JS, int(EVENT_POLL_TIMEOUT * 1000))
+                if batch is None:
+                    # Новый документ без скрипта записи (CDP недоступен) - внедряем заново
+                    if self.recording:
+                        self.driver.execute_script(RECORDER_JS)
+                    continue
+                self._enqueue_events(batch)
+                self.drain_events()
             except Exception as e:
-                logger.error(f"Ошибка мониторинга: {e}")
-                break
+                if not self.recording:
+                    break
+                # Опрос прерывается переходом на другую страницу - события старой страницы
+                # сохранены в sessionStorage и вернутся со следующей пачкой
+                logger.debug(f"Опрос событий прерван: {e}")
+                time.sleep(0.1)
     
     def start_recording(self, url, headless=False):
         """Начать запись действий"""
         try:
             self.driver = self.setup_driver(headless)
-            self.driver.get(url)
-            self.recording = True
             self.actions = []
-            self.last_url = url
+            self.event_queue = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+            self.dropped_events = 0
+            self.last_url = None
             
-            # Запускаем мониторинг изменений страницы
-            self.recording_thread = threading.Thread(target=self.monitor_page_changes)
-            self.recording_thread.daemon = True
-            self.recording_thread.start()
-            
-            # Пытаемся добавить JavaScript для записи действий
+            # Скрипт записи регистрируется до загрузки страницы, чтобы не пропустить ранние переходы
+            self._install_page_recorder()
+            self.driver.get(url)
             try:
-                self.driver.execute_script("""
-                    window.recordedActions = [];
-                    window.recording = true;
-                    
-                    // Функция для получения XPath элемента
-                    function getXPath(element) {
-                        if (element.id !== '') {
-                            return 'id("' + element.id + '")';
-                        }
-                        if (element === document.body) {
-                            return element.tagName;
-                        }
-                        var ix = 0;
-                        var siblings = element.parentNode.childNodes;
-                        for (var i = 0; i < siblings.length; i++) {
-                            var sibling = siblings[i];
-                            if (sibling === element) {
-                                return getXPath(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';
-                            }
-                            if (sibling.nodeType === 1 && sibling.tagName === element.tagName) {
-                                ix++;
-                            }
-                        }
-                    }
-                    
-                    // Записываем клики
-                    document.addEventListener('click', function(e) {
-                        if (window.recording) {
-                            var rect = e.target.getBoundingClientRect();
-                            window.recordedActions.push({
-                                type: 'click',
-                                xpath: getXPath(e.target),
-                                text: e.target.textContent || e.target.value || '',
-                                tagName: e.target.tagName,
-                                className: e.target.className,
-                                id: e.target.id,
-                                coordinates: {
-                                    x: Math.round(rect.left + rect.width / 2),
-                                    y: Math.round(rect.top + rect.height / 2)
-                                },
-                                timestamp: Date.now(),
-                                url: window.location.href
-                            });
-                            console.log('Recorded click:', e.target.textContent || e.target.value);
-                        }
-                    }, true);
-                    
-                    // Записываем ввод текста
-                    document.addEventListener('input', function(e) {
-                        if (window.recording) {
-                            window.recordedActions.push({
-                                type: 'input',
-                                xpath: getXPath(e.target),
-                                text: e.target.textContent || e.target.value || '',
-                                tagName: e.target.tagName,
-                                className: e.target.className,
-                                id: e.target.id,
-                                value: e.target.value,
-                                placeholder: e.target.placeholder || '',
-                                timestamp: Date.now(),
-                                url: window.location.href
-                            });
-                            console.log('Recorded input:', e.target.value);
-                        }
-                    });
-                    
-                    // Записываем изменения select
-                    document.addEventListener('change', function(e) {
-                        if (window.recording && e.target.tagName === 'SELECT') {
-                            window.recordedActions.push({
-                                type: 'select',
-                                xpath: getXPath(e.target),
-                                text: e.target.textContent || '',
-                                tagName: e.target.tagName,
-                                className: e.target.className,
-                                id: e.target.id,
-                                value: e.target.value,
-                                selectedText: e.target.options[e.target.selectedIndex]?.text || '',
-                                timestamp: Date.now(),
-                                url: window.location.href
-                            });
-                            console.log('Recorded select:', e.target.value);
-                        }
-                    });
-                    
-                    // Записываем навигацию
-                    var originalPushState = history.pushState;
-                    history.pushState = function() {
-                        if (window.recording) {
-                            window.recordedActions.push({
-                                type: 'navigation',
-                                url: arguments[2],
-                                timestamp: Date.now()
-                            });
-                            console.log('Recorded navigation:', arguments[2]);
-                        }
-                        return originalPushState.apply(this, arguments);
-                    };
-                """)
+                # Без CDP скрипт ставится в уже открытую страницу (при CDP повторный запуск ничего не делает)
+                self.driver.execute_script(RECORDER_JS)
                 logger.info("JavaScript для записи добавлен успешно")
             except Exception as js_error:
                 logger.warning(f"JavaScript не удалось добавить: {js_error}")
+            self.recording = True
+            
+            # Запускаем сбор событий страницы
+            self.recording_thread = threading.Thread(target=self.monitor_page_changes)
+            self.recording_thread.daemon = True
+            self.recording_thread.start()
             
             logger.info(f"Запись начата для {url}")
             return True
@@ -236,50 +408,33 @@ class ActionRecorder:
         try:
             self.recording = False
             
-            # Ждем завершения потока мониторинга
+            # Ждем завершения потока сбора событий (не дольше одного опроса)
             if self.recording_thread and self.recording_thread.is_alive():
-                self.recording_thread.join(timeout=2)
+                self.recording_thread.join(timeout=EVENT_POLL_TIMEOUT + 2)
             
             if self.driver:
-                # Пытаемся получить действия из JavaScript
+                # Забираем события, которые страница не успела отдать
                 try:
-                    self.driver.execute_script("window.recording = false;")
-                    js_actions = self.driver.execute_script("return window.recordedActions;")
-                    
-                    if js_actions:
-                        # Объединяем JavaScript действия с навигацией
-                        all_actions = js_actions + self.actions
-                        # Убираем дубликаты навигации
-                        seen_urls = set()
-                        unique_actions = []
-                        for action in all_actions:
-                            if action.get('type') == 'navigation':
-                                if action.get('url') not in seen_urls:
-                                    unique_actions.append(action)
-                                    seen_urls.add(action.get('url'))
-                            else:
-                                unique_actions.append(action)
-                        
-                        self.actions = unique_actions
+                    self._enqueue_events(self.driver.execute_script(STOP_RECORDER_JS))
                 except Exception as js_error:
                     logger.warning(f"Не удалось получить JavaScript действия: {js_error}")
-                    # Используем только навигационные действия
-                    pass
+                self._remove_page_recorder()
+                self.drain_events()
+                if self.dropped_events:
+                    logger.warning(f"Очередь событий переполнялась, потеряно {self.dropped_events}")
                 
                 if self.actions:
                     # Сохраняем в файл
                     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f"{self.recordings_dir}/{self.platform_name}_actions_{timestamp}.json"
+                    filename = f"{self.recordings_dir}/{self.platform_name}_actions_{timestamp}{recording_extension()}"
                     
-                    recording_data = {
+                    header = {
                         "platform": self.platform_name,
-                        "created_at": datetime.now().isoformat(),
-                        "total_actions": len(self.actions),
-                        "actions": self.actions
+                        "created_at": datetime.now().isoformat()
                     }
                     
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        json.dump(recording_data, f, ensure_ascii=False, indent=2)
+                    save_recording(filename, header, self.actions)
+                    get_catalog(self.recordings_dir).register(filename)
                     
                     logger.info(f"Запись сохранена в файл: {filename}")
                     logger.info(f"Записано действий: {len(self.actions)}")
@@ -293,16 +448,17 @@ class ActionRecorder:
             return None
         finally:
             if self.driver:
-                self.driver.quit()
+                self.release_driver()
     
     def load_recording(self, filename):
         """Загрузить записанные действия из файла"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.actions = data.get('actions', [])
-                logger.info(f"Загружено {len(self.actions)} действий из {filename}")
-                return True
+            # Потоковая запись дочитывается по ходу воспроизведения
+            _, self.actions = load_recording(filename)
+            self.recording_path = filename
+            self._compiled_selectors = {}
+            logger.info(f"Загружено {len(self.actions)} действий из {filename}")
+            return True
         except Exception as e:
             logger.error(f"Ошибка при загрузке записи: {e}")
             return False
@@ -330,8 +486,9 @@ class ActionRecorder:
         
         return text
     
-    def find_element_smart(self, action):
-        """Умный поиск элемента по нескольким критериям"""
+    @staticmethod
+    def build_selectors(action):
+        """Кандидаты-селекторы для поиска элемента действия, в порядке приоритета"""
         selectors = []
         
         # Добавляем XPath
@@ -355,66 +512,221 @@ class ActionRecorder:
             if class_name:
                 selectors.append(('class_name', class_name))
         
+        return selectors
+    
+    def _selectors_for(self, action, step):
+        """Селекторы шага строятся один раз на загруженную запись"""
+        if step is None:
+            return self.build_selectors(action)
+        selectors = self._compiled_selectors.get(step)
+        if selectors is None:
+            selectors = self._compiled_selectors[step] = self.build_selectors(action)
+        return selectors
+    
+    def _find_by(self, selector_type, selector_value):
+        """Один селектор - один запрос к WebDriver"""
+        try:
+            element = self.driver.find_element(SELECTOR_BY[selector_type], selector_value)
+            if element and element.is_displayed():
+                return element
+        except NoSuchElementException:
+            pass
+        return None
+    
+    def _resolve_in_page(self, selectors):
+        """Проверить все селекторы одним JS-вызовом: (элемент, индекс сработавшего) или (None, None)"""
+        result = self.driver.execute_script(RESOLVE_SELECTORS_JS, [list(selector) for selector in selectors])
+        if result:
+            return result[0], int(result[1])
+        return None, None
+    
+    def find_element_smart(self, action, step=None):
+        """
+        Умный поиск элемента по нескольким критериям
+        
+        Если известен номер шага и идет воспроизведение, сначала пробуется селектор,
+        сработавший в прошлый раз, затем все кандидаты проверяются одним JS-вызовом.
+        """
+        selectors = self._selectors_for(action, step)
+        if not selectors:
+            return None
+        profile = self._replay_profile if step is not None else None
+        
+        if profile is not None:
+            cached = profile.cached_selector(step)
+            if cached and [cached['strategy'], cached['value']] in [list(sel) for sel in selectors]:
+                started = time.monotonic()
+                element = self._find_by(cached['strategy'], cached['value'])
+                if element:
+                    profile.remember_selector(step, cached['strategy'], cached['value'], time.monotonic() - started)
+                    return element
+        
+        started = time.monotonic()
+        try:
+            element, index = self._resolve_in_page(selectors)
+            if element is not None:
+                if profile is not None:
+                    strategy, value = selectors[index]
+                    profile.remember_selector(step, strategy, value, time.monotonic() - started)
+                return element
+            return None
+        except Exception as e:
+            logger.debug(f"JS-поиск элемента недоступен, пробуем селекторы по очереди: {e}")
+        
         # Пробуем каждый селектор
         for selector_type, selector_value in selectors:
-            try:
-                if selector_type == 'xpath':
-                    element = self.driver.find_element(By.XPATH, selector_value)
-                elif selector_type == 'id':
-                    element = self.driver.find_element(By.ID, selector_value)
-                elif selector_type == 'class_name':
-                    element = self.driver.find_element(By.CLASS_NAME, selector_value)
-                
-                if element and element.is_displayed():
-                    return element
-            except NoSuchElementException:
-                continue
+            element = self._find_by(selector_type, selector_value)
+            if element:
+                if profile is not None:
+                    profile.remember_selector(step, selector_type, selector_value, time.monotonic() - started)
+                return element
         
         return None
     
-    def replay_actions(self, user_data, delay=1.0):
-        """Воспроизвести записанные действия"""
+    # --- Ожидания при воспроизведении ---
+    def _network_idle(self, timeout, quiet_period=0.5):
+        """Дождаться загрузки документа и паузы в сетевых запросах страницы"""
+        deadline = time.monotonic() + timeout
+        last_count = None
+        quiet_since = time.monotonic()
+        while time.monotonic() < deadline:
+            try:
+                state, count = self.driver.execute_script(
+                    "return [document.readyState, performance.getEntriesByType('resource').length];"
+                )
+            except Exception:
+                state, count = 'loading', None
+            now = time.monotonic()
+            if state != 'complete' or count != last_count:
+                last_count = count
+                quiet_since = now
+            elif now - quiet_since >= quiet_period:
+                return True
+            time.sleep(0.1)
+        return False
+
+    def _wait_for_url_change(self, old_url, timeout):
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(lambda d: d.current_url != old_url)
+            return True
+        except TimeoutException:
+            return False
+
+    def _wait_for_element(self, action, timeout, clickable=False, step=None):
+        """Дождаться элемента (видимого, а для клика - доступного)"""
+        def ready(driver):
+            element = self.find_element_smart(action, step)
+            if element and (not clickable or element.is_enabled()):
+                return element
+            return False
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(ready)
+        except TimeoutException:
+            return None
+
+    @staticmethod
+    def has_selectors(action):
+        """Можно ли дождаться элемента действия (есть хотя бы один способ его найти)"""
+        return bool(ActionRecorder.build_selectors(action))
+
+    def _next_navigation_url(self, index):
+        """URL следующей навигации, если она идет сразу за действием"""
+        if index + 1 < len(self.actions):
+            next_action = self.actions[index + 1]
+            if next_action.get('type') == 'navigation':
+                return next_action.get('url')
+        return None
+
+    def replay_actions(self, user_data, delay=1.0, cancel_event=None, wait_mode=True):
+        """
+        Воспроизвести записанные действия
+
+        Args:
+            user_data: Данные для подстановки в placeholder'ы
+            delay: Фиксированная пауза; в wait_mode используется только там, где нечего ждать
+            cancel_event: threading.Event для остановки воспроизведения
+            wait_mode: Ждать готовности страницы/элементов вместо фиксированных пауз
+        """
         if not self.actions:
             logger.error("Нет действий для воспроизведения")
             return False
-        
+
+        profile = ReplayProfile(self.recording_path if wait_mode else None)
+        self._replay_profile = profile
+
         try:
             self.driver = self.setup_driver()
             current_url = None
-            
+
             for i, action in enumerate(self.actions):
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info(f"Воспроизведение отменено на действии {i+1}/{len(self.actions)}")
+                    return False
+                step_started = time.monotonic()
+                waited = 0.0
+                condition = 'fixed_delay'
+                satisfied = True
                 try:
                     logger.info(f"Выполняем действие {i+1}/{len(self.actions)}: {action['type']}")
-                    
+
                     # Обрабатываем навигацию
                     if action['type'] == 'navigation' and action.get('url'):
                         if current_url != action['url']:
                             self.driver.get(action['url'])
                             current_url = action['url']
-                            time.sleep(delay)
+                            wait_started = time.monotonic()
+                            if wait_mode:
+                                condition = 'network_idle'
+                                satisfied = self._network_idle(profile.timeout_for(i))
+                            else:
+                                time.sleep(delay)
+                            waited = time.monotonic() - wait_started
                         continue
-                    
+
                     # Находим элемент
-                    element = self.find_element_smart(action)
-                    
+                    wait_started = time.monotonic()
+                    if wait_mode and self.has_selectors(action):
+                        condition = 'clickable' if action['type'] == 'click' else 'present'
+                        element = self._wait_for_element(
+                            action, profile.timeout_for(i), clickable=action['type'] == 'click', step=i
+                        )
+                        satisfied = element is not None
+                    else:
+                        element = self.find_element_smart(action, i)
+                    waited = time.monotonic() - wait_started
+
                     if not element:
                         logger.warning(f"Не удалось найти элемент для действия {i+1}")
+                        profile.invalidate_selector(i)
                         continue
-                    
+
                     # Выполняем действие
                     if action['type'] == 'click':
                         # Прокручиваем к элементу
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                        time.sleep(0.5)
+                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+                        if not wait_mode:
+                            time.sleep(0.5)
+                        url_before = self.driver.current_url
                         element.click()
-                        
+
+                        if wait_mode:
+                            # Клик перед навигацией ждет смены URL, остальные - успокоения сети
+                            wait_started = time.monotonic()
+                            expected_url = self._next_navigation_url(i)
+                            if expected_url and expected_url != url_before:
+                                self._wait_for_url_change(url_before, profile.timeout_for(i))
+                                current_url = self.driver.current_url
+                            else:
+                                self._network_idle(profile.timeout_for(i), quiet_period=0.3)
+                            waited += time.monotonic() - wait_started
+
                     elif action['type'] == 'input':
                         # Очищаем поле и вводим текст
                         element.clear()
                         value = self.replace_placeholders(action.get('value', ''), user_data)
                         if value:
                             element.send_keys(value)
-                            
+
                     elif action['type'] == 'select':
                         # Выбираем опцию в select
                         from selenium.webdriver.support.ui import Select
@@ -425,46 +737,51 @@ class ActionRecorder:
                                 select.select_by_value(value)
                             except:
                                 select.select_by_visible_text(value)
-                    
-                    time.sleep(delay)
-                    
+
+                    if condition == 'fixed_delay':
+                        # Готовность проверить нечем - остается фиксированная пауза
+                        time.sleep(delay)
+
                 except Exception as e:
                     logger.error(f"Ошибка при выполнении действия {i+1}: {e}")
+                    profile.invalidate_selector(i)
+                    satisfied = False
                     continue
-            
-            logger.info("Воспроизведение завершено")
+                finally:
+                    profile.record(i, action.get('type', ''), condition, waited,
+                                   time.monotonic() - step_started, satisfied)
+
+            report = profile.report()
+            self.last_replay_report = report
+            logger.info(
+                f"Воспроизведение завершено за {report['total_seconds']}с "
+                f"(ожидание {report['waited_seconds']}с, шагов {len(report['steps'])})"
+            )
+            for step in report['steps']:
+                logger.info(f"  шаг {step['step']:>3} {step['type']:<10} {step['condition']:<12} {step['seconds']:.2f}с")
+            profile.save()
             return True
-            
+
         except Exception as e:
             logger.error(f"Ошибка при воспроизведении: {e}")
             return False
         finally:
+            self._replay_profile = None
             if self.driver:
-                self.driver.quit()
-    
+                self.release_driver()
+
     def get_available_recordings(self):
-        """Получить список доступных записей"""
-        recordings = []
-        if os.path.exists(self.recordings_dir):
-            for filename in os.listdir(self.recordings_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.recordings_dir, filename)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            # Проверяем, что запись для этой платформы
-                            if data.get('platform', '').lower() == self.platform_name.lower():
-                                recordings.append({
-                                    'filename': filename,
-                                    'filepath': filepath,
-                                    'platform': data.get('platform', 'Unknown'),
-                                    'created_at': data.get('created_at', ''),
-                                    'total_actions': data.get('total_actions', 0)
-                                })
-                    except:
-                        continue
-        
-        return sorted(recordings, key=lambda x: x['created_at'], reverse=True)
+        """Получить список доступных записей платформы (от новых к старым)"""
+        return [
+            {
+                'filename': rec['filename'],
+                'filepath': rec['filepath'],
+                'platform': rec['platform'],
+                'created_at': rec['created_at'],
+                'total_actions': rec['total_actions']
+            }
+            for rec in get_catalog(self.recordings_dir).recordings(platform=self.platform_name)
+        ]
     
     def get_available_recording_files(self):
         """Получить список имен файлов записей (для совместимости)"""
@@ -474,10 +791,7 @@ class ActionRecorder:
     def preview_recording(self, filename):
         """Предварительный просмотр записи"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            actions = data.get('actions', [])
+            data, actions = load_recording(filename)
             preview = f"📋 **Запись: {os.path.basename(filename)}**\n\n"
             preview += f"🏷️ Платформа: {data.get('platform', 'Unknown')}\n"
             preview += f"📅 Создана: {data.get('created_at', '')}\n"
@@ -542,6 +856,12 @@ class RecordingManager:
             recordings.extend(recorder.get_available_recordings())
         return recordings
 
+    def close(self):
+        """Вернуть браузеры рекордеров в пул (при остановке приложения)"""
+        for recorder in self.recorders.values():
+            recorder.release_driver()
+        self.current_recording = None
+
 
 # Пример использования
 if __name__ == "__main__":
@@ -35,3 +35,13 @@ def handler(request):
                 'status': 'error'
             })
         }
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from startup_profile import get_startup_profiler, probe_callable
+
+    # Профилирование старта (--profile-startup): первый вызов обработчика Vercel
+    profiler = get_startup_profiler('api/index')
+    if profiler:
+        sys.exit(profiler.run(probe_callable, handler, {}))
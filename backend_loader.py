@@ -0,0 +1,207 @@
+"""
+Ленивая загрузка бэкендов автоматизации бота
+RPA, AutoHotkey, интегрированная автоматизация, PyAutoGUI и Selenium-менеджеры площадок
+импортируются и создаются при первом обращении, а не при импорте bot.py: бот отвечает на /start,
+пока тяжелые модули еще не загружены. Доступность проверяется без импорта (поиск модуля),
+время импорта и создания каждого бэкенда записывается.
+
+Сторонние пакеты добавляют или переопределяют бэкенды через entry point группы
+hotel_bot.backends (имя - имя бэкенда, значение - "модуль:класс").
+"""
+
+import importlib
+import importlib.metadata
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'hotel_bot.backends'
+
+# Встроенные бэкенды: имя -> кандидаты "модуль:класс" по порядку предпочтения
+DEFAULT_BACKENDS: Dict[str, Tuple[str, ...]] = {
+    # Упрощенная версия RPA (без PyAutoGUI), иначе полная
+    'rpa': ('rpa_manager_simple:SimpleRPAManager', 'rpa_manager:RPAManager'),
+    'ahk': ('autohotkey_automation:AutoHotkeyAutomation',),
+    'integrated': ('telegram_integrated_manager:TelegramIntegratedManager',),
+    'pyautogui': ('pyautogui_bot_integration:PyAutoGUIBotIntegration',),
+    'ostrovok': ('enhanced_ostrovok_manager:EnhancedOstrovokManager',),
+    'hotels101': ('hotels101_manager:Hotels101Manager',),
+    'bronevik': ('bronevik_manager:BronevikManager',),
+}
+
+
+class BackendUnavailable(RuntimeError):
+    """Бэкенд не удалось импортировать или создать"""
+
+
+class BackendState:
+    __slots__ = ('name', 'candidates', 'instance', 'source', 'error', 'loaded', 'import_time', 'init_time')
+
+    def __init__(self, name: str, candidates: Tuple[str, ...]):
+        self.name = name
+        self.candidates = candidates
+        self.instance = None
+        self.source: Optional[str] = None
+        self.error: Optional[str] = None
+        self.loaded = False
+        self.import_time = 0.0
+        self.init_time = 0.0
+
+
+def module_exists(path: str) -> bool:
+    """Есть ли модуль "модуль:класс" (без его выполнения)"""
+    module = path.partition(':')[0]
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class BackendLoader:
+    """
+    Реестр бэкендов с импортом при первом использовании
+
+    Пример:
+        backends = get_backend_loader()
+        if backends.available('rpa'):      # без импорта
+            rpa = backends.get('rpa')      # импорт и создание, None при ошибке
+    """
+
+    def __init__(self, backends: Optional[Dict[str, Iterable[str]]] = None, discover: bool = True):
+        self._states: Dict[str, BackendState] = {}
+        self._lock = threading.RLock()
+        for name, candidates in (DEFAULT_BACKENDS if backends is None else backends).items():
+            self.register(name, *candidates)
+        if discover:
+            self.discover()
+
+    def register(self, name: str, *candidates: str):
+        """Зарегистрировать (или переопределить) бэкенд; кандидаты пробуются по порядку"""
+        with self._lock:
+            state = self._states.get(name)
+            if state is not None and state.loaded:
+                raise ValueError(f"Бэкенд {name} уже загружен, переопределить его нельзя")
+            self._states[name] = BackendState(name, tuple(candidates))
+
+    def discover(self, group: str = ENTRY_POINT_GROUP) -> List[str]:
+        """Бэкенды из entry points установленных пакетов (переопределяют встроенные)"""
+        try:
+            entry_points = importlib.metadata.entry_points(group=group)
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать entry points {group}: {e}")
+            return []
+        names = []
+        for entry_point in entry_points:
+            self.register(entry_point.name, entry_point.value)
+            names.append(entry_point.name)
+        if names:
+            logger.info(f"Бэкенды из entry points: {', '.join(names)}")
+        return names
+
+    def names(self) -> List[str]:
+        return list(self._states)
+
+    def available(self, name: str) -> bool:
+        """Можно ли загрузить бэкенд (модуль найден или уже загружен успешно); модуль не импортируется"""
+        state = self._states.get(name)
+        if state is None:
+            return False
+        if state.loaded:
+            return state.instance is not None
+        return any(module_exists(path) for path in state.candidates)
+
+    def loaded(self, name: str) -> bool:
+        state = self._states.get(name)
+        return bool(state and state.loaded)
+
+    def _load(self, state: BackendState):
+        errors = []
+        for path in state.candidates:
+            module_name, _, attr = path.partition(':')
+            started = time.perf_counter()
+            try:
+                factory = getattr(importlib.import_module(module_name), attr)
+            except (ImportError, AttributeError) as e:
+                state.import_time += time.perf_counter() - started
+                errors.append(f"{path}: {e}")
+                continue
+            state.import_time += time.perf_counter() - started
+            started = time.perf_counter()
+            try:
+                state.instance = factory()
+            except Exception as e:
+                errors.append(f"{path}: {e}")
+                continue
+            finally:
+                state.init_time = time.perf_counter() - started
+            state.source = path
+            logger.info(
+                f"Бэкенд {state.name} ({path}) загружен: импорт {state.import_time * 1000:.0f} мс, "
+                f"создание {state.init_time * 1000:.0f} мс"
+            )
+            break
+        else:
+            state.error = '; '.join(errors) or 'нет кандидатов'
+            logger.warning(f"Бэкенд {state.name} недоступен: {state.error}")
+        state.loaded = True
+
+    def get(self, name: str) -> Any:
+        """Экземпляр бэкенда (импорт при первом обращении) или None, если он недоступен"""
+        state = self._states.get(name)
+        if state is None:
+            return None
+        if not state.loaded:
+            with self._lock:
+                if not state.loaded:
+                    self._load(state)
+        return state.instance
+
+    def require(self, name: str) -> Any:
+        """Экземпляр обязательного бэкенда; BackendUnavailable, если его нет"""
+        instance = self.get(name)
+        if instance is None:
+            state = self._states.get(name)
+            raise BackendUnavailable(f"Бэкенд {name} недоступен: {state.error if state else 'не зарегистрирован'}")
+        return instance
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """Загрузить бэкенды заранее (например, в фоне после старта бота)"""
+        return {name: self.get(name) is not None for name in (names or self.names()) if self.available(name)}
+
+    def preload_async(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """preload в фоновом потоке: первое нажатие не ждет импорта"""
+        names = list(names) if names is not None else None
+        thread = threading.Thread(target=self.preload, args=(names,), name='backend-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Время импорта и создания бэкендов (для диагностики холодного старта)"""
+        return {
+            name: {
+                'loaded': state.loaded,
+                'available': state.instance is not None if state.loaded else None,
+                'source': state.source,
+                'import_ms': round(state.import_time * 1000, 1),
+                'init_ms': round(state.init_time * 1000, 1),
+                'error': state.error
+            }
+            for name, state in self._states.items()
+        }
+
+
+_loader: Optional[BackendLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_backend_loader() -> BackendLoader:
+    """Общий загрузчик бэкендов процесса"""
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = BackendLoader()
+        return _loader
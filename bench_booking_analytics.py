@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк аналитики бронирований booking_analytics
+
+Генерирует синтетический портфель, сравнивает подсчет статистики циклом по словарям
+(как в прежнем BnovoManager.get_statistics) с векторным window_metrics по колонкам
+и измеряет инкрементальное обновление пачкой бронирований после синхронизации.
+
+Запуск:
+    python bench_booking_analytics.py               # 1 000 000 бронирований
+    python bench_booking_analytics.py --rows 100000
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from booking_analytics import BookingFrame, to_day, window_metrics
+
+CHANNELS = ['Booking.com', 'Ostrovok', '101 Hotels', 'Яндекс Путешествия', 'Прямое']
+STATUSES = ['Новое', 'Заселен', 'Выехал', 'Отменено']
+
+
+def synthetic_columns(rows: int, properties: int, seed: int = 42):
+    """Колонки синтетических бронирований за два года"""
+    rng = np.random.default_rng(seed)
+    start = to_day('2024-01-01')
+    arrival = start + rng.integers(0, 730, rows)
+    nights = rng.integers(1, 8, rows)
+    return {
+        'arrival': arrival.astype(np.int32),
+        'departure': (arrival + nights).astype(np.int32),
+        'created': (arrival - rng.integers(0, 120, rows)).astype(np.int32),
+        'amount': (nights * rng.uniform(2500, 9000, rows)).round(2),
+        'channel': rng.integers(0, len(CHANNELS), rows).astype(np.int32),
+        'status': rng.choice(len(STATUSES), rows, p=[0.3, 0.3, 0.3, 0.1]).astype(np.int32),
+        'property': rng.integers(0, properties, rows).astype(np.int32),
+    }
+
+
+def to_dicts(columns, properties):
+    """Те же бронирования в виде ответа API"""
+    epoch = date(1970, 1, 1)
+    days = lambda value: (epoch + timedelta(days=int(value))).isoformat()
+    return [
+        {
+            'id': i,
+            'amount': float(columns['amount'][i]),
+            'source': {'name': CHANNELS[columns['channel'][i]]},
+            'status': {'name': STATUSES[columns['status'][i]]},
+            'dates': {'arrival': days(columns['arrival'][i]), 'departure': days(columns['departure'][i])},
+            'create_date': days(columns['created'][i]),
+            'hotel_id': f'hotel-{columns["property"][i] % properties}'
+        }
+        for i in range(len(columns['amount']))
+    ]
+
+
+def loop_statistics(bookings, date_from: date, date_to: date):
+    """Прежний подход: проход циклом по словарям на каждый запрос"""
+    revenue = 0.0
+    room_nights = 0
+    cancelled = 0
+    platforms = {}
+    for booking in bookings:
+        arrival = date.fromisoformat(booking['dates']['arrival'][:10])
+        departure = date.fromisoformat(booking['dates']['departure'][:10])
+        nights = (min(departure, date_to) - max(arrival, date_from)).days
+        if nights <= 0:
+            continue
+        if booking['status']['name'] == 'Отменено':
+            cancelled += 1
+            continue
+        share = booking['amount'] * nights / max((departure - arrival).days, 1)
+        revenue += share
+        room_nights += nights
+        platform = platforms.setdefault(booking['source']['name'], {'count': 0, 'revenue': 0.0})
+        platform['count'] += 1
+        platform['revenue'] += share
+    return revenue, room_nights, cancelled, platforms
+
+
+def timed(func, repeat: int):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк booking_analytics')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='сколько бронирований сгенерировать')
+    parser.add_argument('--properties', type=int, default=50, help='сколько объектов в портфеле')
+    parser.add_argument('--rooms', type=int, default=120, help='номерной фонд одного объекта')
+    parser.add_argument('--loop-rows', type=int, default=200_000,
+                        help='на скольких бронированиях измерить цикл по словарям')
+    parser.add_argument('--batch', type=int, default=5_000, help='размер пачки инкрементального обновления')
+    parser.add_argument('--repeat', type=int, default=3, help='повторов каждого замера')
+    args = parser.parse_args()
+
+    print(f"📊 Бенчмарк booking_analytics: {args.rows:,} бронирований, {args.properties} объектов")
+
+    columns = synthetic_columns(args.rows, args.properties)
+    frame = BookingFrame(capacity=args.rows + args.batch)
+    started = time.perf_counter()
+    frame.append_columns([str(i) for i in range(args.rows)], columns)
+    frame.channels.names.extend(CHANNELS)
+    frame.channels.codes.update({name: code for code, name in enumerate(CHANNELS)})
+    frame.statuses.names.extend(STATUSES)
+    frame.statuses.codes.update({name: code for code, name in enumerate(STATUSES)})
+    for code in range(args.properties):
+        frame.properties.encode(f'hotel-{code}')
+    print(f"  Загрузка колонок:                 {time.perf_counter() - started:.3f} с")
+
+    windows = [('месяц', '2024-06-01', '2024-07-01'), ('квартал', '2024-07-01', '2024-10-01'),
+               ('год', '2024-01-01', '2025-01-01')]
+    rooms = {f'hotel-{code}': args.rooms for code in range(args.properties)}
+    for title, date_from, date_to in windows:
+        elapsed, metrics = timed(lambda: window_metrics(frame, date_from, date_to, rooms=rooms), args.repeat)
+        print(f"  window_metrics ({title}):{' ' * (10 - len(title))}{elapsed * 1000:8.1f} мс "
+              f"(загрузка {metrics['occupancy']:.1%}, ADR {metrics['adr']:.0f} ₽)")
+
+    loop_rows = min(args.loop_rows, args.rows)
+    bookings = to_dicts({name: column[:loop_rows] for name, column in columns.items()}, args.properties)
+    loop_elapsed, _ = timed(lambda: loop_statistics(bookings, date(2024, 1, 1), date(2025, 1, 1)), 1)
+    loop_elapsed *= args.rows / loop_rows
+    vector_elapsed, _ = timed(lambda: window_metrics(frame, '2024-01-01', '2025-01-01'), args.repeat)
+    print(f"  Цикл по словарям (год, оценка на {args.rows:,}): {loop_elapsed * 1000:,.0f} мс "
+          f"(x{loop_elapsed / vector_elapsed:.0f} медленнее)")
+
+    # Инкрементальное обновление: половина пачки - изменения известных, половина - новые
+    batch = to_dicts({name: column[:args.batch] for name, column in columns.items()}, args.properties)
+    for offset, booking in enumerate(batch[args.batch // 2:]):
+        booking['id'] = args.rows + offset
+    elapsed, (added, updated) = timed(lambda: frame.upsert(batch), 1)
+    print(f"  upsert пачки {args.batch:,}: {elapsed * 1000:.1f} мс "
+          f"(добавлено {added:,}, обновлено {updated:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк слоя хранения db.Database
+
+Сравнивает построчную вставку с коммитом на каждую строку (как раньше) и пакетную
+bulk_add_listings, а также время поиска по listing_id/account_id с индексом и без него.
+
+Запуск:
+    python bench_db.py               # 1 000 000 строк
+    python bench_db.py --rows 100000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from db import Database
+
+
+def measure_lookups(db: Database, sql: str, keys, repeat: int):
+    """Задержки запросов в микросекундах: (p50, p95)"""
+    timings = []
+    for key in random.sample(keys, min(repeat, len(keys))):
+        started = time.perf_counter()
+        db.conn.execute(sql, (key,)).fetchall()
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк db.Database')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='сколько строк вставить')
+    parser.add_argument('--single-rows', type=int, default=20_000,
+                        help='сколько строк вставить по одной (с коммитом на каждую)')
+    parser.add_argument('--lookups', type=int, default=200, help='сколько поисков измерить')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_db_')
+    try:
+        db = Database(os.path.join(workdir, 'bench.db'))
+        payload = '{"title": "Номер", "price": 3500}'
+
+        print(f"📊 Бенчмарк db.Database: {args.rows:,} строк")
+
+        started = time.perf_counter()
+        for i in range(args.single_rows):
+            db.add_new_listing(f'single-{i}', payload)
+        single_rate = args.single_rows / (time.perf_counter() - started)
+        print(f"  Построчная вставка (коммит на строку): {single_rate:,.0f} строк/с")
+
+        started = time.perf_counter()
+        db.bulk_add_listings((f'listing-{i}', payload, 'pending') for i in range(args.rows))
+        bulk_rate = args.rows / (time.perf_counter() - started)
+        print(f"  bulk_add_listings:                     {bulk_rate:,.0f} строк/с "
+              f"(x{bulk_rate / single_rate:.1f})")
+
+        accounts = [f'account-{i}' for i in range(args.rows // 10)]
+        with db.transaction() as conn:
+            conn.executemany(
+                'INSERT INTO account_sessions (account_id, session_data) VALUES (?, ?)',
+                ((random.choice(accounts), payload) for _ in range(args.rows))
+            )
+
+        listing_keys = [f'listing-{i}' for i in range(0, args.rows, max(1, args.rows // 10_000))]
+        queries = [
+            ('new_listings по listing_id',
+             'SELECT * FROM new_listings {hint} WHERE listing_id = ?', listing_keys),
+            ('последняя сессия аккаунта',
+             'SELECT * FROM account_sessions {hint} WHERE account_id = ? '
+             'ORDER BY created_at DESC, id DESC LIMIT 1', accounts),
+        ]
+        for title, sql, keys in queries:
+            indexed = measure_lookups(db, sql.format(hint=''), keys, args.lookups)
+            # NOT INDEXED воспроизводит поведение старой схемы без индексов
+            scan = measure_lookups(db, sql.format(hint='NOT INDEXED'), keys, max(5, args.lookups // 20))
+            print(f"  {title}: индекс p50 {indexed[0]:.0f} мкс / p95 {indexed[1]:.0f} мкс, "
+                  f"без индекса p50 {scan[0]:,.0f} мкс / p95 {scan[1]:,.0f} мкс")
+
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк формата записей действий
+
+Сравнивает старый JSON (indent=2) с потоковым форматом без сжатия, с gzip и zstd
+(если установлен zstandard): размер файла, время полного разбора и время до первого действия.
+
+Запуск:
+    python bench_recording_format.py                  # 200 снимков страницы по 150 элементов
+    python bench_recording_format.py --actions 1000 --elements 300
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from recording_format import load_recording, save_recording, zstandard
+
+TAILWIND_CLASSES = [
+    'whitespace-nowrap transition-colors font-regular relative flex flex-row items-center justify-center '
+    'rounded-xl bg-secondary text-black hover:bg-secondary-hover active:bg-secondary-active h-10 px-4 text-m',
+    'text-m placeholder:placeholder-placeholder autofill:shadow-innerColor focus:outline-hidden w-full '
+    'bg-transparent leading-5 text-black',
+    'z-overlay fixed left-5 bottom-24 h-12 w-12 rounded-full bg-[#0D41D2] transition-opacity '
+    'hover:bg-[#1D51CA] md:bottom-10 opacity-100',
+    'flex', '',
+]
+
+
+def make_actions(count: int, elements: int):
+    """Синтетическая ручная запись: навигация и снимки страниц, как у ManualRecorder"""
+    actions = []
+    for i in range(count):
+        if i % 10 == 0:
+            actions.append({'type': 'navigation', 'url': f'https://extranet.ostrovok.ru/v3/hotels/{i}',
+                            'timestamp': f'2025-08-05T17:{i // 60 % 60:02d}:{i % 60:02d}'})
+            continue
+        page = []
+        for j in range(elements):
+            class_name = random.choice(TAILWIND_CLASSES)
+            page.append({
+                'type': random.choice(['input', 'button', 'link']),
+                'tagName': random.choice(['input', 'button', 'a']),
+                'id': '', 'name': '',
+                'className': class_name,
+                'text': random.choice(['', 'Добавить объект', 'Сохранить', f'Номер {j}']),
+                'xpath': f"//button[contains(@class, '{class_name.split(' ')[0]}')]" if class_name else '//a',
+            })
+        actions.append({'type': 'page_state', 'url': 'https://extranet.ostrovok.ru/v3/hotels',
+                        'title': 'Мои объекты - Экстранет Островка', 'elements': page,
+                        'timestamp': f'2025-08-05T17:{i // 60 % 60:02d}:{i % 60:02d}'})
+    return actions
+
+
+def measure(path: str, repeat: int = 3):
+    """(время полного разбора, время до первого действия) в миллисекундах, лучшее из repeat"""
+    full, first = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _, actions = load_recording(path)
+        actions[0]
+        first.append((time.perf_counter() - started) * 1000)
+        list(actions)
+        full.append((time.perf_counter() - started) * 1000)
+    return min(full), min(first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк формата записей')
+    parser.add_argument('--actions', type=int, default=200, help='сколько действий в записи')
+    parser.add_argument('--elements', type=int, default=150, help='сколько элементов в снимке страницы')
+    args = parser.parse_args()
+
+    random.seed(42)
+    actions = make_actions(args.actions, args.elements)
+    header = {'platform': 'ostrovok', 'recording_type': 'manual', 'created_at': '2025-08-05T17:11:33'}
+    workdir = tempfile.mkdtemp(prefix='bench_recording_')
+    try:
+        legacy = os.path.join(workdir, 'recording.json')
+        with open(legacy, 'w', encoding='utf-8') as f:
+            json.dump({**header, 'total_actions': len(actions), 'actions': actions}, f, ensure_ascii=False, indent=2)
+
+        variants = [('JSON indent=2 (старый)', legacy)]
+        for title, extension in (('Поток', '.rec'), ('Поток + gzip', '.rec.gz'), ('Поток + zstd', '.rec.zst')):
+            if extension == '.rec.zst' and zstandard is None:
+                print("  (zstandard не установлен - вариант zstd пропущен)")
+                continue
+            path = os.path.join(workdir, 'recording' + extension)
+            save_recording(path, header, actions)
+            variants.append((title, path))
+
+        print(f"📊 Запись: {args.actions} действий, {args.elements} элементов в снимке")
+        legacy_size = os.path.getsize(legacy)
+        for title, path in variants:
+            size = os.path.getsize(path)
+            full_ms, first_ms = measure(path)
+            print(f"  {title:<24} {size / 1024:>9,.0f} КБ (x{legacy_size / size:>5.1f})  "
+                  f"разбор {full_ms:>8.1f} мс  первое действие {first_ms:>7.2f} мс")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
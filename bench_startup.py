@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк холодного старта точек входа
+
+Запускает каждую точку входа с --profile-startup в отдельном процессе (холодный интерпретатор),
+офлайн с фиктивным токеном и без ключа Bnovo, и сводит отчеты: медианы времени до первого
+запроса и общего времени старта, самые долгие пакеты при импорте. С --max-ttfr-ms завершается
+с кодом 1, если какая-то точка входа медленнее бюджета - так регрессии старта ловятся в CI.
+
+Запуск:
+    python bench_startup.py                                   # все точки входа, 3 повтора
+    python bench_startup.py --entry run_bot.py,run_mini_app.py --repeat 5
+    python bench_startup.py --max-ttfr-ms 3000 --json startup_report.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from startup_profile import DUMMY_TOKEN, OUTPUT_FLAG, PROFILE_ENV, PROFILE_FLAG
+
+ENTRY_POINTS = ['run_bot.py', 'run_mini_app.py', 'run_all.py', 'run_all_async.py',
+                'start_simple.py', 'main.py', 'api/index.py']
+
+
+def offline_env(token: str):
+    """Окружение без сети: фиктивный токен и пустой ключ Bnovo (.env их не переопределяет)"""
+    env = dict(os.environ)
+    env['BOT_TOKEN'] = token
+    env['BNOVO_API_KEY'] = ''
+    env.pop(PROFILE_ENV, None)
+    return env
+
+
+def profile_once(script: str, env, timeout: float):
+    """Отчет одного холодного запуска точки входа"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'report.json')
+        result = subprocess.run(
+            [sys.executable, script, PROFILE_FLAG, OUTPUT_FLAG, output],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout
+        )
+        if not os.path.exists(output):
+            raise RuntimeError(f"{script}: нет отчета (код {result.returncode}): {result.stderr.strip()[-500:]}")
+        with open(output, encoding='utf-8') as f:
+            report = json.load(f)
+    report['returncode'] = result.returncode
+    return report
+
+
+def summarize(reports):
+    """Медианы по повторам и пакеты последнего запуска"""
+    ttfr = [r['time_to_first_request_ms'] for r in reports if r['time_to_first_request_ms'] is not None]
+    last = reports[-1]
+    packages = dict(last['imports']['packages'])
+    # У лаунчеров с дочерними процессами импорты - в отчетах детей
+    for child in last['children'].values():
+        for package, ms in child['imports']['packages'].items():
+            packages[package] = round(packages.get(package, 0.0) + ms, 1)
+    return {
+        'runs': len(reports),
+        'time_to_first_request_ms': round(statistics.median(ttfr), 1) if ttfr else None,
+        'total_ms': round(statistics.median(r['total_ms'] for r in reports), 1),
+        'imports_ms': last['imports']['total_ms'] + sum(c['imports']['total_ms'] for c in last['children'].values()),
+        'packages': dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:5]),
+        'errors': sorted({error for r in reports for error in r['errors']}),
+        'reports': reports
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк холодного старта точек входа')
+    parser.add_argument('--entry', default=','.join(ENTRY_POINTS), help='точки входа через запятую')
+    parser.add_argument('--repeat', type=int, default=3, help='холодных запусков каждой точки входа')
+    parser.add_argument('--token', default=DUMMY_TOKEN, help='токен бота (по умолчанию фиктивный)')
+    parser.add_argument('--timeout', type=float, default=300, help='таймаут одного запуска, секунды')
+    parser.add_argument('--max-ttfr-ms', type=float, default=None,
+                        help='бюджет времени до первого запроса; превышение - код выхода 1')
+    parser.add_argument('--json', default=None, help='сохранить сводку и отчеты в файл')
+    args = parser.parse_args()
+
+    entries = [entry.strip() for entry in args.entry.split(',') if entry.strip()]
+    env = offline_env(args.token)
+    print(f"📊 Холодный старт: {len(entries)} точек входа, {args.repeat} запуска каждой")
+
+    summary = {}
+    failed = False
+    for script in entries:
+        try:
+            reports = [profile_once(script, env, args.timeout) for _ in range(args.repeat)]
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"  ❌ {script}: {e}")
+            summary[script] = {'errors': [str(e)]}
+            failed = True
+            continue
+        result = summary[script] = summarize(reports)
+        ttfr = result['time_to_first_request_ms']
+        over_budget = args.max_ttfr_ms is not None and (ttfr is None or ttfr > args.max_ttfr_ms)
+        failed = failed or over_budget or bool(result['errors'])
+        mark = '❌' if over_budget or result['errors'] else '✅'
+        packages = ', '.join(f"{name} {ms:.0f}" for name, ms in result['packages'].items())
+        print(f"  {mark} {script:<18} первый запрос {ttfr if ttfr is not None else '-':>8} мс, "
+              f"старт {result['total_ms']:8.1f} мс, импорт {result['imports_ms']:7.1f} мс ({packages})")
+        for error in result['errors']:
+            print(f"       ⚠️ {error}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"  Отчет сохранен: {args.json}")
+    if args.max_ttfr_ms is not None:
+        print(f"  Бюджет до первого запроса: {args.max_ttfr_ms:.0f} мс")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
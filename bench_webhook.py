@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест приема обновлений через webhook
+
+Поднимает локальный «Telegram»: он шлет обновления на webhook (FastAPI + воркеры webhook.py)
+и принимает ответы бота (sendMessage) вместо api.telegram.org. Бот-эхо отвечает на каждое
+сообщение, имитируя работу обработчика; тест измеряет пропускную способность при разном
+числе воркеров и проверяет, что ответы каждого чата пришли в порядке отправки.
+
+Запуск:
+    python bench_webhook.py                       # 1 и 4 воркера, 2000 обновлений
+    python bench_webhook.py --workers 1,2,8 --updates 5000 --work-ms 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import requests
+
+FAKE_TOKEN = '123456:TEST'
+# Адрес фейкового Bot API и работа обработчика передаются воркерам через окружение (spawn)
+FAKE_API_ENV = 'FAKE_TELEGRAM_API'
+WORK_MS_ENV = 'FAKE_TELEGRAM_WORK_MS'
+
+
+class FakeTelegram:
+    """Фейковый Bot API: отвечает на getMe и записывает sendMessage по чатам"""
+
+    def __init__(self):
+        self.replies = defaultdict(list)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._all_received = threading.Condition(self._lock)
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки и тело уходят разными пакетами - без этого ответ ждет delayed ACK
+            disable_nagle_algorithm = True
+
+            def _reply(self, result):
+                body = json.dumps({'ok': True, 'result': result}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                if 'json' in (self.headers.get('Content-Type') or ''):
+                    params = json.loads(raw or '{}')
+                else:
+                    params = {key: values[0] for key, values in parse_qs(raw).items()}
+                method = self.path.rsplit('/', 1)[-1]
+                if method == 'getMe':
+                    self._reply({'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot'})
+                elif method == 'sendMessage':
+                    chat_id = int(params['chat_id'])
+                    fake.record(chat_id, params.get('text'))
+                    self._reply({'message_id': 1, 'date': 0, 'chat': {'id': chat_id, 'type': 'private'},
+                                 'text': params.get('text')})
+                else:
+                    self._reply(True)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.api_url = f"http://127.0.0.1:{self.server.server_address[1]}/bot"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def record(self, chat_id: int, text: str):
+        with self._lock:
+            self.replies[chat_id].append(text)
+            self.count += 1
+            self._all_received.notify_all()
+
+    def wait_for(self, count: int, timeout: float) -> bool:
+        with self._lock:
+            return self._all_received.wait_for(lambda: self.count >= count, timeout)
+
+    def reset(self):
+        with self._lock:
+            self.replies.clear()
+            self.count = 0
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_update(update_id: int, chat_id: int, text: str):
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Гость'},
+            'text': text
+        }
+    }
+
+
+def echo_application(shard: int):
+    """Фабрика приложения воркера: эхо-бот на фейковом Bot API"""
+    from telegram.ext import Application, MessageHandler, filters
+
+    work_seconds = float(os.getenv(WORK_MS_ENV, '0')) / 1000
+
+    async def echo(update, context):
+        if work_seconds:
+            # Имитация работы обработчика (разбор, форматирование), занимающей процессор
+            deadline = time.perf_counter() + work_seconds
+            while time.perf_counter() < deadline:
+                pass
+        await context.bot.send_message(update.effective_chat.id, update.message.text)
+
+    application = Application.builder().token(FAKE_TOKEN).base_url(os.environ[FAKE_API_ENV]).updater(None).build()
+    application.add_handler(MessageHandler(filters.TEXT, echo))
+    return application
+
+
+def start_webhook_server(workers: int):
+    """FastAPI с webhook в фоновом потоке; возвращает (url, server, thread)"""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from webhook import WebhookWorkers, mount_webhook, webhook_lifespan
+
+    webhook_workers = WebhookWorkers(workers, factory='bench_webhook:echo_application')
+    app = FastAPI(lifespan=lambda app: webhook_lifespan(webhook_workers))
+    mount_webhook(app, webhook_workers, path='/telegram/webhook', secret='bench-secret')
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/telegram/webhook", server, thread
+
+
+def send_updates(url: str, chats: int, per_chat: int, first_update_id: int, senders: int) -> int:
+    """Отправить обновления: каждый чат - последовательно, разные чаты - параллельно"""
+    headers = {'X-Telegram-Bot-Api-Secret-Token': 'bench-secret'}
+    rejected = [0]
+
+    def send_chat(chat_id: int):
+        with requests.Session() as session:
+            for seq in range(per_chat):
+                update = make_update(first_update_id + chat_id * per_chat + seq, chat_id, str(seq))
+                while True:
+                    response = session.post(url, json=update, headers=headers, timeout=10)
+                    if response.status_code == 200:
+                        break
+                    # Как Telegram: при отказе повторяем то же обновление позже
+                    rejected[0] += 1
+                    time.sleep(0.05)
+
+    with ThreadPoolExecutor(max_workers=senders) as pool:
+        list(pool.map(send_chat, range(1, chats + 1)))
+    return rejected[0]
+
+
+def run(fake: FakeTelegram, workers: int, chats: int, per_chat: int, senders: int):
+    url, server, thread = start_webhook_server(workers)
+    try:
+        # Прогрев: воркеры поднимают приложение и получают getMe
+        send_updates(url, chats, 1, 10_000_000, senders)
+        if not fake.wait_for(chats, timeout=120):
+            raise RuntimeError("воркеры не ответили на прогревочные обновления")
+        fake.reset()
+
+        total = chats * per_chat
+        started = time.perf_counter()
+        rejected = send_updates(url, chats, per_chat, 0, senders)
+        if not fake.wait_for(total, timeout=300):
+            raise RuntimeError(f"получено {fake.count} ответов из {total}")
+        elapsed = time.perf_counter() - started
+
+        expected = [str(seq) for seq in range(per_chat)]
+        out_of_order = sum(1 for chat_id in range(1, chats + 1) if fake.replies[chat_id] != expected)
+        return total / elapsed, out_of_order, rejected
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест webhook')
+    parser.add_argument('--workers', default='1,4', help='числа воркеров через запятую')
+    parser.add_argument('--updates', type=int, default=2000, help='сколько обновлений отправить')
+    parser.add_argument('--chats', type=int, default=50, help='сколько разных чатов')
+    parser.add_argument('--senders', type=int, default=16, help='параллельных соединений «Telegram»')
+    parser.add_argument('--work-ms', type=float, default=2.0, help='время работы обработчика на обновление, мс')
+    args = parser.parse_args()
+
+    fake = FakeTelegram()
+    os.environ[FAKE_API_ENV] = fake.api_url
+    os.environ[WORK_MS_ENV] = str(args.work_ms)
+    per_chat = max(1, args.updates // args.chats)
+
+    print(f"📊 Бенчмарк webhook: {args.chats * per_chat:,} обновлений, {args.chats} чатов, "
+          f"обработчик {args.work_ms} мс")
+    try:
+        baseline = None
+        for workers in (int(value) for value in args.workers.split(',')):
+            rate, out_of_order, rejected = run(fake, workers, args.chats, per_chat, args.senders)
+            baseline = baseline or rate
+            fake.reset()
+            print(f"  Воркеров {workers}: {rate:,.0f} обновлений/с (x{rate / baseline:.1f}), "
+                  f"чатов с нарушенным порядком: {out_of_order}, повторов из-за переполнения: {rejected}")
+    finally:
+        fake.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Асинхронный клиент Bnovo PMS API
+Постоянный пул keep-alive соединений и конкурентная постраничная выгрузка бронирований
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from http_transport import (
+    IDEMPOTENT_METHODS, RETRY_STATUSES, RETRY_TOTAL, backoff_delay, record_latency
+)
+
+logger = logging.getLogger(__name__)
+
+BNOVO_BASE_URL = "https://api.pms.bnovo.ru"
+BNOVO_PAGE_SIZE = 20  # Максимум 20 согласно API
+
+
+class BnovoAPIError(Exception):
+    """Ошибка ответа Bnovo PMS API"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class BnovoClient:
+    """Асинхронный клиент Bnovo PMS API с пулом соединений"""
+
+    def __init__(self, api_key: str, base_url: str = BNOVO_BASE_URL,
+                 page_size: int = BNOVO_PAGE_SIZE, max_concurrency: int = 4,
+                 timeout: float = 15.0, max_connections: int = 10):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.page_size = page_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        }
+        # Пул соединений httpx привязан к event loop, поэтому держим по клиенту на loop
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """Получить HTTP-клиент для текущего event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+            self._clients[loop] = client
+        return client
+
+    async def request(self, method: str, path: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Выполнить запрос к API
+
+        Raises:
+            BnovoAPIError: если API вернул статус, отличный от 200
+        """
+        url = self.base_url + path
+        retries = RETRY_TOTAL if method.upper() in IDEMPOTENT_METHODS else 0
+        for attempt in range(retries + 1):
+            started = time.perf_counter()
+            try:
+                response = await self._get_http().request(method, path, params=params)
+            except httpx.TransportError as e:
+                record_latency(method, url, time.perf_counter() - started, None)
+                if attempt == retries:
+                    raise
+                logger.warning(f"Ошибка соединения с Bnovo ({e}), повтор {attempt + 1}/{retries}")
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            record_latency(method, url, time.perf_counter() - started, response.status_code)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                break
+            logger.warning(f"Bnovo ответил {response.status_code}, повтор {attempt + 1}/{retries}")
+            await asyncio.sleep(backoff_delay(attempt))
+
+        if response.status_code != 200:
+            logger.error(f"Ошибка API: {response.status_code} - {response.text}")
+            raise BnovoAPIError(f"Ошибка API: {response.status_code}", response.status_code)
+        return response.json()
+
+    async def fetch_bookings_page(self, date_from: str, date_to: str, offset: int) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Получить одну страницу бронирований
+
+        Returns:
+            Tuple[List[Dict], Optional[int]]: (бронирования, общее количество если API его сообщает)
+        """
+        response_data = await self.request('GET', '/api/v1/bookings', params={
+            'date_from': date_from,
+            'date_to': date_to,
+            'limit': self.page_size,
+            'offset': offset
+        })
+
+        if 'data' not in response_data or 'bookings' not in response_data['data']:
+            logger.error(f"Неожиданная структура ответа: {response_data}")
+            raise BnovoAPIError("Неожиданная структура ответа API")
+
+        meta = response_data['data'].get('meta') or {}
+        total = meta.get('total')
+        return response_data['data']['bookings'], int(total) if total is not None else None
+
+    async def iter_bookings(self, date_from: str, date_to: str) -> AsyncIterator[Dict]:
+        """
+        Потоково выдать все бронирования за период
+
+        Страницы запрашиваются конкурентно (не более max_concurrency одновременно),
+        бронирования выдаются в порядке страниц по мере их получения.
+        """
+        seen = set()
+
+        def unseen(bookings):
+            # Между запросами страниц данные могут сдвинуться - убираем повторы
+            for booking in bookings:
+                booking_id = booking.get('id')
+                if booking_id is not None:
+                    if booking_id in seen:
+                        continue
+                    seen.add(booking_id)
+                yield booking
+
+        first_page, total = await self.fetch_bookings_page(date_from, date_to, 0)
+        for booking in unseen(first_page):
+            yield booking
+
+        if len(first_page) < self.page_size:
+            return
+
+        if total is not None:
+            # Общее количество известно - скользящее окно по оставшимся страницам
+            offsets = iter(range(self.page_size, total, self.page_size))
+            pending = deque()
+            try:
+                for offset in offsets:
+                    pending.append(asyncio.create_task(self.fetch_bookings_page(date_from, date_to, offset)))
+                    if len(pending) >= self.max_concurrency:
+                        break
+                while pending:
+                    bookings, _ = await pending.popleft()
+                    next_offset = next(offsets, None)
+                    if next_offset is not None:
+                        pending.append(asyncio.create_task(self.fetch_bookings_page(date_from, date_to, next_offset)))
+                    for booking in unseen(bookings):
+                        yield booking
+            finally:
+                for task in pending:
+                    task.cancel()
+            return
+
+        # Общее количество неизвестно - запрашиваем пачки страниц до первой неполной
+        offset = self.page_size
+        while True:
+            pages = await asyncio.gather(*[
+                self.fetch_bookings_page(date_from, date_to, offset + i * self.page_size)
+                for i in range(self.max_concurrency)
+            ])
+            for bookings, _ in pages:
+                for booking in unseen(bookings):
+                    yield booking
+                if len(bookings) < self.page_size:
+                    return
+            offset += self.page_size * self.max_concurrency
+
+    async def get_bookings(self, date_from: str, date_to: str) -> List[Dict]:
+        """Получить все бронирования за период одним списком"""
+        return [booking async for booking in self.iter_bookings(date_from, date_to)]
+
+    async def get_booking(self, booking_id: str) -> Dict:
+        """Получить детальную информацию о бронировании"""
+        return await self.request('GET', f'/api/v1/bookings/{booking_id}')
+
+    async def aclose(self):
+        """Закрыть HTTP-клиент текущего event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+class BackgroundLoop:
+    """Фоновый event loop для вызова асинхронного кода из синхронного"""
+
+    def __init__(self, name: str = "bnovo-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                thread.start()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Выполнить корутину в фоновом loop и дождаться результата"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return future.result(timeout)
+
+
+# Общий фоновый loop: синхронные вызовы переиспользуют его пул соединений
+background_loop = BackgroundLoop()
+
+
+def run_sync(coro, timeout: Optional[float] = None):
+    """Выполнить корутину синхронно через общий фоновый loop"""
+    return background_loop.run(coro, timeout)
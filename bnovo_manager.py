@@ -1,25 +1,59 @@
-import requests
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
 import json
 
+from bnovo_client import BnovoClient, BnovoAPIError, BNOVO_BASE_URL, run_sync
+
+if TYPE_CHECKING:
+    from booking_analytics import BookingFrame
+
 logger = logging.getLogger(__name__)
 
 class BnovoManager:
     """Менеджер для работы с Bnovo PMS API"""
     
-    def __init__(self, api_key: str, base_url: str = "https://api.pms.bnovo.ru"):
+    def __init__(self, api_key: str, base_url: str = BNOVO_BASE_URL):
         self.api_key = api_key
         self.base_url = base_url
         self.headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
         }
+        self.client = BnovoClient(api_key, base_url)
     
-    def get_bookings(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[bool, List[Dict]]:
+    def resolve_period(self, date_from: Optional[str], date_to: Optional[str]) -> Tuple[str, str]:
+        """Подставить период по умолчанию (текущий месяц) и проверить порядок дат"""
+        # Если даты не указаны, берем текущий месяц
+        if not date_from:
+            date_from = datetime.now().replace(day=1).strftime('%Y-%m-%d')
+        if not date_to:
+            date_to = (datetime.now().replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            date_to = date_to.strftime('%Y-%m-%d')
+        
+        # Убеждаемся, что date_from раньше date_to
+        if date_from >= date_to:
+            date_to = (datetime.strptime(date_from, '%Y-%m-%d') + timedelta(days=30)).strftime('%Y-%m-%d')
+        
+        return date_from, date_to
+    
+    def iter_bookings(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> AsyncIterator[Dict]:
         """
-        Получить список бронирований за период
+        Потоковый асинхронный итератор по всем бронированиям за период
+        
+        Args:
+            date_from: Дата начала в формате YYYY-MM-DD
+            date_to: Дата окончания в формате YYYY-MM-DD
+            
+        Returns:
+            AsyncIterator[Dict]: бронирования со всех страниц API
+        """
+        date_from, date_to = self.resolve_period(date_from, date_to)
+        return self.client.iter_bookings(date_from, date_to)
+    
+    async def get_bookings_async(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[bool, List[Dict]]:
+        """
+        Получить список бронирований за период (все страницы)
         
         Args:
             date_from: Дата начала в формате YYYY-MM-DD
@@ -29,49 +63,30 @@ class BnovoManager:
             Tuple[bool, List[Dict]]: (успех, список бронирований)
         """
         try:
-            # Если даты не указаны, берем текущий месяц
-            if not date_from:
-                date_from = datetime.now().replace(day=1).strftime('%Y-%m-%d')
-            if not date_to:
-                date_to = (datetime.now().replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                date_to = date_to.strftime('%Y-%m-%d')
-            
-            # Убеждаемся, что date_from раньше date_to
-            if date_from >= date_to:
-                date_to = (datetime.strptime(date_from, '%Y-%m-%d') + timedelta(days=30)).strftime('%Y-%m-%d')
-            
-            params = {
-                'date_from': date_from,
-                'date_to': date_to,
-                'limit': 20,   # Максимум 20 согласно API
-                'offset': 0    # Обязательный параметр
-            }
-            
-            response = requests.get(
-                f"{self.base_url}/api/v1/bookings",
-                headers=self.headers,
-                params=params
-            )
-            
-            if response.status_code == 200:
-                response_data = response.json()
-                # Проверяем структуру ответа
-                if 'data' in response_data and 'bookings' in response_data['data']:
-                    bookings = response_data['data']['bookings']
-                    logger.info(f"Получено {len(bookings)} бронирований")
-                    return True, bookings
-                else:
-                    logger.error(f"Неожиданная структура ответа: {response_data}")
-                    return False, "Неожиданная структура ответа API"
-            else:
-                logger.error(f"Ошибка API: {response.status_code} - {response.text}")
-                return False, f"Ошибка API: {response.status_code}"
-                
+            date_from, date_to = self.resolve_period(date_from, date_to)
+            bookings = await self.client.get_bookings(date_from, date_to)
+            logger.info(f"Получено {len(bookings)} бронирований")
+            return True, bookings
+        except BnovoAPIError as e:
+            return False, str(e)
         except Exception as e:
             logger.error(f"Ошибка при получении бронирований: {e}")
             return False, f"Ошибка соединения: {str(e)}"
     
-    def get_booking_details(self, booking_id: str) -> Tuple[bool, Dict]:
+    def get_bookings(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[bool, List[Dict]]:
+        """
+        Получить список бронирований за период
+        
+        Args:
+            date_from: Дата начала в формате YYYY-MM-DD
+            date_to: Дата окончания в формате YYYY-MM-DD
+            
+        Returns:
+            Tuple[bool, List[Dict]]: (успех, список бронирований)
+        """
+        return run_sync(self.get_bookings_async(date_from, date_to))
+    
+    async def get_booking_details_async(self, booking_id: str) -> Tuple[bool, Dict]:
         """
         Получить детальную информацию о бронировании
         
@@ -82,23 +97,27 @@ class BnovoManager:
             Tuple[bool, Dict]: (успех, данные бронирования)
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/api/v1/bookings/{booking_id}",
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                booking = response.json()
-                return True, booking
-            else:
-                logger.error(f"Ошибка API: {response.status_code} - {response.text}")
-                return False, f"Ошибка API: {response.status_code}"
-                
+            booking = await self.client.get_booking(booking_id)
+            return True, booking
+        except BnovoAPIError as e:
+            return False, str(e)
         except Exception as e:
             logger.error(f"Ошибка при получении деталей бронирования: {e}")
             return False, f"Ошибка соединения: {str(e)}"
     
-    def get_new_bookings(self, hours_back: int = 24) -> Tuple[bool, List[Dict]]:
+    def get_booking_details(self, booking_id: str) -> Tuple[bool, Dict]:
+        """
+        Получить детальную информацию о бронировании
+        
+        Args:
+            booking_id: ID бронирования
+            
+        Returns:
+            Tuple[bool, Dict]: (успех, данные бронирования)
+        """
+        return run_sync(self.get_booking_details_async(booking_id))
+    
+    async def get_new_bookings_async(self, hours_back: int = 24) -> Tuple[bool, List[Dict]]:
         """
         Получить новые бронирования за последние N часов
         
@@ -112,12 +131,24 @@ class BnovoManager:
             date_from = (datetime.now() - timedelta(hours=hours_back)).strftime('%Y-%m-%d')
             date_to = datetime.now().strftime('%Y-%m-%d')
             
-            return self.get_bookings(date_from, date_to)
+            return await self.get_bookings_async(date_from, date_to)
             
         except Exception as e:
             logger.error(f"Ошибка при получении новых бронирований: {e}")
             return False, f"Ошибка: {str(e)}"
     
+    def get_new_bookings(self, hours_back: int = 24) -> Tuple[bool, List[Dict]]:
+        """
+        Получить новые бронирования за последние N часов
+        
+        Args:
+            hours_back: Количество часов назад для поиска
+            
+        Returns:
+            Tuple[bool, List[Dict]]: (успех, список новых бронирований)
+        """
+        return run_sync(self.get_new_bookings_async(hours_back))
+    
     def format_booking_message(self, booking: Dict) -> str:
         """
         Форматировать бронирование для отправки в Telegram
@@ -185,46 +216,52 @@ class BnovoManager:
             logger.error(f"Ошибка форматирования бронирования: {e}")
             return f"❌ Ошибка форматирования данных бронирования"
     
-    def get_statistics(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[bool, Dict]:
+    def get_statistics(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       rooms: Optional[int] = None, frame: Optional['BookingFrame'] = None) -> Tuple[bool, Dict]:
         """
         Получить статистику по бронированиям
         
         Args:
             date_from: Дата начала
             date_to: Дата окончания
+            rooms: Номерной фонд (для загрузки и RevPAR)
+            frame: Колонки бронирований, которые поддерживает синхронизация (BookingSyncEngine.analytics);
+                без них бронирования периода выгружаются заново
             
         Returns:
             Tuple[bool, Dict]: (успех, статистика)
         """
+        # NumPy нужен только статистике - не замедляет импорт бота
+        from booking_analytics import BookingFrame, booking_summary, period_mask, window_metrics
+
         try:
-            success, bookings = self.get_bookings(date_from, date_to)
-            if not success:
-                return False, bookings
-            
-            if not isinstance(bookings, list):
-                return False, "Неверный формат данных"
-            
-            # Подсчитываем статистику
-            total_bookings = len(bookings)
-            total_revenue = sum(float(booking.get('amount', 0)) for booking in bookings if booking.get('amount'))
-            confirmed_bookings = len([b for b in bookings if b.get('status', {}).get('name') == 'Заселен'])
-            
-            # Группируем по платформам
-            platforms = {}
-            for booking in bookings:
-                source = booking.get('source', {})
-                platform = source.get('name', 'Неизвестно') if isinstance(source, dict) else str(source)
-                if platform not in platforms:
-                    platforms[platform] = {'count': 0, 'revenue': 0}
-                platforms[platform]['count'] += 1
-                platforms[platform]['revenue'] += float(booking.get('amount', 0))
+            # Ночи считаются включительно по date_to
+            period_from, period_to = self.resolve_period(date_from, date_to)
+            window_end = (datetime.strptime(period_to, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+            if frame is None:
+                success, bookings = self.get_bookings(date_from, date_to)
+                if not success:
+                    return False, bookings
+                
+                if not isinstance(bookings, list):
+                    return False, "Неверный формат данных"
+                
+                frame = BookingFrame()
+                frame.upsert(bookings)
+                summary = booking_summary(frame)
+            else:
+                summary = booking_summary(frame, period_mask(frame, period_from, window_end))
+
+            analytics = window_metrics(frame, period_from, window_end, rooms=rooms)
             
             stats = {
-                'total_bookings': total_bookings,
-                'total_revenue': f"{total_revenue:.2f} ₽",
-                'confirmed_bookings': confirmed_bookings,
-                'platforms': platforms,
-                'period': f"{date_from} - {date_to}" if date_from and date_to else "Текущий месяц"
+                'total_bookings': summary['total_bookings'],
+                'total_revenue': f"{summary['total_revenue']:.2f} ₽",
+                'confirmed_bookings': summary['confirmed_bookings'],
+                'platforms': summary['platforms'],
+                'period': f"{date_from} - {date_to}" if date_from and date_to else "Текущий месяц",
+                'analytics': analytics
             }
             
             return True, stats
@@ -254,13 +291,26 @@ class BnovoManager:
                 for platform, data in stats['platforms'].items():
                     message += f"• {platform}: {data['count']} бронирований, {data['revenue']:.2f} ₽\n"
             
+            analytics = stats.get('analytics')
+            if analytics and analytics['bookings']:
+                message += "\n📐 **Показатели периода:**\n"
+                message += f"• Ночей продано: {analytics['room_nights']}\n"
+                if analytics['adr'] is not None:
+                    message += f"• ADR: {analytics['adr']:.2f} ₽\n"
+                if analytics['occupancy'] is not None:
+                    message += f"• Загрузка: {analytics['occupancy']:.1%}\n"
+                    message += f"• RevPAR: {analytics['revpar']:.2f} ₽\n"
+                if analytics['lead_time_avg'] is not None:
+                    message += f"• Бронируют заранее: {analytics['lead_time_avg']:.1f} дн. (медиана {analytics['lead_time_median']:.0f})\n"
+                message += f"• Доля отмен: {analytics['cancellation_rate']:.1%}\n"
+            
             return message
             
         except Exception as e:
             logger.error(f"Ошибка форматирования статистики: {e}")
             return f"❌ Ошибка форматирования статистики"
     
-    def test_connection(self) -> Tuple[bool, str]:
+    async def test_connection_async(self) -> Tuple[bool, str]:
         """
         Проверить подключение к API
         
@@ -272,23 +322,21 @@ class BnovoManager:
             tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
             day_after_tomorrow = (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d')
             
-            response = requests.get(
-                f"{self.base_url}/api/v1/bookings",
-                headers=self.headers,
-                params={
-                    'date_from': tomorrow,
-                    'date_to': day_after_tomorrow,
-                    'limit': 20,
-                    'offset': 0
-                }
-            )
-            
-            if response.status_code == 200:
-                return True, "✅ Подключение к Bnovo PMS успешно"
-            elif response.status_code == 401:
-                return False, "❌ Неверный API ключ"
-            else:
-                return False, f"❌ Ошибка API: {response.status_code}"
+            await self.client.fetch_bookings_page(tomorrow, day_after_tomorrow, 0)
+            return True, "✅ Подключение к Bnovo PMS успешно"
                 
+        except BnovoAPIError as e:
+            if e.status_code == 401:
+                return False, "❌ Неверный API ключ"
+            return False, f"❌ {e}"
         except Exception as e:
-            return False, f"❌ Ошибка соединения: {str(e)}" 
\ No newline at end of file
+            return False, f"❌ Ошибка соединения: {str(e)}"
+    
+    def test_connection(self) -> Tuple[bool, str]:
+        """
+        Проверить подключение к API
+        
+        Returns:
+            Tuple[bool, str]: (успех, сообщение)
+        """
+        return run_sync(self.test_connection_async())
@@ -0,0 +1,332 @@
+"""
+Аналитика бронирований по портфелю объектов
+Бронирования хранятся колонками NumPy (даты - дни от эпохи, суммы, коды канала/статуса/объекта),
+поэтому показатели за любой период считаются векторно, без циклов по словарям:
+загрузка, ADR, RevPAR, срок бронирования заранее (lead time), доля отмен и разбивка по каналам.
+Новые и измененные бронирования дописываются на месте (upsert по ID) по мере синхронизации.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Поля бронирования Bnovo
+CREATED_AT_FIELDS = ('create_date', 'created_at')
+PROPERTY_FIELDS = ('hotel_id', 'property_id')
+CONFIRMED_STATUS = 'Заселен'
+CANCELLED_MARKERS = ('отмен', 'cancel')
+UNKNOWN = 'Неизвестно'
+
+# Дни от эпохи; отсутствующая дата
+NO_DATE = np.iinfo(np.int32).min
+
+DateLike = Union[str, date, datetime, None]
+
+
+class Vocabulary:
+    """Строковые значения колонки, закодированные номерами"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def encode(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def to_day(value: DateLike) -> int:
+    """Дата в дни от эпохи (NO_DATE, если даты нет)"""
+    if value is None or value == '':
+        return NO_DATE
+    if isinstance(value, datetime):
+        value = value.date()
+    text = value.isoformat() if isinstance(value, date) else str(value)[:10]
+    try:
+        return int(np.datetime64(text, 'D').astype(np.int64))
+    except ValueError:
+        return NO_DATE
+
+
+def parse_days(values: List[Optional[str]]) -> np.ndarray:
+    """Векторный разбор дат 'YYYY-MM-DD...' в дни от эпохи"""
+    texts = np.array([str(value)[:10] if value else 'NaT' for value in values], dtype='U10')
+    try:
+        days = texts.astype('datetime64[D]')
+    except ValueError:
+        # Есть некорректные значения - разбираем по одному
+        return np.fromiter((to_day(value) for value in values), dtype=np.int32, count=len(values))
+    result = days.astype(np.int64)
+    result[np.isnat(days)] = NO_DATE
+    return result.astype(np.int32)
+
+
+def _first(booking: Dict, fields: Tuple[str, ...]) -> Any:
+    for field in fields:
+        value = booking.get(field)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _name(value: Any) -> str:
+    if isinstance(value, dict):
+        return str(value.get('name') or UNKNOWN)
+    return str(value) if value not in (None, '') else UNKNOWN
+
+
+def _amount(value: Any) -> float:
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class BookingFrame:
+    """
+    Колоночное хранилище бронирований
+
+    Пример:
+        frame = BookingFrame()
+        frame.upsert(bookings)
+        metrics = window_metrics(frame, '2024-06-01', '2024-07-01', rooms=40)
+    """
+
+    COLUMNS = {
+        'arrival': np.int32,
+        'departure': np.int32,
+        'created': np.int32,
+        'amount': np.float64,
+        'channel': np.int32,
+        'status': np.int32,
+        'property': np.int32,
+    }
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self._index: Dict[str, int] = {}
+        self.channels = Vocabulary()
+        self.statuses = Vocabulary()
+        self.properties = Vocabulary()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Колонки доступны как frame.amount, frame.arrival, ... (только заполненная часть)
+        data = self.__dict__.get('_data')
+        if data is not None and name in data:
+            return data[name][:self._size]
+        raise AttributeError(name)
+
+    def _reserve(self, size: int):
+        capacity = len(self._data['amount'])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, column in self._data.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._data[name] = grown
+
+    def append_columns(self, ids: List[str], columns: Dict[str, np.ndarray]):
+        """Дописать уже закодированные колонки (быстрый путь для загрузки и бенчмарков)"""
+        count = len(ids)
+        start = self._size
+        self._reserve(start + count)
+        for name in self.COLUMNS:
+            self._data[name][start:start + count] = columns[name]
+        self._index.update(zip(ids, range(start, start + count)))
+        self._size += count
+
+    def upsert(self, bookings: Iterable[Dict]) -> Tuple[int, int]:
+        """
+        Добавить новые и обновить известные бронирования
+
+        Returns:
+            Tuple[int, int]: (добавлено, обновлено)
+        """
+        bookings = [booking for booking in bookings if booking.get('id') is not None]
+        if not bookings:
+            return 0, 0
+
+        # Повтор ID внутри пачки: побеждает последняя версия
+        latest: Dict[str, Dict] = {}
+        for booking in bookings:
+            latest[str(booking['id'])] = booking
+        ids = list(latest)
+        bookings = list(latest.values())
+
+        dates = [booking.get('dates') or {} for booking in bookings]
+        columns = {
+            'arrival': parse_days([d.get('arrival') for d in dates]),
+            'departure': parse_days([d.get('departure') for d in dates]),
+            'created': parse_days([_first(booking, CREATED_AT_FIELDS) for booking in bookings]),
+            'amount': np.fromiter((_amount(b.get('amount')) for b in bookings), dtype=np.float64, count=len(bookings)),
+            'channel': np.fromiter((self.channels.encode(_name(b.get('source'))) for b in bookings),
+                                   dtype=np.int32, count=len(bookings)),
+            'status': np.fromiter((self.statuses.encode(_name(b.get('status'))) for b in bookings),
+                                  dtype=np.int32, count=len(bookings)),
+            'property': np.fromiter((self.properties.encode(_name(_first(b, PROPERTY_FIELDS))) for b in bookings),
+                                    dtype=np.int32, count=len(bookings)),
+        }
+
+        rows = np.fromiter((self._index.get(booking_id, -1) for booking_id in ids), dtype=np.int64, count=len(ids))
+        known = rows >= 0
+        if known.any():
+            for name in self.COLUMNS:
+                self._data[name][rows[known]] = columns[name][known]
+        fresh = ~known
+        if fresh.any():
+            fresh_ids = [booking_id for booking_id, is_new in zip(ids, fresh) if is_new]
+            self.append_columns(fresh_ids, {name: column[fresh] for name, column in columns.items()})
+        return int(fresh.sum()), int(known.sum())
+
+    def status_mask(self, predicate) -> np.ndarray:
+        """Маска строк, чей статус удовлетворяет predicate(имя статуса)"""
+        flags = np.array([bool(predicate(name)) for name in self.statuses.names], dtype=bool)
+        if not len(flags):
+            return np.zeros(self._size, dtype=bool)
+        return flags[self.status]
+
+    def cancelled_mask(self) -> np.ndarray:
+        return self.status_mask(lambda name: any(marker in name.lower() for marker in CANCELLED_MARKERS))
+
+
+def period_mask(frame: BookingFrame, date_from: DateLike, date_to: DateLike) -> np.ndarray:
+    """Бронирования, проживание по которым пересекается с периодом [date_from, date_to)"""
+    start, end = to_day(date_from), to_day(date_to)
+    arrival, departure = frame.arrival, frame.departure
+    dated = (arrival != NO_DATE) & (departure != NO_DATE)
+    return dated & (arrival < end) & (np.maximum(departure, arrival + 1) > start)
+
+
+def booking_summary(frame: BookingFrame, mask: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Итоги по бронированиям (всем или выбранным mask): количество, выручка, заселенные, каналы"""
+    if mask is None:
+        mask = np.ones(len(frame), dtype=bool)
+    channels = len(frame.channels)
+    channel, amount = frame.channel[mask], frame.amount[mask]
+    counts = np.bincount(channel, minlength=channels)
+    revenue = np.bincount(channel, weights=amount, minlength=channels)
+    return {
+        'total_bookings': int(mask.sum()),
+        'total_revenue': float(amount.sum()),
+        'confirmed_bookings': int((frame.status_mask(lambda name: name == CONFIRMED_STATUS) & mask).sum()),
+        'platforms': {
+            name: {'count': int(counts[code]), 'revenue': float(revenue[code])}
+            for code, name in enumerate(frame.channels.names) if counts[code]
+        }
+    }
+
+
+def _rooms_available(frame: BookingFrame, rooms: Union[int, Dict[str, int], None],
+                     property_name: Optional[str]) -> Optional[int]:
+    if rooms is None:
+        return None
+    if isinstance(rooms, dict):
+        if property_name is not None:
+            return rooms.get(property_name)
+        return sum(rooms.values()) or None
+    return rooms
+
+
+def _breakdown(codes: np.ndarray, names: List[str], active: np.ndarray, cancelled: np.ndarray,
+               nights: np.ndarray, revenue: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    size = len(names)
+    sold = active & ~cancelled
+    bookings = np.bincount(codes[sold], minlength=size)
+    cancellations = np.bincount(codes[active & cancelled], minlength=size)
+    room_nights = np.bincount(codes[sold], weights=nights[sold], minlength=size)
+    income = np.bincount(codes[sold], weights=revenue[sold], minlength=size)
+    total_income = income.sum()
+    result = {}
+    for code, name in enumerate(names):
+        if not bookings[code] and not cancellations[code]:
+            continue
+        result[name] = {
+            'bookings': int(bookings[code]),
+            'cancelled': int(cancellations[code]),
+            'room_nights': int(room_nights[code]),
+            'revenue': float(income[code]),
+            'adr': float(income[code] / room_nights[code]) if room_nights[code] else None,
+            'share': float(income[code] / total_income) if total_income else 0.0
+        }
+    return result
+
+
+def window_metrics(frame: BookingFrame, date_from: DateLike, date_to: DateLike,
+                   rooms: Union[int, Dict[str, int], None] = None,
+                   property_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Показатели за период [date_from, date_to)
+
+    Выручка бронирования делится по ночам, поэтому в период попадает только доля
+    за ночи внутри него. Отмененные бронирования учитываются только в доле отмен.
+
+    Args:
+        rooms: Номерной фонд (число или {объект: число}) - нужен для загрузки и RevPAR
+        property_name: Считать только по одному объекту
+
+    Returns:
+        Dict: bookings, cancelled, cancellation_rate, room_nights, revenue, adr,
+        occupancy, revpar, lead_time_avg, lead_time_median, channels, properties
+    """
+    start, end = to_day(date_from), to_day(date_to)
+    period_nights = max(0, end - start)
+
+    arrival = frame.arrival.astype(np.int64)
+    departure = frame.departure.astype(np.int64)
+    dated = (arrival != NO_DATE) & (departure != NO_DATE)
+    length = np.maximum(departure - arrival, 1)
+    nights = np.where(dated, np.clip(np.minimum(departure, end) - np.maximum(arrival, start), 0, None), 0)
+    active = nights > 0
+    if property_name is not None:
+        code = frame.properties.codes.get(property_name)
+        active &= frame.property == code if code is not None else False
+
+    cancelled = frame.cancelled_mask()
+    sold = active & ~cancelled
+    revenue = np.where(dated, frame.amount * nights / length, 0.0)
+
+    sold_count = int(sold.sum())
+    cancelled_count = int((active & cancelled).sum())
+    room_nights = int(nights[sold].sum())
+    total_revenue = float(revenue[sold].sum())
+
+    # Lead time - по бронированиям с заездом в периоде
+    arriving = sold & (arrival >= start) & (arrival < end) & (frame.created != NO_DATE)
+    lead = (arrival - frame.created)[arriving]
+    lead = lead[lead >= 0]
+
+    available = _rooms_available(frame, rooms, property_name)
+    available_nights = available * period_nights if available else 0
+
+    return {
+        'period': f"{date_from} - {date_to}",
+        'nights': period_nights,
+        'bookings': sold_count,
+        'cancelled': cancelled_count,
+        'cancellation_rate': cancelled_count / (sold_count + cancelled_count) if sold_count + cancelled_count else 0.0,
+        'room_nights': room_nights,
+        'revenue': total_revenue,
+        'adr': total_revenue / room_nights if room_nights else None,
+        'occupancy': room_nights / available_nights if available_nights else None,
+        'revpar': total_revenue / available_nights if available_nights else None,
+        'lead_time_avg': float(lead.mean()) if len(lead) else None,
+        'lead_time_median': float(np.median(lead)) if len(lead) else None,
+        'channels': _breakdown(frame.channel, frame.channels.names, active, cancelled, nights, revenue),
+        'properties': _breakdown(frame.property, frame.properties.names, active, cancelled, nights, revenue),
+    }
@@ -0,0 +1,252 @@
+"""
+Инкрементальная синхронизация бронирований Bnovo PMS
+Хранит бронирования в локальной SQLite и отдает только изменения с прошлой синхронизации
+
+Хранилище знает, за какой период запросов к Bnovo в нем есть бронирования (покрытие):
+синхронизация расширяет его вперед, а статистика за период, который покрыт не полностью,
+один раз догружает недостающую часть. Даты запросов Bnovo - время создания/изменения брони
+(на этом построена отметка синхронизации), поэтому будущая часть периода всегда пуста.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from db import Database
+from executors import run_blocking
+
+if TYPE_CHECKING:
+    from booking_analytics import BookingFrame
+
+logger = logging.getLogger(__name__)
+
+# Поля, в которых Bnovo может вернуть время изменения/создания бронирования
+MODIFIED_AT_FIELDS = ('update_date', 'updated_at', 'create_date', 'created_at')
+
+
+def booking_fingerprint(booking: Dict) -> str:
+    """Отпечаток содержимого бронирования для обнаружения изменений"""
+    payload = json.dumps(booking, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def booking_modified_at(booking: Dict) -> Optional[str]:
+    """Время последнего изменения бронирования (если API его сообщает)"""
+    for field in MODIFIED_AT_FIELDS:
+        value = booking.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+def booking_id_key(booking_id) -> Tuple[int, str]:
+    """Ключ сортировки ID: числовые ID сравниваются как числа"""
+    text = str(booking_id)
+    return (int(text), text) if text.isdigit() else (-1, text)
+
+
+class BookingSyncEngine:
+    """Движок инкрементальной синхронизации бронирований"""
+
+    def __init__(self, bnovo_manager, db: Database, account_id: Optional[str] = None,
+                 initial_days_back: int = 1, overlap_days: int = 1):
+        self.bnovo_manager = bnovo_manager
+        self.db = db
+        self.account_id = account_id or self.make_account_id(bnovo_manager.api_key)
+        self.initial_days_back = initial_days_back
+        self.overlap_days = overlap_days
+        self.last_stats: Dict[str, int] = {}
+        self._analytics: Optional['BookingFrame'] = None
+        # Синхронизация, догрузка периода и расчеты по колонкам не пересекаются
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def make_account_id(api_key: str) -> str:
+        """ID аккаунта по API-ключу (сам ключ в базе не хранится)"""
+        return 'bnovo:' + hashlib.sha1(api_key.encode('utf-8')).hexdigest()[:12]
+
+    def _build_analytics(self) -> 'BookingFrame':
+        # NumPy загружается с первыми колонками, а не при импорте бота
+        from booking_analytics import BookingFrame
+
+        frame = BookingFrame()
+        frame.upsert(json.loads(data) for data in self.db.get_bookings_data(self.account_id))
+        return frame
+
+    @property
+    def analytics(self) -> 'BookingFrame':
+        """
+        Колоночная копия сохраненных бронирований для booking_analytics
+
+        Загружается из базы при первом обращении (блокирующе - из asyncio используйте load_analytics),
+        дальше обновляется изменениями каждой синхронизации.
+        """
+        if self._analytics is None:
+            self._analytics = self._build_analytics()
+        return self._analytics
+
+    async def load_analytics(self) -> 'BookingFrame':
+        """Загрузить колонки вне цикла событий (чтение всех бронирований и json.loads)"""
+        async with self._lock:
+            return await self._load_analytics()
+
+    async def _load_analytics(self) -> 'BookingFrame':
+        if self._analytics is None:
+            self._analytics = await run_blocking(self._build_analytics)
+        return self._analytics
+
+    def _missing_range(self, date_from: str, date_to: str) -> Optional[Tuple[str, str]]:
+        """Часть периода запросов [date_from, date_to], которой нет в хранилище (None - период покрыт)"""
+        coverage = self.db.get_sync_coverage(self.account_id)
+        today = datetime.now().strftime('%Y-%m-%d')
+        if coverage is None or coverage[1] < min(date_to, today):
+            return date_from, date_to
+        if coverage[0] <= date_from:
+            return None
+        # Покрытие смыкается с концом периода - догружаем только начало
+        return date_from, min(date_to, coverage[0])
+
+    def covers(self, date_from: str, date_to: str) -> bool:
+        """Есть ли в хранилище бронирования за весь период запросов [date_from, date_to]"""
+        return self._missing_range(date_from, date_to) is None
+
+    def _extend_coverage(self, date_from: str, date_to: str):
+        """Добавить период к покрытию; несмежный период не запоминается (покрытие - один отрезок)"""
+        coverage = self.db.get_sync_coverage(self.account_id)
+        if coverage is not None:
+            if date_from > coverage[1] or date_to < coverage[0]:
+                return
+            date_from, date_to = min(date_from, coverage[0]), max(date_to, coverage[1])
+        self.db.update_sync_coverage(self.account_id, date_from, date_to)
+
+    def _store(self, bookings: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Сохранить новые и измененные бронирования в базе и колонках
+
+        Returns:
+            Tuple[List[Dict], int]: (новые и измененные бронирования, сколько из них новых)
+        """
+        known = self.db.get_booking_fingerprints(
+            self.account_id, [str(b.get('id')) for b in bookings if b.get('id') is not None]
+        )
+
+        changes = []
+        rows = []
+        new_count = 0
+        for booking in bookings:
+            if booking.get('id') is None:
+                continue
+            booking_id = str(booking['id'])
+            fingerprint = booking_fingerprint(booking)
+            if known.get(booking_id) == fingerprint:
+                continue
+
+            rows.append((booking_id, json.dumps(booking, ensure_ascii=False), fingerprint,
+                         booking_modified_at(booking)))
+            changes.append(booking)
+            if booking_id not in known:
+                new_count += 1
+
+        if rows:
+            self.db.upsert_bookings(self.account_id, rows)
+            if self._analytics is not None:
+                self._analytics.upsert(changes)
+        return changes, new_count
+
+    async def statistics(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                         rooms: Optional[int] = None) -> Tuple[bool, Dict]:
+        """
+        Статистика BnovoManager.get_statistics по колонкам хранилища
+
+        Если хранилище покрывает период не полностью (например, сразу после первой синхронизации),
+        недостающая часть один раз выгружается из Bnovo и сохраняется.
+
+        Returns:
+            Tuple[bool, Dict]: (успех, статистика)
+        """
+        period_from, period_to = self.bnovo_manager.resolve_period(date_from, date_to)
+        async with self._lock:
+            frame = await self._load_analytics()
+            missing = self._missing_range(period_from, period_to)
+            if missing is not None:
+                success, bookings = await self.bnovo_manager.get_bookings_async(*missing)
+                if not success:
+                    return False, bookings
+                if not isinstance(bookings, list):
+                    return False, "Неверный формат данных"
+                await run_blocking(self._store, bookings)
+                # Бронирования после сегодняшнего дня появятся позже - их покроет синхронизация
+                tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+                self._extend_coverage(period_from, min(period_to, tomorrow))
+                logger.info(f"Догружены бронирования {self.account_id} за {missing[0]} - {missing[1]}: {len(bookings)}")
+            return await run_blocking(self.bnovo_manager.get_statistics, date_from, date_to,
+                                      rooms=rooms, frame=frame)
+
+    def _sync_window(self, state) -> Tuple[str, str]:
+        """Период запроса: от high-water mark (с перекрытием) до сегодня"""
+        now = datetime.now()
+        date_from = now - timedelta(days=self.initial_days_back)
+
+        if state and state[1]:
+            try:
+                high_water = datetime.fromisoformat(state[1][:19])
+                date_from = high_water - timedelta(days=self.overlap_days)
+            except ValueError:
+                logger.warning(f"Некорректная отметка синхронизации для {self.account_id}: {state[1]}")
+
+        return date_from.strftime('%Y-%m-%d'), (now + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    async def sync(self) -> Tuple[bool, List[Dict]]:
+        """
+        Синхронизировать бронирования и вернуть изменения
+
+        Первая синхронизация только наполняет хранилище (без уведомлений),
+        последующие возвращают новые и измененные бронирования.
+
+        Returns:
+            Tuple[bool, List[Dict]]: (успех, новые/измененные бронирования)
+        """
+        async with self._lock:
+            return await self._sync()
+
+    async def _sync(self) -> Tuple[bool, List[Dict]]:
+        state = self.db.get_sync_state(self.account_id)
+        date_from, date_to = self._sync_window(state)
+
+        success, bookings = await self.bnovo_manager.get_bookings_async(date_from, date_to)
+        if not success or not isinstance(bookings, list):
+            return False, bookings
+
+        changes, new_count = self._store(bookings)
+
+        last_booking_id = state[0] if state else None
+        last_modified_at = state[1] if state else None
+        for booking in changes:
+            booking_id = str(booking['id'])
+            modified_at = booking_modified_at(booking)
+            if last_booking_id is None or booking_id_key(booking_id) > booking_id_key(last_booking_id):
+                last_booking_id = booking_id
+            if modified_at and (last_modified_at is None or modified_at > last_modified_at):
+                last_modified_at = modified_at
+
+        if last_modified_at is None:
+            # API не сообщает время изменения - двигаем отметку по времени синхронизации
+            last_modified_at = datetime.now().isoformat(timespec='seconds')
+        self.db.update_sync_state(self.account_id, last_booking_id, last_modified_at)
+        self._extend_coverage(date_from, date_to)
+
+        self.last_stats = {
+            'fetched': len(bookings),
+            'new': new_count,
+            'updated': len(changes) - new_count
+        }
+        logger.info(f"Синхронизация {self.account_id}: {self.last_stats}")
+
+        if state is None:
+            # Первая синхронизация: запоминаем текущее состояние без уведомлений
+            return True, []
+
+        return True, changes
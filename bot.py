@@ -1,58 +1,26 @@
 import logging
 import asyncio
+import threading
 import time
 from datetime import datetime, timedelta
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes, ConversationHandler, MessageHandler, filters
-from config import BOT_TOKEN, BNOVO_API_KEY
-from enhanced_ostrovok_manager import EnhancedOstrovokManager as OstrovokManager
+from config import BOT_TOKEN, BNOVO_API_KEY, BNOVO_ROOMS
 from bnovo_manager import BnovoManager
-from hotels101_manager import Hotels101Manager
-from bronevik_manager import BronevikManager
+from booking_sync import BookingSyncEngine
+from db import Database
+from notification_dispatcher import NotificationDispatcher
+from session_store import SessionStore, SQLiteSessionBackend
+from executors import run_blocking
+from geocoding import get_geocoder
+from response_cache import get_response_cache
+from callback_router import CallbackRouter
+from backend_loader import get_backend_loader
+from integration_registry import get_integration_registry, start_integrations, stop_integrations
 import os
 
-# Пробуем импортировать упрощенную версию RPA-менеджера (без PyAutoGUI)
-try:
-    from rpa_manager_simple import SimpleRPAManager as RPAManager
-    RPA_AVAILABLE = True
-    print("✅ Используется упрощенная версия RPA-менеджера (без PyAutoGUI)")
-except ImportError as e:
-    print(f"Предупреждение: Не удалось импортировать упрощенную версию RPA-менеджера: {e}")
-    # Пробуем импортировать полную версию RPA-менеджера
-    try:
-        from rpa_manager import RPAManager
-        RPA_AVAILABLE = True
-        print("✅ Используется полная версия RPA-менеджера (с PyAutoGUI)")
-    except ImportError as e2:
-        print(f"Ошибка: Не удалось импортировать полную версию RPA-менеджера: {e2}")
-        RPA_AVAILABLE = False
-
-# Импортируем AutoHotkey автоматизацию
-try:
-    from autohotkey_automation import AutoHotkeyAutomation
-    AHK_AVAILABLE = True
-    print("✅ AutoHotkey автоматизация доступна")
-except ImportError as e:
-    print(f"Предупреждение: AutoHotkey автоматизация недоступна: {e}")
-    AHK_AVAILABLE = False
-
-# Импортируем интегрированный менеджер
-try:
-    from telegram_integrated_manager import TelegramIntegratedManager
-    INTEGRATED_AVAILABLE = True
-    print("✅ Интегрированная автоматизация доступна")
-except ImportError as e:
-    print(f"Предупреждение: Интегрированная автоматизация недоступна: {e}")
-    INTEGRATED_AVAILABLE = False
-
-# Импортируем PyAutoGUI интеграцию
-try:
-    from pyautogui_bot_integration import PyAutoGUIBotIntegration
-    PYAUTOGUI_AVAILABLE = True
-    print("✅ PyAutoGUI интеграция доступна")
-except ImportError as e:
-    print(f"Предупреждение: PyAutoGUI интеграция недоступна: {e}")
-    PYAUTOGUI_AVAILABLE = False
+# Бэкенды автоматизации (RPA, AutoHotkey, интегрированная, PyAutoGUI) и Selenium-менеджеры площадок
+# импортируются при первом обращении через backend_loader, а не при импорте модуля
 
 import sqlite3
 
@@ -66,6 +34,9 @@ WAITING_AD_NAME, WAITING_AD_TYPE, WAITING_AD_REGION, WAITING_AD_ADDRESS, WAITING
 WAITING_101HOTELS_EMAIL, WAITING_101HOTELS_PASSWORD = range(200, 202)
 WAITING_101HOTELS_CONTACT_NAME, WAITING_101HOTELS_CONTACT_PHONE, WAITING_101HOTELS_CONTACT_EMAIL = range(202, 205)
 
+# Площадки RPA-автоматизации (кнопки rpa_platform_*, rpa_*_login, rpa_*_add_object)
+RPA_PLATFORMS = ('101hotels', 'ostrovok', 'bronevik')
+
 # Состояния для RPA
 WAITING_RPA_EMAIL, WAITING_RPA_PASSWORD = range(300, 302)
 WAITING_HOTEL_NAME = 302
@@ -108,66 +79,96 @@ logger = logging.getLogger(__name__)
 # --- END SQLITE INIT ---
 
 class HotelBot:
-    def __init__(self, token: str):
+    def __init__(self, token: str, request=None, warm_up: bool = True):
         self.token = token
-        self.application = Application.builder().token(token).build()
-        self.ostrovok_manager = OstrovokManager()
+        # Прогрев браузеров и бэкендов после старта (в воркерах webhook - только в одном процессе)
+        self.warm_up_enabled = warm_up
+        builder = Application.builder().token(token).post_init(self.on_startup).post_shutdown(stop_integrations)
+        if request is not None:
+            # Свой транспорт Bot API (например, офлайн для профилирования старта)
+            builder = builder.request(request).get_updates_request(request)
+        self.application = builder.build()
+        self.db = Database()
+        # Менеджеры площадок и автоматизации - свойства ниже, загружаются при первом обращении
+        self.backends = get_backend_loader()
         self.bnovo_manager = BnovoManager(BNOVO_API_KEY) if BNOVO_API_KEY else None
-        self.hotels101_manager = Hotels101Manager()
-        self.bronevik_manager = BronevikManager()
-        
-        # Инициализируем RPA-менеджер только если он доступен
-        if RPA_AVAILABLE:
-            try:
-                self.rpa_manager = RPAManager()
-                print("✅ RPA-менеджер успешно инициализирован")
-            except Exception as e:
-                print(f"❌ Ошибка при инициализации RPA-менеджера: {e}")
-                self.rpa_manager = None
-        else:
-            self.rpa_manager = None
-            print("RPA-функции недоступны из-за проблем с зависимостями")
-        
-        # Инициализируем AutoHotkey автоматизацию
-        if AHK_AVAILABLE:
-            try:
-                self.ahk_automation = AutoHotkeyAutomation()
-                print("✅ AutoHotkey автоматизация успешно инициализирована")
-            except Exception as e:
-                print(f"❌ Ошибка при инициализации AutoHotkey автоматизации: {e}")
-                self.ahk_automation = None
-        else:
-            self.ahk_automation = None
-            print("AutoHotkey автоматизация недоступна")
-        
-        # Инициализируем интегрированный менеджер
-        if INTEGRATED_AVAILABLE:
-            try:
-                self.integrated_manager = TelegramIntegratedManager()
-                print("✅ Интегрированный менеджер успешно инициализирован")
-            except Exception as e:
-                print(f"❌ Ошибка при инициализации интегрированного менеджера: {e}")
-                self.integrated_manager = None
-        else:
-            self.integrated_manager = None
-            print("Интегрированный менеджер недоступен")
-        
-        # Инициализируем PyAutoGUI интеграцию
-        if PYAUTOGUI_AVAILABLE:
-            try:
-                self.pyautogui_integration = PyAutoGUIBotIntegration()
-                print("✅ PyAutoGUI интеграция успешно инициализирована")
-            except Exception as e:
-                print(f"❌ Ошибка при инициализации PyAutoGUI интеграции: {e}")
-                self.pyautogui_integration = None
-        else:
-            self.pyautogui_integration = None
-            print("PyAutoGUI интеграция недоступна")
-        
-        self.user_sessions = {}  # Хранение сессий пользователей
+        self.booking_sync = BookingSyncEngine(self.bnovo_manager, self.db) if self.bnovo_manager else None
+        self.analytics_task = None
+        self.notifier = NotificationDispatcher(self.application.bot)
+        # Кэш чтений для экранов бронирований, статистики и списков отелей
+        self.response_cache = get_response_cache()
+        
+        self.user_sessions = SessionStore(SQLiteSessionBackend(self.db))  # Сессии пользователей (SQLite + LRU)
+        self.callback_router = CallbackRouter()  # Маршруты inline-кнопок
+        self.setup_callback_routes()
         self.setup_handlers()
         self.setup_bnovo_notifications()
     
+    @property
+    def ostrovok_manager(self):
+        return self.backends.require('ostrovok')
+
+    @property
+    def hotels101_manager(self):
+        return self.backends.require('hotels101')
+
+    @property
+    def bronevik_manager(self):
+        return self.backends.require('bronevik')
+
+    @property
+    def rpa_manager(self):
+        return self.backends.get('rpa')
+
+    @property
+    def ahk_automation(self):
+        return self.backends.get('ahk')
+
+    @property
+    def integrated_manager(self):
+        return self.backends.get('integrated')
+
+    @property
+    def pyautogui_integration(self):
+        return self.backends.get('pyautogui')
+
+    async def on_startup(self, application):
+        """post_init: интеграции, затем в фоне колонки статистики, прогрев браузеров и загрузка бэкендов"""
+        await start_integrations(application)
+        if self.booking_sync:
+            # Колонки для статистики строятся из базы в пуле, первый экран статистики их не ждет
+            self.analytics_task = asyncio.create_task(self.booking_sync.load_analytics())
+        if self.warm_up_enabled:
+            threading.Thread(target=self.warm_up, name='bot-warm-up', daemon=True).start()
+
+    def warm_up(self):
+        """Прогрев после старта: бот уже отвечает, первое нажатие не ждет импорта и запуска Chrome"""
+        # Холодный старт Chrome - самая долгая часть автоматизации
+        from browser_pool import get_browser_pool
+        get_browser_pool().warm_up_async()
+        # RecordingManager умной автоматизации и записей (импорт Selenium) - до первого нажатия
+        get_integration_registry().get('recording_manager')
+        loaded = self.backends.preload()
+        logger.info(f"Бэкенды загружены: {', '.join(name for name, ok in loaded.items() if ok) or 'нет'}")
+
+    def backend_entry(self, name, callback):
+        """
+        Точка входа диалога автоматизации: бэкенд загружается вне цикла событий,
+        если он не загрузился (модуль есть, но импорт или создание упали) - ответ «недоступно»
+        """
+        async def entry(update, context):
+            if await run_blocking(self.backends.get, name) is None:
+                logger.warning(f"Бэкенд {name} недоступен: {self.backends.stats().get(name, {}).get('error')}")
+                text = "⚠️ Эта автоматизация недоступна - проблемы с зависимостями"
+                if update.callback_query:
+                    await update.callback_query.answer()
+                    await update.callback_query.edit_message_text(text)
+                elif update.message:
+                    await update.message.reply_text(text)
+                return ConversationHandler.END
+            return await callback(update, context)
+        return entry
+
     def setup_handlers(self):
         self.application.add_handler(CommandHandler("start", self.start_command))
         self.application.add_handler(CommandHandler("bnovo", self.bnovo_command))
@@ -195,11 +196,11 @@ class HotelBot:
         self.application.add_handler(conv_handler)
         
         # ConversationHandler для AutoHotkey автоматизации
-        if self.ahk_automation:
+        if self.backends.available('ahk'):
             ahk_conv_handler = ConversationHandler(
                 entry_points=[
-                    CallbackQueryHandler(self.start_ahk_automation, pattern='^ahk_automation$'),
-                    CallbackQueryHandler(self.start_ahk_platform_selection, pattern='^ahk_platform_')
+                    CallbackQueryHandler(self.backend_entry('ahk', self.start_ahk_automation), pattern='^ahk_automation$'),
+                    CallbackQueryHandler(self.backend_entry('ahk', self.start_ahk_platform_selection), pattern='^ahk_platform_')
                 ],
                 states={
                     WAITING_AHK_PLATFORM: [CallbackQueryHandler(self.handle_ahk_platform_selection, pattern='^ahk_platform_')],
@@ -274,11 +275,11 @@ class HotelBot:
         self.application.add_handler(rpa_conv_handler)
         
         # ConversationHandler для интегрированной автоматизации
-        if self.integrated_manager:
+        if self.backends.available('integrated'):
             integrated_conv_handler = ConversationHandler(
                 entry_points=[
-                    CallbackQueryHandler(self.start_integrated_automation, pattern='^integrated_automation$'),
-                    CallbackQueryHandler(self.start_integrated_platform_selection, pattern='^integrated_platform_')
+                    CallbackQueryHandler(self.backend_entry('integrated', self.start_integrated_automation), pattern='^integrated_automation$'),
+                    CallbackQueryHandler(self.backend_entry('integrated', self.start_integrated_platform_selection), pattern='^integrated_platform_')
                 ],
                 states={
                     WAITING_INTEGRATED_PLATFORM: [CallbackQueryHandler(self.handle_integrated_platform_selection, pattern='^integrated_platform_')],
@@ -294,12 +295,12 @@ class HotelBot:
             self.application.add_handler(integrated_conv_handler)
         
         # ConversationHandler для PyAutoGUI интеграции
-        if self.pyautogui_integration:
+        if self.backends.available('pyautogui'):
             pyautogui_conv_handler = ConversationHandler(
                 entry_points=[
-                    CallbackQueryHandler(self.start_pyautogui_automation, pattern='^pyautogui_automation$'),
-                    CallbackQueryHandler(self.start_pyautogui_login, pattern='^pyautogui_login_start$'),
-                    CallbackQueryHandler(self.start_pyautogui_add_object, pattern='^pyautogui_add_object_start$')
+                    CallbackQueryHandler(self.backend_entry('pyautogui', self.start_pyautogui_automation), pattern='^pyautogui_automation$'),
+                    CallbackQueryHandler(self.backend_entry('pyautogui', self.start_pyautogui_login), pattern='^pyautogui_login_start$'),
+                    CallbackQueryHandler(self.backend_entry('pyautogui', self.start_pyautogui_add_object), pattern='^pyautogui_add_object_start$')
                 ],
                 states={
                     WAITING_PYAUTOGUI_EMAIL: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_pyautogui_email)],
@@ -313,27 +314,30 @@ class HotelBot:
             )
             self.application.add_handler(pyautogui_conv_handler)
         
+        # Интеграции - общие экземпляры реестра: один RecordingManager на процесс
+        integrations = get_integration_registry()
+
         # Добавляем обработчики для умной системы автоматизации
         try:
-            from smart_bot_integration import SmartBotIntegration
-            smart_integration = SmartBotIntegration()
+            smart_integration = integrations.get('smart')
             for handler in smart_integration.get_handlers():
                 self.application.add_handler(handler)
+            smart_integration.register_callbacks(self.callback_router)
             print("✅ Обработчики умной системы автоматизации добавлены")
         except ImportError as e:
             print(f"⚠️ Умная система автоматизации недоступна: {e}")
         
         # Добавляем обработчики для системы записи действий
         try:
-            from recording_bot_integration import RecordingBotIntegration
-            recording_integration = RecordingBotIntegration()
+            recording_integration = integrations.get('recording')
             for handler in recording_integration.get_handlers():
                 self.application.add_handler(handler)
+            recording_integration.register_callbacks(self.callback_router)
             print("✅ Обработчики системы записи действий добавлены")
         except ImportError as e:
             print(f"⚠️ Система записи действий недоступна: {e}")
         
-        # ПОТОМ общий CallbackQueryHandler
+        # ПОТОМ общий CallbackQueryHandler: остальные кнопки разбирает таблица маршрутов
         self.application.add_handler(CallbackQueryHandler(self.button_callback))
     
     def setup_bnovo_notifications(self):
@@ -350,36 +354,30 @@ class HotelBot:
     
     async def check_new_bookings(self):
         """Проверка новых бронирований и отправка уведомлений"""
-        if not self.bnovo_manager:
+        if not self.booking_sync:
             return
         
-        success, bookings = self.bnovo_manager.get_new_bookings(hours_back=1)
-        if not success or not isinstance(bookings, list):
+        # Только новые и измененные с прошлой синхронизации бронирования
+        success, bookings = await self.booking_sync.sync()
+        if not success or not bookings:
             return
         
-        # Отправляем уведомления всем активным пользователям
-        for user_id, session in self.user_sessions.items():
-            if session.get('bnovo_notifications_enabled', True):
-                for booking in bookings:
-                    message = self.bnovo_manager.format_booking_message(booking)
-                    try:
-                        await self.application.bot.send_message(
-                            chat_id=user_id,
-                            text=message,
-                            parse_mode='Markdown'
-                        )
-                    except Exception as e:
-                        logger.error(f"Ошибка отправки уведомления пользователю {user_id}: {e}")
+        # Рассылаем через диспетчер: он ограничивает скорость и объединяет брони в одно сообщение
+        messages = [self.bnovo_manager.format_booking_message(booking) for booking in bookings]
+        self.notifier.broadcast(self.user_sessions.subscribed_users(), messages)
+        logger.info(f"Уведомления поставлены в очередь: {self.notifier.get_metrics()}")
     
     async def start_command(self, update, context):
+        # Пункты автоматизации: после фоновой загрузки (warm_up) - по ее результату,
+        # до нее - по наличию модуля; точки входа сами проверяют, что бэкенд загрузился
         keyboard = [
             [InlineKeyboardButton("📱 Mini App", web_app={'url': 'http://localhost:8000'}, callback_data='mini_app')],
             [InlineKeyboardButton("🏨 Платформы", callback_data='platforms')],
             [InlineKeyboardButton("🧠 Умная автоматизация", callback_data='smart_menu')],
             [InlineKeyboardButton("🎬 Автоматизация объявлений", callback_data='recording_menu')],
-            [InlineKeyboardButton("🤖 RPA-Автоматизация", callback_data='rpa_menu')] if self.rpa_manager else None,
-            [InlineKeyboardButton("⚡ AutoHotkey Автоматизация", callback_data='ahk_automation')] if self.ahk_automation else None,
-            [InlineKeyboardButton("🚀 Интегрированная Автоматизация", callback_data='integrated_automation')] if self.integrated_manager else None,
+            [InlineKeyboardButton("🤖 RPA-Автоматизация", callback_data='rpa_menu')] if self.backends.available('rpa') else None,
+            [InlineKeyboardButton("⚡ AutoHotkey Автоматизация", callback_data='ahk_automation')] if self.backends.available('ahk') else None,
+            [InlineKeyboardButton("🚀 Интегрированная Автоматизация", callback_data='integrated_automation')] if self.backends.available('integrated') else None,
             [InlineKeyboardButton("🔗 Bnovo PMS", callback_data='bnovo_dashboard')] if self.bnovo_manager else None,
             [InlineKeyboardButton("🔔 Уведомления", callback_data='notifications_settings')]
         ]
@@ -397,7 +395,7 @@ class HotelBot:
         welcome_text += "🧠 **Умная автоматизация** - введите данные один раз, получите объявления на всех платформах!\n\n"
         welcome_text += "🎬 **Автоматизация объявлений** - создавайте объявления на всех платформах!\n\n"
         
-        if self.rpa_manager:
+        if self.backends.available('rpa'):
             welcome_text += "🤖 **RPA-автоматизация доступна** - автоматический вход и создание объектов!\n\n"
         else:
             welcome_text += "⚠️ **RPA-автоматизация недоступна** - проблемы с зависимостями\n\n"
@@ -418,113 +416,172 @@ class HotelBot:
             )
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        query = update.callback_query
-        await query.answer()
+        """Нажатие inline-кнопки: обработчик берется из таблицы маршрутов"""
+        await self.callback_router.dispatch(update, context)
+    
+    def setup_callback_routes(self):
+        """Маршруты кнопок бота (модули интеграций добавляют свои в setup_handlers)"""
+        router = self.callback_router
+        
+        def on_query(method, *args):
+            # Большинство экранов принимают только callback_query
+            return lambda update, context: method(update.callback_query, *args)
+        
+        def stub(text):
+            return lambda update, context: update.callback_query.edit_message_text(text)
+        
+        router.add('platforms', on_query(self.show_platforms_menu))
+        router.add('back_to_main', self.start_command)
+        
+        # Ostrovok
+        router.add('platform_ostrovok', on_query(self.show_ostrovok_platform))
+        router.add('ostrovok_bookings', on_query(self.show_ostrovok_bookings))
+        router.add('ostrovok_statistics', on_query(self.show_ostrovok_statistics))
+        router.add('ostrovok_rooms', on_query(self.show_ostrovok_rooms))
+        router.add('ostrovok_account', on_query(self.show_ostrovok_account))
+        router.add('ostrovok_logout', on_query(self.ostrovok_logout))
+        router.add('ostrovok_add_object', on_query(self.ostrovok_add_object))
+        router.add('ostrovok_object_with_rooms', on_query(self.ostrovok_select_object_with_rooms))
+        router.add('ostrovok_whole_apartment', on_query(self.ostrovok_select_whole_apartment))
+        router.add('ostrovok_my_objects', on_query(self.show_ostrovok_my_objects))
+        router.add('ostrovok_new_bookings', on_query(self.show_ostrovok_new_bookings_objects))
+        router.add_prefix('ostrovok_bookings_for_',
+                          lambda update, context, object_id: self.show_ostrovok_bookings_for_object(update.callback_query, object_id))
+        router.add('ostrovok_back_to_menu', on_query(self.show_ostrovok_main_menu))
+        router.add('ostrovok_create_ad', stub("Форма создания объявления (заглушка)"))
+        router.add('ostrovok_my_ads', stub("Ваши объявления (заглушка)"))
+        
+        # Bnovo
+        router.add('bnovo_dashboard', on_query(self.show_bnovo_dashboard))
+        router.add('bnovo_bookings', on_query(self.show_bnovo_bookings))
+        router.add('bnovo_statistics', on_query(self.show_bnovo_statistics))
+        router.add('bnovo_new_bookings', on_query(self.show_bnovo_new_bookings))
+        router.add('bnovo_back_to_dashboard', on_query(self.show_bnovo_dashboard))
+        router.add('notifications_settings', on_query(self.show_notifications_settings))
+        router.add('toggle_notifications', on_query(self.toggle_notifications))
+        
+        # PyAutoGUI
+        router.add('pyautogui_menu', on_query(self.show_pyautogui_menu))
+        router.add('pyautogui_test', on_query(self.pyautogui_test_coordinates))
+        router.add('pyautogui_login_test', on_query(self.pyautogui_login_test))
+        router.add('pyautogui_login_start', on_query(self.pyautogui_login_start))
+        router.add('pyautogui_add_object_test', on_query(self.pyautogui_add_object_test))
+        router.add('pyautogui_screen_info', on_query(self.pyautogui_screen_info))
+        router.add('pyautogui_reload', on_query(self.pyautogui_reload))
+        
+        # 101 Hotels
+        router.add('platform_101hotels', on_query(self.open_101hotels_platform))
+        router.add('101hotels_bookings', on_query(self.show_101hotels_bookings))
+        router.add('101hotels_statistics', on_query(self.show_101hotels_statistics))
+        router.add('101hotels_add_object', on_query(self.show_101hotels_add_object))
+        router.add('101hotels_my_objects', on_query(self.show_101hotels_my_objects))
+        router.add('101hotels_logout', on_query(self.show_101hotels_logout))
+        router.add('101hotels_close_browser', on_query(self.close_101hotels_browser))
+        router.add('101hotels_debug_page', on_query(self.show_101hotels_debug_page))
+        router.add('101hotels_select_country', on_query(self.show_101hotels_country_selection))
+        router.add('101hotels_next_step', on_query(self.continue_101hotels_registration))
+        router.add('101hotels_login', on_query(self.start_101hotels_login))
+        router.add('101hotels_create_new', on_query(self.start_101hotels_create_new))
+        router.add_prefix('101hotels_country_', lambda update, context, country_id: self.select_101hotels_country(update.callback_query))
+        router.add('101hotels_api_basic_info', on_query(self.show_101hotels_api_basic_info_form))
+        router.add('101hotels_api_progress', on_query(self.show_101hotels_api_progress))
+        router.add('101hotels_api_fields', on_query(self.show_101hotels_api_fields))
+        router.add('101hotels_contact_info', lambda update, context: self.start_101hotels_contact_conv(update.callback_query, context))
+        
+        # RPA
+        router.add('rpa_menu', on_query(self.show_rpa_menu))
+        for platform in RPA_PLATFORMS:
+            router.add(f'rpa_platform_{platform}', on_query(self.show_rpa_platform_menu, platform))
+            router.add(f'rpa_{platform}_login',
+                       lambda update, context, platform=platform: self.start_rpa_platform_login(update.callback_query, context, platform))
+            router.add(f'rpa_{platform}_add_object',
+                       lambda update, context, platform=platform: self.start_rpa_platform_add_object(update.callback_query, context, platform))
+        router.add('rpa_autohotkey', lambda update, context: self.create_autohotkey_script(update.callback_query, context))
+        router.add('ahk_automation', lambda update, context: self.start_ahk_automation(update.callback_query, context))
+        
+        # Интегрированная автоматизация (сама отвечает на callback: при недоступности - с текстом ошибки)
+        router.add('integrated_automation', self.open_integrated_automation, answer=False)
+        router.add('integrated_test_coordinates', self.open_integrated_coordinates_test, answer=False)
+        router.add_prefix('test_coords_', self.run_integrated_coordinates_test, answer=False)
+        
+        # Bronevik
+        router.add('platform_bronevik', on_query(self.show_bronevik_platform))
+        router.add('bronevik_bookings', on_query(self.show_bronevik_bookings))
+        router.add('bronevik_statistics', on_query(self.show_bronevik_statistics))
+        router.add('bronevik_add_object', stub("➕ Добавление объекта на Bronevik (в разработке)"))
+        router.add('bronevik_my_objects', stub("🏨 Мои объекты на Bronevik (в разработке)"))
+        router.add('bronevik_logout', stub("🚪 Выход из Bronevik (в разработке)"))
+    
+    async def show_ostrovok_platform(self, query):
+        """Экран Ostrovok: меню или предложение войти"""
+        user_id = query.from_user.id
+        if user_id in self.user_sessions and self.user_sessions[user_id].get('ostrovok_logged_in'):
+            await self.show_ostrovok_main_menu(query)
+        else:
+            keyboard = [
+                [InlineKeyboardButton("🔐 Войти в панель управления", callback_data='ostrovok_login')],
+                [InlineKeyboardButton("🔙 К платформам", callback_data='platforms')],
+                [InlineKeyboardButton("🏠 Главное меню", callback_data='back_to_main')]
+            ]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(
+                "❌ Вы не авторизованы в панели управления\n\nВойдите, чтобы продолжить:",
+                reply_markup=reply_markup
+            )
+    
+    async def show_bronevik_platform(self, query):
+        """Экран Bronevik: меню или предложение войти"""
+        user_id = query.from_user.id
+        if user_id in self.user_sessions and self.user_sessions[user_id].get('bronevik_logged_in'):
+            await self.show_bronevik_main_menu(query)
+        else:
+            keyboard = [
+                [InlineKeyboardButton("🔐 Войти в панель управления", callback_data='bronevik_login')],
+                [InlineKeyboardButton("🔙 К платформам", callback_data='platforms')],
+                [InlineKeyboardButton("🏠 Главное меню", callback_data='back_to_main')]
+            ]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(
+                "❌ Вы не авторизованы в панели управления Bronevik\n\nВойдите, чтобы продолжить:",
+                reply_markup=reply_markup
+            )
+    
+    async def open_101hotels_platform(self, query):
+        """Экран 101 Hotels: меню или открытие главной страницы в браузере"""
+        user_id = query.from_user.id
         
-        if query.data == 'platforms':
-            await self.show_platforms_menu(query)
-        elif query.data == 'smart_menu':
-            # Импортируем и используем умную интеграцию
-            try:
-                from smart_bot_integration import SmartBotIntegration
-                smart_integration = SmartBotIntegration()
-                await smart_integration.show_smart_menu(update, context)
-            except ImportError:
-                await query.answer("❌ Модуль умной автоматизации недоступен")
-        elif query.data == 'recording_menu':
-            # Импортируем и используем интеграцию записи
-            try:
-                from recording_bot_integration import RecordingBotIntegration
-                recording_integration = RecordingBotIntegration()
-                await recording_integration.show_recording_menu(update, context)
-            except ImportError:
-                await query.answer("❌ Модуль автоматизации недоступен")
-        elif query.data == 'back_to_main':
-            await self.start_command(update, context)
-        elif query.data == 'platform_ostrovok':
-            user_id = query.from_user.id
-            if user_id in self.user_sessions and self.user_sessions[user_id].get('ostrovok_logged_in'):
-                await self.show_ostrovok_main_menu(query)
-            else:
+        # Проверяем, авторизован ли пользователь
+        if user_id in self.user_sessions and self.user_sessions[user_id].get('101hotels_logged_in'):
+            # Если пользователь уже авторизован, показываем главное меню
+            await self.show_101hotels_main_menu(query)
+            return
+        
+        # Сразу открываем главную страницу 101hotels
+        try:
+            # Безопасно открываем главную страницу
+            success = await run_blocking(self.hotels101_manager.open_dashboard_safe, kind='browser')
+            
+            if success:
+                # Показываем меню с опциями
                 keyboard = [
-                    [InlineKeyboardButton("🔐 Войти в панель управления", callback_data='ostrovok_login')],
+                    [InlineKeyboardButton("🔐 Войти в аккаунт", callback_data='101hotels_login')],
+                    [InlineKeyboardButton("➕ Создать новый отель", callback_data='101hotels_create_new')],
+                    [InlineKeyboardButton("🔒 Закрыть браузер", callback_data='101hotels_close_browser')],
                     [InlineKeyboardButton("🔙 К платформам", callback_data='platforms')],
                     [InlineKeyboardButton("🏠 Главное меню", callback_data='back_to_main')]
                 ]
                 reply_markup = InlineKeyboardMarkup(keyboard)
                 await query.edit_message_text(
-                    "❌ Вы не авторизованы в панели управления\n\nВойдите, чтобы продолжить:",
-                    reply_markup=reply_markup
+                    "🏨 **101 Hotels Extranet**\n\n"
+                    "✅ Главная страница открыта в браузере\n\n"
+                    "Выберите действие:\n"
+                    "• **Войти в аккаунт** - для работы с существующими отелями\n"
+                    "• **Создать новый отель** - для регистрации нового объекта",
+                    reply_markup=reply_markup,
+                    parse_mode='Markdown'
                 )
-        elif query.data == 'platform_bronevik':
-            user_id = query.from_user.id
-            if user_id in self.user_sessions and self.user_sessions[user_id].get('bronevik_logged_in'):
-                await self.show_bronevik_main_menu(query)
             else:
-                keyboard = [
-                    [InlineKeyboardButton("🔐 Войти в панель управления", callback_data='bronevik_login')],
-                    [InlineKeyboardButton("🔙 К платформам", callback_data='platforms')],
-                    [InlineKeyboardButton("🏠 Главное меню", callback_data='back_to_main')]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
-                    "❌ Вы не авторизованы в панели управления Bronevik\n\nВойдите, чтобы продолжить:",
-                    reply_markup=reply_markup
-                )
-        elif query.data == 'platform_101hotels':
-            user_id = query.from_user.id
-            
-            # Проверяем, авторизован ли пользователь
-            if user_id in self.user_sessions and self.user_sessions[user_id].get('101hotels_logged_in'):
-                # Если пользователь уже авторизован, показываем главное меню
-                await self.show_101hotels_main_menu(query)
-                return
-            
-            # Сразу открываем главную страницу 101hotels
-            try:
-                # Безопасно открываем главную страницу
-                success = self.hotels101_manager.open_dashboard_safe()
-                
-                if success:
-                    # Показываем меню с опциями
-                    keyboard = [
-                        [InlineKeyboardButton("🔐 Войти в аккаунт", callback_data='101hotels_login')],
-                        [InlineKeyboardButton("➕ Создать новый отель", callback_data='101hotels_create_new')],
-                        [InlineKeyboardButton("🔒 Закрыть браузер", callback_data='101hotels_close_browser')],
-                        [InlineKeyboardButton("🔙 К платформам", callback_data='platforms')],
-                        [InlineKeyboardButton("🏠 Главное меню", callback_data='back_to_main')]
-                    ]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
-                    await query.edit_message_text(
-                        "🏨 **101 Hotels Extranet**\n\n"
-                        "✅ Главная страница открыта в браузере\n\n"
-                        "Выберите действие:\n"
-                        "• **Войти в аккаунт** - для работы с существующими отелями\n"
-                        "• **Создать новый отель** - для регистрации нового объекта",
-                        reply_markup=reply_markup,
-                        parse_mode='Markdown'
-                    )
-                else:
-                    # Если не удалось открыть страницу, показываем стандартное меню
-                    keyboard = [
-                        [InlineKeyboardButton("🔐 Войти в аккаунт", callback_data='101hotels_login')],
-                        [InlineKeyboardButton("➕ Создать новый отель", callback_data='101hotels_create_new')],
-                        [InlineKeyboardButton("🔒 Закрыть браузер", callback_data='101hotels_close_browser')],
-                        [InlineKeyboardButton("🔙 К платформам", callback_data='platforms')],
-                        [InlineKeyboardButton("🏠 Главное меню", callback_data='back_to_main')]
-                    ]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
-                    await query.edit_message_text(
-                        "🏨 **101 Hotels Extranet**\n\n"
-                        "⚠️ Не удалось открыть главную страницу\n\n"
-                        "Выберите действие:\n"
-                        "• **Войти в аккаунт** - для работы с существующими отелями\n"
-                        "• **Создать новый отель** - для регистрации нового объекта",
-                        reply_markup=reply_markup,
-                        parse_mode='Markdown'
-                    )
-            except Exception as e:
-                # В случае ошибки показываем стандартное меню
+                # Если не удалось открыть страницу, показываем стандартное меню
                 keyboard = [
                     [InlineKeyboardButton("🔐 Войти в аккаунт", callback_data='101hotels_login')],
                     [InlineKeyboardButton("➕ Создать новый отель", callback_data='101hotels_create_new')],
@@ -535,220 +592,145 @@ class HotelBot:
                 reply_markup = InlineKeyboardMarkup(keyboard)
                 await query.edit_message_text(
                     "🏨 **101 Hotels Extranet**\n\n"
-                    f"⚠️ Ошибка при открытии страницы: {str(e)}\n\n"
+                    "⚠️ Не удалось открыть главную страницу\n\n"
                     "Выберите действие:\n"
                     "• **Войти в аккаунт** - для работы с существующими отелями\n"
                     "• **Создать новый отель** - для регистрации нового объекта",
                     reply_markup=reply_markup,
                     parse_mode='Markdown'
                 )
-        elif query.data == 'ostrovok_bookings':
-            await self.show_ostrovok_bookings(query)
-        elif query.data == 'ostrovok_statistics':
-            await self.show_ostrovok_statistics(query)
-        elif query.data == 'ostrovok_rooms':
-            await self.show_ostrovok_rooms(query)
-        elif query.data == 'ostrovok_account':
-            await self.show_ostrovok_account(query)
-        elif query.data == 'ostrovok_logout':
-            await self.ostrovok_logout(query)
-        elif query.data == 'ostrovok_add_object':
-            user_id = query.from_user.id
-            email = self.user_sessions.get(user_id, {}).get('ostrovok_email')
-            if not email:
-                await query.edit_message_text("❌ Необходимо войти в аккаунт")
-                return
-            ok, msg = self.ostrovok_manager.click_add_object_button()
-            if ok:
-                # Показываем меню выбора типа объекта
-                keyboard = [
-                    [InlineKeyboardButton("🏨 Объект с номерами", callback_data='ostrovok_object_with_rooms')],
-                    [InlineKeyboardButton("🏠 Жильё целиком", callback_data='ostrovok_whole_apartment')]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(
-                    "Выберите тип объекта:",
-                    reply_markup=reply_markup
-                )
-            else:
-                await query.edit_message_text(f"❌ {msg}")
-        elif query.data == 'ostrovok_object_with_rooms':
-            ok, msg = self.ostrovok_manager.click_next_on_object_with_rooms()
-            if ok:
-                await query.edit_message_text("✅ Выбран объект с номерами. Введите название объекта (например, Ромашка):")
-                return WAITING_OBJECT_NAME
-            else:
-                await query.edit_message_text(f"❌ {msg}")
-        elif query.data == 'ostrovok_whole_apartment':
-            ok, msg = self.ostrovok_manager.select_whole_apartment_and_next()
-            if ok:
-                await query.edit_message_text("✅ Выбрано жильё целиком. Введите название объекта (например, Ромашка):")
-                return WAITING_OBJECT_NAME
-            else:
-                await query.edit_message_text(f"❌ {msg}")
-        elif query.data == 'ostrovok_my_objects':
-            objects = self.ostrovok_manager.get_my_objects()
-            if objects:
-                text = 'Ваши объекты:\n\n'
-                for i, obj in enumerate(objects, 1):
-                    text += f"{i}. {obj['name']}\n   {obj['address']}\n   ID: {obj['id']}\n   Статус: {obj['status']}\n\n"
-                keyboard = [[InlineKeyboardButton('🔙 Назад', callback_data='ostrovok_back_to_menu')]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(text, reply_markup=reply_markup)
-            else:
-                await query.edit_message_text("❌ Не удалось получить список объектов или объекты не найдены.")
-        elif query.data == 'ostrovok_new_bookings':
-            objects = self.ostrovok_manager.get_my_objects()
-            if objects:
-                keyboard = []
-                for obj in objects:
-                    keyboard.append([
-                        InlineKeyboardButton(f"{obj['name']} (ID: {obj['id']})", callback_data=f"ostrovok_bookings_for_{obj['id']}")
-                    ])
-                keyboard.append([InlineKeyboardButton('🔙 Назад', callback_data='ostrovok_back_to_menu')])
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text("Выберите объект для просмотра новых бронирований:", reply_markup=reply_markup)
-            else:
-                await query.edit_message_text("❌ Не удалось получить список объектов или объекты не найдены.")
-        elif query.data.startswith('ostrovok_bookings_for_'):
-            object_id = query.data.replace('ostrovok_bookings_for_', '')
-            bookings = self.ostrovok_manager.get_new_bookings_for_object(object_id)
-            if bookings:
-                text = f'Новые бронирования для объекта ID {object_id}:\n\n'
-                for i, booking in enumerate(bookings, 1):
-                    text += f"{i}. {booking}\n"
-                keyboard = [[InlineKeyboardButton('🔙 Назад', callback_data='ostrovok_new_bookings')]]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                await query.edit_message_text(text, reply_markup=reply_markup)
-            else:
-                await query.edit_message_text(f"Нет новых бронирований для объекта ID {object_id} или не удалось получить данные.")
-        elif query.data == 'ostrovok_back_to_menu':
-            await self.show_ostrovok_main_menu(query)
-        # Новые обработчики для Bnovo
-        elif query.data == 'bnovo_dashboard':
-            await self.show_bnovo_dashboard(query)
-        elif query.data == 'bnovo_bookings':
-            await self.show_bnovo_bookings(query)
-        elif query.data == 'bnovo_statistics':
-            await self.show_bnovo_statistics(query)
-        elif query.data == 'bnovo_new_bookings':
-            await self.show_bnovo_new_bookings(query)
-        elif query.data == 'notifications_settings':
-            await self.show_notifications_settings(query)
-        elif query.data == 'toggle_notifications':
-            await self.toggle_notifications(query)
-        elif query.data == 'pyautogui_menu':
-            await self.show_pyautogui_menu(query)
-        elif query.data == 'pyautogui_test':
-            await self.pyautogui_test_coordinates(query)
-        elif query.data == 'pyautogui_login_test':
-            await self.pyautogui_login_test(query)
-        elif query.data == 'pyautogui_login_start':
-            await self.pyautogui_login_start(query)
-        elif query.data == 'pyautogui_add_object_test':
-            await self.pyautogui_add_object_test(query)
-        elif query.data == 'pyautogui_screen_info':
-            await self.pyautogui_screen_info(query)
-        elif query.data == 'pyautogui_reload':
-            await self.pyautogui_reload(query)
-        elif query.data == 'bnovo_back_to_dashboard':
-            await self.show_bnovo_dashboard(query)
-        elif query.data == 'ostrovok_create_ad':
-            await query.edit_message_text("Форма создания объявления (заглушка)")
-        elif query.data == 'ostrovok_my_ads':
-            await query.edit_message_text("Ваши объявления (заглушка)")
-        # 101 Hotels handlers
-        elif query.data == '101hotels_bookings':
-            await self.show_101hotels_bookings(query)
-        elif query.data == '101hotels_statistics':
-            await self.show_101hotels_statistics(query)
-        elif query.data == '101hotels_add_object':
-            await self.show_101hotels_add_object(query)
-        elif query.data == '101hotels_my_objects':
-            await self.show_101hotels_my_objects(query)
-        elif query.data == '101hotels_logout':
-            await self.show_101hotels_logout(query)
-        elif query.data == '101hotels_close_browser':
-            await self.close_101hotels_browser(query)
-        elif query.data == '101hotels_debug_page':
-            await self.show_101hotels_debug_page(query)
-        elif query.data == '101hotels_select_country':
-            await self.show_101hotels_country_selection(query)
-        elif query.data == '101hotels_next_step':
-            await self.continue_101hotels_registration(query)
-        elif query.data == '101hotels_login':
-            await self.start_101hotels_login(query)
-        elif query.data == '101hotels_create_new':
-            await self.start_101hotels_create_new(query)
-        elif query.data.startswith('101hotels_country_'):
-            await self.select_101hotels_country(query)
-        elif query.data == '101hotels_api_basic_info':
-            await self.show_101hotels_api_basic_info_form(query)
-        elif query.data == '101hotels_api_progress':
-            await self.show_101hotels_api_progress(query)
-        elif query.data == '101hotels_api_fields':
-            await self.show_101hotels_api_fields(query)
-        elif query.data == '101hotels_contact_info':
-            await self.start_101hotels_contact_conv(query, context)
-        # RPA handlers
-        elif query.data == 'rpa_menu':
-            await self.show_rpa_menu(query)
-        elif query.data == 'rpa_platform_101hotels':
-            await self.show_rpa_platform_menu(query, '101hotels')
-        elif query.data == 'rpa_platform_ostrovok':
-            await self.show_rpa_platform_menu(query, 'ostrovok')
-        elif query.data == 'rpa_platform_bronevik':
-            await self.show_rpa_platform_menu(query, 'bronevik')
-        elif query.data == 'rpa_101hotels_login':
-            await self.start_rpa_platform_login(query, context, '101hotels')
-        elif query.data == 'rpa_ostrovok_login':
-            await self.start_rpa_platform_login(query, context, 'ostrovok')
-        elif query.data == 'rpa_bronevik_login':
-            await self.start_rpa_platform_login(query, context, 'bronevik')
-        elif query.data == 'rpa_101hotels_add_object':
-            await self.start_rpa_platform_add_object(query, context, '101hotels')
-        elif query.data == 'rpa_ostrovok_add_object':
-            await self.start_rpa_platform_add_object(query, context, 'ostrovok')
-        elif query.data == 'rpa_bronevik_add_object':
-            await self.start_rpa_platform_add_object(query, context, 'bronevik')
-        elif query.data == 'rpa_autohotkey':
-            await self.create_autohotkey_script(query, context)
-        elif query.data == 'ahk_automation':
-            await self.start_ahk_automation(query, context)
-        elif query.data == 'integrated_automation':
-            if self.integrated_manager:
-                await self.start_integrated_automation(update, context)
-            else:
-                await query.answer("❌ Интегрированная автоматизация недоступна")
-        elif query.data == 'integrated_test_coordinates':
-            if self.integrated_manager:
-                await self.test_integrated_coordinates(query)
-            else:
-                await query.answer("❌ Интегрированная автоматизация недоступна")
-        elif query.data.startswith('test_coords_'):
-            if self.integrated_manager:
-                platform = query.data.replace('test_coords_', '')
-                result = self.integrated_manager.test_coordinates(platform)
-                await query.edit_message_text(
-                    f"🧪 **Результат тестирования {platform.upper()}**\n\n{result}",
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("🔙 Назад", callback_data='integrated_automation')]
-                    ]),
-                    parse_mode='Markdown'
-                )
-            else:
-                await query.answer("❌ Интегрированная автоматизация недоступна")
-        # Bronevik handlers
-        elif query.data == 'bronevik_bookings':
-            await self.show_bronevik_bookings(query)
-        elif query.data == 'bronevik_statistics':
-            await self.show_bronevik_statistics(query)
-        elif query.data == 'bronevik_add_object':
-            await query.edit_message_text("➕ Добавление объекта на Bronevik (в разработке)")
-        elif query.data == 'bronevik_my_objects':
-            await query.edit_message_text("🏨 Мои объекты на Bronevik (в разработке)")
-        elif query.data == 'bronevik_logout':
-            await query.edit_message_text("🚪 Выход из Bronevik (в разработке)")
+        except Exception as e:
+            # В случае ошибки показываем стандартное меню
+            keyboard = [
+                [InlineKeyboardButton("🔐 Войти в аккаунт", callback_data='101hotels_login')],
+                [InlineKeyboardButton("➕ Создать новый отель", callback_data='101hotels_create_new')],
+                [InlineKeyboardButton("🔒 Закрыть браузер", callback_data='101hotels_close_browser')],
+                [InlineKeyboardButton("🔙 К платформам", callback_data='platforms')],
+                [InlineKeyboardButton("🏠 Главное меню", callback_data='back_to_main')]
+            ]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(
+                "🏨 **101 Hotels Extranet**\n\n"
+                f"⚠️ Ошибка при открытии страницы: {str(e)}\n\n"
+                "Выберите действие:\n"
+                "• **Войти в аккаунт** - для работы с существующими отелями\n"
+                "• **Создать новый отель** - для регистрации нового объекта",
+                reply_markup=reply_markup,
+                parse_mode='Markdown'
+            )
+    
+    async def ostrovok_add_object(self, query):
+        """Начать добавление объекта на Ostrovok"""
+        user_id = query.from_user.id
+        email = self.user_sessions.get(user_id, {}).get('ostrovok_email')
+        if not email:
+            await query.edit_message_text("❌ Необходимо войти в аккаунт")
+            return
+        ok, msg = await run_blocking(self.ostrovok_manager.click_add_object_button, kind='browser')
+        if ok:
+            # Показываем меню выбора типа объекта
+            keyboard = [
+                [InlineKeyboardButton("🏨 Объект с номерами", callback_data='ostrovok_object_with_rooms')],
+                [InlineKeyboardButton("🏠 Жильё целиком", callback_data='ostrovok_whole_apartment')]
+            ]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(
+                "Выберите тип объекта:",
+                reply_markup=reply_markup
+            )
+        else:
+            await query.edit_message_text(f"❌ {msg}")
+    
+    async def ostrovok_select_object_with_rooms(self, query):
+        """Выбран тип «объект с номерами»"""
+        ok, msg = await run_blocking(self.ostrovok_manager.click_next_on_object_with_rooms, kind='browser')
+        if ok:
+            await query.edit_message_text("✅ Выбран объект с номерами. Введите название объекта (например, Ромашка):")
+            return WAITING_OBJECT_NAME
+        else:
+            await query.edit_message_text(f"❌ {msg}")
+    
+    async def ostrovok_select_whole_apartment(self, query):
+        """Выбран тип «жильё целиком»"""
+        ok, msg = await run_blocking(self.ostrovok_manager.select_whole_apartment_and_next, kind='browser')
+        if ok:
+            await query.edit_message_text("✅ Выбрано жильё целиком. Введите название объекта (например, Ромашка):")
+            return WAITING_OBJECT_NAME
+        else:
+            await query.edit_message_text(f"❌ {msg}")
+    
+    async def show_ostrovok_my_objects(self, query):
+        """Список объектов Ostrovok"""
+        objects = await run_blocking(self.ostrovok_manager.get_my_objects, kind='browser')
+        if objects:
+            text = 'Ваши объекты:\n\n'
+            for i, obj in enumerate(objects, 1):
+                text += f"{i}. {obj['name']}\n   {obj['address']}\n   ID: {obj['id']}\n   Статус: {obj['status']}\n\n"
+            keyboard = [[InlineKeyboardButton('🔙 Назад', callback_data='ostrovok_back_to_menu')]]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(text, reply_markup=reply_markup)
+        else:
+            await query.edit_message_text("❌ Не удалось получить список объектов или объекты не найдены.")
+    
+    async def show_ostrovok_new_bookings_objects(self, query):
+        """Выбор объекта для просмотра новых бронирований Ostrovok"""
+        objects = await run_blocking(self.ostrovok_manager.get_my_objects, kind='browser')
+        if objects:
+            keyboard = []
+            for obj in objects:
+                keyboard.append([
+                    InlineKeyboardButton(f"{obj['name']} (ID: {obj['id']})", callback_data=f"ostrovok_bookings_for_{obj['id']}")
+                ])
+            keyboard.append([InlineKeyboardButton('🔙 Назад', callback_data='ostrovok_back_to_menu')])
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text("Выберите объект для просмотра новых бронирований:", reply_markup=reply_markup)
+        else:
+            await query.edit_message_text("❌ Не удалось получить список объектов или объекты не найдены.")
+    
+    async def show_ostrovok_bookings_for_object(self, query, object_id: str):
+        """Новые бронирования объекта Ostrovok"""
+        bookings = await run_blocking(self.ostrovok_manager.get_new_bookings_for_object, object_id, kind='browser')
+        if bookings:
+            text = f'Новые бронирования для объекта ID {object_id}:\n\n'
+            for i, booking in enumerate(bookings, 1):
+                text += f"{i}. {booking}\n"
+            keyboard = [[InlineKeyboardButton('🔙 Назад', callback_data='ostrovok_new_bookings')]]
+            reply_markup = InlineKeyboardMarkup(keyboard)
+            await query.edit_message_text(text, reply_markup=reply_markup)
+        else:
+            await query.edit_message_text(f"Нет новых бронирований для объекта ID {object_id} или не удалось получить данные.")
+
+    async def open_integrated_automation(self, update, context):
+        """Кнопка интегрированной автоматизации"""
+        query = update.callback_query
+        if not self.integrated_manager:
+            await query.answer("❌ Интегрированная автоматизация недоступна")
+            return
+        await self.start_integrated_automation(update, context)
+    
+    async def open_integrated_coordinates_test(self, update, context):
+        """Кнопка проверки координат интегрированной автоматизации"""
+        query = update.callback_query
+        if not self.integrated_manager:
+            await query.answer("❌ Интегрированная автоматизация недоступна")
+            return
+        await self.test_integrated_coordinates(query)
+    
+    async def run_integrated_coordinates_test(self, update, context, platform: str):
+        """Проверить координаты кнопок площадки"""
+        query = update.callback_query
+        if not self.integrated_manager:
+            await query.answer("❌ Интегрированная автоматизация недоступна")
+            return
+        await query.answer()
+        result = await run_blocking(self.integrated_manager.test_coordinates, platform, kind='browser')
+        await query.edit_message_text(
+            f"🧪 **Результат тестирования {platform.upper()}**\n\n{result}",
+            reply_markup=InlineKeyboardMarkup([
+                [InlineKeyboardButton("🔙 Назад", callback_data='integrated_automation')]
+            ]),
+            parse_mode='Markdown'
+        )
     
     async def show_platforms_menu(self, query):
         """Показать меню платформ"""
@@ -792,7 +774,7 @@ class HotelBot:
         elif update.callback_query:
             await update.callback_query.edit_message_text("🔄 Открываю сайт extranet.ostrovok.ru и форму входа...")
         try:
-            self.ostrovok_manager.open_login_page()
+            await run_blocking(self.ostrovok_manager.open_login_page, kind='browser')
             # После открытия формы входа спрашиваем email
             if update.message:
                 await update.message.reply_text("Введите ваш email для входа на Островок:")
@@ -812,7 +794,7 @@ class HotelBot:
         email = update.message.text
         context.user_data['ostrovok_email'] = email
         try:
-            self.ostrovok_manager.fill_email(email)
+            await run_blocking(self.ostrovok_manager.fill_email, email, kind='browser')
             # После ввода email спрашиваем пароль
             await update.message.reply_text("Введите ваш пароль:")
             return WAITING_PASSWORD
@@ -826,17 +808,17 @@ class HotelBot:
         password = update.message.text
         context.user_data['ostrovok_password'] = password
         try:
-            self.ostrovok_manager.fill_password(password)
-            self.ostrovok_manager.submit_login()
+            await run_blocking(self.ostrovok_manager.fill_password, password, kind='browser')
+            await run_blocking(self.ostrovok_manager.submit_login, kind='browser')
             # Проверяем, требуется ли 2FA
             try:
-                self.ostrovok_manager.wait_2fa_form()
+                await run_blocking(self.ostrovok_manager.wait_2fa_form, kind='browser')
                 await update.message.reply_text("Введите 4-значный код из письма/email (2FA):")
                 return WAITING_2FA
             except Exception:
                 # 2FA не требуется, сразу сохраняем cookies
                 email = context.user_data['ostrovok_email']
-                success = self.ostrovok_manager.check_login_success(email)
+                success = await run_blocking(self.ostrovok_manager.check_login_success, email, kind='browser')
                 if success:
                     await update.message.reply_text("Вход выполнен, cookies сохранены!")
                     await self.show_ostrovok_ad_menu(update.message)
@@ -855,8 +837,8 @@ class HotelBot:
         code = update.message.text.strip()
         email = context.user_data['ostrovok_email']
         try:
-            self.ostrovok_manager.fill_2fa_code(code)
-            success = self.ostrovok_manager.check_login_success(email)
+            await run_blocking(self.ostrovok_manager.fill_2fa_code, code, kind='browser')
+            success = await run_blocking(self.ostrovok_manager.check_login_success, email, kind='browser')
             if success:
                 await update.message.reply_text("Вход выполнен, cookies сохранены!")
                 await self.show_ostrovok_ad_menu(update.message)
@@ -870,7 +852,7 @@ class HotelBot:
 
     async def get_object_name(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         name = update.message.text.strip()
-        ok, msg = self.ostrovok_manager.fill_object_name(name)
+        ok, msg = await run_blocking(self.ostrovok_manager.fill_object_name, name, kind='browser')
         if ok:
             await update.message.reply_text(f"✅ Название '{name}' успешно введено!\nТеперь введите тип объекта (например, Отель, Хостел, Апарт-отель и т.д.):")
             context.user_data['object_name'] = name
@@ -881,7 +863,7 @@ class HotelBot:
 
     async def get_object_type(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         object_type = update.message.text.strip()
-        ok, msg = self.ostrovok_manager.select_object_type(object_type)
+        ok, msg = await run_blocking(self.ostrovok_manager.select_object_type, object_type, kind='browser')
         if ok:
             await update.message.reply_text(f"✅ Тип '{object_type}' успешно выбран!\nТеперь введите город (например, Санкт-Петербург):")
             context.user_data['object_type'] = object_type
@@ -892,7 +874,7 @@ class HotelBot:
 
     async def get_object_city(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         city = update.message.text.strip()
-        ok, msg = self.ostrovok_manager.select_object_city(city)
+        ok, msg = await run_blocking(self.ostrovok_manager.select_object_city, city, kind='browser')
         if ok:
             await update.message.reply_text(f"✅ Город '{city}' успешно выбран!\nТеперь введите улицу и дом (например, Невский проспект 1):")
             context.user_data['object_city'] = city
@@ -903,7 +885,7 @@ class HotelBot:
 
     async def get_object_address(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         address = update.message.text.strip()
-        ok, msg = self.ostrovok_manager.select_object_address(address)
+        ok, msg = await run_blocking(self.ostrovok_manager.select_object_address, address, kind='browser')
         if ok:
             # Сохраняем все данные формы
             context.user_data['object_address'] = address
@@ -916,7 +898,7 @@ class HotelBot:
             )
             await update.message.reply_text(summary)
             # Далее — регистрация объекта
-            ok_submit, msg_submit = self.ostrovok_manager.submit_object_form()
+            ok_submit, msg_submit = await run_blocking(self.ostrovok_manager.submit_object_form, kind='browser')
             if ok_submit:
                 await update.message.reply_text(f"✅ Адрес '{address}' успешно выбран!\nОбъект зарегистрирован!")
             else:
@@ -943,7 +925,7 @@ class HotelBot:
         await query.answer("🔄 Загружаем бронирования отеля...")
         
         # Получаем бронирования
-        success, result = self.ostrovok_manager.get_bookings()
+        success, result = await run_blocking(self.ostrovok_manager.get_bookings)
         
         if success:
             bookings = result
@@ -980,7 +962,7 @@ class HotelBot:
         await query.answer("🔄 Загружаем информацию об отеле...")
         
         # Получаем информацию об аккаунте
-        success, result = self.ostrovok_manager.get_account_info()
+        success, result = await run_blocking(self.ostrovok_manager.get_account_info)
         
         if success:
             account_info = result
@@ -1010,7 +992,7 @@ class HotelBot:
         await query.answer("🔄 Загружаем статистику отеля...")
         
         # Получаем статистику
-        success, result = self.ostrovok_manager.get_hotel_statistics()
+        success, result = await run_blocking(self.ostrovok_manager.get_hotel_statistics)
         
         if success:
             stats = result
@@ -1041,7 +1023,7 @@ class HotelBot:
         await query.answer("🔄 Загружаем информацию о номерах...")
         
         # Получаем информацию о номерах
-        success, result = self.ostrovok_manager.get_room_management()
+        success, result = await run_blocking(self.ostrovok_manager.get_room_management)
         
         if success:
             rooms = result
@@ -1076,7 +1058,7 @@ class HotelBot:
         await query.answer("🔄 Выполняется выход из аккаунта...")
         
         # Выполняем выход
-        success, message = self.ostrovok_manager.logout()
+        success, message = await run_blocking(self.ostrovok_manager.logout)
         
         if success:
             # Очищаем информацию о сессии
@@ -1203,7 +1185,7 @@ class HotelBot:
             latitude=lat,
             longitude=lon
         )
-        status, result = self.ostrovok_manager.create_hotel(hotel_data)
+        status, result = await run_blocking(self.ostrovok_manager.create_hotel, hotel_data)
         if status == 200:
             await update.message.reply_text(f"✅ Объявление создано!\nID: {result.get('id', 'неизвестно')}")
         else:
@@ -1211,45 +1193,42 @@ class HotelBot:
         await self.show_ostrovok_ad_menu(update.message)
         return ConversationHandler.END
 
+    async def cached_read(self, platform, user_id, name, fetch):
+        """
+        Чтение для экрана бота через общий кэш (см. response_cache)
+        Повторные нажатия «Обновить» в пределах TTL не обращаются к площадке
+        """
+        account = self.user_sessions.get(user_id, {}).get(f'{platform}_email')
+        return await self.response_cache.get(platform, account, name, fetch)
+
     async def geocode_address(self, address):
         """
-        Геокодинг адреса через API Ostrovok
+        Геокодинг адреса через API Ostrovok с fallback на Яндекс.Карты
+        Результат берется из общего кэша геокодинга, если адрес уже искали
         """
+        # Без бэкенда Ostrovok геокодим сразу через Яндекс.Карты
+        providers = []
+        ostrovok = self.backends.get('ostrovok') if self.backends.available('ostrovok') else None
+        if ostrovok is not None:
+            providers.append(('ostrovok', ostrovok.geocode_address_ostrovok))
         try:
-            # Используем метод из OstrovokManager
-            coords = self.ostrovok_manager.geocode_address_ostrovok(address)
+            coords = await get_geocoder().geocode_async(address, providers=providers)
             if coords:
                 lat, lon = coords
-                logger.info(f"Координаты получены через Ostrovok API: {lat}, {lon}")
+                logger.info(f"Координаты адреса {address}: {lat}, {lon}")
                 return lat, lon
-            else:
-                logger.warning(f"Не удалось получить координаты через Ostrovok API для адреса: {address}")
-                # Fallback на Яндекс.Карты если Ostrovok не сработал
-                return await self.geocode_address_yandex(address)
+            logger.warning(f"Не удалось получить координаты для адреса: {address}")
+            return None
         except Exception as e:
-            logger.error(f"Ошибка геокодинга через Ostrovok: {e}")
-            # Fallback на Яндекс.Карты
-            return await self.geocode_address_yandex(address)
+            logger.error(f"Ошибка геокодинга: {e}")
+            return None
     
     async def geocode_address_yandex(self, address):
         """
-        Fallback геокодинг через Яндекс.Карты
+        Геокодинг только через Яндекс.Карты (с общим кэшем)
         """
-        import requests
-        url = "https://geocode-maps.yandex.ru/1.x/"
-        params = {
-            'geocode': address,
-            'format': 'json',
-            'results': 1
-        }
         try:
-            resp = requests.get(url, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            pos = data['response']['GeoObjectCollection']['featureMember'][0]['GeoObject']['Point']['pos']
-            lon, lat = map(float, pos.split())
-            logger.info(f"Координаты получены через Яндекс.Карты: {lat}, {lon}")
-            return lat, lon
+            return await get_geocoder().geocode_async(address)
         except Exception as e:
             logger.error(f"Ошибка геокодинга через Яндекс.Карты: {e}")
             return None
@@ -1322,7 +1301,9 @@ class HotelBot:
         
         await query.answer("🔄 Загружаем бронирования...")
         
-        success, result = self.bnovo_manager.get_bookings()
+        success, result = await self.cached_read(
+            'bnovo', query.from_user.id, 'bookings', self.bnovo_manager.get_bookings_async
+        )
         if success and isinstance(result, list):
             if result:
                 text = f"📋 **Все бронирования** (последние 30 дней)\n\n"
@@ -1353,7 +1334,10 @@ class HotelBot:
         
         await query.answer("🔄 Загружаем новые бронирования...")
         
-        success, result = self.bnovo_manager.get_new_bookings(hours_back=24)
+        success, result = await self.cached_read(
+            'bnovo', query.from_user.id, 'new_bookings:24',
+            lambda: self.bnovo_manager.get_new_bookings_async(hours_back=24)
+        )
         if success and isinstance(result, list):
             if result:
                 text = f"🆕 **Новые бронирования** (за последние 24 часа)\n\n"
@@ -1373,6 +1357,12 @@ class HotelBot:
         
         await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='Markdown')
     
+    async def load_bnovo_statistics(self):
+        """Статистика Bnovo: по хранилищу синхронизации, без нее - выгрузкой бронирований"""
+        if self.booking_sync:
+            return await self.booking_sync.statistics(rooms=BNOVO_ROOMS)
+        return await run_blocking(self.bnovo_manager.get_statistics, rooms=BNOVO_ROOMS)
+    
     async def show_bnovo_statistics(self, query):
         """Показать статистику из Bnovo"""
         if not self.bnovo_manager:
@@ -1381,7 +1371,9 @@ class HotelBot:
         
         await query.answer("📊 Загружаем статистику...")
         
-        success, result = self.bnovo_manager.get_statistics()
+        success, result = await self.cached_read(
+            'bnovo', query.from_user.id, 'statistics', self.load_bnovo_statistics
+        )
         if success:
             text = self.bnovo_manager.format_statistics_message(result)
         else:
@@ -1460,7 +1452,9 @@ class HotelBot:
         
         await query.answer("🔄 Загружаем бронирования...")
         
-        success, result = self.hotels101_manager.get_bookings()
+        success, result = await self.cached_read(
+            '101hotels', user_id, 'bookings', lambda: run_blocking(self.hotels101_manager.get_bookings)
+        )
         
         if success:
             bookings = result
@@ -1495,7 +1489,9 @@ class HotelBot:
         
         await query.answer("📊 Загружаем статистику...")
         
-        success, result = self.hotels101_manager.get_statistics()
+        success, result = await self.cached_read(
+            '101hotels', user_id, 'statistics', lambda: run_blocking(self.hotels101_manager.get_statistics)
+        )
         
         if success:
             stats = result
@@ -1526,19 +1522,19 @@ class HotelBot:
         await query.answer("🔄 Открываем форму добавления отеля...")
         
         # Открываем страницу отелей
-        success = self.hotels101_manager.open_hotels_page()
+        success = await run_blocking(self.hotels101_manager.open_hotels_page, kind='browser')
         if not success:
             await query.edit_message_text("❌ Не удалось открыть страницу отелей")
             return
         
         # Нажимаем кнопку "Добавить отель"
-        success, msg = self.hotels101_manager.click_add_hotel_button()
+        success, msg = await run_blocking(self.hotels101_manager.click_add_hotel_button, kind='browser')
         if not success:
             await query.edit_message_text(f"❌ Не удалось найти кнопку добавления отеля: {msg}")
             return
         
         # Анализируем структуру страницы для отладки
-        success, debug_info = self.hotels101_manager.debug_page_structure()
+        success, debug_info = await run_blocking(self.hotels101_manager.debug_page_structure, kind='browser')
         if success:
             debug_text = f"📊 Отладочная информация:\nURL: {debug_info['url']}\nФорм: {debug_info['forms']}\nПолей ввода: {debug_info['inputs']}\nКнопок: {debug_info['buttons']}"
         else:
@@ -1564,14 +1560,17 @@ class HotelBot:
         
         await query.answer("🔄 Загружаем список отелей...")
         
-        # Сначала попробуем получить через API
-        success, result = self.hotels101_manager.get_my_hotels()
+        async def fetch_hotels():
+            # Сначала попробуем получить через API
+            success, result = await run_blocking(self.hotels101_manager.get_my_hotels)
+            if not success:
+                # Если API не работает, попробуем через Selenium
+                if await run_blocking(self.hotels101_manager.open_hotels_page, kind='browser'):
+                    return await run_blocking(self.hotels101_manager.get_my_hotels_from_page, kind='browser')
+                return False, result
+            return success, result
         
-        if not success:
-            # Если API не работает, попробуем через Selenium
-            success = self.hotels101_manager.open_hotels_page()
-            if success:
-                success, result = self.hotels101_manager.get_my_hotels_from_page()
+        success, result = await self.cached_read('101hotels', user_id, 'hotels', fetch_hotels)
         
         if success and result:
             hotels = result
@@ -1604,10 +1603,11 @@ class HotelBot:
         # Очищаем информацию о сессии
         if user_id in self.user_sessions:
             self.user_sessions[user_id]['101hotels_logged_in'] = False
-            self.user_sessions[user_id].pop('101hotels_email', None)
+            email = self.user_sessions[user_id].pop('101hotels_email', None)
+            self.response_cache.invalidate('101hotels', email)
         
         # Закрываем браузер
-        self.hotels101_manager.close_browser()
+        await run_blocking(self.hotels101_manager.close_browser, kind='browser')
         
         keyboard = [
             [InlineKeyboardButton("🔐 Войти в аккаунт", callback_data='101hotels_login')],
@@ -1627,7 +1627,7 @@ class HotelBot:
         await query.answer("🔄 Закрываем браузер...")
         
         # Закрываем браузер
-        success = self.hotels101_manager.close_browser()
+        success = await run_blocking(self.hotels101_manager.close_browser, kind='browser')
         
         if success:
             keyboard = [
@@ -1667,7 +1667,7 @@ class HotelBot:
         
         await query.answer("🔍 Анализируем структуру страницы...")
         
-        success, debug_info = self.hotels101_manager.debug_page_structure()
+        success, debug_info = await run_blocking(self.hotels101_manager.debug_page_structure, kind='browser')
         
         if success:
             text = "🔍 **Отладочная информация страницы 101 hotels:**\n\n"
@@ -1699,10 +1699,10 @@ class HotelBot:
         
         try:
             # Сначала получим отладочную информацию
-            debug_success, debug_info = self.hotels101_manager.debug_page_structure()
+            debug_success, debug_info = await run_blocking(self.hotels101_manager.debug_page_structure, kind='browser')
             
             # Получаем список доступных стран
-            success, countries = self.hotels101_manager.get_available_countries()
+            success, countries = await run_blocking(self.hotels101_manager.get_available_countries, kind='browser')
             
             if success and countries:
                 keyboard = []
@@ -1802,7 +1802,7 @@ class HotelBot:
         
         try:
             # Нажимаем кнопку "Далее" через Selenium
-            success, message = self.hotels101_manager.click_next_step()
+            success, message = await run_blocking(self.hotels101_manager.click_next_step, kind='browser')
             
             if success:
                 # После успешного нажатия "Продолжить" переключаемся на API
@@ -1814,7 +1814,7 @@ class HotelBot:
                 )
                 
                 # Получаем информацию о текущем шаге через API
-                step_success, step_info = self.hotels101_manager.get_registration_step_info()
+                step_success, step_info = await run_blocking(self.hotels101_manager.get_registration_step_info, kind='browser')
                 
                 if step_success:
                     keyboard = [
@@ -1900,7 +1900,7 @@ class HotelBot:
             country_name = country_names.get(country_id, f"Страна {country_id}")
             
             # Выбираем страну в форме
-            success, message = self.hotels101_manager.select_country(country_name)
+            success, message = await run_blocking(self.hotels101_manager.select_country, country_name, kind='browser')
             
             if success:
                 keyboard = [
@@ -1956,7 +1956,7 @@ class HotelBot:
         
         try:
             # Открываем страницу входа
-            self.hotels101_manager.open_login_page()
+            await run_blocking(self.hotels101_manager.open_login_page, kind='browser')
             
             keyboard = [
                 [InlineKeyboardButton("🔐 Ввести данные", callback_data='101hotels_enter_credentials')],
@@ -1989,12 +1989,12 @@ class HotelBot:
         
         try:
             # Открываем главную страницу extranet
-            dashboard_success = self.hotels101_manager.open_dashboard()
+            dashboard_success = await run_blocking(self.hotels101_manager.open_dashboard, kind='browser')
             if not dashboard_success:
                 raise Exception("Не удалось открыть главную страницу")
             
             # Нажимаем кнопку "Зарегистрировать свой объект"
-            register_success, register_message = self.hotels101_manager.click_register_new_object()
+            register_success, register_message = await run_blocking(self.hotels101_manager.click_register_new_object, kind='browser')
             
             if register_success:
                 keyboard = [
@@ -2056,7 +2056,7 @@ class HotelBot:
         
         try:
             # Вводим email в форму
-            self.hotels101_manager.fill_email(email)
+            await run_blocking(self.hotels101_manager.fill_email, email, kind='browser')
             
             await update.message.reply_text(
                 "✅ Email введен!\n\n"
@@ -2084,11 +2084,11 @@ class HotelBot:
         
         try:
             # Вводим пароль и выполняем вход
-            self.hotels101_manager.fill_password(password)
-            self.hotels101_manager.submit_login()
+            await run_blocking(self.hotels101_manager.fill_password, password, kind='browser')
+            await run_blocking(self.hotels101_manager.submit_login, kind='browser')
             
             # Проверяем успешность входа
-            success = self.hotels101_manager.check_login_success(email)
+            success = await run_blocking(self.hotels101_manager.check_login_success, email, kind='browser')
             
             if success:
                 # Сохраняем информацию о сессии
@@ -2201,7 +2201,9 @@ class HotelBot:
         
         await query.answer("🔄 Загружаем бронирования...")
         
-        success, result = self.bronevik_manager.get_bookings()
+        success, result = await self.cached_read(
+            'bronevik', user_id, 'bookings', lambda: run_blocking(self.bronevik_manager.get_bookings)
+        )
         
         if success:
             bookings = result
@@ -2236,7 +2238,9 @@ class HotelBot:
         
         await query.answer("📊 Загружаем статистику...")
         
-        success, result = self.bronevik_manager.get_statistics()
+        success, result = await self.cached_read(
+            'bronevik', user_id, 'statistics', lambda: run_blocking(self.bronevik_manager.get_statistics)
+        )
         
         if success:
             stats = result
@@ -2266,7 +2270,7 @@ class HotelBot:
         
         try:
             # Получаем поля формы для основной информации
-            fields_success, fields_data = self.hotels101_manager.get_registration_form_fields("basic_info")
+            fields_success, fields_data = await run_blocking(self.hotels101_manager.get_registration_form_fields, "basic_info", kind='browser')
             
             if fields_success:
                 keyboard = [
@@ -2325,7 +2329,7 @@ class HotelBot:
         
         try:
             # Получаем прогресс регистрации
-            progress_success, progress_data = self.hotels101_manager.get_registration_progress()
+            progress_success, progress_data = await run_blocking(self.hotels101_manager.get_registration_progress, kind='browser')
             
             if progress_success:
                 keyboard = [
@@ -2391,7 +2395,7 @@ class HotelBot:
         
         try:
             # Получаем поля формы
-            fields_success, fields_data = self.hotels101_manager.get_registration_form_fields()
+            fields_success, fields_data = await run_blocking(self.hotels101_manager.get_registration_form_fields, kind='browser')
             
             if fields_success:
                 keyboard = [
@@ -2551,7 +2555,7 @@ class HotelBot:
         
         try:
             # Отправляем данные через Selenium
-            success, message = self.hotels101_manager.submit_hotel_contact_info(contact_data)
+            success, message = await run_blocking(self.hotels101_manager.submit_hotel_contact_info, contact_data, kind='browser')
             
             if success:
                 keyboard = [
@@ -2789,7 +2793,7 @@ class HotelBot:
         platform = context.user_data.get('rpa_platform', '101hotels')
         
         # Выполняем RPA-вход
-        success = self.rpa_manager.login_platform(platform, email, password)
+        success = await run_blocking(self.rpa_manager.login_platform, platform, email, password, kind='browser')
         
         if success:
             keyboard = [
@@ -2851,7 +2855,7 @@ class HotelBot:
                 'price': '5000'
             }
             
-            success = self.rpa_manager.add_object_to_platform(platform, object_data)
+            success = await run_blocking(self.rpa_manager.add_object_to_platform, platform, object_data, kind='browser')
             
             if success:
                 keyboard = [
@@ -2884,7 +2888,7 @@ class HotelBot:
                 'country': 'Россия'
             }
             
-            success = self.rpa_manager.create_hotel_101hotels(hotel_data)
+            success = await run_blocking(self.rpa_manager.create_hotel_101hotels, hotel_data, kind='browser')
             
             if success:
                 keyboard = [
@@ -3336,11 +3340,11 @@ class HotelBot:
         context.user_data['integrated_platform'] = platform
         
         # Открываем браузер с платформой
-        success = self.integrated_manager.open_browser_with_platform(platform)
+        success = await run_blocking(self.integrated_manager.open_browser_with_platform, platform, kind='browser')
         
         if success:
             # Нажимаем кнопку входа
-            login_success = self.integrated_manager.click_login_button()
+            login_success = await run_blocking(self.integrated_manager.click_login_button, kind='browser')
             
             if login_success:
                 await query.edit_message_text(
@@ -3403,7 +3407,7 @@ class HotelBot:
         )
         
         # Выполняем первый шаг входа
-        success = self.integrated_manager.perform_login_step1(email, password)
+        success = await run_blocking(self.integrated_manager.perform_login_step1, email, password, kind='browser')
         
         if success:
             await update.message.reply_text(
@@ -3480,7 +3484,7 @@ class HotelBot:
         )
         
         # Выполняем второй шаг входа (2FA)
-        success = self.integrated_manager.perform_login_step2(code)
+        success = await run_blocking(self.integrated_manager.perform_login_step2, code, kind='browser')
         
         if success:
             # Сохраняем информацию о сессии
@@ -3555,7 +3559,7 @@ class HotelBot:
         )
         
         # Добавляем объект через интегрированный менеджер
-        success = self.integrated_manager.add_object(object_name, object_address)
+        success = await run_blocking(self.integrated_manager.add_object, object_name, object_address, kind='browser')
         
         if success:
             keyboard = [
@@ -4087,10 +4091,8 @@ class HotelBot:
         )
         return ConversationHandler.END
 
-    def run(self):
-        """Запуск бота"""
-        logger.info("Запуск бота...")
-        
+    def schedule_jobs(self):
+        """Фоновые задачи бота (уведомления Bnovo)"""
         # Запускаем уведомления Bnovo если они включены
         if self.bnovo_notifications_enabled:
             logger.info("Запуск уведомлений Bnovo PMS...")
@@ -4105,7 +4107,11 @@ class HotelBot:
                 logger.info("Уведомления Bnovo PMS запущены")
             else:
                 logger.warning("JobQueue недоступен. Уведомления Bnovo PMS отключены.")
-        
+
+    def run(self):
+        """Запуск бота (long polling; режим webhook - webhook.serve)"""
+        logger.info("Запуск бота...")
+        self.schedule_jobs()
         self.application.run_polling()
 
 if __name__ == "__main__":
@@ -4113,5 +4119,10 @@ if __name__ == "__main__":
         logger.error("Не указан токен бота! Создайте файл .env с BOT_TOKEN")
         exit(1)
     
-    bot = HotelBot(BOT_TOKEN)
-    bot.run() 
\ No newline at end of file
+    from webhook import webhook_enabled, serve
+    if webhook_enabled():
+        # Обновления принимает webhook, обрабатывают воркер-процессы со своими HotelBot
+        serve()
+    else:
+        bot = HotelBot(BOT_TOKEN)
+        bot.run() 
\ No newline at end of file
@@ -1,15 +1,14 @@
-import requests
 import os
 import json
 import uuid
 import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from browser_pool import get_browser_pool
+from http_transport import create_session
+from response_cache import invalidate_reads
+from geocoding import GeocodingUnavailable, geocode_with
 import time
 
 logger = logging.getLogger(__name__)
@@ -20,7 +19,8 @@ if not os.path.exists(SESSIONS_DIR):
 
 class BronevikManager:
     def __init__(self, email=None):
-        self.session = requests.Session()
+        # Своя сессия (cookies) на общем пуле соединений, с таймаутами и повторами
+        self.session = create_session('bronevik')
         self.email = email
         self.driver = None
         if email:
@@ -56,32 +56,15 @@ class BronevikManager:
 
     # --- Selenium login methods ---
     def setup_driver(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        try:
-            # Попробуем использовать ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            logger.info("Веб-драйвер успешно настроен через ChromeDriverManager")
-        except Exception as e:
-            logger.warning(f"Ошибка с ChromeDriverManager: {e}")
-            try:
-                # Попробуем запустить Chrome без service
-                self.driver = webdriver.Chrome(options=chrome_options)
-                logger.info("Веб-драйвер успешно настроен без service")
-            except Exception as e2:
-                logger.error(f"Ошибка запуска Chrome: {e2}")
-                raise Exception(f"Не удалось запустить Chrome. Убедитесь, что Chrome установлен. Ошибка: {e2}")
-        
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        # Браузер берется из общего пула прогретых экземпляров вместо холодного запуска Chrome
+        self.driver = get_browser_pool().acquire()
+        logger.info("Веб-драйвер получен из пула браузеров")
+
+    def release_driver(self):
+        """Вернуть браузер в пул"""
+        if self.driver:
+            get_browser_pool().release(self.driver)
+            self.driver = None
 
     def open_login_page(self):
         if not self.driver:
@@ -139,7 +122,7 @@ class BronevikManager:
         else:
             print("Ошибка входа.")
         if self.driver:
-            self.driver.quit()
+            self.release_driver()
 
     # --- Bronevik API Methods ---
     def search_address_on_bronevik(self, address: str):
@@ -149,14 +132,7 @@ class BronevikManager:
         try:
             # URL для поиска адресов на Bronevik
             url = "https://bronevik.com/api/geocoding/search"
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://bronevik.com",
-                "Referer": "https://bronevik.com/partner/hotels/add",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
-            }
+            headers = {"Referer": "https://bronevik.com/partner/hotels/add"}
             
             params = {
                 "query": address,
@@ -185,17 +161,23 @@ class BronevikManager:
 
     def geocode_address_bronevik(self, address: str):
         """
-        Геокодинг адреса через Bronevik API
+        Геокодинг адреса через Bronevik API с общим кэшем геокодинга
         Возвращает (lat, lng) или None
         """
+        return geocode_with('bronevik', self._geocode_address_bronevik, address)
+
+    def _geocode_address_bronevik(self, address: str):
+        """
+        Запрос координат к Bronevik API без кэша
+        Возвращает (lat, lng) или None; если API недоступен - GeocodingUnavailable
+        """
         logger.info(f"Геокодинг адреса через Bronevik: {address}")
         
         # Пробуем поиск
         success, results = self.search_address_on_bronevik(address)
         
         if not success:
-            logger.error(f"Не удалось выполнить поиск адреса: {results}")
-            return None
+            raise GeocodingUnavailable(f"Не удалось выполнить поиск адреса: {results}")
         
         if not results:
             logger.warning(f"Адрес не найден: {address}")
@@ -223,14 +205,7 @@ class BronevikManager:
         Создание отеля через API Bronevik
         """
         url = "https://secure.bronevik.com/ru/api/hotel/save.json.php"
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "Origin": "https://bronevik.com",
-            "Referer": "https://bronevik.com/partner/hotels/add",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
-        }
+        headers = {"Referer": "https://bronevik.com/partner/hotels/add"}
         
         # Добавляем idempotency_key если его нет
         if 'idempotency_key' not in hotel_data:
@@ -252,6 +227,7 @@ class BronevikManager:
             if response.status_code == 200:
                 result = response.json()
                 logger.info(f"Отель успешно создан: {result}")
+                invalidate_reads('bronevik', self.email)
                 return response.status_code, result
             else:
                 logger.error(f"Ошибка создания отеля: {response.status_code} - {response.text}")
@@ -289,12 +265,7 @@ class BronevikManager:
         """
         try:
             url = "https://bronevik.com/api/partner/bookings"
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://bronevik.com",
-                "Referer": "https://bronevik.com/partner/bookings"
-            }
+            headers = {"Referer": "https://bronevik.com/partner/bookings"}
             
             response = self.session.get(url, headers=headers)
             
@@ -317,12 +288,7 @@ class BronevikManager:
         """
         try:
             url = "https://bronevik.com/api/partner/statistics"
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://bronevik.com",
-                "Referer": "https://bronevik.com/partner/dashboard"
-            }
+            headers = {"Referer": "https://bronevik.com/partner/dashboard"}
             
             response = self.session.get(url, headers=headers)
             
@@ -344,14 +310,7 @@ class BronevikManager:
         """
         try:
             url = "https://secure.bronevik.com/ru/api/hotel/save.json.php"
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://bronevik.com",
-                "Referer": "https://bronevik.com/partner/hotels/add",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
-            }
+            headers = {"Referer": "https://bronevik.com/partner/hotels/add"}
             
             data = {
                 "id": hotel_id,
@@ -367,6 +326,7 @@ class BronevikManager:
             if response.status_code == 200:
                 result = response.json()
                 logger.info(f"Шаг отеля {hotel_id} обновлен на '{step}': {result}")
+                invalidate_reads('bronevik', self.email)
                 return True, result
             else:
                 logger.error(f"Ошибка обновления шага: {response.status_code} - {response.text}")
@@ -376,15 +336,40 @@ class BronevikManager:
             logger.error(f"Ошибка при обновлении шага отеля: {e}")
             return False, f"Ошибка соединения: {str(e)}"
 
+    def get_step_data(self, step, hotel_data):
+        """
+        Данные шага регистрации из данных отеля
+        """
+        if step == "category":
+            return {
+                "category": hotel_data.get("type", "hotel"),
+                "stars": hotel_data.get("stars", 3)
+            }
+        if step == "name":
+            return {
+                "name": hotel_data.get("name", ""),
+                "name_en": hotel_data.get("name_en", hotel_data.get("name", ""))
+            }
+        if step == "address":
+            return {
+                "address": hotel_data.get("address", ""),
+                "city": hotel_data.get("city", ""),
+                "region": hotel_data.get("region", ""),
+                "latitude": hotel_data.get("latitude", ""),
+                "longitude": hotel_data.get("longitude", "")
+            }
+        return None
+
     def register_hotel_step_by_step(self, hotel_data):
         """
         Пошаговая регистрация отеля на Bronevik
+        (для пакетного создания с сохранением прогресса см. listing_jobs.py)
         """
         logger.info("Начинаем пошаговую регистрацию отеля на Bronevik")
         
         # Шаг 1: Создание базового отеля
-        success, result = self.create_hotel(hotel_data)
-        if not success:
+        status, result = self.create_hotel(hotel_data)
+        if status != 200 or not isinstance(result, dict):
             return False, f"Ошибка создания отеля: {result}"
         
         hotel_id = result.get('hotelId') or result.get('id')
@@ -393,35 +378,11 @@ class BronevikManager:
         
         logger.info(f"Отель создан с ID: {hotel_id}")
         
-        # Шаг 2: Установка категории отеля
-        category_data = {
-            "category": hotel_data.get("type", "hotel"),
-            "stars": hotel_data.get("stars", 3)
-        }
-        success, result = self.update_hotel_step(hotel_id, "category", category_data)
-        if not success:
-            logger.warning(f"Ошибка установки категории: {result}")
-        
-        # Шаг 3: Установка названия
-        name_data = {
-            "name": hotel_data.get("name", ""),
-            "name_en": hotel_data.get("name_en", hotel_data.get("name", ""))
-        }
-        success, result = self.update_hotel_step(hotel_id, "name", name_data)
-        if not success:
-            logger.warning(f"Ошибка установки названия: {result}")
-        
-        # Шаг 4: Установка адреса
-        address_data = {
-            "address": hotel_data.get("address", ""),
-            "city": hotel_data.get("city", ""),
-            "region": hotel_data.get("region", ""),
-            "latitude": hotel_data.get("latitude", ""),
-            "longitude": hotel_data.get("longitude", "")
-        }
-        success, result = self.update_hotel_step(hotel_id, "address", address_data)
-        if not success:
-            logger.warning(f"Ошибка установки адреса: {result}")
+        # Шаги 2-4: категория, название, адрес
+        for step in ("category", "name", "address"):
+            success, result = self.update_hotel_step(hotel_id, step, self.get_step_data(step, hotel_data))
+            if not success:
+                logger.warning(f"Ошибка шага {step}: {result}")
         
         return True, {"hotel_id": hotel_id, "message": "Регистрация отеля завершена"}
 
@@ -446,14 +407,7 @@ class BronevikManager:
         """
         try:
             url = "https://secure.bronevik.com/ru/api/hotel/save.json.php"
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://bronevik.com",
-                "Referer": "https://bronevik.com/partner/hotels/add",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
-            }
+            headers = {"Referer": "https://bronevik.com/partner/hotels/add"}
             
             data = {
                 "hotelId": hotel_id
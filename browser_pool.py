@@ -0,0 +1,358 @@
+"""
+Пул браузеров Chrome (WebDriver)
+Держит прогретые экземпляры Chrome, выдает их в аренду, очищает cookies и хранилища
+между арендами и пересоздает браузер после K использований или при росте памяти.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+logger = logging.getLogger(__name__)
+
+# Настройки пула можно переопределить переменными окружения
+POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+MAX_BROWSERS = int(os.getenv('BROWSER_POOL_MAX', '4'))
+MAX_USES = int(os.getenv('BROWSER_POOL_MAX_USES', '20'))
+MAX_MEMORY_GROWTH_MB = float(os.getenv('BROWSER_POOL_MAX_MEMORY_GROWTH_MB', '300'))
+DEFAULT_HEADLESS = os.getenv('BROWSER_HEADLESS', '1').lower() not in ('0', 'false', 'no')
+
+# Дополнительные флаги для записи действий: запись работает на страницах с разных доменов
+RECORDER_CHROME_ARGS = ("--disable-web-security", "--allow-running-insecure-content")
+
+STEALTH_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+_chromedriver_lock = threading.Lock()
+_chromedriver_path: Optional[str] = None
+_chromedriver_resolved = False
+
+
+def get_chromedriver_path() -> Optional[str]:
+    """Путь к chromedriver; ChromeDriverManager().install() вызывается один раз на процесс"""
+    global _chromedriver_path, _chromedriver_resolved
+    with _chromedriver_lock:
+        if not _chromedriver_resolved:
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                _chromedriver_path = ChromeDriverManager().install()
+            except Exception as e:
+                logger.warning(f"Ошибка с ChromeDriverManager: {e}")
+                _chromedriver_path = None
+            _chromedriver_resolved = True
+        return _chromedriver_path
+
+
+def build_chrome_options(headless: bool, extra_args: Tuple[str, ...] = ()) -> Options:
+    """Общие настройки Chrome для всех менеджеров"""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-plugins")
+    for arg in extra_args:
+        chrome_options.add_argument(arg)
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    return chrome_options
+
+
+def create_chrome_driver(headless: bool, extra_args: Tuple[str, ...] = ()):
+    """Запустить новый Chrome"""
+    chrome_options = build_chrome_options(headless, extra_args)
+    driver_path = get_chromedriver_path()
+    try:
+        if driver_path:
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        else:
+            driver = webdriver.Chrome(options=chrome_options)
+    except Exception as e:
+        logger.error(f"Ошибка запуска Chrome: {e}")
+        raise Exception(f"Не удалось запустить Chrome. Убедитесь, что Chrome установлен. Ошибка: {e}")
+    driver.execute_script(STEALTH_SCRIPT)
+    return driver
+
+
+class PooledBrowser:
+    """Браузер из пула и его статистика"""
+
+    def __init__(self, driver, key: Tuple):
+        self.driver = driver
+        self.key = key
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.baseline_memory: Optional[float] = None
+
+    @property
+    def headless(self) -> bool:
+        return self.key[0]
+
+    def memory_mb(self) -> Optional[float]:
+        """Занятая JS-куча вкладки в МБ (Chrome performance.memory)"""
+        try:
+            used = self.driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : null"
+            )
+            return used / (1024 * 1024) if used else None
+        except Exception:
+            return None
+
+    def is_alive(self) -> bool:
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def reset(self):
+        """Очистить состояние предыдущей аренды: вкладки, cookies, кэш и хранилища"""
+        driver = self.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        try:
+            origin = driver.execute_script("return window.location.origin")
+            if origin and origin.startswith('http'):
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        except Exception:
+            # Не Chrome или CDP недоступен - чистим средствами WebDriver
+            driver.delete_all_cookies()
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        driver.get('about:blank')
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Ошибка при закрытии браузера: {e}")
+
+
+class BrowserPool:
+    """
+    Пул прогретых браузеров
+
+    Пример:
+        with get_browser_pool().lease() as driver:
+            driver.get("https://extranet.101hotels.com/login")
+    """
+
+    def __init__(self, size: int = POOL_SIZE, max_browsers: int = MAX_BROWSERS, max_uses: int = MAX_USES,
+                 max_memory_growth_mb: float = MAX_MEMORY_GROWTH_MB, headless: bool = DEFAULT_HEADLESS,
+                 driver_factory: Callable = create_chrome_driver):
+        self.size = size
+        self.max_browsers = max(max_browsers, size)
+        self.max_uses = max_uses
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.headless = headless
+        self.driver_factory = driver_factory
+
+        self._idle: Dict[Tuple, List[PooledBrowser]] = {}
+        self._leased: Dict[int, PooledBrowser] = {}
+        self._total = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.stats = {'created': 0, 'reused': 0, 'recycled': 0, 'failed_health_checks': 0, 'waits': 0}
+
+    def _key(self, headless: Optional[bool], extra_args: Tuple[str, ...]) -> Tuple:
+        return (self.headless if headless is None else headless, tuple(extra_args))
+
+    def _create(self, key: Tuple) -> PooledBrowser:
+        started = time.monotonic()
+        browser = PooledBrowser(self.driver_factory(key[0], key[1]), key)
+        browser.baseline_memory = browser.memory_mb()
+        self.stats['created'] += 1
+        logger.info(f"Запущен браузер для пула за {time.monotonic() - started:.1f}с (headless={key[0]})")
+        return browser
+
+    def warm_up(self, count: Optional[int] = None, headless: Optional[bool] = None,
+                extra_args: Tuple[str, ...] = ()):
+        """Заранее запустить браузеры, чтобы первая аренда не ждала холодного старта"""
+        key = self._key(headless, extra_args)
+        count = self.size if count is None else count
+        for _ in range(count):
+            with self._condition:
+                if self._closed or self._total >= self.max_browsers or len(self._idle.get(key, [])) >= count:
+                    return
+                self._total += 1
+            try:
+                browser = self._create(key)
+            except Exception as e:
+                with self._condition:
+                    self._total -= 1
+                    self._condition.notify()
+                logger.error(f"Не удалось прогреть браузер: {e}")
+                return
+            with self._condition:
+                self._idle.setdefault(key, []).append(browser)
+                self._condition.notify()
+
+    def warm_up_async(self, **kwargs) -> threading.Thread:
+        """Прогреть пул в фоновом потоке"""
+        thread = threading.Thread(target=self.warm_up, kwargs=kwargs, daemon=True, name='browser-pool-warmup')
+        thread.start()
+        return thread
+
+    def _evict_idle(self, keep_key: Tuple) -> Optional[PooledBrowser]:
+        """Освободить место: забрать простаивающий браузер с другими настройками"""
+        for key, browsers in self._idle.items():
+            if key != keep_key and browsers:
+                return browsers.pop(0)
+        return None
+
+    def acquire(self, headless: Optional[bool] = None, extra_args: Tuple[str, ...] = (),
+                timeout: Optional[float] = None):
+        """Взять браузер в аренду (ждет, если достигнут лимит одновременно запущенных)"""
+        key = self._key(headless, extra_args)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        while True:
+            browser = None
+            evicted = None
+            create = False
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Пул браузеров закрыт")
+                    idle = self._idle.get(key)
+                    if idle:
+                        browser = idle.pop()
+                        break
+                    if self._total < self.max_browsers:
+                        self._total += 1
+                        create = True
+                        break
+                    evicted = self._evict_idle(key)
+                    if evicted:
+                        create = True
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Нет свободных браузеров в пуле")
+                    self.stats['waits'] += 1
+                    self._condition.wait(remaining)
+
+            if evicted:
+                evicted.quit()
+                self.stats['recycled'] += 1
+
+            if create:
+                try:
+                    browser = self._create(key)
+                except Exception:
+                    with self._condition:
+                        self._total -= 1
+                        self._condition.notify()
+                    raise
+            elif not browser.is_alive():
+                self.stats['failed_health_checks'] += 1
+                logger.warning("Браузер из пула не отвечает - пересоздаем")
+                self._discard(browser)
+                continue
+            else:
+                self.stats['reused'] += 1
+
+            browser.uses += 1
+            with self._condition:
+                self._leased[id(browser.driver)] = browser
+            return browser.driver
+
+    def _needs_recycle(self, browser: PooledBrowser) -> bool:
+        if browser.uses >= self.max_uses:
+            return True
+        memory = browser.memory_mb()
+        if memory is not None and browser.baseline_memory is not None:
+            return memory - browser.baseline_memory > self.max_memory_growth_mb
+        return False
+
+    def _discard(self, browser: PooledBrowser):
+        browser.quit()
+        with self._condition:
+            self._total -= 1
+            self._condition.notify()
+
+    def release(self, driver):
+        """Вернуть браузер в пул (или закрыть, если пора пересоздать)"""
+        with self._condition:
+            browser = self._leased.pop(id(driver), None)
+        if browser is None:
+            # Драйвер создан не пулом
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        recycle = self._closed or self._needs_recycle(browser)
+        if not recycle:
+            try:
+                browser.reset()
+            except Exception as e:
+                logger.warning(f"Не удалось очистить браузер: {e}")
+                recycle = True
+
+        if recycle:
+            self.stats['recycled'] += 1
+            self._discard(browser)
+            return
+
+        with self._condition:
+            self._idle.setdefault(browser.key, []).append(browser)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, headless: Optional[bool] = None, extra_args: Tuple[str, ...] = (),
+              timeout: Optional[float] = None):
+        driver = self.acquire(headless=headless, extra_args=extra_args, timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def get_stats(self) -> Dict:
+        with self._condition:
+            return {
+                **self.stats,
+                'total': self._total,
+                'idle': sum(len(browsers) for browsers in self._idle.values()),
+                'leased': len(self._leased)
+            }
+
+    def shutdown(self):
+        """Закрыть все простаивающие браузеры; арендованные закроются при возврате"""
+        with self._condition:
+            self._closed = True
+            browsers = [b for idle in self._idle.values() for b in idle]
+            self._idle = {}
+            self._total -= len(browsers)
+            self._condition.notify_all()
+        for browser in browsers:
+            browser.quit()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Общий пул браузеров процесса"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.shutdown)
+        return _pool
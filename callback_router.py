@@ -0,0 +1,162 @@
+"""
+Маршрутизация нажатий inline-кнопок (callback_data) бота
+Точные значения ищутся в словаре за O(1), параметризованные (country_*, rpa_platform_*) -
+в префиксном дереве по самому длинному совпавшему префиксу. Маршруты регистрируют
+сами модули интеграций; по каждому маршруту собираются время выполнения и ошибки.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from executors import CallStats
+
+logger = logging.getLogger(__name__)
+
+# Обработчик точного маршрута: (update, context); префиксного: (update, context, суффикс)
+Handler = Callable[..., Awaitable[Any]]
+
+# Нажатия дольше этого (секунды) попадают в лог с именем маршрута
+SLOW_ROUTE_SECONDS = 2.0
+
+
+class Route:
+    __slots__ = ('name', 'handler', 'prefix', 'answer', 'stats')
+
+    def __init__(self, name: str, handler: Handler, prefix: bool, answer: bool):
+        self.name = name
+        self.handler = handler
+        self.prefix = prefix
+        self.answer = answer
+        self.stats = CallStats()
+
+
+class PrefixTrie:
+    """Префиксное дерево по символам: поиск самого длинного зарегистрированного префикса"""
+
+    __slots__ = ('_root',)
+
+    # Ключ узла, под которым хранится значение
+    _VALUE = ''
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def insert(self, prefix: str, value: Any):
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._VALUE] = value
+
+    def longest(self, text: str) -> Tuple[Optional[Any], int]:
+        """(значение, длина префикса) самого длинного префикса text или (None, 0)"""
+        node = self._root
+        found, length = node.get(self._VALUE), 0
+        for index, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._VALUE in node:
+                found, length = node[self._VALUE], index + 1
+        return found, length
+
+
+class CallbackRouter:
+    """
+    Таблица маршрутов callback_data
+
+    Пример:
+        router = CallbackRouter()
+        router.add('bnovo_bookings', lambda update, context: self.show_bnovo_bookings(update.callback_query))
+        router.add_prefix('101hotels_country_', self.on_country)   # (update, context, country_id)
+        handled = await router.dispatch(update, context)
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, Route] = {}
+        self._prefixes = PrefixTrie()
+        self._routes: List[Route] = []
+
+    def _register(self, route: Route):
+        self._routes.append(route)
+        logger.debug(f"Маршрут {route.name} зарегистрирован")
+
+    def add(self, data: str, handler: Handler, answer: bool = True):
+        """
+        Маршрут для точного значения callback_data
+
+        Args:
+            answer: Ответить на callback до вызова (False - обработчик отвечает сам)
+        """
+        if data in self._exact:
+            raise ValueError(f"Маршрут {data} уже зарегистрирован")
+        route = Route(data, handler, False, answer)
+        self._exact[data] = route
+        self._register(route)
+
+    def add_prefix(self, prefix: str, handler: Handler, answer: bool = True):
+        """Маршрут для callback_data, начинающихся с prefix; обработчик получает остаток строки"""
+        if not prefix:
+            raise ValueError("Пустой префикс маршрута")
+        route = Route(prefix + '*', handler, True, answer)
+        self._prefixes.insert(prefix, route)
+        self._register(route)
+
+    def resolve(self, data: Optional[str]) -> Tuple[Optional[Route], Optional[str]]:
+        """(маршрут, параметр) для callback_data; точное совпадение важнее префикса"""
+        if data is None:
+            return None, None
+        route = self._exact.get(data)
+        if route is not None:
+            return route, None
+        route, length = self._prefixes.longest(data)
+        if route is None:
+            return None, None
+        return route, data[length:]
+
+    async def dispatch(self, update, context) -> bool:
+        """
+        Выполнить обработчик нажатия
+
+        Returns:
+            bool: Найден ли маршрут
+        """
+        query = update.callback_query
+        route, param = self.resolve(query.data)
+        if route is None:
+            logger.warning(f"Нет обработчика для кнопки {query.data}")
+            await query.answer()
+            return False
+
+        if route.answer:
+            await query.answer()
+        stats = route.stats
+        stats.calls += 1
+        stats.in_flight += 1
+        started = time.perf_counter()
+        try:
+            if route.prefix:
+                await route.handler(update, context, param)
+            else:
+                await route.handler(update, context)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.in_flight -= 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            if elapsed > SLOW_ROUTE_SECONDS:
+                logger.info(f"Кнопка {query.data} (маршрут {route.name}) обработана за {elapsed:.1f}с")
+        return True
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __contains__(self, data: str) -> bool:
+        return self.resolve(data)[0] is not None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Метрики маршрутов, по которым были нажатия"""
+        return {route.name: route.stats.to_dict() for route in self._routes if route.stats.calls}
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from startup_profile import DUMMY_TOKEN, profiling_enabled
 
 # Загружаем переменные окружения из .env файла
 load_dotenv()
@@ -10,10 +11,15 @@ BOT_TOKEN = os.getenv('BOT_TOKEN')
 # Bnovo PMS API Key
 BNOVO_API_KEY = os.getenv('BNOVO_API_KEY')
 
+# Номерной фонд для загрузки и RevPAR в статистике Bnovo (0 - не считать)
+BNOVO_ROOMS = int(os.getenv('BNOVO_ROOMS', '0') or 0) or None
+
 # Другие настройки
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 
-# Проверка обязательных переменных
+# Проверка обязательных переменных (профилирование старта работает офлайн с фиктивным токеном)
+if not BOT_TOKEN and profiling_enabled():
+    BOT_TOKEN = DUMMY_TOKEN
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN не найден в переменных окружения")
 
@@ -1,70 +1,753 @@
+import asyncio
 import sqlite3
-from typing import Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Any, Callable, Dict, Iterable, List, Tuple
 
 DB_NAME = 'hotel_bot.db'
+# Сколько строк отправлять в один executemany при пакетной записи
+BATCH_SIZE = 1000
+
+# Миграции схемы: (версия, список SQL). Текущая версия хранится в PRAGMA user_version.
+# Первые версии используют IF NOT EXISTS, чтобы базы, созданные до появления миграций, догонялись без ошибок.
+MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (1, [
+        '''
+        CREATE TABLE IF NOT EXISTS account_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id TEXT NOT NULL,
+            session_data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS new_listings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            listing_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (2, [
+        '''
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id TEXT NOT NULL,
+            booking_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            modified_at TEXT,
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (account_id, booking_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS booking_sync_state (
+            account_id TEXT PRIMARY KEY,
+            last_booking_id TEXT,
+            last_modified_at TEXT,
+            last_sync_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (3, [
+        '''
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            user_id INTEGER PRIMARY KEY,
+            notifications_enabled INTEGER NOT NULL DEFAULT 1,
+            data TEXT NOT NULL DEFAULT '{}',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        # Частичный индекс: рассылка перебирает только подписанных пользователей
+        '''
+        CREATE INDEX IF NOT EXISTS idx_user_sessions_subscribed
+        ON user_sessions (user_id) WHERE notifications_enabled = 1
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_platform_logins (
+            user_id INTEGER NOT NULL,
+            platform TEXT NOT NULL,
+            logged_in INTEGER NOT NULL DEFAULT 0,
+            email TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, platform)
+        )
+        ''',
+    ]),
+    (4, [
+        # Последняя сессия аккаунта читается по индексу без сортировки всей таблицы
+        '''
+        CREATE INDEX IF NOT EXISTS idx_account_sessions_account
+        ON account_sessions (account_id, created_at DESC, id DESC)
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_new_listings_listing_id ON new_listings (listing_id)',
+    ]),
+    (5, [
+        # Каталог записей действий: метаданные без чтения JSON-файлов
+        '''
+        CREATE TABLE IF NOT EXISTS recordings (
+            path TEXT PRIMARY KEY,
+            recordings_dir TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            platform_key TEXT NOT NULL,
+            user_id TEXT,
+            name TEXT,
+            created_at TEXT NOT NULL DEFAULT '',
+            total_actions INTEGER NOT NULL DEFAULT 0,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_recordings_platform
+        ON recordings (recordings_dir, platform_key, created_at DESC)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_recordings_user
+        ON recordings (recordings_dir, user_id, created_at DESC)
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS recording_dirs (
+            recordings_dir TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL
+        )
+        ''',
+    ]),
+    (6, [
+        # Очередь создания объявлений: задание на отель и площадку, шаги регистрации сохраняются по мере выполнения
+        '''
+        CREATE TABLE IF NOT EXISTS listing_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT,
+            platform TEXT NOT NULL,
+            account_email TEXT,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_step TEXT,
+            error TEXT,
+            run_after REAL NOT NULL DEFAULT 0,
+            lease_until REAL,
+            worker TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_listing_jobs_claim
+        ON listing_jobs (platform, status, run_after)
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_listing_jobs_batch ON listing_jobs (batch_id)',
+        '''
+        CREATE TABLE IF NOT EXISTS listing_job_steps (
+            job_id INTEGER NOT NULL REFERENCES listing_jobs (id) ON DELETE CASCADE,
+            step TEXT NOT NULL,
+            result TEXT NOT NULL DEFAULT '{}',
+            finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (job_id, step)
+        )
+        ''',
+    ]),
+    (7, [
+        # Кэш геокодинга по нормализованному адресу; found = 0 - адрес не найден (отрицательный кэш)
+        '''
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            address_key TEXT PRIMARY KEY,
+            provider TEXT,
+            latitude REAL,
+            longitude REAL,
+            found INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (8, [
+        # Рабочий URL операции API площадки (шаблон из списка кандидатов) для каждого аккаунта
+        '''
+        CREATE TABLE IF NOT EXISTS api_endpoints (
+            platform TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            account TEXT NOT NULL DEFAULT '',
+            template TEXT NOT NULL,
+            failures INTEGER NOT NULL DEFAULT 0,
+            expires_at REAL NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (platform, operation, account)
+        )
+        ''',
+    ]),
+    (9, [
+        # Период запросов к Bnovo, бронирования которого уже есть в локальном хранилище
+        '''
+        CREATE TABLE IF NOT EXISTS booking_sync_coverage (
+            account_id TEXT PRIMARY KEY,
+            date_from TEXT NOT NULL,
+            date_to TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
 
 class Database:
-    def __init__(self, db_name: str = DB_NAME):
-        self.conn = sqlite3.connect(db_name, check_same_thread=False)
-        self.cursor = self.conn.cursor()
-        self._create_tables()
-
-    def _create_tables(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS account_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                account_id TEXT NOT NULL,
-                session_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS new_listings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                listing_id TEXT NOT NULL,
-                data TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        self.conn.commit()
+    """
+    Хранилище SQLite: WAL, отдельное соединение на каждый поток, пакетная запись и миграции схемы
+
+    Запись идет в явных транзакциях (BEGIN IMMEDIATE); несколько операций можно
+    объединить в одну транзакцию через `with db.transaction():`.
+    """
+
+    def __init__(self, db_name: str = DB_NAME, pool_size: int = 4, busy_timeout: float = 30.0):
+        self.db_name = db_name
+        self.busy_timeout = busy_timeout
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # База в памяти видна только своему соединению - все потоки делят одно соединение под блокировкой
+        self._shared_conn = self._connect() if db_name == ':memory:' else None
+        self._write_lock = threading.RLock()
+        self._migrate()
+
+    # --- Соединения ---
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_name, timeout=self.busy_timeout,
+            check_same_thread=False, isolation_level=None
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        # В режиме WAL fsync на каждый коммит не нужен для целостности базы
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Соединение текущего потока"""
+        if self._shared_conn is not None:
+            return self._shared_conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        return self.conn.cursor()
+
+    def _fetchone(self, sql: str, params: Tuple = ()) -> Optional[Any]:
+        return self.conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: Tuple = ()) -> List[Any]:
+        return self.conn.execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Транзакция записи; вложенные вызовы присоединяются к внешней транзакции
+
+        Пример:
+            with db.transaction():
+                db.add_new_listing(...)
+                db.update_listing_status(...)
+        """
+        depth = getattr(self._local, 'depth', 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield self.conn
+            finally:
+                self._local.depth = depth
+            return
+
+        lock = self._write_lock if self._shared_conn is not None else None
+        if lock:
+            lock.acquire()
+        conn = self.conn
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            self._local.depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            else:
+                conn.execute('COMMIT')
+            finally:
+                self._local.depth = 0
+        finally:
+            if lock:
+                lock.release()
+
+    def _migrate(self):
+        version = self._fetchone('PRAGMA user_version')[0]
+        for target, statements in MIGRATIONS:
+            if target <= version:
+                continue
+            with self.transaction() as conn:
+                for sql in statements:
+                    conn.execute(sql)
+                conn.execute(f'PRAGMA user_version = {target}')
+            version = target
+
+    @property
+    def schema_version(self) -> int:
+        return self._fetchone('PRAGMA user_version')[0]
+
+    async def run_async(self, func: Callable, *args, **kwargs):
+        """
+        Выполнить метод базы из asyncio, не блокируя event loop
+
+        Пример:
+            row = await db.run_async(db.get_new_listing, listing_id)
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='db')
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
 
     # --- Account Sessions ---
     def add_account_session(self, account_id: str, session_data: str):
-        self.cursor.execute(
-            'INSERT INTO account_sessions (account_id, session_data) VALUES (?, ?)',
-            (account_id, session_data)
-        )
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT INTO account_sessions (account_id, session_data) VALUES (?, ?)',
+                (account_id, session_data)
+            )
 
     def get_account_session(self, account_id: str) -> Optional[Any]:
-        self.cursor.execute(
-            'SELECT * FROM account_sessions WHERE account_id = ? ORDER BY created_at DESC LIMIT 1',
+        return self._fetchone(
+            'SELECT * FROM account_sessions WHERE account_id = ? ORDER BY created_at DESC, id DESC LIMIT 1',
             (account_id,)
         )
-        return self.cursor.fetchone()
 
     # --- New Listings ---
     def add_new_listing(self, listing_id: str, data: str, status: str = 'pending'):
-        self.cursor.execute(
-            'INSERT INTO new_listings (listing_id, data, status) VALUES (?, ?, ?)',
-            (listing_id, data, status)
-        )
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT INTO new_listings (listing_id, data, status) VALUES (?, ?, ?)',
+                (listing_id, data, status)
+            )
+
+    def bulk_add_listings(self, listings: Iterable[Tuple[str, str, str]], batch_size: int = BATCH_SIZE) -> int:
+        """listings: (listing_id, data, status); все строки пишутся одной транзакцией"""
+        count = 0
+        batch = []
+        with self.transaction() as conn:
+            for listing in listings:
+                batch.append(listing)
+                if len(batch) >= batch_size:
+                    conn.executemany('INSERT INTO new_listings (listing_id, data, status) VALUES (?, ?, ?)', batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany('INSERT INTO new_listings (listing_id, data, status) VALUES (?, ?, ?)', batch)
+                count += len(batch)
+        return count
 
     def get_new_listing(self, listing_id: str) -> Optional[Any]:
-        self.cursor.execute(
-            'SELECT * FROM new_listings WHERE listing_id = ?',
-            (listing_id,)
-        )
-        return self.cursor.fetchone()
+        return self._fetchone('SELECT * FROM new_listings WHERE listing_id = ?', (listing_id,))
 
     def update_listing_status(self, listing_id: str, status: str):
-        self.cursor.execute(
-            'UPDATE new_listings SET status = ? WHERE listing_id = ?',
-            (status, listing_id)
+        with self.transaction() as conn:
+            conn.execute('UPDATE new_listings SET status = ? WHERE listing_id = ?', (status, listing_id))
+
+    # --- Bookings ---
+    def get_booking_fingerprints(self, account_id: str, booking_ids: List[str]) -> Dict[str, str]:
+        fingerprints = {}
+        # SQLite ограничивает число параметров запроса, поэтому идем пачками
+        for start in range(0, len(booking_ids), 500):
+            chunk = booking_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            fingerprints.update(self._fetchall(
+                f'SELECT booking_id, fingerprint FROM bookings WHERE account_id = ? AND booking_id IN ({placeholders})',
+                (account_id, *chunk)
+            ))
+        return fingerprints
+
+    def upsert_bookings(self, account_id: str, bookings: List[Tuple[str, str, str, Optional[str]]]):
+        """bookings: список (booking_id, data, fingerprint, modified_at)"""
+        with self.transaction() as conn:
+            conn.executemany(
+                '''
+                INSERT INTO bookings (account_id, booking_id, data, fingerprint, modified_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (account_id, booking_id) DO UPDATE SET
+                    data = excluded.data,
+                    fingerprint = excluded.fingerprint,
+                    modified_at = excluded.modified_at,
+                    updated_at = CURRENT_TIMESTAMP
+                ''',
+                [(account_id, *booking) for booking in bookings]
+            )
+
+    def get_booking(self, account_id: str, booking_id: str) -> Optional[Any]:
+        return self._fetchone(
+            'SELECT * FROM bookings WHERE account_id = ? AND booking_id = ?',
+            (account_id, booking_id)
+        )
+
+    def get_bookings_data(self, account_id: str) -> List[str]:
+        """JSON всех сохраненных бронирований аккаунта"""
+        return [row[0] for row in self._fetchall(
+            'SELECT data FROM bookings WHERE account_id = ? ORDER BY booking_id', (account_id,)
+        )]
+
+    def get_sync_state(self, account_id: str) -> Optional[Any]:
+        return self._fetchone(
+            'SELECT last_booking_id, last_modified_at, last_sync_at FROM booking_sync_state WHERE account_id = ?',
+            (account_id,)
+        )
+
+    def get_sync_coverage(self, account_id: str) -> Optional[Any]:
+        return self._fetchone(
+            'SELECT date_from, date_to FROM booking_sync_coverage WHERE account_id = ?', (account_id,)
         )
-        self.conn.commit()
+
+    def update_sync_coverage(self, account_id: str, date_from: str, date_to: str):
+        with self.transaction() as conn:
+            conn.execute(
+                '''
+                INSERT INTO booking_sync_coverage (account_id, date_from, date_to, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (account_id) DO UPDATE SET
+                    date_from = excluded.date_from,
+                    date_to = excluded.date_to,
+                    updated_at = CURRENT_TIMESTAMP
+                ''',
+                (account_id, date_from, date_to)
+            )
+
+    def update_sync_state(self, account_id: str, last_booking_id: Optional[str], last_modified_at: Optional[str]):
+        with self.transaction() as conn:
+            conn.execute(
+                '''
+                INSERT INTO booking_sync_state (account_id, last_booking_id, last_modified_at, last_sync_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (account_id) DO UPDATE SET
+                    last_booking_id = excluded.last_booking_id,
+                    last_modified_at = excluded.last_modified_at,
+                    last_sync_at = CURRENT_TIMESTAMP
+                ''',
+                (account_id, last_booking_id, last_modified_at)
+            )
+
+    # --- User Sessions ---
+    def get_user_session(self, user_id: int) -> Optional[Tuple[Any, List[Any]]]:
+        row = self._fetchone(
+            'SELECT notifications_enabled, data FROM user_sessions WHERE user_id = ?',
+            (user_id,)
+        )
+        if row is None:
+            return None
+        return row, self._fetchall(
+            'SELECT platform, logged_in, email FROM user_platform_logins WHERE user_id = ?',
+            (user_id,)
+        )
+
+    def save_user_session(self, user_id: int, notifications_enabled: bool, data: str,
+                          platform_logins: List[Tuple[str, bool, Optional[str]]]):
+        with self.transaction() as conn:
+            conn.execute(
+                '''
+                INSERT INTO user_sessions (user_id, notifications_enabled, data, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    notifications_enabled = excluded.notifications_enabled,
+                    data = excluded.data,
+                    updated_at = CURRENT_TIMESTAMP
+                ''',
+                (user_id, int(notifications_enabled), data)
+            )
+            conn.execute('DELETE FROM user_platform_logins WHERE user_id = ?', (user_id,))
+            conn.executemany(
+                'INSERT INTO user_platform_logins (user_id, platform, logged_in, email) VALUES (?, ?, ?, ?)',
+                [(user_id, platform, int(logged_in), email) for platform, logged_in, email in platform_logins]
+            )
+
+    def delete_user_session(self, user_id: int):
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM user_platform_logins WHERE user_id = ?', (user_id,))
+            conn.execute('DELETE FROM user_sessions WHERE user_id = ?', (user_id,))
+
+    def has_user_session(self, user_id: int) -> bool:
+        return self._fetchone('SELECT 1 FROM user_sessions WHERE user_id = ?', (user_id,)) is not None
+
+    def get_user_session_ids(self) -> List[int]:
+        return [row[0] for row in self._fetchall('SELECT user_id FROM user_sessions')]
+
+    def get_subscribed_user_ids(self) -> List[int]:
+        return [row[0] for row in self._fetchall('SELECT user_id FROM user_sessions WHERE notifications_enabled = 1')]
+
+    # --- Recordings Catalog ---
+    def get_recording_files(self, recordings_dir: str) -> Dict[str, Tuple[int, int]]:
+        """filename -> (mtime_ns, size) для проиндексированных записей каталога"""
+        return {
+            filename: (mtime_ns, size) for filename, mtime_ns, size in self._fetchall(
+                'SELECT filename, mtime_ns, size FROM recordings WHERE recordings_dir = ?',
+                (recordings_dir,)
+            )
+        }
+
+    def upsert_recordings(self, rows: List[Tuple]):
+        """rows: (path, recordings_dir, filename, platform, user_id, name, created_at, total_actions, mtime_ns, size)"""
+        with self.transaction() as conn:
+            conn.executemany(
+                '''
+                INSERT INTO recordings (path, recordings_dir, filename, platform, platform_key, user_id,
+                                        name, created_at, total_actions, mtime_ns, size)
+                VALUES (?, ?, ?, ?, lower(?), ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    platform = excluded.platform,
+                    platform_key = excluded.platform_key,
+                    user_id = excluded.user_id,
+                    name = excluded.name,
+                    created_at = excluded.created_at,
+                    total_actions = excluded.total_actions,
+                    mtime_ns = excluded.mtime_ns,
+                    size = excluded.size
+                ''',
+                [(path, directory, filename, platform, platform, *rest)
+                 for path, directory, filename, platform, *rest in rows]
+            )
+
+    def delete_recordings(self, paths: List[str]):
+        with self.transaction() as conn:
+            conn.executemany('DELETE FROM recordings WHERE path = ?', [(path,) for path in paths])
+
+    def list_recordings(self, recordings_dir: str, platform: Optional[str] = None,
+                        user_id: Optional[str] = None) -> List[Any]:
+        """Записи каталога от новых к старым; записи без владельца видны всем пользователям"""
+        sql = ('SELECT path, filename, platform, user_id, name, created_at, total_actions '
+               'FROM recordings WHERE recordings_dir = ?')
+        params: List[Any] = [recordings_dir]
+        if platform is not None:
+            sql += ' AND platform_key = lower(?)'
+            params.append(platform)
+        if user_id is not None:
+            sql += ' AND (user_id = ? OR user_id IS NULL)'
+            params.append(user_id)
+        sql += ' ORDER BY created_at DESC'
+        return self._fetchall(sql, tuple(params))
+
+    def get_recording_dir_mtime(self, recordings_dir: str) -> Optional[int]:
+        row = self._fetchone('SELECT mtime_ns FROM recording_dirs WHERE recordings_dir = ?', (recordings_dir,))
+        return row[0] if row else None
+
+    def set_recording_dir_mtime(self, recordings_dir: str, mtime_ns: int):
+        with self.transaction() as conn:
+            conn.execute(
+                '''
+                INSERT INTO recording_dirs (recordings_dir, mtime_ns) VALUES (?, ?)
+                ON CONFLICT (recordings_dir) DO UPDATE SET mtime_ns = excluded.mtime_ns
+                ''',
+                (recordings_dir, mtime_ns)
+            )
+
+    # --- Listing Jobs ---
+    def add_listing_jobs(self, jobs: Iterable[Tuple[Optional[str], str, Optional[str], str]]) -> List[int]:
+        """jobs: (batch_id, platform, account_email, payload); возвращает id заданий"""
+        ids = []
+        with self.transaction() as conn:
+            for job in jobs:
+                ids.append(conn.execute(
+                    'INSERT INTO listing_jobs (batch_id, platform, account_email, payload) VALUES (?, ?, ?, ?)',
+                    job
+                ).lastrowid)
+        return ids
+
+    def claim_listing_job(self, platforms: List[str], worker: str, now: float,
+                          lease_seconds: float) -> Optional[Any]:
+        """
+        Взять следующее задание для одной из площадок
+
+        Кроме новых заданий берутся и «зависшие»: running с истекшей арендой (воркер упал).
+        """
+        if not platforms:
+            return None
+        placeholders = ', '.join('?' for _ in platforms)
+        with self.transaction() as conn:
+            row = conn.execute(
+                f'''
+                SELECT id, platform, account_email, payload, state, attempts FROM listing_jobs
+                WHERE platform IN ({placeholders})
+                  AND ((status = 'pending' AND run_after <= ?) OR (status = 'running' AND lease_until < ?))
+                ORDER BY id LIMIT 1
+                ''',
+                (*platforms, now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                '''
+                UPDATE listing_jobs SET status = 'running', worker = ?, lease_until = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                ''',
+                (worker, now + lease_seconds, row[0])
+            )
+        return row
+
+    def get_listing_job_steps(self, job_id: int) -> List[Any]:
+        return self._fetchall(
+            'SELECT step, result FROM listing_job_steps WHERE job_id = ? ORDER BY finished_at, rowid', (job_id,)
+        )
+
+    def checkpoint_listing_step(self, job_id: int, step: str, result: str, state: str, lease_until: float):
+        """Отметить шаг выполненным и продлить аренду задания (одной транзакцией)"""
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO listing_job_steps (job_id, step, result) VALUES (?, ?, ?)',
+                (job_id, step, result)
+            )
+            conn.execute(
+                '''
+                UPDATE listing_jobs SET state = ?, last_step = ?, lease_until = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                ''',
+                (state, step, lease_until, job_id)
+            )
+
+    def finish_listing_job(self, job_id: int, status: str, error: Optional[str] = None,
+                           run_after: float = 0, attempt_failed: bool = False):
+        """Завершить попытку: done, failed или pending (повтор после run_after)"""
+        with self.transaction() as conn:
+            conn.execute(
+                '''
+                UPDATE listing_jobs
+                SET status = ?, error = ?, run_after = ?, attempts = attempts + ?, lease_until = NULL,
+                    worker = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                ''',
+                (status, error, run_after, int(attempt_failed), job_id)
+            )
+
+    def get_listing_job(self, job_id: int) -> Optional[Any]:
+        return self._fetchone(
+            '''
+            SELECT id, batch_id, platform, account_email, payload, state, status, attempts, last_step, error,
+                   created_at, updated_at
+            FROM listing_jobs WHERE id = ?
+            ''',
+            (job_id,)
+        )
+
+    def list_listing_jobs(self, batch_id: Optional[str] = None, status: Optional[str] = None,
+                          limit: int = 100) -> List[Any]:
+        sql = 'SELECT id, batch_id, platform, status, attempts, last_step, error FROM listing_jobs WHERE 1 = 1'
+        params: List[Any] = []
+        if batch_id is not None:
+            sql += ' AND batch_id = ?'
+            params.append(batch_id)
+        if status is not None:
+            sql += ' AND status = ?'
+            params.append(status)
+        sql += ' ORDER BY id LIMIT ?'
+        params.append(limit)
+        return self._fetchall(sql, tuple(params))
+
+    def count_listing_jobs(self, batch_id: Optional[str] = None) -> Dict[str, int]:
+        if batch_id is None:
+            rows = self._fetchall('SELECT status, COUNT(*) FROM listing_jobs GROUP BY status')
+        else:
+            rows = self._fetchall(
+                'SELECT status, COUNT(*) FROM listing_jobs WHERE batch_id = ? GROUP BY status', (batch_id,)
+            )
+        return dict(rows)
+
+    # --- Geocode Cache ---
+    def get_geocode(self, address_key: str, now: float) -> Optional[Any]:
+        """(provider, latitude, longitude, found, expires_at) непросроченной записи"""
+        return self._fetchone(
+            'SELECT provider, latitude, longitude, found, expires_at FROM geocode_cache '
+            'WHERE address_key = ? AND expires_at > ?',
+            (address_key, now)
+        )
+
+    def save_geocode(self, address_key: str, provider: Optional[str], latitude: Optional[float],
+                     longitude: Optional[float], found: bool, expires_at: float):
+        with self.transaction() as conn:
+            conn.execute(
+                '''
+                INSERT INTO geocode_cache (address_key, provider, latitude, longitude, found, expires_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (address_key) DO UPDATE SET
+                    provider = excluded.provider,
+                    latitude = excluded.latitude,
+                    longitude = excluded.longitude,
+                    found = excluded.found,
+                    expires_at = excluded.expires_at,
+                    updated_at = CURRENT_TIMESTAMP
+                ''',
+                (address_key, provider, latitude, longitude, int(found), expires_at)
+            )
+
+    def purge_geocode_cache(self, now: float) -> int:
+        with self.transaction() as conn:
+            return conn.execute('DELETE FROM geocode_cache WHERE expires_at <= ?', (now,)).rowcount
+
+    # --- API Endpoints ---
+    def get_api_endpoint(self, platform: str, operation: str, account: str, now: float) -> Optional[Any]:
+        """(template, failures, expires_at) непросроченной записи"""
+        return self._fetchone(
+            'SELECT template, failures, expires_at FROM api_endpoints '
+            'WHERE platform = ? AND operation = ? AND account = ? AND expires_at > ?',
+            (platform, operation, account, now)
+        )
+
+    def save_api_endpoint(self, platform: str, operation: str, account: str, template: str,
+                          failures: int, expires_at: float):
+        with self.transaction() as conn:
+            conn.execute(
+                '''
+                INSERT INTO api_endpoints (platform, operation, account, template, failures, expires_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (platform, operation, account) DO UPDATE SET
+                    template = excluded.template,
+                    failures = excluded.failures,
+                    expires_at = excluded.expires_at,
+                    updated_at = CURRENT_TIMESTAMP
+                ''',
+                (platform, operation, account, template, failures, expires_at)
+            )
+
+    def delete_api_endpoint(self, platform: str, operation: str, account: str):
+        with self.transaction() as conn:
+            conn.execute(
+                'DELETE FROM api_endpoints WHERE platform = ? AND operation = ? AND account = ?',
+                (platform, operation, account)
+            )
+
+    def list_api_endpoints(self, platform: Optional[str] = None) -> List[Any]:
+        sql = ('SELECT platform, operation, account, template, failures, expires_at, updated_at '
+               'FROM api_endpoints')
+        params: Tuple = ()
+        if platform:
+            sql += ' WHERE platform = ?'
+            params = (platform,)
+        return self._fetchall(sql + ' ORDER BY platform, operation, account', params)
 
     def close(self):
-        self.conn.close() 
\ No newline at end of file
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+        self._shared_conn = None
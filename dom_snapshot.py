@@ -0,0 +1,142 @@
+"""
+Снимок интерактивных элементов страницы за один запрос к браузеру
+Поля ввода, кнопки, ссылки и списки вместе с видимостью, атрибутами, вариантами выбора
+и XPath собирает один внедренный скрипт; результат приходит компактными строками
+и разворачивается в привычные словари элементов page_state.
+В режиме diff повторный снимок того же URL содержит только изменившиеся элементы.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Порядок полей в строке, которую возвращает скрипт
+SNAPSHOT_FIELDS = ('type', 'tagName', 'id', 'name', 'className', 'type_attr', 'value',
+                   'placeholder', 'text', 'href', 'options', 'xpath')
+
+# Поля элемента каждого типа (как в прежнем record_current_page_state)
+ELEMENT_FIELDS = {
+    'input': ('type', 'tagName', 'id', 'name', 'className', 'type_attr', 'value', 'placeholder', 'xpath'),
+    'button': ('type', 'tagName', 'id', 'name', 'className', 'text', 'xpath'),
+    'link': ('type', 'tagName', 'id', 'className', 'text', 'href', 'xpath'),
+    'select': ('type', 'tagName', 'id', 'name', 'className', 'options', 'xpath'),
+}
+
+SNAPSHOT_JS = """
+const groups = [['input', 'input'], ['button', 'button'], ['link', 'a'], ['select', 'select']];
+
+function visible(el) {
+    if (typeof el.checkVisibility === 'function') {
+        return el.checkVisibility({checkOpacity: false, checkVisibilityCSS: true});
+    }
+    const style = window.getComputedStyle(el);
+    return style.display !== 'none' && style.visibility !== 'hidden' && el.getClientRects().length > 0;
+}
+
+function xpath(el, tag, className) {
+    if (el.id) {
+        return "//*[@id='" + el.id + "']";
+    }
+    const first = className.trim().split(/\\s+/)[0];
+    return first ? '//' + tag + "[contains(@class, '" + first + "')]" : '//' + tag;
+}
+
+const rows = [];
+for (const [type, tag] of groups) {
+    for (const el of document.getElementsByTagName(tag)) {
+        if (!visible(el)) {
+            continue;
+        }
+        const className = el.getAttribute('class') || '';
+        const text = type === 'button' || type === 'link' ? (el.innerText || '').trim() : '';
+        const options = type === 'select'
+            ? Array.from(el.options, (o) => [o.getAttribute('value') || '', (o.text || '').trim()])
+            : null;
+        rows.push([
+            type, tag, el.id || '', el.getAttribute('name') || '', className,
+            type === 'input' ? (el.getAttribute('type') || '') : '',
+            type === 'input' ? (el.value || '') : '',
+            el.getAttribute('placeholder') || '',
+            text,
+            type === 'link' ? (el.href || '') : '',
+            options,
+            xpath(el, tag, className)
+        ]);
+    }
+}
+return {url: window.location.href, title: document.title, rows: rows};
+"""
+
+
+def expand_rows(rows: List[List[Any]]) -> List[Dict[str, Any]]:
+    """Развернуть компактные строки скрипта в словари элементов"""
+    elements = []
+    for row in rows:
+        values = dict(zip(SNAPSHOT_FIELDS, row))
+        element = {field: values[field] for field in ELEMENT_FIELDS[values['type']]}
+        if 'options' in element:
+            element['options'] = [{'value': value, 'text': text} for value, text in element['options'] or []]
+        elements.append(element)
+    return elements
+
+
+def element_keys(elements: List[Dict[str, Any]]) -> List[Tuple]:
+    """Ключи элементов: тип, XPath и порядковый номер среди элементов с тем же XPath"""
+    seen: Dict[Tuple[str, str], int] = {}
+    keys = []
+    for element in elements:
+        base = (element['type'], element['xpath'])
+        seen[base] = seen.get(base, -1) + 1
+        keys.append(base + (seen[base],))
+    return keys
+
+
+class DomSnapshotter:
+    """
+    Снимки страницы с опциональным режимом diff
+
+    Пример:
+        snapshotter = DomSnapshotter(diff=True)
+        state = snapshotter.capture(driver)   # первый снимок URL - полный, следующие - только изменения
+    """
+
+    def __init__(self, diff: bool = False):
+        self.diff = diff
+        self._previous: Dict[str, Dict[Tuple, Dict[str, Any]]] = {}
+
+    def reset(self):
+        self._previous = {}
+
+    def capture(self, driver) -> Dict[str, Any]:
+        """
+        Снять состояние страницы
+
+        Returns:
+            Dict: url, title, elements; в режиме diff для уже снятого URL еще
+            diff=True, removed (ключи исчезнувших элементов) и unchanged (сколько не изменилось)
+        """
+        snapshot = driver.execute_script(SNAPSHOT_JS)
+        url, title = snapshot['url'], snapshot['title']
+        elements = expand_rows(snapshot['rows'])
+        state: Dict[str, Any] = {'url': url, 'title': title, 'elements': elements}
+        if not self.diff:
+            return state
+
+        current = dict(zip(element_keys(elements), elements))
+        previous: Optional[Dict[Tuple, Dict[str, Any]]] = self._previous.get(url)
+        self._previous[url] = current
+        if previous is None:
+            return state
+
+        changed = [element for key, element in current.items() if previous.get(key) != element]
+        removed = [
+            {'type': key[0], 'xpath': key[1], 'index': key[2]} for key in previous if key not in current
+        ]
+        state.update({
+            'elements': changed,
+            'diff': True,
+            'removed': removed,
+            'unchanged': len(current) - len(changed)
+        })
+        return state
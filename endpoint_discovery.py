@@ -0,0 +1,244 @@
+"""
+Запоминание рабочих URL API площадок
+Для многих операций 101 hotels точный адрес API неизвестен, и менеджер перебирает
+несколько кандидатов. Первый успешный кандидат запоминается для операции и аккаунта
+(в памяти и в SQLite, с истечением срока), и дальше запрос сразу идет на него.
+Если запомненный URL вернул 404, перебор повторяется в том же вызове; если он ответил
+ошибкой сервера (5xx) или не ответил за таймаут, безопасные (GET) операции перепроверяются
+в фоне, а остальные забываются после нескольких сбоев подряд. Ответы 4xx (неверный запрос,
+нет доступа) - ошибка самого запроса: они возвращаются вызывающему и эндпоинт не трогают.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from db import Database
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_TTL = 24 * 3600
+MAX_FAILURES = 3
+
+# Ответ, после которого пробуется следующий кандидат: такого эндпоинта нет
+MISSING_STATUSES = (404, 405)
+
+# Исключения «эндпоинт не ответил»: считаются сбоем, как ответ 5xx
+TIMEOUT_ERRORS = (requests.exceptions.Timeout, TimeoutError)
+
+Key = Tuple[str, str, str]
+
+
+class EndpointDiscovery:
+    """
+    Память рабочих эндпоинтов
+
+    Пример:
+        response = get_endpoint_discovery().request(
+            '101hotels', 'get_my_hotels', email, HOTELS_URLS,
+            lambda url: session.get(url, headers=headers), safe=True
+        )
+    """
+
+    def __init__(self, db: Optional[Database] = None, ttl: float = DISCOVERY_TTL,
+                 max_failures: int = MAX_FAILURES):
+        self.db = db or Database()
+        self.ttl = ttl
+        self.max_failures = max_failures
+        # key -> (template, failures, expires_at) или None, если в базе ничего нет
+        self._memory: Dict[Key, Optional[Tuple[str, int, float]]] = {}
+        self._lock = threading.Lock()
+        self._probing: set = set()
+        self.stats = {'hits': 0, 'probes': 0, 'probe_requests': 0, 'rediscovered': 0, 'background_probes': 0}
+
+    # --- Память ---
+    def learned(self, platform: str, operation: str, account: Optional[str] = None) -> Optional[str]:
+        """Запомненный шаблон URL операции"""
+        key = (platform, operation, account or '')
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                entry = self._memory[key]
+                if entry is None or entry[2] > now:
+                    return entry[0] if entry else None
+        row = self.db.get_api_endpoint(*key, now)
+        entry = (row[0], row[1], row[2]) if row else None
+        with self._lock:
+            self._memory[key] = entry
+        return entry[0] if entry else None
+
+    def _failures(self, key: Key) -> int:
+        with self._lock:
+            entry = self._memory.get(key)
+        return entry[1] if entry else 0
+
+    def remember(self, platform: str, operation: str, account: Optional[str], template: str, failures: int = 0):
+        key = (platform, operation, account or '')
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            previous = self._memory.get(key)
+            self._memory[key] = (template, failures, expires_at)
+        if previous is None or previous[0] != template:
+            logger.info(f"Рабочий эндпоинт {platform}/{operation}: {template}")
+        self.db.save_api_endpoint(*key, template, failures, expires_at)
+
+    def forget(self, platform: str, operation: str, account: Optional[str] = None):
+        key = (platform, operation, account or '')
+        with self._lock:
+            self._memory[key] = None
+        self.db.delete_api_endpoint(*key)
+
+    def snapshot(self, platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Все запомненные эндпоинты (для диагностики)"""
+        now = time.time()
+        return [
+            {
+                'platform': row_platform,
+                'operation': operation,
+                'account': account,
+                'template': template,
+                'failures': failures,
+                'expires_in': max(0, int(expires_at - now)),
+                'updated_at': updated_at
+            }
+            for row_platform, operation, account, template, failures, expires_at, updated_at
+            in self.db.list_api_endpoints(platform)
+        ]
+
+    # --- Запросы ---
+    def _probe(self, key: Key, candidates: Sequence[str], send: Callable[[str], Any],
+               url_params: Dict[str, Any], ok_statuses: Sequence[int]) -> Any:
+        """
+        Перебрать кандидатов по порядку
+
+        Returns:
+            Ответ первого успешного кандидата; иначе последний ответ, который не означал
+            отсутствие эндпоинта, или None
+        """
+        platform, operation, account = key
+        self.stats['probes'] += 1
+        fallback = None
+        for template in candidates:
+            url = template.format(**url_params)
+            self.stats['probe_requests'] += 1
+            try:
+                response = send(url)
+            except Exception as e:
+                logger.warning(f"Ошибка при запросе к {url}: {e}")
+                continue
+            logger.info(f"Пробуем URL: {url} - статус {response.status_code}")
+            if response.status_code in ok_statuses:
+                self.remember(platform, operation, account, template)
+                return response
+            if response.status_code in MISSING_STATUSES:
+                logger.warning(f"URL {url} не найден, пробуем следующий")
+            else:
+                fallback = response
+        return fallback
+
+    def _probe_in_background(self, key: Key, candidates: Sequence[str], send: Callable[[str], Any],
+                             url_params: Dict[str, Any], ok_statuses: Sequence[int]):
+        with self._lock:
+            if key in self._probing:
+                return
+            self._probing.add(key)
+        self.stats['background_probes'] += 1
+
+        def probe():
+            try:
+                response = self._probe(key, candidates, send, url_params, ok_statuses)
+                if response is None or response.status_code not in ok_statuses:
+                    logger.warning(f"Фоновая проверка {key[0]}/{key[1]}: рабочий эндпоинт не найден")
+            except Exception as e:
+                logger.error(f"Ошибка фоновой проверки эндпоинтов {key[0]}/{key[1]}: {e}")
+            finally:
+                with self._lock:
+                    self._probing.discard(key)
+
+        threading.Thread(target=probe, name=f"endpoint-probe-{key[1]}", daemon=True).start()
+
+    def request(self, platform: str, operation: str, account: Optional[str], candidates: Sequence[str],
+                send: Callable[[str], Any], url_params: Optional[Dict[str, Any]] = None,
+                ok_statuses: Sequence[int] = (200,), safe: bool = False) -> Any:
+        """
+        Выполнить запрос операции на рабочий URL
+
+        Args:
+            platform, operation, account: Чей эндпоинт ищется
+            candidates: Шаблоны URL в порядке предпочтения (str.format с url_params)
+            send: Функция url -> requests.Response
+            ok_statuses: Статусы успешного ответа
+            safe: Запрос без побочных эффектов - его можно повторять в фоновой проверке
+
+        Returns:
+            Успешный ответ; ответ с ошибкой; None, если рабочий эндпоинт не найден
+        """
+        key = (platform, operation, account or '')
+        url_params = url_params or {}
+        template = self.learned(*key)
+        if template not in candidates:
+            return self._probe(key, candidates, send, url_params, ok_statuses)
+
+        self.stats['hits'] += 1
+        url = template.format(**url_params)
+        try:
+            response = send(url)
+        except TIMEOUT_ERRORS as e:
+            logger.warning(f"Таймаут запроса к {url}: {e}")
+            response = None
+        except Exception as e:
+            logger.warning(f"Ошибка при запросе к {url}: {e}")
+            return None
+
+        if response is not None and response.status_code in ok_statuses:
+            if self._failures(key):
+                self.remember(*key, template)
+            return response
+
+        rest = [candidate for candidate in candidates if candidate != template]
+        if response is not None and response.status_code in MISSING_STATUSES:
+            # Эндпоинт переехал - ищем новый сразу, ответ нужен этому вызову
+            logger.warning(f"Запомненный URL {url} больше не найден, ищем заново")
+            self.stats['rediscovered'] += 1
+            self.forget(*key)
+            return self._probe(key, rest, send, url_params, ok_statuses)
+
+        if response is not None and response.status_code < 500:
+            # 4xx - ошибка запроса (данные, права), а не эндпоинта
+            return response
+
+        # Эндпоинт существует, но сейчас отвечает ошибкой: не умножаем нагрузку перебором
+        failures = self._failures(key) + 1
+        if safe:
+            self.remember(*key, template, failures=failures)
+            self._probe_in_background(key, [template] + rest, send, url_params, ok_statuses)
+        elif failures >= self.max_failures:
+            logger.warning(f"URL {url} ответил ошибкой {failures} раз подряд, в следующий раз ищем заново")
+            self.forget(*key)
+        else:
+            self.remember(*key, template, failures=failures)
+        return response
+
+
+_discovery: Optional[EndpointDiscovery] = None
+_discovery_lock = threading.Lock()
+
+
+def get_endpoint_discovery() -> EndpointDiscovery:
+    """Общая память эндпоинтов процесса"""
+    global _discovery
+    with _discovery_lock:
+        if _discovery is None:
+            _discovery = EndpointDiscovery()
+        return _discovery
+
+
+if __name__ == "__main__":
+    import sys
+
+    for entry in get_endpoint_discovery().snapshot(sys.argv[1] if len(sys.argv) > 1 else None):
+        print(f"{entry['platform']}/{entry['operation']} [{entry['account'] or '-'}]: {entry['template']} "
+              f"(сбоев {entry['failures']}, истекает через {entry['expires_in']}с)")
@@ -0,0 +1,174 @@
+"""
+Выполнение блокирующих вызовов менеджеров площадок вне event loop
+HTTP-вызовы (requests) идут в общий пул потоков, Selenium - в отдельный небольшой пул,
+чтобы медленный браузер не занимал потоки, нужные быстрым HTTP-запросам.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HTTP = 'http'
+BROWSER = 'browser'
+
+# Размеры пулов и таймауты по умолчанию (секунды)
+POOL_SIZES = {HTTP: 16, BROWSER: 4}
+DEFAULT_TIMEOUTS = {HTTP: 30.0, BROWSER: 180.0}
+
+
+class CallStats:
+    """Метрики вызовов одной функции"""
+
+    __slots__ = ('calls', 'errors', 'timeouts', 'total_time', 'max_time', 'in_flight')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.in_flight = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'in_flight': self.in_flight,
+            'avg_time': self.total_time / self.calls if self.calls else 0.0,
+            'max_time': self.max_time
+        }
+
+
+class BlockingExecutor:
+    """Пулы потоков для блокирующих вызовов с таймаутами и метриками"""
+
+    def __init__(self, pool_sizes: Optional[Dict[str, int]] = None,
+                 default_timeouts: Optional[Dict[str, float]] = None):
+        self.pool_sizes = {**POOL_SIZES, **(pool_sizes or {})}
+        self.default_timeouts = {**DEFAULT_TIMEOUTS, **(default_timeouts or {})}
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._pools_lock = threading.Lock()
+        self._stats: Dict[str, CallStats] = {}
+        self._stats_lock = threading.Lock()
+        # Один WebDriver нельзя использовать из нескольких потоков одновременно:
+        # вызовы браузерных методов одного менеджера выполняются по очереди
+        self._owner_locks: "weakref.WeakKeyDictionary[Any, threading.Lock]" = weakref.WeakKeyDictionary()
+
+    def _pool(self, kind: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(kind)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._pools.get(kind)
+                if pool is None:
+                    if kind not in self.pool_sizes:
+                        raise ValueError(f"Неизвестный тип пула: {kind}")
+                    pool = self._pools[kind] = ThreadPoolExecutor(
+                        max_workers=self.pool_sizes[kind], thread_name_prefix=f'{kind}-worker'
+                    )
+        return pool
+
+    def _owner_lock(self, func: Callable) -> Optional[threading.Lock]:
+        owner = getattr(func, '__self__', None)
+        if owner is None:
+            return None
+        with self._pools_lock:
+            try:
+                lock = self._owner_locks.get(owner)
+                if lock is None:
+                    lock = self._owner_locks[owner] = threading.Lock()
+            except TypeError:
+                # Объект не поддерживает слабые ссылки
+                return None
+        return lock
+
+    def _stat(self, name: str) -> CallStats:
+        with self._stats_lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = CallStats()
+            return stat
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None,
+                  kind: str = HTTP, **kwargs) -> Any:
+        """
+        Выполнить блокирующую функцию в пуле и дождаться результата
+
+        Args:
+            func: Блокирующая функция или метод менеджера
+            timeout: Таймаут в секундах (None - по умолчанию для пула, 0 - без таймаута)
+            kind: 'http' для requests, 'browser' для Selenium
+
+        Raises:
+            asyncio.TimeoutError: если вызов не уложился в таймаут
+        """
+        if timeout is None:
+            timeout = self.default_timeouts.get(kind)
+        name = f"{kind}:{getattr(func, '__qualname__', repr(func))}"
+        stat = self._stat(name)
+        owner_lock = self._owner_lock(func) if kind == BROWSER else None
+
+        def call():
+            if owner_lock is None:
+                return func(*args, **kwargs)
+            with owner_lock:
+                return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        stat.in_flight += 1
+        try:
+            future = loop.run_in_executor(self._pool(kind), call)
+            if timeout:
+                return await asyncio.wait_for(future, timeout)
+            return await future
+        except asyncio.TimeoutError:
+            stat.timeouts += 1
+            # Поток нельзя прервать: он доработает в фоне, но обработчик больше не ждет
+            logger.warning(f"Вызов {name} не уложился в {timeout}с")
+            raise
+        except Exception:
+            stat.errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            stat.in_flight -= 1
+            stat.calls += 1
+            stat.total_time += elapsed
+            stat.max_time = max(stat.max_time, elapsed)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Метрики по каждой вызванной функции"""
+        with self._stats_lock:
+            return {name: stat.to_dict() for name, stat in self._stats.items()}
+
+    def shutdown(self, wait: bool = True):
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.shutdown(wait=wait)
+            self._pools = {}
+
+
+default_executor = BlockingExecutor()
+
+
+async def run_blocking(func: Callable, *args, timeout: Optional[float] = None,
+                       kind: str = HTTP, **kwargs) -> Any:
+    """
+    Выполнить блокирующий вызов в общем пуле, не останавливая event loop
+
+    Пример:
+        success, result = await run_blocking(self.hotels101_manager.get_bookings)
+        ok = await run_blocking(self.ostrovok_manager.submit_login, kind='browser')
+    """
+    return await default_executor.run(func, *args, timeout=timeout, kind=kind, **kwargs)
+
+
+def get_executor_metrics() -> Dict[str, Dict[str, Any]]:
+    return default_executor.get_metrics()
@@ -0,0 +1,274 @@
+"""
+Общий сервис геокодинга для всех платформ
+Координаты адреса не зависят от площадки, поэтому результат любого провайдера
+кэшируется по нормализованному адресу: сначала LRU в памяти, затем SQLite с TTL.
+Ненайденные адреса тоже кэшируются (на более короткий срок), а сбои провайдеров - нет.
+Провайдеры перебираются по порядку, пока один из них не вернет координаты.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from db import Database
+from executors import run_blocking
+from http_transport import create_session
+
+logger = logging.getLogger(__name__)
+
+Coords = Tuple[float, float]
+Provider = Tuple[str, Callable[[str], Optional[Coords]]]
+
+DEFAULT_TTL = 30 * 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+LRU_SIZE = 5000
+BATCH_WORKERS = 8
+
+YANDEX_GEOCODER_URL = "https://geocode-maps.yandex.ru/1.x/"
+
+_PUNCTUATION = re.compile(r'[\s,.;:"«»()]+')
+
+_yandex_session = None
+
+
+class GeocodingUnavailable(Exception):
+    """Провайдер не ответил; в отличие от «адрес не найден» такой результат не кэшируется"""
+
+
+def normalize_address(address: str) -> str:
+    """Ключ кэша: регистр, ё, знаки препинания и лишние пробелы не важны"""
+    return _PUNCTUATION.sub(' ', (address or '').lower().replace('ё', 'е')).strip()
+
+
+def geocode_yandex(address: str) -> Optional[Coords]:
+    """Геокодинг через Яндекс.Карты"""
+    params = {
+        'geocode': address,
+        'format': 'json',
+        'results': 1
+    }
+    try:
+        global _yandex_session
+        if _yandex_session is None:
+            _yandex_session = create_session()
+        resp = _yandex_session.get(YANDEX_GEOCODER_URL, params=params, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception as e:
+        raise GeocodingUnavailable(f"Яндекс.Карты: {e}") from e
+    members = data.get('response', {}).get('GeoObjectCollection', {}).get('featureMember', [])
+    if not members:
+        return None
+    lon, lat = map(float, members[0]['GeoObject']['Point']['pos'].split())
+    logger.info(f"Координаты получены через Яндекс.Карты: {lat}, {lon}")
+    return lat, lon
+
+
+class Geocoder:
+    """
+    Геокодер с кэшем и перебором провайдеров
+
+    Пример:
+        coords = get_geocoder().geocode(address, providers=[('101hotels', manager._geocode_address_101hotels)])
+        found = get_geocoder().geocode_many(addresses)
+    """
+
+    def __init__(self, db: Optional[Database] = None, providers: Optional[Sequence[Provider]] = None,
+                 ttl: float = DEFAULT_TTL, negative_ttl: float = NEGATIVE_TTL, lru_size: int = LRU_SIZE):
+        self.db = db or Database()
+        # Провайдеры по умолчанию - запасные, после переданных в вызов
+        self.providers: List[Provider] = list(providers if providers is not None else [('yandex', geocode_yandex)])
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lru_size = lru_size
+        # address_key -> (coords или None, expires_at)
+        self._lru: 'OrderedDict[str, Tuple[Optional[Coords], float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Один запрос к провайдерам на адрес, даже если его спрашивают параллельно
+        self._inflight: Dict[str, threading.Event] = {}
+        self.stats = {'memory_hits': 0, 'db_hits': 0, 'negative_hits': 0, 'lookups': 0, 'provider_errors': 0}
+
+    # --- Кэш ---
+    def _remember(self, key: str, coords: Optional[Coords], expires_at: float):
+        with self._lock:
+            self._lru[key] = (coords, expires_at)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _cached(self, key: str) -> Tuple[bool, Optional[Coords]]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry and entry[1] > now:
+                self._lru.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                if entry[0] is None:
+                    self.stats['negative_hits'] += 1
+                return True, entry[0]
+
+        row = self.db.get_geocode(key, now)
+        if row is None:
+            return False, None
+        _, lat, lon, found, expires_at = row
+        coords = (lat, lon) if found else None
+        self._remember(key, coords, expires_at)
+        self.stats['db_hits'] += 1
+        if coords is None:
+            self.stats['negative_hits'] += 1
+        return True, coords
+
+    def _store(self, key: str, provider: Optional[str], coords: Optional[Coords]):
+        expires_at = time.time() + (self.ttl if coords else self.negative_ttl)
+        self._remember(key, coords, expires_at)
+        lat, lon = coords if coords else (None, None)
+        self.db.save_geocode(key, provider, lat, lon, coords is not None, expires_at)
+
+    def invalidate(self, address: str):
+        key = normalize_address(address)
+        with self._lock:
+            self._lru.pop(key, None)
+        self.db.save_geocode(key, None, None, None, False, 0)
+
+    # --- Геокодинг ---
+    def _chain(self, providers: Optional[Iterable[Provider]]) -> List[Provider]:
+        chain: List[Provider] = []
+        names = set()
+        for name, func in list(providers or []) + self.providers:
+            if name not in names:
+                names.add(name)
+                chain.append((name, func))
+        return chain
+
+    def _lookup(self, key: str, address: str, providers: Optional[Iterable[Provider]]) -> Optional[Coords]:
+        self.stats['lookups'] += 1
+        unavailable = 0
+        chain = self._chain(providers)
+        for name, func in chain:
+            try:
+                coords = func(address)
+            except Exception as e:
+                unavailable += 1
+                self.stats['provider_errors'] += 1
+                logger.warning(f"Геокодер {name} недоступен для адреса {address}: {e}")
+                continue
+            if coords:
+                coords = (float(coords[0]), float(coords[1]))
+                logger.info(f"Координаты адреса {address} получены через {name}: {coords}")
+                self._store(key, name, coords)
+                return coords
+            logger.info(f"Геокодер {name} не нашел адрес: {address}")
+
+        if unavailable:
+            # «Не найден» кэшируется, только если ответили все провайдеры - иначе повторим в следующий раз
+            return None
+        self._store(key, None, None)
+        return None
+
+    def geocode(self, address: str, providers: Optional[Iterable[Provider]] = None) -> Optional[Coords]:
+        """
+        Координаты адреса
+
+        Args:
+            address: Адрес
+            providers: Провайдеры, которые пробуются первыми, - (имя, функция адрес -> (lat, lng) или None)
+
+        Returns:
+            (lat, lng) или None, если адрес не найден или провайдеры недоступны
+        """
+        key = normalize_address(address)
+        if not key:
+            return None
+        while True:
+            hit, coords = self._cached(key)
+            if hit:
+                return coords
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                event.wait()
+                # Владелец мог не сохранить результат (провайдеры недоступны) - тогда ищем сами
+                continue
+            try:
+                return self._lookup(key, address, providers)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+    def geocode_many(self, addresses: Iterable[str], providers: Optional[Iterable[Provider]] = None,
+                     max_workers: int = BATCH_WORKERS) -> Dict[str, Optional[Coords]]:
+        """
+        Геокодинг пачки адресов: одинаковые адреса запрашиваются один раз,
+        разные - параллельно
+
+        Returns:
+            Dict: адрес -> (lat, lng) или None
+        """
+        addresses = list(addresses)
+        providers = list(providers or [])
+        unique: Dict[str, str] = {}
+        for address in addresses:
+            unique.setdefault(normalize_address(address), address)
+        unique.pop('', None)
+
+        found: Dict[str, Optional[Coords]] = {}
+        if unique:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique))),
+                                    thread_name_prefix='geocode') as pool:
+                futures = {key: pool.submit(self.geocode, address, providers) for key, address in unique.items()}
+                for key, future in futures.items():
+                    try:
+                        found[key] = future.result()
+                    except Exception as e:
+                        logger.error(f"Ошибка геокодинга адреса {unique[key]}: {e}")
+                        found[key] = None
+        return {address: found.get(normalize_address(address)) for address in addresses}
+
+    async def geocode_async(self, address: str, providers: Optional[Iterable[Provider]] = None) -> Optional[Coords]:
+        return await run_blocking(self.geocode, address, list(providers or []))
+
+    async def geocode_many_async(self, addresses: Iterable[str], providers: Optional[Iterable[Provider]] = None,
+                                 max_workers: int = BATCH_WORKERS) -> Dict[str, Optional[Coords]]:
+        addresses = list(addresses)
+        providers = list(providers or [])
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self.geocode_many(addresses, providers, max_workers)
+        )
+
+
+_geocoder: Optional[Geocoder] = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder() -> Geocoder:
+    """Общий геокодер процесса"""
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = Geocoder()
+        return _geocoder
+
+
+def geocode_with(name: str, func: Callable[[str], Optional[Coords]], address: str) -> Optional[Coords]:
+    """Геокодинг через общий кэш с провайдером площадки в начале цепочки"""
+    return get_geocoder().geocode(address, providers=[(name, func)])
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    results = get_geocoder().geocode_many(sys.argv[1:])
+    for address, coords in results.items():
+        print(f"{address}: {coords if coords else 'не найден'}")
@@ -1,16 +1,16 @@
-import requests
 import os
 import json
 import uuid
 import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+from browser_pool import get_browser_pool
+from http_transport import create_session
+from response_cache import invalidate_reads
+from endpoint_discovery import get_endpoint_discovery
+from geocoding import GeocodingUnavailable, geocode_with
 import time
 
 logger = logging.getLogger(__name__)
@@ -19,9 +19,54 @@ SESSIONS_DIR = 'sessions'
 if not os.path.exists(SESSIONS_DIR):
     os.makedirs(SESSIONS_DIR)
 
+# Возможные URL операций API; рабочий запоминает endpoint_discovery по первому успешному ответу
+# Поиск адресов
+ADDRESS_SEARCH_URLS = (
+    "https://101hotels.com/api/geocoding/search",
+    "https://101hotels.com/api/places/search",
+    "https://101hotels.com/api/location/search",
+    "https://101hotels.com/api/autocomplete/address"
+)
+# Создание отеля
+CREATE_HOTEL_URLS = (
+    "https://101hotels.com/api/partner/hotels/create",
+    "https://101hotels.com/api/hotels/create",
+    "https://101hotels.com/api/partner/properties/create",
+    "https://101hotels.com/api/properties/create"
+)
+# Список отелей
+HOTELS_URLS = (
+    "https://101hotels.com/api/partner/hotels",
+    "https://101hotels.com/api/hotels",
+    "https://101hotels.com/api/partner/properties",
+    "https://101hotels.com/api/properties"
+)
+# Отель по ID (детали, обновление, удаление)
+HOTEL_URLS = (
+    "https://101hotels.com/api/partner/hotels/{hotel_id}",
+    "https://101hotels.com/api/hotels/{hotel_id}",
+    "https://101hotels.com/api/partner/properties/{hotel_id}",
+    "https://101hotels.com/api/properties/{hotel_id}"
+)
+# Удобства отеля
+AMENITIES_URLS = (
+    "https://extranet.101hotels.com/api/hotel/amenities",
+    "https://extranet.101hotels.com/api/partner/hotel/amenities",
+    "https://extranet.101hotels.com/api/registration/amenities",
+    "https://extranet.101hotels.com/api/hotel/facilities"
+)
+# Завершение регистрации
+FINALIZE_REGISTRATION_URLS = (
+    "https://extranet.101hotels.com/api/hotel/registration/finalize",
+    "https://extranet.101hotels.com/api/partner/hotel/registration/finalize",
+    "https://extranet.101hotels.com/api/registration/complete",
+    "https://extranet.101hotels.com/api/hotel/complete"
+)
+
 class Hotels101Manager:
     def __init__(self, email=None):
-        self.session = requests.Session()
+        # Своя сессия (cookies) на общем пуле соединений, с таймаутами и повторами
+        self.session = create_session('101hotels')
         self.email = email
         self.driver = None
         if email:
@@ -57,32 +102,15 @@ class Hotels101Manager:
 
     # --- Selenium login methods ---
     def setup_driver(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        try:
-            # Попробуем использовать ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            logger.info("Веб-драйвер успешно настроен через ChromeDriverManager")
-        except Exception as e:
-            logger.warning(f"Ошибка с ChromeDriverManager: {e}")
-            try:
-                # Попробуем запустить Chrome без service
-                self.driver = webdriver.Chrome(options=chrome_options)
-                logger.info("Веб-драйвер успешно настроен без service")
-            except Exception as e2:
-                logger.error(f"Ошибка запуска Chrome: {e2}")
-                raise Exception(f"Не удалось запустить Chrome. Убедитесь, что Chrome установлен. Ошибка: {e2}")
-        
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        # Браузер берется из общего пула прогретых экземпляров вместо холодного запуска Chrome
+        self.driver = get_browser_pool().acquire()
+        logger.info("Веб-драйвер получен из пула браузеров")
+
+    def release_driver(self):
+        """Вернуть браузер в пул"""
+        if self.driver:
+            get_browser_pool().release(self.driver)
+            self.driver = None
 
     def open_login_page(self):
         if not self.driver:
@@ -166,7 +194,7 @@ class Hotels101Manager:
         if not submit_success:
             print("Ошибка при нажатии кнопки ВОЙТИ")
             if self.driver:
-                self.driver.quit()
+                self.release_driver()
             return False
         
         success = self.check_login_success(email)
@@ -175,31 +203,26 @@ class Hotels101Manager:
         else:
             print("Ошибка входа.")
         if self.driver:
-            self.driver.quit()
+            self.release_driver()
         return success
 
     # --- 101 Hotels API Methods ---
+    def _api_request(self, operation, candidates, send, ok_statuses=(200,), safe=False, **url_params):
+        """
+        Запрос операции API на рабочий URL из кандидатов (см. endpoint_discovery)
+        Возвращает ответ или None, если рабочий эндпоинт не найден
+        """
+        return get_endpoint_discovery().request(
+            '101hotels', operation, self.email, candidates, send,
+            url_params=url_params, ok_statuses=ok_statuses, safe=safe
+        )
+
     def search_address_on_101hotels(self, address: str):
         """
         Поиск адреса через API 101 hotels
         """
         try:
-            # Попробуем несколько возможных URL для поиска адресов
-            possible_urls = [
-                "https://101hotels.com/api/geocoding/search",
-                "https://101hotels.com/api/places/search",
-                "https://101hotels.com/api/location/search",
-                "https://101hotels.com/api/autocomplete/address"
-            ]
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com",
-                "Referer": "https://101hotels.com/partner/hotels/add",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
-            }
+            headers = {"Referer": "https://101hotels.com/partner/hotels/add"}
             
             params = {
                 "query": address,
@@ -207,29 +230,18 @@ class Hotels101Manager:
                 "lang": "ru"
             }
             
-            # Пробуем каждый URL
-            for url in possible_urls:
-                try:
-                    response = self.session.get(url, headers=headers, params=params)
-                    logger.info(f"Пробуем URL: {url}")
-                    logger.info(f"Статус ответа: {response.status_code}")
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Ответ API: {data}")
-                        results = data.get('results', []) if isinstance(data, dict) else []
-                        logger.info(f"Найдено {len(results)} результатов для адреса: {address}")
-                        return True, results
-                    elif response.status_code == 404:
-                        logger.warning(f"URL {url} не найден, пробуем следующий")
-                        continue
-                    else:
-                        logger.error(f"Ошибка поиска адреса: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.warning(f"Ошибка при запросе к {url}: {e}")
-                    continue
-            
+            response = self._api_request(
+                'search_address', ADDRESS_SEARCH_URLS, lambda url: self.session.get(url, headers=headers, params=params), safe=True
+            )
+            if response is not None and response.status_code == 200:
+                data = response.json()
+                logger.info(f"Ответ API: {data}")
+                results = data.get('results', []) if isinstance(data, dict) else []
+                logger.info(f"Найдено {len(results)} результатов для адреса: {address}")
+                return True, results
+            if response is not None:
+                logger.error(f"Ошибка поиска адреса: {response.status_code} - {response.text}")
+                return False, f"Ошибка API: {response.status_code}"
             return False, "Не удалось найти рабочий API эндпоинт для поиска адресов"
                 
         except Exception as e:
@@ -238,17 +250,23 @@ class Hotels101Manager:
 
     def geocode_address_101hotels(self, address: str):
         """
-        Геокодинг адреса через 101 hotels API
+        Геокодинг адреса через 101 hotels API с общим кэшем геокодинга
         Возвращает (lat, lng) или None
         """
+        return geocode_with('101hotels', self._geocode_address_101hotels, address)
+
+    def _geocode_address_101hotels(self, address: str):
+        """
+        Запрос координат к 101 hotels API без кэша
+        Возвращает (lat, lng) или None; если API недоступен - GeocodingUnavailable
+        """
         logger.info(f"Геокодинг адреса через 101 hotels: {address}")
         
         # Пробуем поиск
         success, results = self.search_address_on_101hotels(address)
         
         if not success:
-            logger.error(f"Не удалось выполнить поиск адреса: {results}")
-            return None
+            raise GeocodingUnavailable(f"Не удалось выполнить поиск адреса: {results}")
         
         if not results:
             logger.warning(f"Адрес не найден: {address}")
@@ -275,22 +293,7 @@ class Hotels101Manager:
         """
         Создание отеля через API 101 hotels
         """
-        # Попробуем несколько возможных URL для создания отеля
-        possible_urls = [
-            "https://101hotels.com/api/partner/hotels/create",
-            "https://101hotels.com/api/hotels/create",
-            "https://101hotels.com/api/partner/properties/create",
-            "https://101hotels.com/api/properties/create"
-        ]
-        
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "Origin": "https://101hotels.com",
-            "Referer": "https://101hotels.com/partner/hotels/add",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
-        }
+        headers = {"Referer": "https://101hotels.com/partner/hotels/add"}
         
         # Добавляем idempotency_key если его нет
         if 'idempotency_key' not in hotel_data:
@@ -305,27 +308,17 @@ class Hotels101Manager:
         
         logger.info(f"Отправка запроса создания отеля: {hotel_data}")
         
-        # Пробуем каждый URL
-        for url in possible_urls:
-            try:
-                response = self.session.post(url, headers=headers, json=hotel_data)
-                logger.info(f"Пробуем URL: {url}")
-                logger.info(f"Статус ответа: {response.status_code}")
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info(f"Отель успешно создан: {result}")
-                    return response.status_code, result
-                elif response.status_code == 404:
-                    logger.warning(f"URL {url} не найден, пробуем следующий")
-                    continue
-                else:
-                    logger.error(f"Ошибка создания отеля: {response.status_code} - {response.text}")
-                    
-            except Exception as e:
-                logger.warning(f"Ошибка при запросе к {url}: {e}")
-                continue
-        
+        response = self._api_request(
+            'create_hotel', CREATE_HOTEL_URLS, lambda url: self.session.post(url, headers=headers, json=hotel_data)
+        )
+        if response is not None and response.status_code == 200:
+            result = response.json()
+            logger.info(f"Отель успешно создан: {result}")
+            invalidate_reads('101hotels', self.email)
+            return response.status_code, result
+        if response is not None:
+            logger.error(f"Ошибка создания отеля: {response.status_code} - {response.text}")
+            return response.status_code, f"Ошибка API: {response.status_code}"
         return 500, "Не удалось найти рабочий API эндпоинт для создания отеля"
 
     def prepare_hotel_data(self, name, address, city, region, hotel_type, latitude, longitude):
@@ -352,12 +345,7 @@ class Hotels101Manager:
         """
         try:
             url = "https://101hotels.com/api/partner/bookings"
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com",
-                "Referer": "https://101hotels.com/partner/bookings"
-            }
+            headers = {"Referer": "https://101hotels.com/partner/bookings"}
             
             response = self.session.get(url, headers=headers)
             
@@ -380,12 +368,7 @@ class Hotels101Manager:
         """
         try:
             url = "https://101hotels.com/api/partner/statistics"
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com",
-                "Referer": "https://101hotels.com/partner/dashboard"
-            }
+            headers = {"Referer": "https://101hotels.com/partner/dashboard"}
             
             response = self.session.get(url, headers=headers)
             
@@ -406,40 +389,19 @@ class Hotels101Manager:
         Получить список моих отелей
         """
         try:
-            possible_urls = [
-                "https://101hotels.com/api/partner/hotels",
-                "https://101hotels.com/api/hotels",
-                "https://101hotels.com/api/partner/properties",
-                "https://101hotels.com/api/properties"
-            ]
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com",
-                "Referer": "https://101hotels.com/partner/hotels"
-            }
-            
-            for url in possible_urls:
-                try:
-                    response = self.session.get(url, headers=headers)
-                    logger.info(f"Пробуем получить отели с URL: {url}")
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        hotels = data.get('hotels', []) or data.get('properties', []) or data.get('data', [])
-                        logger.info(f"Получено {len(hotels)} отелей")
-                        return True, hotels
-                    elif response.status_code == 404:
-                        logger.warning(f"URL {url} не найден, пробуем следующий")
-                        continue
-                    else:
-                        logger.error(f"Ошибка получения отелей: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.warning(f"Ошибка при запросе к {url}: {e}")
-                    continue
+            headers = {"Referer": "https://101hotels.com/partner/hotels"}
             
+            response = self._api_request(
+                'get_my_hotels', HOTELS_URLS, lambda url: self.session.get(url, headers=headers), safe=True
+            )
+            if response is not None and response.status_code == 200:
+                data = response.json()
+                hotels = data.get('hotels', []) or data.get('properties', []) or data.get('data', [])
+                logger.info(f"Получено {len(hotels)} отелей")
+                return True, hotels
+            if response is not None:
+                logger.error(f"Ошибка получения отелей: {response.status_code} - {response.text}")
+                return False, f"Ошибка API: {response.status_code}"
             return False, "Не удалось найти рабочий API эндпоинт для получения отелей"
                 
         except Exception as e:
@@ -451,39 +413,18 @@ class Hotels101Manager:
         Получить детальную информацию об отеле
         """
         try:
-            possible_urls = [
-                f"https://101hotels.com/api/partner/hotels/{hotel_id}",
-                f"https://101hotels.com/api/hotels/{hotel_id}",
-                f"https://101hotels.com/api/partner/properties/{hotel_id}",
-                f"https://101hotels.com/api/properties/{hotel_id}"
-            ]
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com",
-                "Referer": f"https://101hotels.com/partner/hotels/{hotel_id}"
-            }
-            
-            for url in possible_urls:
-                try:
-                    response = self.session.get(url, headers=headers)
-                    logger.info(f"Пробуем получить детали отеля с URL: {url}")
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Детали отеля {hotel_id} получены")
-                        return True, data
-                    elif response.status_code == 404:
-                        logger.warning(f"URL {url} не найден, пробуем следующий")
-                        continue
-                    else:
-                        logger.error(f"Ошибка получения деталей отеля: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.warning(f"Ошибка при запросе к {url}: {e}")
-                    continue
+            headers = {"Referer": f"https://101hotels.com/partner/hotels/{hotel_id}"}
             
+            response = self._api_request(
+                'get_hotel_details', HOTEL_URLS, lambda url: self.session.get(url, headers=headers), hotel_id=hotel_id, safe=True
+            )
+            if response is not None and response.status_code == 200:
+                data = response.json()
+                logger.info(f"Детали отеля {hotel_id} получены")
+                return True, data
+            if response is not None:
+                logger.error(f"Ошибка получения деталей отеля: {response.status_code} - {response.text}")
+                return False, f"Ошибка API: {response.status_code}"
             return False, "Не удалось найти рабочий API эндпоинт для получения деталей отеля"
                 
         except Exception as e:
@@ -495,39 +436,19 @@ class Hotels101Manager:
         Обновить информацию об отеле
         """
         try:
-            possible_urls = [
-                f"https://101hotels.com/api/partner/hotels/{hotel_id}",
-                f"https://101hotels.com/api/hotels/{hotel_id}",
-                f"https://101hotels.com/api/partner/properties/{hotel_id}",
-                f"https://101hotels.com/api/properties/{hotel_id}"
-            ]
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com",
-                "Referer": f"https://101hotels.com/partner/hotels/{hotel_id}"
-            }
-            
-            for url in possible_urls:
-                try:
-                    response = self.session.put(url, headers=headers, json=hotel_data)
-                    logger.info(f"Пробуем обновить отель с URL: {url}")
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Отель {hotel_id} успешно обновлен")
-                        return True, data
-                    elif response.status_code == 404:
-                        logger.warning(f"URL {url} не найден, пробуем следующий")
-                        continue
-                    else:
-                        logger.error(f"Ошибка обновления отеля: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.warning(f"Ошибка при запросе к {url}: {e}")
-                    continue
+            headers = {"Referer": f"https://101hotels.com/partner/hotels/{hotel_id}"}
             
+            response = self._api_request(
+                'update_hotel', HOTEL_URLS, lambda url: self.session.put(url, headers=headers, json=hotel_data), hotel_id=hotel_id
+            )
+            if response is not None and response.status_code == 200:
+                data = response.json()
+                logger.info(f"Отель {hotel_id} успешно обновлен")
+                invalidate_reads('101hotels', self.email)
+                return True, data
+            if response is not None:
+                logger.error(f"Ошибка обновления отеля: {response.status_code} - {response.text}")
+                return False, f"Ошибка API: {response.status_code}"
             return False, "Не удалось найти рабочий API эндпоинт для обновления отеля"
                 
         except Exception as e:
@@ -539,38 +460,18 @@ class Hotels101Manager:
         Удалить отель
         """
         try:
-            possible_urls = [
-                f"https://101hotels.com/api/partner/hotels/{hotel_id}",
-                f"https://101hotels.com/api/hotels/{hotel_id}",
-                f"https://101hotels.com/api/partner/properties/{hotel_id}",
-                f"https://101hotels.com/api/properties/{hotel_id}"
-            ]
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com",
-                "Referer": f"https://101hotels.com/partner/hotels/{hotel_id}"
-            }
-            
-            for url in possible_urls:
-                try:
-                    response = self.session.delete(url, headers=headers)
-                    logger.info(f"Пробуем удалить отель с URL: {url}")
-                    
-                    if response.status_code == 200 or response.status_code == 204:
-                        logger.info(f"Отель {hotel_id} успешно удален")
-                        return True, "Отель успешно удален"
-                    elif response.status_code == 404:
-                        logger.warning(f"URL {url} не найден, пробуем следующий")
-                        continue
-                    else:
-                        logger.error(f"Ошибка удаления отеля: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.warning(f"Ошибка при запросе к {url}: {e}")
-                    continue
-            
+            headers = {"Referer": f"https://101hotels.com/partner/hotels/{hotel_id}"}
+            
+            response = self._api_request(
+                'delete_hotel', HOTEL_URLS, lambda url: self.session.delete(url, headers=headers), hotel_id=hotel_id, ok_statuses=(200, 204)
+            )
+            if response is not None and response.status_code in (200, 204):
+                logger.info(f"Отель {hotel_id} успешно удален")
+                invalidate_reads('101hotels', self.email)
+                return True, "Отель успешно удален"
+            if response is not None:
+                logger.error(f"Ошибка удаления отеля: {response.status_code} - {response.text}")
+                return False, f"Ошибка API: {response.status_code}"
             return False, "Не удалось найти рабочий API эндпоинт для удаления отеля"
                 
         except Exception as e:
@@ -582,23 +483,13 @@ class Hotels101Manager:
         Тестирование подключения к API 101 hotels
         """
         try:
-            test_urls = [
-                "https://101hotels.com/api/partner/hotels",
-                "https://101hotels.com/api/hotels",
-                "https://101hotels.com/api/partner/properties",
-                "https://101hotels.com/api/properties"
-            ]
-            
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-                "Origin": "https://101hotels.com"
-            }
+            test_urls = HOTELS_URLS
             
             working_urls = []
             
             for url in test_urls:
                 try:
-                    response = self.session.get(url, headers=headers)
+                    response = self.session.get(url)
                     if response.status_code in [200, 401, 403]:  # 401/403 означает что API существует, но нужна авторизация
                         working_urls.append(url)
                         logger.info(f"Рабочий URL найден: {url}")
@@ -674,8 +565,7 @@ class Hotels101Manager:
         """
         try:
             if self.driver:
-                self.driver.quit()
-                self.driver = None
+                self.release_driver()
                 logger.info("Браузер закрыт")
                 return True
             else:
@@ -2054,42 +1944,21 @@ class Hotels101Manager:
         Отправить информацию об удобствах отеля
         """
         try:
-            possible_urls = [
-                "https://extranet.101hotels.com/api/hotel/amenities",
-                "https://extranet.101hotels.com/api/partner/hotel/amenities",
-                "https://extranet.101hotels.com/api/registration/amenities",
-                "https://extranet.101hotels.com/api/hotel/facilities"
-            ]
-            
             headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
                 "Origin": "https://extranet.101hotels.com",
-                "Referer": "https://extranet.101hotels.com/partner/hotels/add",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
+                "Referer": "https://extranet.101hotels.com/partner/hotels/add"
             }
             
-            for url in possible_urls:
-                try:
-                    response = self.session.post(url, headers=headers, json=amenities_data)
-                    logger.info(f"Пробуем отправить информацию об удобствах с URL: {url}")
-                    logger.info(f"Отправляемые данные: {amenities_data}")
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Информация об удобствах успешно отправлена: {data}")
-                        return True, data
-                    elif response.status_code == 404:
-                        logger.warning(f"URL {url} не найден, пробуем следующий")
-                        continue
-                    else:
-                        logger.error(f"Ошибка отправки информации об удобствах: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.warning(f"Ошибка при запросе к {url}: {e}")
-                    continue
-            
+            response = self._api_request(
+                'submit_hotel_amenities', AMENITIES_URLS, lambda url: self.session.post(url, headers=headers, json=amenities_data)
+            )
+            if response is not None and response.status_code == 200:
+                data = response.json()
+                logger.info(f"Информация об удобствах успешно отправлена: {data}")
+                return True, data
+            if response is not None:
+                logger.error(f"Ошибка отправки информации об удобствах: {response.status_code} - {response.text}")
+                return False, f"Ошибка API: {response.status_code}"
             return False, "Не удалось найти рабочий API эндпоинт для отправки информации об удобствах"
                 
         except Exception as e:
@@ -2101,43 +1970,24 @@ class Hotels101Manager:
         Завершить регистрацию отеля
         """
         try:
-            possible_urls = [
-                "https://extranet.101hotels.com/api/hotel/registration/finalize",
-                "https://extranet.101hotels.com/api/partner/hotel/registration/finalize",
-                "https://extranet.101hotels.com/api/registration/complete",
-                "https://extranet.101hotels.com/api/hotel/complete"
-            ]
-            
             headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
                 "Origin": "https://extranet.101hotels.com",
-                "Referer": "https://extranet.101hotels.com/partner/hotels/add",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8"
+                "Referer": "https://extranet.101hotels.com/partner/hotels/add"
             }
             
             data = final_data or {}
             
-            for url in possible_urls:
-                try:
-                    response = self.session.post(url, headers=headers, json=data)
-                    logger.info(f"Пробуем завершить регистрацию отеля с URL: {url}")
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Регистрация отеля успешно завершена: {data}")
-                        return True, data
-                    elif response.status_code == 404:
-                        logger.warning(f"URL {url} не найден, пробуем следующий")
-                        continue
-                    else:
-                        logger.error(f"Ошибка завершения регистрации отеля: {response.status_code} - {response.text}")
-                        
-                except Exception as e:
-                    logger.warning(f"Ошибка при запросе к {url}: {e}")
-                    continue
-            
+            response = self._api_request(
+                'finalize_hotel_registration', FINALIZE_REGISTRATION_URLS, lambda url: self.session.post(url, headers=headers, json=data)
+            )
+            if response is not None and response.status_code == 200:
+                data = response.json()
+                logger.info(f"Регистрация отеля успешно завершена: {data}")
+                invalidate_reads('101hotels', self.email)
+                return True, data
+            if response is not None:
+                logger.error(f"Ошибка завершения регистрации отеля: {response.status_code} - {response.text}")
+                return False, f"Ошибка API: {response.status_code}"
             return False, "Не удалось найти рабочий API эндпоинт для завершения регистрации отеля"
                 
         except Exception as e:
@@ -0,0 +1,237 @@
+"""
+Общий HTTP-транспорт менеджеров площадок
+У каждого аккаунта своя сессия requests (свои cookies), но все сессии смонтированы на один
+HTTPAdapter: пул keep-alive соединений общий на процесс. Сессии задают таймауты по умолчанию,
+повторяют идемпотентные запросы с экспоненциальной задержкой и джиттером, ограничивают
+число одновременных запросов к одному хосту и собирают гистограммы задержек по эндпоинтам.
+"""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Таймауты (соединение, чтение) в секундах
+DEFAULT_TIMEOUT = (
+    float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+    float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+)
+# Пул: число хостов и соединений на хост (по размеру HTTP-пула потоков executors)
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 16
+HOST_CONCURRENCY = int(os.getenv('HTTP_HOST_CONCURRENCY', '8'))
+
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_JITTER = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# POST не повторяется: повтор создания отеля может создать дубль
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Границы корзин гистограммы задержек, мс
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+BROWSER_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36")
+
+# Заголовки по умолчанию для API площадок; методы передают только отличающиеся (Referer)
+PLATFORM_HEADERS = {
+    '101hotels': {'Origin': 'https://101hotels.com'},
+    'bronevik': {'Origin': 'https://bronevik.com'},
+}
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def api_headers(platform: Optional[str] = None) -> Dict[str, str]:
+    return {
+        'Content-Type': 'application/json',
+        'User-Agent': BROWSER_USER_AGENT,
+        'Accept': 'application/json, text/plain, */*',
+        'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
+        # br - только если установлен brotli, иначе requests не распакует ответ
+        'Accept-Encoding': ACCEPT_ENCODING,
+        **PLATFORM_HEADERS.get(platform, {})
+    }
+
+
+class LatencyHistogram:
+    """Гистограмма задержек одного эндпоинта"""
+
+    __slots__ = ('buckets', 'count', 'errors', 'total_ms', 'max_ms', 'statuses')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.statuses: Dict[int, int] = {}
+
+    def observe(self, elapsed_ms: float, status: Optional[int]):
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and elapsed_ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if status is None:
+            self.errors += 1
+        else:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает квантиль"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[index]) if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'max_ms': self.max_ms,
+            'buckets': dict(zip(labels, self.buckets)),
+            'statuses': dict(self.statuses)
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Имя эндпоинта для метрик: числовые ID в пути заменяются на {id}"""
+    parts = urlsplit(url)
+    return f"{method.upper()} {parts.hostname}{_ID_SEGMENT.sub('/{id}', parts.path)}"
+
+
+def record_latency(method: str, url: str, elapsed: float, status: Optional[int]):
+    """Учесть запрос в гистограмме (status=None - запрос не получил ответа)"""
+    name = endpoint_name(method, url)
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = LatencyHistogram()
+        histogram.observe(elapsed * 1000, status)
+
+
+def get_http_metrics() -> Dict[str, Dict[str, Any]]:
+    """Гистограммы задержек по эндпоинтам"""
+    with _histograms_lock:
+        return {name: histogram.to_dict() for name, histogram in sorted(_histograms.items())}
+
+
+def reset_http_metrics():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+@contextmanager
+def host_slot(host: Optional[str], limit: int = HOST_CONCURRENCY):
+    """Не больше limit одновременных запросов к одному хосту"""
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(limit)
+    with slot:
+        yield
+
+
+def backoff_delay(attempt: int) -> float:
+    """Задержка перед повтором attempt (с 0): экспонента с джиттером, как у Retry"""
+    return RETRY_BACKOFF * (2 ** attempt) + random.uniform(0, RETRY_JITTER)
+
+
+def make_retry() -> Retry:
+    return Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=RETRY_TOTAL,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        backoff_jitter=RETRY_JITTER,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+_adapter: Optional[HTTPAdapter] = None
+_adapter_lock = threading.Lock()
+
+
+def get_adapter() -> HTTPAdapter:
+    """Общий адаптер (пул соединений) процесса"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                                   max_retries=make_retry())
+        return _adapter
+
+
+class PlatformSession(requests.Session):
+    """
+    Сессия аккаунта на общем пуле соединений
+
+    Пример:
+        self.session = create_session('101hotels')
+        response = self.session.get(url, headers={"Referer": "https://101hotels.com/partner/hotels"})
+    """
+
+    def __init__(self, platform: Optional[str] = None, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 adapter: Optional[HTTPAdapter] = None):
+        super().__init__()
+        self.platform = platform
+        self.timeout = timeout
+        self.headers.update(api_headers(platform))
+        adapter = adapter or get_adapter()
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        with host_slot(urlsplit(url).hostname):
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except Exception:
+                record_latency(method, url, time.perf_counter() - started, None)
+                raise
+        record_latency(method, url, time.perf_counter() - started, response.status_code)
+        return response
+
+    def close(self):
+        # Адаптер общий: закрытие одной сессии не должно рвать соединения остальных
+        self.adapters.clear()
+
+
+def create_session(platform: Optional[str] = None, **kwargs) -> PlatformSession:
+    return PlatformSession(platform, **kwargs)
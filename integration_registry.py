@@ -0,0 +1,236 @@
+"""
+Реестр долгоживущих интеграций бота и Mini App
+Интеграции (умная автоматизация, воспроизведение записей, RecordingManager) создаются
+один раз на процесс при первом обращении и дальше используются всеми нажатиями и запросами,
+поэтому рекордеры, кэши и активные запуски не теряются между ними. При остановке приложения
+созданные объекты закрываются в обратном порядке.
+"""
+
+import asyncio
+import importlib
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Фабрика: вызываемый объект или путь "модуль:атрибут" (модуль импортируется при первом обращении)
+Factory = Union[str, Callable[[], Any]]
+Hook = Callable[[Any], Any]
+
+
+def resolve_factory(factory: Factory) -> Callable[[], Any]:
+    if callable(factory):
+        return factory
+    module, _, name = factory.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+class IntegrationSpec:
+    __slots__ = ('name', 'factory', 'startup', 'shutdown', 'instance', 'created_at', 'init_time')
+
+    def __init__(self, name: str, factory: Factory, startup: Optional[Hook], shutdown: Optional[Hook]):
+        self.name = name
+        self.factory = factory
+        self.startup = startup
+        self.shutdown = shutdown
+        self.instance = None
+        self.created_at: Optional[float] = None
+        self.init_time = 0.0
+
+
+class IntegrationProxy:
+    """
+    Ссылка на интеграцию реестра для зависимостей других интеграций
+
+    Экземпляр (и импорт его модуля) создается при первом обращении к атрибуту,
+    после перезапуска реестра ссылка ведет на новый экземпляр.
+    """
+
+    __slots__ = ('_registry', '_name')
+
+    def __init__(self, registry: 'IntegrationRegistry', name: str):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.get(self._name), attr)
+
+
+async def _call_hook(hook: Hook, instance: Any):
+    result = hook(instance)
+    if inspect.isawaitable(result):
+        await result
+
+
+class IntegrationRegistry:
+    """
+    Лениво создаваемые общие объекты с хуками жизненного цикла
+
+    Пример:
+        registry = get_integration_registry()
+        smart = registry.get('smart')        # создается при первом обращении
+        await registry.startup()             # хуки startup уже созданных и созданных позже объектов
+        await registry.shutdown()            # shutdown-хуки в обратном порядке создания
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, IntegrationSpec] = {}
+        # RLock: фабрика может обращаться к реестру за зависимостями
+        self._lock = threading.RLock()
+        self._created: List[str] = []
+        self._started = False
+
+    def register(self, name: str, factory: Factory, startup: Optional[Hook] = None,
+                 shutdown: Optional[Hook] = None, replace: bool = False):
+        """
+        Зарегистрировать интеграцию
+
+        Args:
+            factory: Функция без аргументов или "модуль:атрибут"
+            startup, shutdown: Хуки instance -> None (могут быть корутинами)
+            replace: Заменить уже зарегистрированную (до ее создания)
+        """
+        with self._lock:
+            spec = self._specs.get(name)
+            if spec is not None and not replace:
+                raise ValueError(f"Интеграция {name} уже зарегистрирована")
+            if spec is not None and spec.instance is not None:
+                raise ValueError(f"Интеграция {name} уже создана, заменить ее нельзя")
+            self._specs[name] = IntegrationSpec(name, factory, startup, shutdown)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def get(self, name: str) -> Any:
+        """Общий экземпляр интеграции (создается при первом обращении)"""
+        spec = self._specs.get(name)
+        if spec is None:
+            raise KeyError(f"Интеграция {name} не зарегистрирована")
+        if spec.instance is not None:
+            return spec.instance
+        with self._lock:
+            if spec.instance is None:
+                started = time.perf_counter()
+                instance = resolve_factory(spec.factory)()
+                spec.init_time = time.perf_counter() - started
+                spec.created_at = time.time()
+                spec.instance = instance
+                self._created.append(name)
+                logger.info(f"Интеграция {name} создана за {spec.init_time * 1000:.0f} мс")
+                if self._started and spec.startup:
+                    # Реестр уже запущен - хук startup выполняется сразу (корутина - задачей текущего event loop)
+                    self._run_startup_late(spec)
+        return spec.instance
+
+    def proxy(self, name: str) -> IntegrationProxy:
+        """Ленивая ссылка на интеграцию (без создания)"""
+        if name not in self._specs:
+            raise KeyError(f"Интеграция {name} не зарегистрирована")
+        return IntegrationProxy(self, name)
+
+    def peek(self, name: str) -> Any:
+        """Экземпляр, если он уже создан (без создания)"""
+        spec = self._specs.get(name)
+        return spec.instance if spec else None
+
+    def _run_startup_late(self, spec: IntegrationSpec):
+        try:
+            result = spec.startup(spec.instance)
+            if inspect.isawaitable(result):
+                asyncio.get_running_loop().create_task(result)
+        except Exception as e:
+            logger.error(f"Ошибка запуска интеграции {spec.name}: {e}")
+
+    async def startup(self):
+        """Выполнить startup-хуки созданных интеграций; созданные позже запустятся при создании"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            specs = [self._specs[name] for name in self._created]
+        for spec in specs:
+            if spec.startup:
+                try:
+                    await _call_hook(spec.startup, spec.instance)
+                except Exception as e:
+                    logger.error(f"Ошибка запуска интеграции {spec.name}: {e}")
+
+    async def shutdown(self):
+        """Закрыть созданные интеграции в обратном порядке; следующий get создаст их заново"""
+        with self._lock:
+            names = list(reversed(self._created))
+            self._created.clear()
+            self._started = False
+            specs = [self._specs[name] for name in names]
+        for spec in specs:
+            instance, spec.instance = spec.instance, None
+            if spec.shutdown and instance is not None:
+                try:
+                    await _call_hook(spec.shutdown, instance)
+                except Exception as e:
+                    logger.error(f"Ошибка остановки интеграции {spec.name}: {e}")
+            logger.info(f"Интеграция {spec.name} остановлена")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Состояние интеграций (для диагностики)"""
+        return {
+            name: {
+                'created': spec.instance is not None,
+                'init_ms': round(spec.init_time * 1000, 1),
+                'created_at': spec.created_at
+            }
+            for name, spec in self._specs.items()
+        }
+
+
+def _close(method: str) -> Hook:
+    def hook(instance):
+        close = getattr(instance, method, None)
+        return close() if close else None
+    return hook
+
+
+def register_default_integrations(registry: IntegrationRegistry):
+    """
+    Интеграции бота: общий RecordingManager и использующие его интеграции
+
+    RecordingManager (и Selenium в action_recorder) загружается при первом обращении к нему,
+    а не при создании обработчиков умной автоматизации и записей.
+    """
+    registry.register('recording_manager', 'action_recorder:RecordingManager', shutdown=_close('close'))
+    registry.register(
+        'smart',
+        lambda: resolve_factory('smart_bot_integration:SmartBotIntegration')(registry.proxy('recording_manager')),
+        shutdown=_close('close')
+    )
+    registry.register(
+        'recording',
+        lambda: resolve_factory('recording_bot_integration:RecordingBotIntegration')(registry.proxy('recording_manager'))
+    )
+
+
+_registry: Optional[IntegrationRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_integration_registry() -> IntegrationRegistry:
+    """Общий реестр интеграций процесса"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = IntegrationRegistry()
+            register_default_integrations(_registry)
+        return _registry
+
+
+async def start_integrations(application=None):
+    """post_init для Application: запуск реестра вместе с ботом"""
+    await get_integration_registry().startup()
+
+
+async def stop_integrations(application=None):
+    """post_shutdown для Application: закрытие интеграций вместе с ботом"""
+    await get_integration_registry().shutdown()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Очередь пакетного создания объявлений
+
+Каждое задание - один отель на одной площадке. Задания хранятся в SQLite (db.Database),
+регистрация выполняется по шагам, и после каждого шага результат сохраняется: после падения
+процесса задание продолжается с первого невыполненного шага. Воркеры разбирают очередь
+с ограничением числа одновременных заданий на каждую площадку.
+
+Запуск:
+    python listing_jobs.py submit hotels.csv --platforms bronevik,101hotels --email owner@example.com
+    python listing_jobs.py work --workers 4           # разбирать очередь, пока не прервут
+    python listing_jobs.py work --until-idle          # выполнить накопившееся и выйти
+    python listing_jobs.py status [--batch BATCH_ID]
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from db import Database
+
+logger = logging.getLogger(__name__)
+
+# Сколько заданий одной площадки выполняется одновременно
+PLATFORM_LIMITS = {'bronevik': 2, '101hotels': 1}
+# Аренда задания воркером: если воркер не отметил шаг за это время, задание считается брошенным
+LEASE_SECONDS = 600
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 30
+POLL_INTERVAL = 2.0
+
+# Поля отеля, которые приходят из CSV числами
+NUMERIC_FIELDS = {'latitude': float, 'longitude': float, 'stars': int, 'country_id': int}
+
+StepResult = Tuple[bool, Any]
+Step = Tuple[str, Callable[[Any, Dict[str, Any], Dict[str, Any]], StepResult]]
+
+
+# --- Шаги регистрации ---
+def _geocode_step(geocode_method: str):
+    def geocode(manager, hotel: Dict[str, Any], state: Dict[str, Any]) -> StepResult:
+        if hotel.get('latitude') and hotel.get('longitude'):
+            return True, {'latitude': hotel['latitude'], 'longitude': hotel['longitude']}
+        coords = getattr(manager, geocode_method)(hotel.get('address', ''))
+        if not coords:
+            return False, f"Не удалось определить координаты адреса: {hotel.get('address')}"
+        return True, {'latitude': coords[0], 'longitude': coords[1]}
+    return geocode
+
+
+def _create_step(extra: Optional[Dict[str, Any]] = None):
+    def create(manager, hotel: Dict[str, Any], state: Dict[str, Any]) -> StepResult:
+        hotel_data = {
+            'name': hotel.get('name', ''),
+            'address': hotel.get('address', ''),
+            'city': hotel.get('city', ''),
+            'region': hotel.get('region', ''),
+            'type': hotel.get('type', 'hotel'),
+            'latitude': state['latitude'],
+            'longitude': state['longitude'],
+            # Ключ задан при постановке в очередь: повтор после сбоя не создаст второй отель
+            'idempotency_key': hotel['idempotency_key'],
+            **(extra or {})
+        }
+        status, result = manager.create_hotel(hotel_data)
+        if status != 200 or not isinstance(result, dict):
+            return False, f"Ошибка создания отеля: {result}"
+        hotel_id = result.get('hotelId') or result.get('hotel_id') or result.get('id')
+        if not hotel_id:
+            return False, "Не удалось получить ID отеля"
+        return True, {'hotel_id': hotel_id}
+    return create
+
+
+def _bronevik_update_step(step: str):
+    def update(manager, hotel: Dict[str, Any], state: Dict[str, Any]) -> StepResult:
+        success, result = manager.update_hotel_step(
+            state['hotel_id'], step, manager.get_step_data(step, {**hotel, **state})
+        )
+        return (True, {}) if success else (False, result)
+    return update
+
+
+PIPELINES: Dict[str, List[Step]] = {
+    'bronevik': [
+        ('geocode', _geocode_step('geocode_address_bronevik')),
+        ('create', _create_step({'lastAvailableStep': 'category'})),
+        ('category', _bronevik_update_step('category')),
+        ('name', _bronevik_update_step('name')),
+        ('address', _bronevik_update_step('address')),
+    ],
+    '101hotels': [
+        ('geocode', _geocode_step('geocode_address_101hotels')),
+        ('create', _create_step()),
+    ],
+}
+
+
+def create_manager(platform: str, email: Optional[str]):
+    """Менеджер площадки с cookies аккаунта"""
+    if platform == 'bronevik':
+        from bronevik_manager import BronevikManager
+        return BronevikManager(email=email)
+    if platform == '101hotels':
+        from hotels101_manager import Hotels101Manager
+        return Hotels101Manager(email=email)
+    raise ValueError(f"Неизвестная площадка: {platform}")
+
+
+def read_hotels_csv(source) -> List[Dict[str, Any]]:
+    """
+    Отели из CSV (путь, файл или текст): строка заголовка с именами полей -
+    name, address, city, region, type, latitude, longitude, stars, ...
+    """
+    if isinstance(source, str) and '\n' not in source and os.path.exists(source):
+        with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+            return read_hotels_csv(f)
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    hotels = []
+    for line_no, row in enumerate(csv.DictReader(source), start=2):
+        hotel = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        if not hotel.get('name') or not hotel.get('address'):
+            raise ValueError(f"Строка {line_no}: нужны хотя бы name и address")
+        for field, cast in NUMERIC_FIELDS.items():
+            if field in hotel:
+                try:
+                    hotel[field] = cast(hotel[field].replace(',', '.') if cast is float else hotel[field])
+                except ValueError:
+                    raise ValueError(f"Строка {line_no}: поле {field} должно быть числом")
+        hotels.append(hotel)
+    return hotels
+
+
+class ListingJobQueue:
+    """Постановка заданий и просмотр их состояния"""
+
+    def __init__(self, db: Optional[Database] = None):
+        self.db = db or Database()
+
+    def submit(self, hotels: Iterable[Dict[str, Any]], platforms: List[str],
+               email: Optional[str] = None) -> Tuple[str, List[int]]:
+        """
+        Поставить отели в очередь на каждую из площадок
+
+        Returns:
+            (batch_id, id заданий)
+        """
+        unknown = [platform for platform in platforms if platform not in PIPELINES]
+        if unknown:
+            raise ValueError(f"Неизвестные площадки: {', '.join(unknown)}")
+        batch_id = uuid.uuid4().hex[:12]
+        jobs = []
+        for hotel in hotels:
+            for platform in platforms:
+                payload = {**hotel, 'idempotency_key': hotel.get('idempotency_key') or str(uuid.uuid4())}
+                jobs.append((batch_id, platform, email, json.dumps(payload, ensure_ascii=False)))
+        ids = self.db.add_listing_jobs(jobs)
+        logger.info(f"В очередь поставлено {len(ids)} заданий (пакет {batch_id})")
+        return batch_id, ids
+
+    def submit_csv(self, source, platforms: List[str], email: Optional[str] = None) -> Tuple[str, List[int]]:
+        return self.submit(read_hotels_csv(source), platforms, email)
+
+    def batch_status(self, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """Сводка по пакету (или по всей очереди) и задания пакета"""
+        jobs = self.db.list_listing_jobs(batch_id=batch_id, limit=1000) if batch_id else []
+        return {
+            'batch_id': batch_id,
+            'counts': self.db.count_listing_jobs(batch_id),
+            'jobs': [
+                {'id': job_id, 'platform': platform, 'status': status, 'attempts': attempts,
+                 'last_step': last_step, 'error': error}
+                for job_id, _, platform, status, attempts, last_step, error in jobs
+            ]
+        }
+
+    def job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self.db.get_listing_job(job_id)
+        if row is None:
+            return None
+        (job_id, batch_id, platform, email, payload, state, status, attempts,
+         last_step, error, created_at, updated_at) = row
+        return {
+            'id': job_id, 'batch_id': batch_id, 'platform': platform, 'status': status,
+            'attempts': attempts, 'last_step': last_step, 'error': error,
+            'hotel': json.loads(payload), 'state': json.loads(state),
+            'steps': [step for step, _ in self.db.get_listing_job_steps(job_id)],
+            'created_at': created_at, 'updated_at': updated_at
+        }
+
+
+class ListingJobWorkers:
+    """
+    Пул воркеров очереди
+
+    Пример:
+        workers = ListingJobWorkers(db, workers=4)
+        workers.start()            # в фоне, до workers.stop()
+        workers.run_until_idle()   # или выполнить все готовые задания и вернуться
+    """
+
+    def __init__(self, db: Optional[Database] = None, workers: int = 4,
+                 platform_limits: Optional[Dict[str, int]] = None,
+                 manager_factory: Callable[[str, Optional[str]], Any] = create_manager,
+                 pipelines: Optional[Dict[str, List[Step]]] = None,
+                 lease_seconds: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS,
+                 retry_base_delay: float = RETRY_BASE_DELAY):
+        self.db = db or Database()
+        self.workers = workers
+        self.pipelines = pipelines or PIPELINES
+        self.platform_limits = {**{p: PLATFORM_LIMITS.get(p, 1) for p in self.pipelines}, **(platform_limits or {})}
+        self.manager_factory = manager_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+
+        self._running = {platform: 0 for platform in self.platform_limits}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.stats = {'completed': 0, 'failed': 0, 'retried': 0, 'steps': 0, 'resumed': 0}
+
+    # --- Выбор задания ---
+    def _claim(self, worker: str) -> Optional[Any]:
+        with self._lock:
+            free = [p for p, limit in self.platform_limits.items() if self._running[p] < limit]
+            row = self.db.claim_listing_job(free, worker, time.time(), self.lease_seconds)
+            if row is not None:
+                self._running[row[1]] += 1
+            return row
+
+    def _release(self, platform: str):
+        with self._lock:
+            self._running[platform] -= 1
+
+    # --- Выполнение ---
+    def process(self, row) -> str:
+        """Выполнить задание с первого невыполненного шага; возвращает итоговый статус"""
+        job_id, platform, email, payload, state, attempts = row
+        hotel = json.loads(payload)
+        state = json.loads(state)
+        done = {step for step, _ in self.db.get_listing_job_steps(job_id)}
+        if done:
+            self.stats['resumed'] += 1
+            logger.info(f"Задание {job_id} ({platform}) продолжается после шагов: {sorted(done)}")
+
+        try:
+            manager = self.manager_factory(platform, email)
+        except Exception as e:
+            return self._fail(job_id, platform, attempts, f"Не удалось подготовить менеджер: {e}")
+
+        for step, run_step in self.pipelines[platform]:
+            if step in done:
+                continue
+            try:
+                success, result = run_step(manager, hotel, state)
+            except Exception as e:
+                success, result = False, str(e)
+            if not success:
+                return self._fail(job_id, platform, attempts, f"Шаг {step}: {result}")
+            state.update(result or {})
+            self.db.checkpoint_listing_step(
+                job_id, step, json.dumps(result or {}, ensure_ascii=False),
+                json.dumps(state, ensure_ascii=False), time.time() + self.lease_seconds
+            )
+            self.stats['steps'] += 1
+
+        listing_id = f"{platform}:{state.get('hotel_id', job_id)}"
+        with self.db.transaction():
+            self.db.finish_listing_job(job_id, 'done')
+            self.db.add_new_listing(listing_id, json.dumps({**hotel, **state}, ensure_ascii=False), status='created')
+        self.stats['completed'] += 1
+        logger.info(f"Задание {job_id}: объявление {listing_id} создано")
+        return 'done'
+
+    def _fail(self, job_id: int, platform: str, attempts: int, error: str) -> str:
+        attempts += 1
+        if attempts >= self.max_attempts:
+            self.db.finish_listing_job(job_id, 'failed', error=error, attempt_failed=True)
+            self.stats['failed'] += 1
+            logger.error(f"Задание {job_id} ({platform}) не выполнено за {attempts} попыток: {error}")
+            return 'failed'
+        delay = self.retry_base_delay * 2 ** (attempts - 1)
+        self.db.finish_listing_job(job_id, 'pending', error=error, run_after=time.time() + delay, attempt_failed=True)
+        self.stats['retried'] += 1
+        logger.warning(f"Задание {job_id} ({platform}): {error}; повтор через {delay:.0f}с")
+        return 'pending'
+
+    def _worker_loop(self, name: str, until_idle: bool):
+        while not self._stop.is_set():
+            row = self._claim(name)
+            if row is None:
+                if until_idle:
+                    return
+                self._stop.wait(POLL_INTERVAL)
+                continue
+            try:
+                self.process(row)
+            except Exception as e:
+                logger.error(f"Воркер {name}: ошибка задания {row[0]}: {e}")
+            finally:
+                self._release(row[1])
+
+    def start(self):
+        """Запустить воркеры в фоновых потоках"""
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._worker_loop, args=(f'listing-worker-{i}', False),
+                             daemon=True, name=f'listing-worker-{i}')
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Запущено {self.workers} воркеров очереди объявлений, лимиты: {self.platform_limits}")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Остановить воркеры после текущих заданий"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_until_idle(self):
+        """Выполнить все готовые к запуску задания и вернуться"""
+        threads = [
+            threading.Thread(target=self._worker_loop, args=(f'listing-worker-{i}', True), daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Пакетное создание объявлений')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    submit = subparsers.add_parser('submit', help='поставить отели из CSV в очередь')
+    submit.add_argument('csv', help='CSV с отелями (name,address,city,region,type,...)')
+    submit.add_argument('--platforms', default=','.join(PIPELINES), help='площадки через запятую')
+    submit.add_argument('--email', help='аккаунт площадок (cookies из sessions/)')
+
+    work = subparsers.add_parser('work', help='разбирать очередь')
+    work.add_argument('--workers', type=int, default=4)
+    work.add_argument('--until-idle', action='store_true', help='выйти, когда готовых заданий не останется')
+
+    status = subparsers.add_parser('status', help='состояние очереди')
+    status.add_argument('--batch', help='id пакета')
+    args = parser.parse_args()
+
+    db = Database()
+    if args.command == 'submit':
+        platforms = [p.strip() for p in args.platforms.split(',') if p.strip()]
+        batch_id, ids = ListingJobQueue(db).submit_csv(args.csv, platforms, args.email)
+        print(f"✅ Пакет {batch_id}: {len(ids)} заданий")
+    elif args.command == 'work':
+        workers = ListingJobWorkers(db, workers=args.workers)
+        if args.until_idle:
+            workers.run_until_idle()
+            print(f"✅ Готово: {workers.stats}")
+        else:
+            workers.start()
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                print("⏹ Останавливаем воркеры после текущих заданий...")
+                workers.stop()
+    else:
+        print(json.dumps(ListingJobQueue(db).batch_status(args.batch), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -25,3 +25,12 @@ class handler(BaseHTTPRequestHandler):
     
     def do_POST(self):
         self.do_GET()
+
+if __name__ == "__main__":
+    import sys
+    from startup_profile import get_startup_profiler, probe_http_handler
+
+    # Профилирование старта (--profile-startup): первый запрос к обработчику на локальном порту
+    profiler = get_startup_profiler('main')
+    if profiler:
+        sys.exit(profiler.run(probe_http_handler, handler))
@@ -4,17 +4,12 @@
 Альтернативный метод записи, который работает даже если JavaScript заблокирован
 """
 
-import json
-import time
 import os
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from browser_pool import get_browser_pool, RECORDER_CHROME_ARGS
+from dom_snapshot import DomSnapshotter
+from recording_catalog import get_catalog
+from recording_format import recording_extension, save_recording
 import logging
 
 # Настройка логирования
@@ -24,33 +19,30 @@ logger = logging.getLogger(__name__)
 class ManualRecorder:
     """Ручная система записи действий"""
     
-    def __init__(self, platform_name):
+    def __init__(self, platform_name, diff_snapshots=False):
         self.platform_name = platform_name
         self.actions = []
         self.driver = None
         self.recording = False
         self.recordings_dir = "recorded_actions"
+        # diff_snapshots: повторные снимки той же страницы хранят только изменившиеся элементы
+        self.snapshotter = DomSnapshotter(diff=diff_snapshots)
         
         # Создаем директорию для записей
         if not os.path.exists(self.recordings_dir):
             os.makedirs(self.recordings_dir)
     
     def setup_driver(self):
-        """Настройка веб-драйвера"""
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--allow-running-insecure-content")
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
+        """Получить веб-драйвер из пула браузеров"""
+        self.driver = get_browser_pool().acquire(headless=False, extra_args=RECORDER_CHROME_ARGS)
         return self.driver
-    
+
+    def release_driver(self):
+        """Вернуть браузер в пул"""
+        if self.driver:
+            get_browser_pool().release(self.driver)
+            self.driver = None
+
     def start_recording(self, url):
         """Начать запись действий"""
         try:
@@ -58,6 +50,7 @@ class ManualRecorder:
             self.driver.get(url)
             self.recording = True
             self.actions = []
+            self.snapshotter.reset()
             
             # Записываем начальную навигацию
             self.actions.append({
@@ -77,91 +70,24 @@ class ManualRecorder:
             return False
     
     def record_current_page_state(self):
-        """Записать текущее состояние страницы"""
+        """Записать текущее состояние страницы (один запрос к браузеру)"""
         try:
-            current_url = self.driver.current_url
-            page_title = self.driver.title
-            
-            # Ищем все интерактивные элементы
-            elements = []
-            
-            # Поля ввода
-            inputs = self.driver.find_elements(By.TAG_NAME, "input")
-            for inp in inputs:
-                if inp.is_displayed():
-                    elements.append({
-                        'type': 'input',
-                        'tagName': inp.tag_name,
-                        'id': inp.get_attribute('id') or '',
-                        'name': inp.get_attribute('name') or '',
-                        'className': inp.get_attribute('class') or '',
-                        'type_attr': inp.get_attribute('type') or '',
-                        'value': inp.get_attribute('value') or '',
-                        'placeholder': inp.get_attribute('placeholder') or '',
-                        'xpath': self.get_xpath(inp)
-                    })
-            
-            # Кнопки
-            buttons = self.driver.find_elements(By.TAG_NAME, "button")
-            for btn in buttons:
-                if btn.is_displayed():
-                    elements.append({
-                        'type': 'button',
-                        'tagName': btn.tag_name,
-                        'id': btn.get_attribute('id') or '',
-                        'name': btn.get_attribute('name') or '',
-                        'className': btn.get_attribute('class') or '',
-                        'text': btn.text or '',
-                        'xpath': self.get_xpath(btn)
-                    })
-            
-            # Ссылки
-            links = self.driver.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                if link.is_displayed():
-                    elements.append({
-                        'type': 'link',
-                        'tagName': link.tag_name,
-                        'id': link.get_attribute('id') or '',
-                        'className': link.get_attribute('class') or '',
-                        'text': link.text or '',
-                        'href': link.get_attribute('href') or '',
-                        'xpath': self.get_xpath(link)
-                    })
-            
-            # Select элементы
-            selects = self.driver.find_elements(By.TAG_NAME, "select")
-            for select in selects:
-                if select.is_displayed():
-                    options = []
-                    for option in select.find_elements(By.TAG_NAME, "option"):
-                        options.append({
-                            'value': option.get_attribute('value') or '',
-                            'text': option.text or ''
-                        })
-                    
-                    elements.append({
-                        'type': 'select',
-                        'tagName': select.tag_name,
-                        'id': select.get_attribute('id') or '',
-                        'name': select.get_attribute('name') or '',
-                        'className': select.get_attribute('class') or '',
-                        'options': options,
-                        'xpath': self.get_xpath(select)
-                    })
+            state = self.snapshotter.capture(self.driver)
             
             # Записываем состояние страницы
             page_state = {
                 'type': 'page_state',
-                'url': current_url,
-                'title': page_title,
-                'elements': elements,
+                **state,
                 'timestamp': datetime.now().isoformat()
             }
             
             self.actions.append(page_state)
-            logger.info(f"Записано состояние страницы: {current_url}")
-            logger.info(f"Найдено элементов: {len(elements)}")
+            logger.info(f"Записано состояние страницы: {state['url']}")
+            if state.get('diff'):
+                logger.info(f"Изменилось элементов: {len(state['elements'])}, "
+                            f"без изменений: {state['unchanged']}, исчезло: {len(state['removed'])}")
+            else:
+                logger.info(f"Найдено элементов: {len(state['elements'])}")
             
             return page_state
             
@@ -169,22 +95,6 @@ class ManualRecorder:
             logger.error(f"Ошибка при записи состояния страницы: {e}")
             return None
     
-    def get_xpath(self, element):
-        """Получить XPath элемента"""
-        try:
-            if element.get_attribute('id'):
-                return f"//*[@id='{element.get_attribute('id')}']"
-            
-            # Простой XPath по тегу и классу
-            tag = element.tag_name
-            class_name = element.get_attribute('class')
-            if class_name:
-                return f"//{tag}[contains(@class, '{class_name.split()[0]}')]"
-            
-            return f"//{tag}"
-        except:
-            return ""
-    
     def record_navigation(self):
         """Записать навигацию"""
         try:
@@ -206,18 +116,16 @@ class ManualRecorder:
             if self.actions:
                 # Сохраняем в файл
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{self.recordings_dir}/{self.platform_name}_manual_{timestamp}.json"
+                filename = f"{self.recordings_dir}/{self.platform_name}_manual_{timestamp}{recording_extension()}"
                 
-                recording_data = {
+                header = {
                     "platform": self.platform_name,
                     "recording_type": "manual",
-                    "created_at": datetime.now().isoformat(),
-                    "total_actions": len(self.actions),
-                    "actions": self.actions
+                    "created_at": datetime.now().isoformat()
                 }
                 
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(recording_data, f, ensure_ascii=False, indent=2)
+                save_recording(filename, header, self.actions)
+                get_catalog(self.recordings_dir).register(filename)
                 
                 logger.info(f"Запись сохранена в файл: {filename}")
                 logger.info(f"Записано действий: {len(self.actions)}")
@@ -231,7 +139,7 @@ class ManualRecorder:
             return None
         finally:
             if self.driver:
-                self.driver.quit()
+                self.release_driver()
 
 def main():
     """Главная функция"""
@@ -266,9 +174,11 @@ def main():
     print("5. Введите 'state' для записи текущего состояния страницы")
     print("6. Введите 'nav' для записи навигации")
     
+    diff_mode = input("\nЗаписывать только изменения страницы между снимками? (y/N): ").strip().lower() == 'y'
+    
     input("\nНажмите Enter, чтобы начать...")
     
-    recorder = ManualRecorder(platform_id)
+    recorder = ManualRecorder(platform_id, diff_snapshots=diff_mode)
     
     if recorder.start_recording(url):
         print("\n✅ Запись начата! Выполните действия в браузере...")
@@ -7,8 +7,9 @@ API сервер для Mini App Hotel Bot
 import asyncio
 import json
 import logging
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
@@ -17,8 +18,16 @@ from pydantic import BaseModel
 import uvicorn
 
 # Импорты из основного бота
-from smart_bot_integration import SmartBotIntegration
-from action_recorder import RecordingManager
+from integration_registry import get_integration_registry, start_integrations, stop_integrations
+from parallel_replay import ParallelReplayRun
+from listing_jobs import ListingJobQueue, ListingJobWorkers
+from executors import run_blocking
+from endpoint_discovery import get_endpoint_discovery
+from http_transport import get_http_metrics
+from replay_profile import profile_path
+from webhook import WebhookWorkers, mount_webhook, webhook_enabled, webhook_lifespan
+from recording_catalog import get_catalog
+from recording_format import find_recording, split_recording_extension
 from config import BOT_TOKEN, BNOVO_API_KEY
 
 # Настройка логирования
@@ -51,13 +60,39 @@ class SettingsRequest(BaseModel):
     bnovo_api_key: Optional[str] = None
     debug_mode: Optional[bool] = None
 
+class ListingJobsRequest(BaseModel):
+    csv: str
+    platforms: List[str]
+    email: Optional[str] = None
+
 class NotificationSettingsRequest(BaseModel):
     booking_notifications: bool
     status_notifications: bool
     error_notifications: bool
 
+# Очередь пакетного создания объявлений; воркеры стартуют с приложением и продолжают прерванные задания
+listing_queue = ListingJobQueue()
+listing_workers = ListingJobWorkers(listing_queue.db)
+
+# Режим webhook: обновления Telegram принимает это приложение, обрабатывают воркер-процессы бота
+webhook_workers = WebhookWorkers() if webhook_enabled() else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Старт и остановка приложения: воркеры заданий, общие интеграции и воркеры webhook"""
+    listing_workers.start()
+    await start_integrations()
+    try:
+        async with AsyncExitStack() as stack:
+            if webhook_workers is not None:
+                await stack.enter_async_context(webhook_lifespan(webhook_workers, token=BOT_TOKEN))
+            yield
+    finally:
+        listing_workers.stop(timeout=5)
+        await stop_integrations()
+
 # Создание FastAPI приложения
-app = FastAPI(title="Hotel Bot Mini App API", version="1.0.0")
+app = FastAPI(title="Hotel Bot Mini App API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -71,13 +106,17 @@ app.add_middleware(
 # Подключение статических файлов
 app.mount("/static", StaticFiles(directory="mini_app"), name="static")
 
-# Глобальные объекты
-smart_integration = SmartBotIntegration()
-recording_manager = RecordingManager()
-
+# Глобальные объекты (RecordingManager шаблонов - общий экземпляр реестра интеграций, см. templates_manager)
 # Кэш для хранения данных пользователей
 user_cache = {}
 
+# Активные запуски умной автоматизации: user_id -> ParallelReplayRun
+active_runs: Dict[str, ParallelReplayRun] = {}
+SMART_RUN_DEADLINE = 900
+
+if webhook_workers is not None:
+    mount_webhook(app, webhook_workers)
+
 def get_user_id(request: Request) -> str:
     """Получение ID пользователя из заголовков или параметров"""
     # В реальном приложении здесь будет проверка подписи Telegram
@@ -126,21 +165,68 @@ async def handle_smart_automation(request: SmartAutomationRequest, user_id: str
         # Выбор платформ
         selected_platforms = [platform for platform, selected in request.platforms.items() if selected]
         
-        # Запуск умной автоматизации
-        results = await smart_integration.process_universal_creation(
-            user_data, selected_platforms, user_id
-        )
+        # Запуск умной автоматизации: все платформы параллельно
+        if user_id in active_runs:
+            raise HTTPException(status_code=409, detail="Создание объявлений уже выполняется")
+        run = ParallelReplayRun(selected_platforms, user_data)
+        active_runs[user_id] = run
+        try:
+            results = await run.run(deadline=SMART_RUN_DEADLINE)
+        finally:
+            active_runs.pop(user_id, None)
         
+        success = all(result.get('success') for result in results.values())
         return JSONResponse(content={
-            "success": True,
-            "message": "Объявления успешно созданы",
+            "success": success,
+            "message": "Объявления успешно созданы" if success else "Объявления созданы не на всех платформах",
             "results": results
         })
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Ошибка умной автоматизации: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/smart_automation/cancel")
+async def cancel_smart_automation(user_id: str = Depends(get_user_id)):
+    """Остановить выполняющуюся умную автоматизацию пользователя"""
+    run = active_runs.get(user_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Нет активного создания объявлений")
+    run.cancel()
+    return JSONResponse(content={"success": True, "message": "Останавливаем после текущего действия"})
+
+@app.post("/api/listing_jobs")
+async def submit_listing_jobs(request: ListingJobsRequest, user_id: str = Depends(get_user_id)):
+    """Поставить в очередь создание объявлений для отелей из CSV"""
+    try:
+        batch_id, job_ids = await run_blocking(listing_queue.submit_csv, request.csv, request.platforms, request.email)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Пользователь {user_id} поставил в очередь {len(job_ids)} заданий (пакет {batch_id})")
+    return JSONResponse(content={"success": True, "batch_id": batch_id, "jobs": len(job_ids)})
+
+@app.get("/api/listing_jobs/{batch_id}")
+async def get_listing_jobs(batch_id: str, user_id: str = Depends(get_user_id)):
+    """Состояние пакета заданий"""
+    status = await run_blocking(listing_queue.batch_status, batch_id)
+    if not status['counts']:
+        raise HTTPException(status_code=404, detail="Пакет не найден")
+    return JSONResponse(content={"success": True, **status})
+
+@app.get("/api/endpoints")
+async def get_learned_endpoints(platform: Optional[str] = None, user_id: str = Depends(get_user_id)):
+    """Рабочие URL API площадок, найденные перебором кандидатов"""
+    discovery = get_endpoint_discovery()
+    endpoints = await run_blocking(discovery.snapshot, platform)
+    return JSONResponse(content={"success": True, "endpoints": endpoints, "stats": discovery.stats})
+
+@app.get("/api/http_metrics")
+async def get_http_latency(user_id: str = Depends(get_user_id)):
+    """Гистограммы задержек запросов к API площадок"""
+    return JSONResponse(content={"success": True, "endpoints": get_http_metrics()})
+
 @app.post("/api/open_platform")
 async def handle_open_platform(request: PlatformRequest, user_id: str = Depends(get_user_id)):
     """Открытие платформы в браузере"""
@@ -174,8 +260,8 @@ async def get_templates(user_id: str = Depends(get_user_id)):
     try:
         logger.info(f"Запрос шаблонов от пользователя {user_id}")
         
-        # Получение шаблонов из recording_manager
-        templates = recording_manager.get_user_templates(user_id)
+        # Получение шаблонов из общего RecordingManager
+        templates = templates_manager().get_user_templates(user_id)
         
         return JSONResponse(content={
             "success": True,
@@ -193,7 +279,7 @@ async def play_template(request: TemplateRequest, user_id: str = Depends(get_use
         logger.info(f"Запрос воспроизведения шаблона {request.template_id} от пользователя {user_id}")
         
         # Воспроизведение шаблона
-        result = await recording_manager.play_template(request.template_id, user_id)
+        result = await templates_manager().play_template(request.template_id, user_id)
         
         if result['success']:
             return JSONResponse(content={
@@ -214,7 +300,7 @@ async def delete_template(template_id: str, user_id: str = Depends(get_user_id))
         logger.info(f"Запрос удаления шаблона {template_id} от пользователя {user_id}")
         
         # Удаление шаблона
-        result = recording_manager.delete_template(template_id, user_id)
+        result = templates_manager().delete_template(template_id, user_id)
         
         if result['success']:
             return JSONResponse(content={
@@ -339,36 +425,9 @@ class SmartBotIntegration:
         }
     
     async def process_universal_creation(self, user_data: Dict[str, Any], platforms: list, user_id: str) -> Dict[str, Any]:
-        """Обработка универсального создания объявлений"""
-        results = {}
-        
-        for platform in platforms:
-            try:
-                logger.info(f"Создание объявления на платформе {platform} для пользователя {user_id}")
-                
-                # Получение шаблона для платформы
-                template = self.recording_manager.get_platform_template(platform, user_id)
-                
-                if not template:
-                    results[platform] = {
-                        'success': False,
-                        'error': f'Шаблон для платформы {platform} не найден'
-                    }
-                    continue
-                
-                # Воспроизведение шаблона с данными пользователя
-                result = await self.recording_manager.play_template_with_data(template['id'], user_data, user_id)
-                
-                results[platform] = result
-                
-            except Exception as e:
-                logger.error(f"Ошибка создания объявления на {platform}: {e}")
-                results[platform] = {
-                    'success': False,
-                    'error': str(e)
-                }
-        
-        return results
+        """Обработка универсального создания объявлений (все платформы параллельно)"""
+        logger.info(f"Создание объявлений на {platforms} для пользователя {user_id}")
+        return await ParallelReplayRun(platforms, user_data).run(deadline=SMART_RUN_DEADLINE)
 
 # Расширение RecordingManager для работы с API
 class RecordingManager:
@@ -379,34 +438,18 @@ class RecordingManager:
         self.templates_cache = {}
     
     def get_user_templates(self, user_id: str) -> list:
-        """Получение шаблонов пользователя"""
+        """Получение шаблонов пользователя (свои и общие, от новых к старым)"""
         templates = []
         
         try:
-            import os
-            import json
-            
-            if not os.path.exists(self.recordings_dir):
-                return templates
-            
-            for filename in os.listdir(self.recordings_dir):
-                if filename.endswith('.json'):
-                    try:
-                        with open(os.path.join(self.recordings_dir, filename), 'r', encoding='utf-8') as f:
-                            template_data = json.load(f)
-                        
-                        # Фильтрация по пользователю (в реальном приложении)
-                        templates.append({
-                            'id': filename.replace('.json', ''),
-                            'name': template_data.get('name', 'Без названия'),
-                            'platform': template_data.get('platform', 'unknown'),
-                            'actions_count': len(template_data.get('actions', [])),
-                            'created_at': template_data.get('created_at', datetime.now().isoformat())
-                        })
-                    except Exception as e:
-                        logger.error(f"Ошибка чтения шаблона {filename}: {e}")
-                        continue
-        
+            for rec in get_catalog(self.recordings_dir).recordings(user_id=user_id):
+                templates.append({
+                    'id': split_recording_extension(rec['filename'])[0],
+                    'name': rec['name'] or 'Без названия',
+                    'platform': rec['platform'],
+                    'actions_count': rec['total_actions'],
+                    'created_at': rec['created_at'] or datetime.now().isoformat()
+                })
         except Exception as e:
             logger.error(f"Ошибка получения шаблонов: {e}")
         
@@ -414,13 +457,20 @@ class RecordingManager:
     
     def get_platform_template(self, platform: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Получение шаблона для конкретной платформы"""
-        templates = self.get_user_templates(user_id)
-        
-        for template in templates:
-            if template['platform'] == platform:
-                return template
-        
-        return None
+        try:
+            rec = get_catalog(self.recordings_dir).latest(platform, user_id=user_id)
+        except Exception as e:
+            logger.error(f"Ошибка получения шаблона {platform}: {e}")
+            return None
+        if not rec:
+            return None
+        return {
+            'id': split_recording_extension(rec['filename'])[0],
+            'name': rec['name'] or 'Без названия',
+            'platform': rec['platform'],
+            'actions_count': rec['total_actions'],
+            'created_at': rec['created_at']
+        }
     
     async def play_template(self, template_id: str, user_id: str) -> Dict[str, Any]:
         """Воспроизведение шаблона"""
@@ -459,10 +509,14 @@ class RecordingManager:
         try:
             import os
             
-            template_path = os.path.join(self.recordings_dir, f"{template_id}.json")
+            template_path = find_recording(self.recordings_dir, template_id)
             
-            if os.path.exists(template_path):
+            if template_path:
                 os.remove(template_path)
+                get_catalog(self.recordings_dir).remove(template_path)
+                # Вместе с шаблоном удаляем его профиль воспроизведения
+                if os.path.exists(profile_path(template_path)):
+                    os.remove(profile_path(template_path))
                 return {
                     'success': True,
                     'message': 'Шаблон удален'
@@ -478,6 +532,14 @@ class RecordingManager:
                 'error': str(e)
             }
 
+# Шаблоны API - одна долгоживущая копия на процесс (повторный импорт модуля ее не пересоздает)
+if 'mini_app_templates' not in get_integration_registry():
+    get_integration_registry().register('mini_app_templates', RecordingManager)
+
+def templates_manager() -> RecordingManager:
+    """Общий RecordingManager шаблонов Mini App"""
+    return get_integration_registry().get('mini_app_templates')
+
 def main():
     """Запуск API сервера"""
     print("🚀 Запуск Hotel Bot Mini App API...")
@@ -0,0 +1,265 @@
+"""
+Диспетчер уведомлений Telegram
+Пул воркеров с учетом лимитов Telegram (глобальный и по чатам), обработкой RetryAfter
+и объединением нескольких уведомлений одному пользователю в одно сообщение
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+logger = logging.getLogger(__name__)
+
+# Лимиты Telegram Bot API: ~30 сообщений/с на бота и ~1 сообщение/с в один чат
+TELEGRAM_GLOBAL_RATE = 30.0
+TELEGRAM_PER_CHAT_RATE = 1.0
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+MESSAGE_SEPARATOR = "\n\n"
+# Как часто (секунды) удалять ведра чатов, которые успели наполниться
+BUCKET_SWEEP_INTERVAL = 60.0
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не более capacity подряд"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self, now: float) -> bool:
+        """Наполнилось ли ведро - тогда оно не отличается от нового"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+    def reserve(self) -> float:
+        """Забрать токен; вернуть сколько секунд нужно подождать до его появления"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    async def acquire(self):
+        """Дождаться токена"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class NotificationDispatcher:
+    """Конкурентная рассылка уведомлений с ограничением скорости"""
+
+    def __init__(self, bot, workers: int = 8, global_rate: float = TELEGRAM_GLOBAL_RATE,
+                 per_chat_rate: float = TELEGRAM_PER_CHAT_RATE, max_retries: int = 3,
+                 parse_mode: Optional[str] = 'Markdown', latency_window: int = 1000,
+                 bucket_sweep_interval: float = BUCKET_SWEEP_INTERVAL):
+        self.bot = bot
+        self.workers = workers
+        self.per_chat_rate = per_chat_rate
+        self.max_retries = max_retries
+        self.parse_mode = parse_mode
+
+        self.global_bucket = TokenBucket(global_rate)
+        # Ведра есть только у чатов, которым недавно писали: наполнившиеся удаляются при проверке
+        self.chat_buckets: Dict[int, TokenBucket] = {}
+        self.bucket_sweep_interval = bucket_sweep_interval
+        self._buckets_swept = time.monotonic()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Тексты, ожидающие отправки, по чатам; чат стоит в очереди не более одного раза
+        self._pending: Dict[int, List[str]] = {}
+        self._queued: Set[int] = set()
+        self._in_flight: Set[int] = set()
+        self._enqueued_at: Dict[int, float] = {}
+        self._paused_until = 0.0
+
+        self.stats = {'enqueued': 0, 'sent': 0, 'messages': 0, 'coalesced': 0, 'retries': 0, 'failed': 0}
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._send_times: Deque[float] = deque(maxlen=latency_window)
+
+    # --- Жизненный цикл ---
+    def start(self):
+        """Запустить воркеры в текущем event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        # Чаты, поставленные до старта
+        for chat_id in self._queued:
+            self._queue.put_nowait(chat_id)
+        logger.info(f"Диспетчер уведомлений запущен: {self.workers} воркеров")
+
+    async def join(self):
+        """Дождаться отправки всех поставленных уведомлений"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self, drain: bool = True):
+        """Остановить воркеры (по умолчанию после отправки очереди)"""
+        if drain:
+            await self.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    # --- Постановка в очередь ---
+    def enqueue(self, chat_id: int, text: str):
+        """Поставить уведомление в очередь (запускает воркеры при необходимости)"""
+        self.enqueue_many(chat_id, [text])
+
+    def enqueue_many(self, chat_id: int, texts: Iterable[str]):
+        """Поставить несколько уведомлений одному пользователю"""
+        texts = [text for text in texts if text]
+        if not texts:
+            return
+        if not self._tasks:
+            self.start()
+
+        self._pending.setdefault(chat_id, []).extend(texts)
+        self._enqueued_at.setdefault(chat_id, time.monotonic())
+        self.stats['enqueued'] += len(texts)
+        self._schedule(chat_id)
+
+    def broadcast(self, chat_ids: Iterable[int], texts: List[str]):
+        """Разослать одинаковые уведомления списку пользователей"""
+        for chat_id in chat_ids:
+            self.enqueue_many(chat_id, texts)
+
+    def _schedule(self, chat_id: int):
+        # Чат в работе у воркера - он сам перепоставит его после отправки
+        if chat_id in self._queued or chat_id in self._in_flight:
+            return
+        self._queued.add(chat_id)
+        if self._queue is not None:
+            self._queue.put_nowait(chat_id)
+
+    # --- Отправка ---
+    def coalesce(self, texts: List[str]) -> List[str]:
+        """Объединить тексты в минимальное число сообщений с учетом лимита длины"""
+        messages = []
+        current = ""
+        for text in texts:
+            text = text[:TELEGRAM_MAX_MESSAGE_LENGTH]
+            candidate = f"{current}{MESSAGE_SEPARATOR}{text}" if current else text
+            if len(candidate) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                messages.append(current)
+                current = text
+            else:
+                current = candidate
+        if current:
+            messages.append(current)
+        return messages
+
+    async def _worker(self, index: int):
+        while True:
+            chat_id = await self._queue.get()
+            self._queued.discard(chat_id)
+            self._in_flight.add(chat_id)
+            try:
+                texts = self._pending.pop(chat_id, [])
+                enqueued_at = self._enqueued_at.pop(chat_id, time.monotonic())
+                messages = self.coalesce(texts)
+                self.stats['coalesced'] += len(texts) - len(messages)
+                for message in messages:
+                    await self._send_with_retry(chat_id, message)
+                if texts:
+                    self._latencies.append(time.monotonic() - enqueued_at)
+            except Exception as e:
+                logger.error(f"Воркер уведомлений {index}: ошибка для чата {chat_id}: {e}")
+            finally:
+                self._in_flight.discard(chat_id)
+                if self._pending.get(chat_id):
+                    self._schedule(chat_id)
+                self._queue.task_done()
+
+    async def _wait_for_slot(self, chat_id: int):
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        now = time.monotonic()
+        if now - self._buckets_swept >= self.bucket_sweep_interval:
+            self._sweep_buckets(now)
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, 1.0)
+        await bucket.acquire()
+        await self.global_bucket.acquire()
+
+    def _sweep_buckets(self, now: float):
+        """Удалить наполнившиеся ведра: иначе словарь растет на каждый чат, которому бот писал"""
+        self.chat_buckets = {
+            chat_id: bucket for chat_id, bucket in self.chat_buckets.items() if not bucket.is_full(now)
+        }
+        self._buckets_swept = now
+
+    async def _send_with_retry(self, chat_id: int, text: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_slot(chat_id)
+            started = time.monotonic()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text, parse_mode=self.parse_mode)
+                self._send_times.append(time.monotonic() - started)
+                self.stats['sent'] += 1
+                self.stats['messages'] += text.count(MESSAGE_SEPARATOR) + 1
+                return True
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                # Flood control действует на весь бот - приостанавливаем всех воркеров
+                self._paused_until = max(self._paused_until, time.monotonic() + float(retry_after))
+                self.stats['retries'] += 1
+                logger.warning(f"Telegram просит подождать {retry_after}с (чат {chat_id})")
+            except (Forbidden, BadRequest) as e:
+                # Пользователь заблокировал бота или сообщение некорректно - повтор не поможет
+                logger.error(f"Ошибка отправки уведомления пользователю {chat_id}: {e}")
+                break
+            except (TimedOut, NetworkError) as e:
+                self.stats['retries'] += 1
+                logger.warning(f"Сетевая ошибка при отправке в чат {chat_id}: {e}")
+                await asyncio.sleep(min(2 ** attempt, 30))
+        self.stats['failed'] += 1
+        return False
+
+    # --- Метрики ---
+    @staticmethod
+    def _percentiles(values) -> Dict[str, float]:
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        ordered = sorted(values)
+        return {
+            'p50': ordered[len(ordered) // 2],
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'max': ordered[-1]
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество уведомлений, ожидающих отправки"""
+        return sum(len(texts) for texts in self._pending.values())
+
+    def get_metrics(self) -> Dict:
+        """Метрики очереди и задержек отправки"""
+        return {
+            **self.stats,
+            'queue_depth': self.queue_depth,
+            'chats_waiting': len(self._queued),
+            'chats_in_flight': len(self._in_flight),
+            'chat_buckets': len(self.chat_buckets),
+            'delivery_latency': self._percentiles(self._latencies),
+            'send_latency': self._percentiles(self._send_times)
+        }
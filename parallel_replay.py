@@ -0,0 +1,134 @@
+"""
+Параллельное создание объявлений на нескольких платформах
+Каждая платформа воспроизводится в своем рекордере (и своем браузере из пула) одновременно
+с остальными; результаты отдаются по мере готовности, запуск можно отменить или ограничить дедлайном.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from action_recorder import ActionRecorder
+from executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Общий дедлайн на создание объявлений на всех платформах (секунды)
+DEFAULT_DEADLINE = 900
+# Сколько ждать остановки воспроизведения после отмены
+CANCEL_GRACE_PERIOD = 30
+
+ProgressCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def replay_platform(run: 'ParallelReplayRun', platform: str) -> Dict[str, Any]:
+    """Воспроизвести последний шаблон платформы (выполняется в потоке пула браузеров)"""
+    started = time.monotonic()
+    # Отдельный рекордер на каждый запуск: состояние записи не делится между пользователями
+    recorder = run.recorder_factory(platform)
+
+    recordings = recorder.get_available_recordings()
+    if not recordings:
+        return {'success': False, 'error': 'Нет доступных шаблонов'}
+
+    # Записи отсортированы от новых к старым
+    latest_recording = recordings[0]
+    if not recorder.load_recording(latest_recording['filepath']):
+        return {'success': False, 'error': 'Не удалось загрузить шаблон', 'template': latest_recording['filename']}
+
+    result = recorder.replay_actions(run.user_data, delay=run.delay, cancel_event=run.cancel_event)
+    if run.cancelled:
+        error = 'Превышено время ожидания' if run.deadline_expired else 'Отменено'
+        return {'success': False, 'error': error, 'template': latest_recording['filename']}
+    return {
+        'success': bool(result),
+        'template': latest_recording['filename'],
+        'elapsed': round(time.monotonic() - started, 1)
+    }
+
+
+class ParallelReplayRun:
+    """Один запуск создания объявлений на нескольких платформах"""
+
+    def __init__(self, platforms: List[str], user_data: Dict[str, Any], delay: float = 1.5,
+                 recorder_factory: Callable[[str], Any] = ActionRecorder):
+        self.platforms = list(platforms)
+        self.user_data = user_data
+        self.delay = delay
+        self.recorder_factory = recorder_factory
+        # threading.Event: проверяется внутри воспроизведения в потоке пула
+        self.cancel_event = threading.Event()
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.deadline_expired = False
+
+    def cancel(self):
+        """Остановить воспроизведение на всех платформах (после текущего действия)"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    async def run(self, on_progress: Optional[ProgressCallback] = None,
+                  deadline: Optional[float] = DEFAULT_DEADLINE) -> Dict[str, Dict[str, Any]]:
+        """
+        Запустить воспроизведение на всех платформах одновременно
+
+        Args:
+            on_progress: Корутина (platform, result), вызывается по готовности каждой платформы
+            deadline: Общий лимит времени в секундах; по истечении оставшиеся платформы отменяются
+
+        Returns:
+            Dict[str, Dict]: результат по каждой платформе
+        """
+        tasks = {
+            asyncio.create_task(
+                run_blocking(replay_platform, self, platform, kind='browser', timeout=0)
+            ): platform
+            for platform in self.platforms
+        }
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline if deadline else None
+        pending = set(tasks)
+
+        try:
+            while pending:
+                timeout = None if expires_at is None else max(0.0, expires_at - loop.time())
+                if self.cancelled:
+                    timeout = CANCEL_GRACE_PERIOD
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if self.cancelled:
+                        # Воспроизведение не остановилось за отведенное время - больше не ждем
+                        break
+                    logger.warning(f"Дедлайн {deadline}с истек, отменяем: {[tasks[t] for t in pending]}")
+                    self.deadline_expired = True
+                    self.cancel()
+                    expires_at = None
+                    continue
+
+                for task in done:
+                    platform = tasks[task]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error(f"Ошибка создания объявления на {platform}: {e}")
+                        result = {'success': False, 'error': str(e)}
+                    self.results[platform] = result
+                    if on_progress:
+                        await on_progress(platform, result)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+        error = 'Превышено время ожидания' if self.deadline_expired else 'Отменено'
+        for task in pending:
+            platform = tasks[task]
+            self.results[platform] = {'success': False, 'error': error}
+            if on_progress:
+                await on_progress(platform, self.results[platform])
+
+        return {platform: self.results[platform] for platform in self.platforms}
@@ -1,7 +1,7 @@
 import asyncio
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters, CallbackQueryHandler
-from action_recorder import RecordingManager
+from executors import run_blocking
 import logging
 
 # Настройка логирования
@@ -11,12 +11,19 @@ logger = logging.getLogger(__name__)
 # Состояния для ConversationHandler
 WAITING_REPLAY_DATA = 1002
 WAITING_RECORDING_FILENAME = 1003
+# Воспроизведение записи может идти несколько минут
+REPLAY_TIMEOUT = 600
 
 class RecordingBotIntegration:
     """Интеграция системы воспроизведения действий с Telegram ботом"""
     
-    def __init__(self):
-        self.recording_manager = RecordingManager()
+    def __init__(self, recording_manager=None):
+        # Общий RecordingManager передает реестр интеграций (integration_registry);
+        # action_recorder импортирует Selenium, поэтому загружается только при необходимости
+        if recording_manager is None:
+            from action_recorder import RecordingManager
+            recording_manager = RecordingManager()
+        self.recording_manager = recording_manager
         self.user_recordings = {}  # Хранение записей пользователей
     
     async def show_recording_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -103,7 +110,7 @@ class RecordingBotIntegration:
         
         # Получаем предварительный просмотр записи
         recorder = self.recording_manager.get_recorder('ostrovok')  # Временное решение
-        preview = recorder.preview_recording(filename)
+        preview = await run_blocking(recorder.preview_recording, filename)
         
         keyboard = [
             [InlineKeyboardButton("▶️ Воспроизвести", callback_data=f'recording_replay_{filename}')],
@@ -307,11 +314,14 @@ class RecordingBotIntegration:
                 platform = '101hotels'
             
             recorder = self.recording_manager.get_recorder(platform)
-            success = recorder.load_recording(filename)
+            success = await run_blocking(recorder.load_recording, filename)
             
             if success:
                 # Воспроизводим действия
-                result = recorder.replay_actions(user_data, delay=1.5)
+                result = await run_blocking(
+                    recorder.replay_actions, user_data, delay=1.5,
+                    kind='browser', timeout=REPLAY_TIMEOUT
+                )
                 
                 if result:
                     await self.send_message_to_chat(
@@ -366,12 +376,14 @@ class RecordingBotIntegration:
             per_chat=True
         )
         
-        return [
-            recording_conv_handler,
-            CallbackQueryHandler(self.show_recording_menu, pattern='^recording_menu$'),
-            CallbackQueryHandler(self.show_recordings_list, pattern='^recording_list$'),
-            CallbackQueryHandler(self.view_recording, pattern='^recording_view_'),
-        ]
+        return [recording_conv_handler]
+    
+    def register_callbacks(self, router):
+        """Кнопки меню записей в таблице маршрутов бота (callback_router)"""
+        router.add('recording_menu', self.show_recording_menu)
+        router.add('recording_list', self.show_recordings_list, answer=False)
+        router.add_prefix('recording_view_', lambda update, context, filename: self.view_recording(update, context),
+                          answer=False)
 
 
 # Импорт для интеграции с основным ботом
@@ -0,0 +1,163 @@
+"""
+Каталог записей действий
+Метаданные записей (платформа, пользователь, дата, число действий) хранятся в SQLite-индексе,
+поэтому списки шаблонов строятся запросом по индексу, а не чтением всех JSON-файлов.
+Индекс обновляется хуками записи/удаления и сверкой по stat: JSON перечитывается,
+только если у файла изменились mtime или размер.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from db import Database
+from recording_format import has_recording_extension, read_header
+from replay_profile import is_profile_file
+
+logger = logging.getLogger(__name__)
+
+
+def is_recording_file(filename: str) -> bool:
+    # Скрытые файлы - недописанные временные копии
+    return has_recording_extension(filename) and not is_profile_file(filename) and not filename.startswith('.')
+
+
+class RecordingCatalog:
+    """Индекс записей одной папки"""
+
+    def __init__(self, recordings_dir: str, db: Optional[Database] = None):
+        self.recordings_dir = recordings_dir
+        self.key = os.path.abspath(recordings_dir)
+        # Индекс хранится в общей базе бота, а не в папке записей: файлы WAL рядом с записями
+        # меняли бы mtime папки, по которому определяется, нужна ли сверка
+        self.db = db or Database()
+        self._refresh_lock = threading.Lock()
+        self.stats = {'scans': 0, 'parsed': 0, 'removed': 0}
+
+    def _read_metadata(self, filename: str, stat: os.stat_result) -> Optional[Tuple]:
+        path = os.path.join(self.key, filename)
+        try:
+            # Для потокового формата читается только заголовок
+            data = read_header(path)
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать запись {filename}: {e}")
+            return None
+        self.stats['parsed'] += 1
+        user_id = data.get('user_id')
+        return (
+            path, self.key, filename,
+            data.get('platform', 'Unknown'),
+            str(user_id) if user_id is not None else None,
+            data.get('name'),
+            data.get('created_at', ''),
+            data.get('total_actions', 0),
+            stat.st_mtime_ns, stat.st_size
+        )
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Сверить индекс с папкой
+
+        Пока mtime папки не менялся (файлы не добавлялись и не удалялись), проверка стоит один stat.
+        Иначе сравниваются stat всех файлов, а разбираются только новые и измененные.
+
+        Returns:
+            bool: была ли выполнена сверка
+        """
+        with self._refresh_lock:
+            try:
+                dir_mtime = os.stat(self.key).st_mtime_ns
+            except FileNotFoundError:
+                return False
+            if not force and self.db.get_recording_dir_mtime(self.key) == dir_mtime:
+                return False
+
+            indexed = self.db.get_recording_files(self.key)
+            changed = []
+            seen = set()
+            with os.scandir(self.key) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not is_recording_file(entry.name):
+                        continue
+                    seen.add(entry.name)
+                    stat = entry.stat()
+                    if indexed.get(entry.name) != (stat.st_mtime_ns, stat.st_size):
+                        row = self._read_metadata(entry.name, stat)
+                        if row:
+                            changed.append(row)
+
+            removed = [os.path.join(self.key, filename) for filename in indexed if filename not in seen]
+            with self.db.transaction():
+                if changed:
+                    self.db.upsert_recordings(changed)
+                if removed:
+                    self.db.delete_recordings(removed)
+                # mtime взят до обхода: файл, появившийся во время сверки, подхватится следующей
+                self.db.set_recording_dir_mtime(self.key, dir_mtime)
+
+            self.stats['scans'] += 1
+            self.stats['removed'] += len(removed)
+            if changed or removed:
+                logger.info(f"Каталог записей {self.recordings_dir}: обновлено {len(changed)}, удалено {len(removed)}")
+            return True
+
+    # --- Хуки записи ---
+    def register(self, filepath: str):
+        """Добавить в индекс только что сохраненную запись"""
+        filename = os.path.basename(filepath)
+        try:
+            stat = os.stat(os.path.join(self.key, filename))
+        except FileNotFoundError:
+            return
+        row = self._read_metadata(filename, stat)
+        if row:
+            self.db.upsert_recordings([row])
+
+    def remove(self, filepath: str):
+        """Убрать из индекса удаленную запись"""
+        self.db.delete_recordings([os.path.join(self.key, os.path.basename(filepath))])
+
+    # --- Запросы ---
+    def recordings(self, platform: Optional[str] = None, user_id: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """
+        Записи от новых к старым
+
+        Args:
+            platform: Платформа (без учета регистра)
+            user_id: Владелец; записи без владельца доступны всем
+        """
+        self.refresh()
+        rows = self.db.list_recordings(
+            self.key, platform=platform, user_id=str(user_id) if user_id is not None else None
+        )
+        return [
+            {
+                'filename': filename,
+                'filepath': os.path.join(self.recordings_dir, filename),
+                'platform': row_platform,
+                'user_id': row_user_id,
+                'name': name,
+                'created_at': created_at,
+                'total_actions': total_actions
+            }
+            for _, filename, row_platform, row_user_id, name, created_at, total_actions in rows
+        ]
+
+    def latest(self, platform: str, user_id: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+        recordings = self.recordings(platform=platform, user_id=user_id)
+        return recordings[0] if recordings else None
+
+
+_catalogs: Dict[str, RecordingCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(recordings_dir: str = 'recorded_actions', db: Optional[Database] = None) -> RecordingCatalog:
+    """Общий каталог папки записей"""
+    key = os.path.abspath(recordings_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = RecordingCatalog(recordings_dir, db)
+        return catalog
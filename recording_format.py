@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Формат файлов записей действий
+
+Запись хранится как поток строк JSON (опционально сжатый gzip или zstd):
+    {"format": "hotel-bot-actions", "version": 1, "platform": ..., "total_actions": ...}   - заголовок
+    ["s", "..."]                                                                         - строка в таблицу
+    ["a", {...}]                                                                         - действие
+
+Повторяющиеся строки (классы Tailwind, xpath, url) попадают в таблицу один раз, а в действиях
+на них ссылается номер под ключом с префиксом '@' (собственные ключи, начинающиеся с '@',
+экранируются удвоением: '@click' хранится как '@@click'). Файл пишется дописыванием, поэтому
+чтение может начинаться до конца файла: воспроизведение стартует с первого действия,
+не разбирая остальные. Старые записи в JSON (indent=2) читаются теми же функциями.
+
+Конвертация старых записей:
+    python recording_format.py convert                      # все recorded_actions/*.json
+    python recording_format.py convert file.json --compression zstd --remove-source
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd необязателен: без него доступны gzip и несжатый поток
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = 'hotel-bot-actions'
+FORMAT_VERSION = 1
+
+LEGACY_EXTENSION = '.json'
+STREAM_EXTENSION = '.rec'
+COMPRESSION_EXTENSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+RECORDING_EXTENSIONS = (
+    LEGACY_EXTENSION,
+    STREAM_EXTENSION,
+    STREAM_EXTENSION + COMPRESSION_EXTENSIONS['gzip'],
+    STREAM_EXTENSION + COMPRESSION_EXTENSIONS['zstd'],
+)
+
+# Сжатие новых записей; RECORDING_COMPRESSION=none отключает
+DEFAULT_COMPRESSION = os.getenv('RECORDING_COMPRESSION', 'gzip').lower()
+if DEFAULT_COMPRESSION in ('', 'none'):
+    DEFAULT_COMPRESSION = None
+
+# Строковые поля, значения которых повторяются между действиями и элементами страницы
+INTERNED_KEYS = frozenset({
+    'type', 'tagName', 'tag_name', 'className', 'class_name', 'xpath', 'css_selector',
+    'url', 'href', 'title', 'name', 'type_attr', 'placeholder', 'id',
+})
+REF_PREFIX = '@'
+
+
+def _check_compression(compression: Optional[str]):
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Неизвестное сжатие: {compression}")
+    if compression == 'zstd' and zstandard is None:
+        raise RuntimeError("Для сжатия zstd установите пакет zstandard")
+
+
+def recording_extension(compression: Optional[str] = DEFAULT_COMPRESSION) -> str:
+    """Расширение файла записи: .rec, .rec.gz или .rec.zst"""
+    _check_compression(compression)
+    return STREAM_EXTENSION + COMPRESSION_EXTENSIONS[compression]
+
+
+def split_recording_extension(filename: str) -> Tuple[str, str]:
+    """foo.rec.gz -> ('foo', '.rec.gz'); для прочих файлов расширение пустое"""
+    for extension in sorted(RECORDING_EXTENSIONS, key=len, reverse=True):
+        if filename.endswith(extension):
+            return filename[:-len(extension)], extension
+    return filename, ''
+
+
+def has_recording_extension(filename: str) -> bool:
+    return bool(split_recording_extension(filename)[1])
+
+
+def find_recording(directory: str, name: str) -> Optional[str]:
+    """Путь к записи по имени без расширения (в любом из форматов)"""
+    for extension in RECORDING_EXTENSIONS:
+        path = os.path.join(directory, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _compression_of(path: str) -> Optional[str]:
+    for compression, extension in COMPRESSION_EXTENSIONS.items():
+        if compression and path.endswith(STREAM_EXTENSION + extension):
+            return compression
+    return None
+
+
+def _open_stream(path: str, mode: str):
+    """Открыть поток записи в текстовом режиме с учетом сжатия по расширению"""
+    compression = _compression_of(path)
+    _check_compression(compression)
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    if compression == 'zstd':
+        return zstandard.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class RecordingWriter:
+    """
+    Запись действий потоком
+
+    Пример:
+        with RecordingWriter('recorded_actions/ostrovok_actions_1.rec.gz', {'platform': 'ostrovok'}) as writer:
+            for action in actions:
+                writer.write(action)
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any], sync: bool = False):
+        self.path = path
+        # sync: сбрасывать буфер после каждого действия (запись переживет падение процесса)
+        self.sync = sync
+        self._strings: Dict[str, int] = {}
+        self.count = 0
+        self._file = _open_stream(path, 'w')
+        self._file.write(_dumps({'format': FORMAT_NAME, 'version': FORMAT_VERSION, **header}) + '\n')
+
+    def _intern(self, value: str, lines: List[str]) -> int:
+        ref = self._strings.get(value)
+        if ref is None:
+            ref = self._strings[value] = len(self._strings)
+            lines.append(_dumps(['s', value]))
+        return ref
+
+    def _encode(self, value: Any, lines: List[str]) -> Any:
+        if isinstance(value, dict):
+            encoded = {}
+            for key, item in value.items():
+                if key in INTERNED_KEYS and isinstance(item, str):
+                    encoded[REF_PREFIX + key] = self._intern(item, lines)
+                elif key[:1] == REF_PREFIX:
+                    # Собственный ключ с '@' не должен читаться как ссылка
+                    encoded[REF_PREFIX + key] = self._encode(item, lines)
+                else:
+                    encoded[key] = self._encode(item, lines)
+            return encoded
+        if isinstance(value, list):
+            return [self._encode(item, lines) for item in value]
+        return value
+
+    def write(self, action: Dict[str, Any]):
+        lines: List[str] = []
+        encoded = self._encode(action, lines)
+        lines.append(_dumps(['a', encoded]))
+        self._file.write('\n'.join(lines) + '\n')
+        self.count += 1
+        if self.sync:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _reference_decoder(strings: List[str]):
+    """object_hook для json.loads: ссылки '@key' заменяются строками из таблицы, '@@key' -> '@key'"""
+    escaped = REF_PREFIX * 2
+
+    def decode(obj: Dict[str, Any]) -> Dict[str, Any]:
+        for ref_key in [key for key in obj if key[:1] == REF_PREFIX]:
+            value = obj.pop(ref_key)
+            obj[ref_key[1:]] = value if ref_key[:2] == escaped else strings[value]
+        return obj
+    return decode
+
+
+def _read_stream_header(stream) -> Dict[str, Any]:
+    header = json.loads(stream.readline() or 'null')
+    if not isinstance(header, dict) or header.get('format') != FORMAT_NAME:
+        raise ValueError("Файл не является записью действий")
+    if header.get('version', 0) > FORMAT_VERSION:
+        raise ValueError(f"Запись версии {header['version']} не поддерживается (максимум {FORMAT_VERSION})")
+    return header
+
+
+def _iter_stream_actions(stream, path: str) -> Iterator[Dict[str, Any]]:
+    strings: List[str] = []
+    decoder = json.JSONDecoder(object_hook=_reference_decoder(strings))
+    try:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                kind, payload = decoder.decode(line)
+            except ValueError:
+                # Оборванная последняя строка (процесс упал во время записи)
+                logger.warning(f"Запись {path} обрывается, читаем до последнего целого действия")
+                return
+            if kind == 's':
+                strings.append(payload)
+            elif kind == 'a':
+                yield payload
+    except EOFError:
+        logger.warning(f"Сжатый поток {path} обрывается, читаем до последнего целого действия")
+    finally:
+        stream.close()
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """
+    Метаданные записи без действий
+
+    Для потока читается только первая строка; старый JSON разбирается целиком.
+    """
+    if path.endswith(LEGACY_EXTENSION):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        actions = data.pop('actions', [])
+        data.setdefault('total_actions', len(actions))
+        return data
+    with _open_stream(path, 'r') as stream:
+        header = _read_stream_header(stream)
+    if header.get('total_actions') is None:
+        # Заголовок пишется до действий; если их число не было известно - считаем строки
+        header['total_actions'] = sum(1 for _ in iter_actions(path))
+    return header
+
+
+def iter_actions(path: str) -> Iterator[Dict[str, Any]]:
+    """Действия записи по одному, по мере чтения файла"""
+    if path.endswith(LEGACY_EXTENSION):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f).get('actions', [])
+        return
+    stream = _open_stream(path, 'r')
+    _read_stream_header(stream)
+    yield from _iter_stream_actions(stream, path)
+
+
+class ActionSequence(Sequence):
+    """
+    Список действий, который дочитывается из файла по мере обращения
+
+    Индексация и итерация читают ровно столько действий, сколько нужно; длина берется
+    из заголовка, пока он ее знает.
+    """
+
+    def __init__(self, actions: Iterator[Dict[str, Any]], total: Optional[int] = None):
+        self._cache: List[Dict[str, Any]] = []
+        self._source: Optional[Iterator[Dict[str, Any]]] = iter(actions)
+        self._total = total
+        self._lock = threading.Lock()
+
+    def _fill(self, count: Optional[int] = None):
+        with self._lock:
+            while self._source is not None and (count is None or len(self._cache) < count):
+                try:
+                    self._cache.append(next(self._source))
+                except StopIteration:
+                    self._source = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.stop is not None and index.stop >= 0 and (index.start or 0) >= 0:
+                self._fill(index.stop)
+            else:
+                self._fill()
+            return self._cache[index]
+        self._fill(index + 1 if index >= 0 else None)
+        return self._cache[index]
+
+    def __iter__(self):
+        i = 0
+        while True:
+            self._fill(i + 1)
+            if i >= len(self._cache):
+                return
+            yield self._cache[i]
+            i += 1
+
+    def __len__(self):
+        if self._total is not None:
+            return self._total
+        self._fill()
+        return len(self._cache)
+
+    def __bool__(self):
+        self._fill(1)
+        return bool(self._cache)
+
+
+def load_recording(path: str) -> Tuple[Dict[str, Any], Sequence]:
+    """
+    Открыть запись любого формата
+
+    Returns:
+        (заголовок, действия): для потока действия дочитываются лениво
+    """
+    if path.endswith(LEGACY_EXTENSION):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        actions = data.pop('actions', [])
+        data.setdefault('total_actions', len(actions))
+        return data, actions
+    stream = _open_stream(path, 'r')
+    try:
+        header = _read_stream_header(stream)
+    except Exception:
+        stream.close()
+        raise
+    return header, ActionSequence(_iter_stream_actions(stream, path), header.get('total_actions'))
+
+
+def save_recording(path: str, header: Dict[str, Any], actions: List[Dict[str, Any]]) -> str:
+    """Сохранить запись целиком (атомарно: читатели не увидят недописанный файл)"""
+    header = {**header, 'total_actions': len(actions)}
+    # Временный файл скрыт от каталога и сохраняет расширение, чтобы сжиматься так же, как итоговый
+    directory, filename = os.path.split(path)
+    name, extension = split_recording_extension(filename)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp{extension}")
+    try:
+        with RecordingWriter(tmp_path, header) as writer:
+            for action in actions:
+                writer.write(action)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def convert_recording(source: str, compression: Optional[str] = DEFAULT_COMPRESSION,
+                      remove_source: bool = False) -> str:
+    """Перевести запись (обычно старый JSON) в потоковый формат; возвращает путь нового файла"""
+    name, _ = split_recording_extension(source)
+    target = name + recording_extension(compression)
+    if os.path.abspath(target) == os.path.abspath(source):
+        return source
+    header, actions = load_recording(source)
+    header.pop('format', None)
+    header.pop('version', None)
+    save_recording(target, header, list(actions))
+    if remove_source:
+        os.remove(source)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Конвертация записей действий в потоковый формат')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert = subparsers.add_parser('convert', help='перевести записи в потоковый формат')
+    convert.add_argument('paths', nargs='*', help='файлы записей (по умолчанию recorded_actions/*.json)')
+    convert.add_argument('--compression', choices=['none', 'gzip', 'zstd'],
+                         default=DEFAULT_COMPRESSION or 'none')
+    convert.add_argument('--remove-source', action='store_true', help='удалить исходный файл')
+    args = parser.parse_args()
+
+    compression = None if args.compression == 'none' else args.compression
+    paths = args.paths or [
+        path for path in sorted(glob.glob(os.path.join('recorded_actions', '*' + LEGACY_EXTENSION)))
+        if not path.endswith('.profile.json')
+    ]
+    for path in paths:
+        try:
+            target = convert_recording(path, compression, remove_source=args.remove_source)
+            print(f"✅ {path} -> {target} ({os.path.getsize(target):,} байт)")
+        except Exception as e:
+            print(f"❌ {path}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Профиль воспроизведения записи
+Хранится рядом с записью в <recording>.profile.json: сколько ждал каждый шаг в прошлых запусках
+и каким селектором нашелся его элемент. По этим данным ActionRecorder подбирает таймауты
+ожиданий и сразу пробует сработавший селектор.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from recording_format import split_recording_extension
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = '.profile.json'
+
+# Таймаут ожидания, пока о шаге ничего не известно
+DEFAULT_WAIT_TIMEOUT = 15.0
+# Границы адаптивного таймаута
+MIN_WAIT_TIMEOUT = 2.0
+MAX_WAIT_TIMEOUT = 30.0
+# Вес нового замера в скользящем среднем
+EWMA_ALPHA = 0.3
+
+
+def profile_path(recording_path: str) -> str:
+    """Путь к профилю записи: foo.json / foo.rec.gz -> foo.profile.json"""
+    return split_recording_extension(recording_path)[0] + PROFILE_SUFFIX
+
+
+def is_profile_file(filename: str) -> bool:
+    return filename.endswith(PROFILE_SUFFIX)
+
+
+class ReplayProfile:
+    """Статистика ожиданий по шагам одной записи"""
+
+    def __init__(self, recording_path: Optional[str]):
+        self.path = profile_path(recording_path) if recording_path else None
+        self.data: Dict[str, Any] = {'runs': 0, 'steps': {}, 'selectors': {}}
+        self.current_run: List[Dict[str, Any]] = []
+        self._run_started = time.monotonic()
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+            self.data.setdefault('runs', 0)
+            self.data.setdefault('steps', {})
+            self.data.setdefault('selectors', {})
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать профиль {self.path}: {e}")
+
+    def step(self, index: int) -> Optional[Dict[str, Any]]:
+        return self.data['steps'].get(str(index))
+
+    def timeout_for(self, index: int, default: float = DEFAULT_WAIT_TIMEOUT) -> float:
+        """Таймаут ожидания шага: с запасом к прошлым замерам, но в разумных границах"""
+        stats = self.step(index)
+        if not stats:
+            return default
+        learned = max(stats['ewma'] * 3, stats['max'] * 1.5)
+        return min(MAX_WAIT_TIMEOUT, max(MIN_WAIT_TIMEOUT, learned))
+
+    def record(self, index: int, action_type: str, condition: str, wait_seconds: float,
+               step_seconds: float, satisfied: bool):
+        """Запомнить замер шага текущего запуска"""
+        self.current_run.append({
+            'step': index + 1,
+            'type': action_type,
+            'condition': condition,
+            'wait': round(wait_seconds, 3),
+            'seconds': round(step_seconds, 3),
+            'satisfied': satisfied
+        })
+        # Таймауты учатся только на дождавшихся условиях: неудачное ожидание длится ровно таймаут
+        if not satisfied or condition == 'fixed_delay':
+            return
+        stats = self.data['steps'].get(str(index))
+        if stats is None:
+            self.data['steps'][str(index)] = {
+                'condition': condition, 'ewma': wait_seconds, 'max': wait_seconds, 'samples': 1
+            }
+        else:
+            stats['condition'] = condition
+            stats['ewma'] = EWMA_ALPHA * wait_seconds + (1 - EWMA_ALPHA) * stats['ewma']
+            stats['max'] = max(stats['max'], wait_seconds)
+            stats['samples'] += 1
+
+    # --- Кэш селекторов ---
+    def cached_selector(self, index: int) -> Optional[Dict[str, Any]]:
+        """Селектор, которым шаг находился в прошлый раз"""
+        return self.data['selectors'].get(str(index))
+
+    def remember_selector(self, index: int, strategy: str, value: str, resolve_seconds: float):
+        entry = self.data['selectors'].get(str(index))
+        if entry and entry['strategy'] == strategy and entry['value'] == value:
+            entry['hits'] += 1
+            entry['resolve_ms'] = round(resolve_seconds * 1000, 1)
+        else:
+            self.data['selectors'][str(index)] = {
+                'strategy': strategy, 'value': value, 'hits': 1,
+                'resolve_ms': round(resolve_seconds * 1000, 1)
+            }
+
+    def invalidate_selector(self, index: int):
+        """Забыть селектор шага (элемент по нему не нашелся или действие упало)"""
+        self.data['selectors'].pop(str(index), None)
+
+    def report(self) -> Dict[str, Any]:
+        """Отчет о текущем запуске: время по шагам и общее"""
+        return {
+            'total_seconds': round(time.monotonic() - self._run_started, 3),
+            'waited_seconds': round(sum(step['wait'] for step in self.current_run), 3),
+            'steps': self.current_run
+        }
+
+    def save(self):
+        """Сохранить профиль (атомарно, чтобы параллельные запуски не повредили файл)"""
+        if not self.path:
+            return
+        self.data['runs'] += 1
+        self.data['last_run'] = self.report()
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить профиль {self.path}: {e}")
@@ -0,0 +1,188 @@
+"""
+Кэш чтений для экранов бота (бронирования, статистика, списки отелей)
+Ответы площадок кэшируются по (платформа, аккаунт, запрос) с коротким TTL.
+Устаревший, но еще допустимый ответ отдается сразу, а обновляется в фоне
+(stale-while-revalidate); одновременные одинаковые запросы ждут один вызов площадки.
+Запись (создание, изменение, удаление отеля) сбрасывает кэш аккаунта.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Сколько ответ считается свежим и сколько еще его можно отдавать, обновляя в фоне (секунды)
+READ_TTLS = {
+    'bookings': 60,
+    'new_bookings': 30,
+    'statistics': 300,
+    'hotels': 300,
+}
+DEFAULT_TTL = 60
+STALE_TTL = 600
+MAX_ENTRIES = 2000
+
+Key = Tuple[str, str, str]
+
+
+def is_cacheable(result: Any) -> bool:
+    """Ответы (False, ошибка) не кэшируются"""
+    return not (isinstance(result, tuple) and result and result[0] is False)
+
+
+class CacheEntry:
+    __slots__ = ('value', 'fetched_at', 'ttl')
+
+    def __init__(self, value: Any, fetched_at: float, ttl: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+
+class ResponseCache:
+    """
+    Read-through кэш ответов площадок
+
+    Пример:
+        success, result = await cache.get('101hotels', email, 'statistics',
+                                          lambda: run_blocking(manager.get_statistics))
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, stale_ttl: float = STALE_TTL,
+                 max_entries: int = MAX_ENTRIES):
+        self.ttls = {**READ_TTLS, **(ttls or {})}
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Key, CacheEntry] = {}
+        # Запись может прийти из другого потока (очередь заданий), поэтому блокировка потоковая
+        self._lock = threading.Lock()
+        self._inflight: Dict[Key, asyncio.Future] = {}
+        # Поколение аккаунта: ответ, запрошенный до сброса, не попадет в кэш
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'refreshes': 0, 'invalidations': 0}
+
+    def _generation(self, platform: str, account: str) -> int:
+        return self._generations.get((platform, account), 0)
+
+    def _store(self, key: Key, generation: int, value: Any, ttl: float):
+        with self._lock:
+            if self._generation(key[0], key[1]) != generation:
+                return
+            self._entries[key] = CacheEntry(value, time.monotonic(), ttl)
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k].fetched_at)
+                del self._entries[oldest]
+
+    async def _fetch(self, key: Key, fetch: Callable[[], Awaitable[Any]], ttl: float,
+                     cacheable: Callable[[Any], bool]) -> Any:
+        """Один вызов площадки на ключ; остальные вызовы ждут его результат"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        with self._lock:
+            generation = self._generation(key[0], key[1])
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение передано ожидающим; если их нет, не оставляем его «непрочитанным»
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        if cacheable(value):
+            self._store(key, generation, value, ttl)
+        future.set_result(value)
+        return value
+
+    def _refresh_in_background(self, key: Key, fetch: Callable[[], Awaitable[Any]], ttl: float,
+                               cacheable: Callable[[Any], bool]):
+        if key in self._inflight:
+            return
+        self.stats['refreshes'] += 1
+
+        async def refresh():
+            try:
+                await self._fetch(key, fetch, ttl, cacheable)
+            except Exception as e:
+                logger.warning(f"Не удалось обновить {key[0]}/{key[2]} в фоне: {e}")
+
+        asyncio.get_running_loop().create_task(refresh())
+
+    async def get(self, platform: str, account: Optional[str], name: str,
+                  fetch: Callable[[], Awaitable[Any]], ttl: Optional[float] = None,
+                  refresh: bool = False, cacheable: Callable[[Any], bool] = is_cacheable) -> Any:
+        """
+        Ответ из кэша или от площадки
+
+        Args:
+            platform, account: Чьи данные
+            name: Запрос (bookings, statistics, hotels, ...), с параметрами, если они есть
+            fetch: Корутина-фабрика, выполняющая запрос к площадке
+            ttl: Время свежести (по умолчанию из READ_TTLS)
+            refresh: Не брать кэш, а запросить заново (одновременные запросы все равно объединяются)
+        """
+        key = (platform, account or '', name)
+        ttl = ttl if ttl is not None else self.ttls.get(name.split(':', 1)[0], DEFAULT_TTL)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and not refresh:
+            age = time.monotonic() - entry.fetched_at
+            if age < entry.ttl:
+                self.stats['hits'] += 1
+                return entry.value
+            if age < entry.ttl + self.stale_ttl:
+                self.stats['stale_hits'] += 1
+                self._refresh_in_background(key, fetch, ttl, cacheable)
+                return entry.value
+
+        self.stats['misses'] += 1
+        return await self._fetch(key, fetch, ttl, cacheable)
+
+    def invalidate(self, platform: str, account: Optional[str] = None):
+        """
+        Сбросить кэш после записи
+
+        Args:
+            account: Аккаунт; None - все аккаунты платформы
+        """
+        with self._lock:
+            accounts = {key[1] for key in self._entries if key[0] == platform}
+            accounts.update(acc for plat, acc in self._generations if plat == platform)
+            accounts.update(key[1] for key in list(self._inflight) if key[0] == platform)
+            if account is not None:
+                accounts = {account}
+            for acc in accounts:
+                self._generations[(platform, acc)] = self._generation(platform, acc) + 1
+            for key in [key for key in self._entries if key[0] == platform and key[1] in accounts]:
+                del self._entries[key]
+        self.stats['invalidations'] += 1
+        logger.info(f"Кэш чтений {platform} сброшен ({account or 'все аккаунты'})")
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Общий кэш чтений процесса"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def invalidate_reads(platform: str, account: Optional[str] = None):
+    """Хук записи для менеджеров площадок"""
+    get_response_cache().invalidate(platform, account)
@@ -12,6 +12,10 @@ import threading
 import logging
 from pathlib import Path
 from typing import List, Optional
+from startup_profile import get_startup_profiler, probe_children
+
+# Профилирование старта (--profile-startup): Mini App и бот профилируются в своих процессах
+profiler = get_startup_profiler('run_all')
 
 # Создание папки logs перед настройкой логирования
 os.makedirs('logs', exist_ok=True)
@@ -305,4 +309,6 @@ def main():
     manager.run()
 
 if __name__ == "__main__":
+    if profiler:
+        sys.exit(profiler.run(probe_children, ['run_mini_app.py', 'run_bot.py']))
     main()
@@ -10,6 +10,10 @@ import signal
 import logging
 from pathlib import Path
 from typing import Optional
+from startup_profile import get_startup_profiler, probe_asgi, probe_bot
+
+# Профилирование старта (--profile-startup): оба сервиса в этом процессе, как в start_all
+profiler = get_startup_profiler('run_all_async')
 
 # Создание папки logs перед настройкой логирования
 os.makedirs('logs', exist_ok=True)
@@ -117,10 +121,16 @@ class AsyncHotelBotManager:
             # Импорт и запуск бота
             from bot import HotelBot
             from config import BOT_TOKEN
+            from webhook import webhook_enabled
             
             if not BOT_TOKEN:
                 raise ValueError("BOT_TOKEN не найден в конфигурации")
             
+            if webhook_enabled():
+                # Обновления принимает Mini App API (webhook), бот работает в его воркер-процессах
+                logger.info("✅ Telegram бот работает через webhook Mini App API")
+                return
+            
             # Создание и запуск бота
             bot = HotelBot(BOT_TOKEN)
             await bot.application.initialize()
@@ -223,6 +233,12 @@ LOG_LEVEL=INFO
         return False
     return True
 
+def profile_services(profiler):
+    """Старт Mini App и бота в одном процессе до первого запроса каждого"""
+    probe_asgi(profiler)
+    from config import BOT_TOKEN
+    asyncio.run(probe_bot(profiler, BOT_TOKEN))
+
 async def main():
     """Главная функция"""
     print("🏨 Hotel Bot - Асинхронный запуск Mini App и бота")
@@ -238,6 +254,8 @@ async def main():
     await manager.run()
 
 if __name__ == "__main__":
+    if profiler:
+        sys.exit(profiler.run(profile_services))
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
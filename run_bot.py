@@ -5,6 +5,12 @@
 
 import asyncio
 import logging
+import sys
+from startup_profile import get_startup_profiler, probe_bot
+
+# Профилирование старта (--profile-startup): замер импортов начинается до импорта бота
+profiler = get_startup_profiler('run_bot')
+
 from bot import HotelBot
 from config import BOT_TOKEN
 
@@ -45,4 +51,6 @@ async def main():
             pass
 
 if __name__ == "__main__":
+    if profiler:
+        sys.exit(profiler.run(probe_bot, BOT_TOKEN))
     asyncio.run(main()) 
\ No newline at end of file
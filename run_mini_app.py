@@ -8,6 +8,10 @@ import sys
 import subprocess
 import logging
 from pathlib import Path
+from startup_profile import get_startup_profiler, probe_asgi
+
+# Профилирование старта (--profile-startup)
+profiler = get_startup_profiler('run_mini_app')
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
@@ -99,4 +103,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    if profiler:
+        sys.exit(profiler.run(probe_asgi))
     main()
@@ -0,0 +1,234 @@
+"""
+Хранилище пользовательских сессий бота
+SQLite с LRU-кэшем в памяти; заменяет словарь HotelBot.user_sessions
+и переживает перезапуски бота
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from db import Database
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS_KEY = 'bnovo_notifications_enabled'
+# Ключи вида "<платформа>_logged_in" / "<платформа>_email" хранятся в отдельной таблице
+PLATFORM_KEY_RE = re.compile(r'^(?P<platform>.+)_(?P<field>logged_in|email)$')
+
+
+def split_session(session: Dict) -> Tuple[bool, Dict, List[Tuple[str, bool, Optional[str]]]]:
+    """Разложить сессию на типизированные поля и прочие данные"""
+    notifications_enabled = bool(session.get(NOTIFICATIONS_KEY, True))
+    platforms: Dict[str, Dict] = {}
+    extra = {}
+
+    for key, value in session.items():
+        if key == NOTIFICATIONS_KEY:
+            continue
+        match = PLATFORM_KEY_RE.match(key)
+        if match:
+            platforms.setdefault(match.group('platform'), {})[match.group('field')] = value
+        else:
+            extra[key] = value
+
+    platform_logins = [
+        (platform, bool(fields.get('logged_in', False)), fields.get('email'))
+        for platform, fields in platforms.items()
+    ]
+    return notifications_enabled, extra, platform_logins
+
+
+def join_session(notifications_enabled: bool, extra: Dict, platform_logins) -> Dict:
+    """Собрать сессию из типизированных полей"""
+    session = dict(extra)
+    session[NOTIFICATIONS_KEY] = bool(notifications_enabled)
+    for platform, logged_in, email in platform_logins:
+        session[f'{platform}_logged_in'] = bool(logged_in)
+        if email is not None:
+            session[f'{platform}_email'] = email
+    return session
+
+
+class MemorySessionBackend:
+    """Хранение сессий в памяти процесса (для тестов и запуска без базы)"""
+
+    def __init__(self):
+        self._sessions: Dict[int, Dict] = {}
+
+    def load(self, user_id: int) -> Optional[Dict]:
+        session = self._sessions.get(user_id)
+        return dict(session) if session is not None else None
+
+    def save(self, user_id: int, session: Dict):
+        self._sessions[user_id] = dict(session)
+
+    def delete(self, user_id: int):
+        self._sessions.pop(user_id, None)
+
+    def contains(self, user_id: int) -> bool:
+        return user_id in self._sessions
+
+    def user_ids(self) -> List[int]:
+        return list(self._sessions)
+
+    def subscribed_user_ids(self) -> List[int]:
+        return [
+            user_id for user_id, session in self._sessions.items()
+            if session.get(NOTIFICATIONS_KEY, True)
+        ]
+
+
+class SQLiteSessionBackend:
+    """Хранение сессий в SQLite с типизированными полями"""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def load(self, user_id: int) -> Optional[Dict]:
+        result = self.db.get_user_session(user_id)
+        if result is None:
+            return None
+        (notifications_enabled, data), platform_logins = result
+        try:
+            extra = json.loads(data) if data else {}
+        except ValueError:
+            logger.warning(f"Повреждены данные сессии пользователя {user_id}")
+            extra = {}
+        return join_session(notifications_enabled, extra, platform_logins)
+
+    def save(self, user_id: int, session: Dict):
+        notifications_enabled, extra, platform_logins = split_session(session)
+        self.db.save_user_session(
+            user_id, notifications_enabled,
+            json.dumps(extra, ensure_ascii=False, default=str), platform_logins
+        )
+
+    def delete(self, user_id: int):
+        self.db.delete_user_session(user_id)
+
+    def contains(self, user_id: int) -> bool:
+        return self.db.has_user_session(user_id)
+
+    def user_ids(self) -> List[int]:
+        return self.db.get_user_session_ids()
+
+    def subscribed_user_ids(self) -> List[int]:
+        return self.db.get_subscribed_user_ids()
+
+
+class UserSession(dict):
+    """Сессия пользователя: любое изменение сразу сохраняется в хранилище"""
+
+    def __init__(self, store: 'SessionStore', user_id: int, data: Dict):
+        super().__init__(data)
+        self._store = store
+        self._user_id = user_id
+
+    def _persist(self):
+        self._store.backend.save(self._user_id, dict(self))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._persist()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._persist()
+
+    def pop(self, key, *default):
+        had_key = key in self
+        value = super().pop(key, *default)
+        if had_key:
+            self._persist()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._persist()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        super().clear()
+        self._persist()
+
+
+class SessionStore(MutableMapping):
+    """
+    Словарь сессий по Telegram user id
+
+    Поверх постоянного хранилища держит LRU-кэш; записи кэша устаревают через ttl секунд,
+    чтобы изменения из других процессов бота были видны.
+    """
+
+    def __init__(self, backend=None, capacity: int = 10000, ttl: float = 60.0):
+        self.backend = backend if backend is not None else MemorySessionBackend()
+        self.capacity = capacity
+        self.ttl = ttl
+        self._cache: "OrderedDict[int, Tuple[float, UserSession]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _cached(self, user_id: int) -> Optional[UserSession]:
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        loaded_at, session = entry
+        if time.monotonic() - loaded_at > self.ttl:
+            del self._cache[user_id]
+            return None
+        self._cache.move_to_end(user_id)
+        return session
+
+    def _remember(self, user_id: int, session: UserSession):
+        self._cache[user_id] = (time.monotonic(), session)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def __getitem__(self, user_id: int) -> UserSession:
+        with self._lock:
+            session = self._cached(user_id)
+            if session is not None:
+                return session
+            data = self.backend.load(user_id)
+            if data is None:
+                raise KeyError(user_id)
+            session = UserSession(self, user_id, data)
+            self._remember(user_id, session)
+            return session
+
+    def __setitem__(self, user_id: int, value: Dict):
+        with self._lock:
+            session = UserSession(self, user_id, value)
+            self.backend.save(user_id, dict(session))
+            self._remember(user_id, session)
+
+    def __delitem__(self, user_id: int):
+        with self._lock:
+            if not self.backend.contains(user_id):
+                raise KeyError(user_id)
+            self.backend.delete(user_id)
+            self._cache.pop(user_id, None)
+
+    def __contains__(self, user_id) -> bool:
+        with self._lock:
+            return self._cached(user_id) is not None or self.backend.contains(user_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.backend.user_ids())
+
+    def __len__(self) -> int:
+        return len(self.backend.user_ids())
+
+    def subscribed_users(self) -> List[int]:
+        """Пользователи с включенными уведомлениями (по индексу, без чтения сессий)"""
+        return self.backend.subscribed_user_ids()
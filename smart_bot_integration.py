@@ -1,7 +1,7 @@
 import asyncio
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters, CallbackQueryHandler
-from action_recorder import RecordingManager
+from executors import run_blocking
 import logging
 
 # Настройка логирования
@@ -11,13 +11,21 @@ logger = logging.getLogger(__name__)
 # Состояния для ConversationHandler
 WAITING_UNIVERSAL_DATA = 2000
 WAITING_PLATFORM_SELECTION = 2001
+# Общий лимит на создание объявлений на всех платформах
+SMART_RUN_DEADLINE = 900
 
 class SmartBotIntegration:
     """Умная интеграция для работы с несколькими платформами одновременно"""
     
-    def __init__(self):
-        self.recording_manager = RecordingManager()
+    def __init__(self, recording_manager=None):
+        # Общий RecordingManager передает реестр интеграций (integration_registry);
+        # action_recorder импортирует Selenium, поэтому загружается только при необходимости
+        if recording_manager is None:
+            from action_recorder import RecordingManager
+            recording_manager = RecordingManager()
+        self.recording_manager = recording_manager
         self.user_data = {}  # Хранение данных пользователей
+        self.active_runs = {}  # chat_id -> ParallelReplayRun
         self.platform_templates = {
             'ostrovok': {
                 'name': 'Ostrovok',
@@ -206,63 +214,56 @@ class SmartBotIntegration:
         return ConversationHandler.END
     
     async def create_advertisements_on_all_platforms(self, platforms, user_data, chat_id):
-        """Создание объявлений на всех выбранных платформах"""
-        results = {}
-        
-        for platform in platforms:
-            try:
-                await self.send_message_to_chat(
-                    chat_id,
-                    f"🔄 Создаю объявление на {self.platform_templates[platform]['name']}..."
-                )
-                
-                # Получаем рекордер для платформы
-                recorder = self.recording_manager.get_recorder(platform)
-                
-                # Ищем доступные шаблоны
-                available_recordings = recorder.get_available_recordings()
-                
-                if available_recordings:
-                    # Берем последний созданный шаблон
-                    latest_recording = available_recordings[-1]
-                    
-                    # Загружаем и воспроизводим
-                    success = recorder.load_recording(latest_recording)
-                    if success:
-                        result = recorder.replay_actions(user_data, delay=1.5)
-                        results[platform] = {
-                            'success': result,
-                            'template': latest_recording
-                        }
-                        
-                        status = "✅ Успешно" if result else "⚠️ С ошибками"
-                        await self.send_message_to_chat(
-                            chat_id,
-                            f"{status} {self.platform_templates[platform]['name']} - {latest_recording}"
-                        )
-                    else:
-                        results[platform] = {'success': False, 'error': 'Не удалось загрузить шаблон'}
-                        await self.send_message_to_chat(
-                            chat_id,
-                            f"❌ {self.platform_templates[platform]['name']} - ошибка загрузки шаблона"
-                        )
-                else:
-                    results[platform] = {'success': False, 'error': 'Нет доступных шаблонов'}
-                    await self.send_message_to_chat(
-                        chat_id,
-                        f"❌ {self.platform_templates[platform]['name']} - нет шаблонов. Создайте шаблон через record_actions.py"
-                    )
-                    
-            except Exception as e:
-                results[platform] = {'success': False, 'error': str(e)}
+        """Создание объявлений на всех выбранных платформах (параллельно)"""
+        from parallel_replay import ParallelReplayRun
+
+        run = ParallelReplayRun(platforms, user_data, delay=1.5)
+        self.active_runs[chat_id] = run
+
+        cancel_markup = InlineKeyboardMarkup([
+            [InlineKeyboardButton("⏹ Остановить", callback_data='smart_cancel_run')]
+        ])
+        await self.send_message_to_chat(
+            chat_id,
+            f"🔄 Создаю объявления: {', '.join(self.platform_templates[p]['name'] for p in platforms)}...",
+            cancel_markup
+        )
+
+        async def report_progress(platform, result):
+            name = self.platform_templates[platform]['name']
+            if result.get('success'):
                 await self.send_message_to_chat(
-                    chat_id,
-                    f"❌ {self.platform_templates[platform]['name']} - ошибка: {str(e)}"
+                    chat_id, f"✅ Успешно {name} - {result.get('template')} ({result.get('elapsed')}с)"
                 )
-        
+            elif result.get('template'):
+                await self.send_message_to_chat(chat_id, f"⚠️ {name} - {result.get('error', 'с ошибками')}")
+            else:
+                await self.send_message_to_chat(chat_id, f"❌ {name} - {result.get('error', 'ошибка')}")
+
+        try:
+            results = await run.run(on_progress=report_progress, deadline=SMART_RUN_DEADLINE)
+        finally:
+            self.active_runs.pop(chat_id, None)
+
         # Отправляем итоговый отчет
         await self.send_final_report(chat_id, results)
-    
+
+    async def cancel_active_run(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Остановить создание объявлений в текущем чате"""
+        query = update.callback_query
+        run = self.active_runs.get(query.message.chat_id)
+        if run:
+            run.cancel()
+            await query.answer("⏹ Останавливаем после текущего действия...")
+        else:
+            await query.answer("Нет активного создания объявлений")
+
+    def close(self):
+        """Остановить незавершенные создания объявлений (при остановке приложения)"""
+        for run in self.active_runs.values():
+            run.cancel()
+        self.active_runs.clear()
+
     async def send_final_report(self, chat_id, results):
         """Отправить итоговый отчет"""
         success_count = sum(1 for r in results.values() if r.get('success', False))
@@ -296,7 +297,7 @@ class SmartBotIntegration:
         
         for platform_id, platform_info in self.platform_templates.items():
             recorder = self.recording_manager.get_recorder(platform_id)
-            recordings = recorder.get_available_recordings()
+            recordings = await run_blocking(recorder.get_available_recordings)
             
             if recordings:
                 status_text += f"✅ {platform_info['name']}: {len(recordings)} шаблонов\n"
@@ -341,8 +342,10 @@ class SmartBotIntegration:
             per_chat=True
         )
         
-        return [
-            smart_conv_handler,
-            CallbackQueryHandler(self.show_smart_menu, pattern='^smart_menu$'),
-            CallbackQueryHandler(self.show_templates_status, pattern='^smart_templates$'),
-        ] 
\ No newline at end of file
+        return [smart_conv_handler]
+    
+    def register_callbacks(self, router):
+        """Кнопки меню умной автоматизации в таблице маршрутов бота (callback_router)"""
+        router.add('smart_menu', self.show_smart_menu)
+        router.add('smart_templates', self.show_templates_status, answer=False)
+        router.add('smart_cancel_run', self.cancel_active_run, answer=False)
\ No newline at end of file
@@ -10,6 +10,10 @@ import time
 import subprocess
 import signal
 from pathlib import Path
+from startup_profile import get_startup_profiler, probe_children
+
+# Профилирование старта (--profile-startup): Mini App и бот профилируются в своих процессах
+profiler = get_startup_profiler('start_simple')
 
 def create_directories():
     """Создание необходимых директорий"""
@@ -188,4 +192,6 @@ def main():
         print("✅ Все сервисы остановлены")
 
 if __name__ == "__main__":
+    if profiler:
+        sys.exit(profiler.run(probe_children, ['run_mini_app.py', 'run_bot.py']))
     main()
@@ -0,0 +1,416 @@
+"""
+Профилирование старта точек входа (--profile-startup)
+Записывает время импорта модулей, создания менеджеров и время до первого обработанного
+запроса и выдает отчет в JSON. Профилирование работает офлайн: бот отвечает на /start
+через локальный фейковый Bot API (OfflineBotRequest), Mini App - через TestClient,
+без BOT_TOKEN config.py подставляет фиктивный токен.
+
+Запуск:
+    python run_bot.py --profile-startup                            # отчет в stdout
+    python run_all.py --profile-startup --profile-output startup.json
+"""
+
+import importlib
+import importlib.abc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+PROFILE_FLAG = '--profile-startup'
+OUTPUT_FLAG = '--profile-output'
+# Включает профилирование без флага (serverless) и сообщает config.py о режиме профилирования
+PROFILE_ENV = 'STARTUP_PROFILE'
+DUMMY_TOKEN = '123456:STARTUP-PROFILE'
+
+# Сколько самых долгих модулей и пакетов попадает в отчет
+TOP_IMPORTS = 25
+TOP_PACKAGES = 15
+
+
+def profiling_enabled(argv: Optional[List[str]] = None) -> bool:
+    argv = sys.argv if argv is None else argv
+    return PROFILE_FLAG in argv or os.getenv(PROFILE_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def output_path(argv: Optional[List[str]] = None) -> Optional[str]:
+    argv = sys.argv if argv is None else argv
+    if OUTPUT_FLAG in argv and argv.index(OUTPUT_FLAG) + 1 < len(argv):
+        return argv[argv.index(OUTPUT_FLAG) + 1]
+    return os.getenv(f'{PROFILE_ENV}_OUTPUT')
+
+
+class _TimedLoader:
+    """Обертка загрузчика: время выполнения модуля (с вложенными импортами и без них)"""
+
+    def __init__(self, loader, name: str, timer: 'ImportTimer'):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self._timer._stack()
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self._timer.records[self._name] = (elapsed, elapsed - children)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Время импорта модулей (аналог python -X importtime внутри процесса)
+
+    Первым в sys.meta_path: находит спецификацию остальными искателями и оборачивает загрузчик.
+    """
+
+    def __init__(self):
+        # модуль -> (с вложенными импортами, собственное), секунды
+        self.records: Dict[str, tuple] = {}
+        self._local = threading.local()
+
+    def _stack(self) -> List[float]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, name, self)
+            return spec
+        return None
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def summary(self, top: int = TOP_IMPORTS, top_packages: int = TOP_PACKAGES) -> Dict[str, Any]:
+        packages: Dict[str, float] = {}
+        for name, (_, self_time) in self.records.items():
+            package = name.partition('.')[0]
+            packages[package] = packages.get(package, 0.0) + self_time
+        slowest = sorted(self.records.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            'count': len(self.records),
+            'total_ms': round(sum(self_time for _, self_time in self.records.values()) * 1000, 1),
+            'slowest': [
+                {'module': name, 'self_ms': round(self_time * 1000, 1), 'cumulative_ms': round(cumulative * 1000, 1)}
+                for name, (cumulative, self_time) in slowest
+            ],
+            'packages': {
+                package: round(seconds * 1000, 1)
+                for package, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top_packages]
+            }
+        }
+
+
+class StartupProfiler:
+    """
+    Отчет о старте точки входа
+
+    Пример (первые строки скрипта, до тяжелых импортов):
+        profiler = get_startup_profiler('run_bot')   # None без --profile-startup
+        ...
+        if profiler:
+            sys.exit(profiler.run(probe_bot, BOT_TOKEN))
+    """
+
+    def __init__(self, entry_point: str, output: Optional[str] = None):
+        self.entry_point = entry_point
+        self.output = output
+        self.started = time.perf_counter()
+        # Время по часам для сопоставления с дочерними процессами
+        self.started_at = time.time()
+        self.phases: List[Dict[str, Any]] = []
+        self.first_requests: Dict[str, float] = {}
+        self.managers: Dict[str, Any] = {}
+        self.children: Dict[str, Any] = {}
+        self.errors: List[str] = []
+        # Время инструментов замера (TestClient и т.п.) - не входит во время до первого запроса
+        self.overhead = 0.0
+        self.imports = ImportTimer()
+        self.imports.install()
+        # Отчет без --profile-output идет в stdout - сообщения запуска перенаправляются в stderr
+        self._stdout = sys.stdout
+        if output is None:
+            sys.stdout = sys.stderr
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str, overhead: bool = False):
+        """Замер этапа старта (создание менеджеров, инициализация, первый запрос)"""
+        started = time.perf_counter()
+        record = {'name': name, 'start_ms': round((started - self.started) * 1000, 1)}
+        if overhead:
+            record['overhead'] = True
+        try:
+            yield
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if overhead:
+                self.overhead += elapsed
+            record['ms'] = round(elapsed * 1000, 1)
+            self.phases.append(record)
+
+    def first_request(self, service: str, at_ms: Optional[float] = None):
+        """Отметить первый обработанный запрос сервиса (мс от старта точки входа)"""
+        if at_ms is None:
+            at_ms = round(self.elapsed_ms() - self.overhead * 1000, 1)
+        self.first_requests.setdefault(service, at_ms)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'entry_point': self.entry_point,
+            'python': platform.python_version(),
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'total_ms': self.elapsed_ms(),
+            'overhead_ms': round(self.overhead * 1000, 1),
+            # Все сервисы точки входа обработали первый запрос
+            'time_to_first_request_ms': max(self.first_requests.values()) if self.first_requests else None,
+            'first_request_ms': self.first_requests,
+            'phases': self.phases,
+            'imports': self.imports.summary(),
+            'managers': self.managers,
+            'children': self.children,
+            'errors': self.errors
+        }
+
+    def run(self, probe: Callable[..., Any], *args) -> int:
+        """Выполнить замер (функцию или корутину), выдать отчет; код выхода 1 при ошибках"""
+        try:
+            result = probe(self, *args)
+            if hasattr(result, '__await__'):
+                import asyncio
+                asyncio.run(result)
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+        return 1 if self.emit()['errors'] else 0
+
+    def emit(self) -> Dict[str, Any]:
+        """Записать отчет в файл (--profile-output) или stdout"""
+        self.imports.uninstall()
+        sys.stdout = self._stdout
+        report = self.report()
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if self.output:
+            with open(self.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            print(text, flush=True)
+        return report
+
+
+def get_startup_profiler(entry_point: str, argv: Optional[List[str]] = None) -> Optional[StartupProfiler]:
+    """Профилировщик точки входа или None, если профилирование не запрошено"""
+    if not profiling_enabled(argv):
+        return None
+    # Режим виден config.py (фиктивный токен) и дочерним процессам
+    os.environ[PROFILE_ENV] = '1'
+    return StartupProfiler(entry_point, output_path(argv))
+
+
+def _offline_request_class():
+    from telegram.request import BaseRequest
+
+    class OfflineBotRequest(BaseRequest):
+        """Фейковый Bot API внутри процесса: getMe и ответы на отправку сообщений, без сети"""
+
+        def __init__(self):
+            self.calls: List[str] = []
+            self._message_id = 0
+
+        async def initialize(self):
+            pass
+
+        async def shutdown(self):
+            pass
+
+        async def do_request(self, url, method, request_data=None, read_timeout=None,
+                             write_timeout=None, connect_timeout=None, pool_timeout=None):
+            api_method = url.rsplit('/', 1)[-1]
+            params = request_data.parameters if request_data else {}
+            self.calls.append(api_method)
+            if api_method == 'getMe':
+                result = {'id': 1, 'is_bot': True, 'first_name': 'Profile', 'username': 'profile_bot'}
+            elif api_method in ('sendMessage', 'editMessageText'):
+                self._message_id += 1
+                result = {'message_id': self._message_id, 'date': int(time.time()),
+                          'chat': {'id': int(params.get('chat_id', 0)), 'type': 'private'},
+                          'text': params.get('text')}
+            else:
+                result = True
+            return 200, json.dumps({'ok': True, 'result': result}).encode('utf-8')
+
+    return OfflineBotRequest
+
+
+def offline_bot_request():
+    """BaseRequest для Application без сети (telegram импортируется при вызове)"""
+    return _offline_request_class()()
+
+
+def start_update(update_id: int = 1, chat_id: int = 1) -> Dict[str, Any]:
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Profile'},
+            'text': '/start',
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}]
+        }
+    }
+
+
+async def probe_application(profiler: StartupProfiler, application, request, service: str = 'bot'):
+    """initialize и первое обновление (/start) через офлайн Bot API"""
+    from telegram import Update
+
+    with profiler.phase(f'{service}: initialize'):
+        await application.initialize()
+    try:
+        with profiler.phase(f'{service}: first /start'):
+            await application.process_update(Update.de_json(start_update(), application.bot))
+        if 'sendMessage' in request.calls:
+            profiler.first_request(service)
+        else:
+            profiler.errors.append(f"{service}: /start не отправил ответ")
+    finally:
+        await application.shutdown()
+
+
+async def probe_bot(profiler: StartupProfiler, token: str):
+    """Старт HotelBot: импорт, создание менеджеров, первый /start, затем загрузка бэкендов"""
+    with profiler.phase('import bot'):
+        from bot import HotelBot
+    request = offline_bot_request()
+    with profiler.phase('HotelBot()'):
+        bot = HotelBot(token, request=request)
+    await probe_application(profiler, bot.application, request)
+    # Бэкенды загружаются после первого ответа (в рабочем режиме - в фоне)
+    with profiler.phase('backends preload'):
+        bot.backends.preload()
+    from integration_registry import get_integration_registry
+    profiler.managers['backends'] = bot.backends.stats()
+    profiler.managers['integrations'] = get_integration_registry().snapshot()
+
+
+def probe_asgi(profiler: StartupProfiler, app_path: str = 'mini_app_api:app', path: str = '/api/status',
+               service: str = 'mini_app'):
+    """Старт ASGI-приложения: импорт, startup-события и первый запрос через TestClient"""
+    module, _, attr = app_path.partition(':')
+    with profiler.phase(f'import {module}'):
+        app = getattr(importlib.import_module(module), attr)
+    # Инструмент замера, а не часть старта
+    with profiler.phase('import fastapi.testclient', overhead=True):
+        from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    with profiler.phase(f'{service}: startup'):
+        client.__enter__()
+    try:
+        with profiler.phase(f'{service}: first request {path}'):
+            response = client.get(path)
+        if response.status_code < 500:
+            profiler.first_request(service)
+        else:
+            profiler.errors.append(f"{service}: {path} вернул {response.status_code}")
+    finally:
+        with profiler.phase(f'{service}: shutdown'):
+            client.__exit__(None, None, None)
+    from integration_registry import get_integration_registry
+    profiler.managers['integrations'] = get_integration_registry().snapshot()
+
+
+def probe_http_handler(profiler: StartupProfiler, handler_class, path: str = '/', service: str = 'http'):
+    """Первый запрос к BaseHTTPRequestHandler (serverless-обработчик) на локальном порту"""
+    from http.server import HTTPServer
+    from urllib.request import urlopen
+
+    server = HTTPServer(('127.0.0.1', 0), handler_class)
+    thread = threading.Thread(target=server.handle_request, daemon=True)
+    thread.start()
+    try:
+        with profiler.phase(f'{service}: first request {path}'):
+            with urlopen(f"http://127.0.0.1:{server.server_address[1]}{path}", timeout=10) as response:
+                response.read()
+        profiler.first_request(service)
+    finally:
+        thread.join(timeout=5)
+        server.server_close()
+
+
+def probe_callable(profiler: StartupProfiler, handler: Callable[..., Any], *args, service: str = 'handler'):
+    """Первый вызов serverless-функции"""
+    with profiler.phase(f'{service}: first call'):
+        handler(*args)
+    profiler.first_request(service)
+
+
+def probe_children(profiler: StartupProfiler, scripts: Iterable[str], timeout: float = 120.0):
+    """Профилирование дочерних процессов лаунчера (запускаются одновременно, как в рабочем режиме)"""
+    outputs = {}
+    processes = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for script in scripts:
+            outputs[script] = os.path.join(tmp, f'{os.path.basename(script)}.json')
+            spawned_ms = profiler.elapsed_ms()
+            process = subprocess.Popen(
+                [sys.executable, script, PROFILE_FLAG, OUTPUT_FLAG, outputs[script]],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+            )
+            processes[script] = (process, spawned_ms)
+        for script, (process, spawned_ms) in processes.items():
+            try:
+                _, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                profiler.errors.append(f"{script}: нет отчета за {timeout:.0f}с")
+                continue
+            if process.returncode != 0 or not os.path.exists(outputs[script]):
+                profiler.errors.append(f"{script}: код {process.returncode}: {stderr.strip()[-500:]}")
+                continue
+            with open(outputs[script], encoding='utf-8') as f:
+                child = json.load(f)
+            child['spawned_ms'] = spawned_ms
+            profiler.children[script] = child
+            # Отсчет ребенка начинается после старта интерпретатора - сдвигаем по часам
+            offset_ms = (child['started_at'] - profiler.started_at) * 1000
+            for service, at_ms in child['first_request_ms'].items():
+                profiler.first_request(f'{script}:{service}', round(offset_ms + at_ms, 1))
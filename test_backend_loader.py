@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Тестирование ленивой загрузки бэкендов автоматизации
+"""
+
+import importlib.metadata
+import os
+import sys
+import tempfile
+
+from backend_loader import BackendLoader, BackendUnavailable
+
+BACKEND_SOURCE = """
+CREATED = []
+
+class FastBackend:
+    def __init__(self):
+        CREATED.append('fast')
+
+class BrokenBackend:
+    def __init__(self):
+        raise RuntimeError('нет дисплея')
+"""
+
+
+def test_lazy_load_and_fallback():
+    """Тест: модуль импортируется при первом get, кандидаты пробуются по порядку"""
+    print("🔍 Тестирование ленивой загрузки бэкендов...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'lazy_backend_mod.py'), 'w', encoding='utf-8') as f:
+            f.write(BACKEND_SOURCE)
+        sys.path.insert(0, tmp)
+        try:
+            loader = BackendLoader({
+                'rpa': ('missing_rpa_simple:Manager', 'lazy_backend_mod:FastBackend'),
+                'broken': ('lazy_backend_mod:BrokenBackend',),
+                'absent': ('missing_backend_mod:Backend',),
+            }, discover=False)
+
+            # Проверка доступности не импортирует модуль
+            assert loader.available('rpa') and loader.available('broken')
+            assert not loader.available('absent') and not loader.available('unknown')
+            assert 'lazy_backend_mod' not in sys.modules
+
+            rpa = loader.get('rpa')
+            assert rpa is loader.get('rpa')
+            assert sys.modules['lazy_backend_mod'].CREATED == ['fast']
+
+            # Ошибка создания: бэкенд недоступен, повторно не пробуем
+            assert loader.get('broken') is None and not loader.available('broken')
+            try:
+                loader.require('broken')
+                assert False, "обязательный бэкенд без экземпляра должен быть ошибкой"
+            except BackendUnavailable as e:
+                assert 'нет дисплея' in str(e)
+
+            stats = loader.stats()
+            assert stats['rpa']['source'] == 'lazy_backend_mod:FastBackend' and stats['rpa']['import_ms'] >= 0
+            assert stats['broken']['loaded'] and stats['broken']['available'] is False
+            assert not stats['absent']['loaded']
+            assert loader.preload() == {'rpa': True}
+        finally:
+            sys.path.remove(tmp)
+            sys.modules.pop('lazy_backend_mod', None)
+    print("✅ Бэкенды загружаются при первом обращении")
+
+
+def test_entry_point_discovery():
+    """Тест: бэкенды из entry points переопределяют встроенные"""
+    print("🔍 Тестирование поиска бэкендов через entry points...")
+
+    entry_point = importlib.metadata.EntryPoint(
+        name='rpa', value='callback_router:CallbackRouter', group='hotel_bot.backends'
+    )
+    original = importlib.metadata.entry_points
+    importlib.metadata.entry_points = lambda group=None: [entry_point] if group == 'hotel_bot.backends' else []
+    try:
+        loader = BackendLoader({'rpa': ('missing_rpa_simple:Manager',)})
+    finally:
+        importlib.metadata.entry_points = original
+    assert loader.available('rpa')
+    assert len(loader.get('rpa')) == 0
+    print("✅ Entry points подключаются")
+
+
+if __name__ == "__main__":
+    test_lazy_load_and_fallback()
+    test_entry_point_discovery()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Тестирование асинхронного клиента Bnovo PMS на локальном stub-сервере
+Проверяет полноту постраничной выгрузки и замеряет пропускную способность
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bnovo_client import BnovoClient
+from bnovo_manager import BnovoManager
+
+TOTAL_BOOKINGS = 5000
+PAGE_LATENCY = 0.002  # Имитация задержки API на страницу
+
+
+def make_bookings(total: int) -> list:
+    """Сгенерировать тестовые бронирования"""
+    return [
+        {
+            'id': i,
+            'number': f'B-{i:06d}',
+            'customer': {'name': 'Гость', 'surname': str(i)},
+            'amount': 1000 + i % 500,
+            'source': {'name': ['Ostrovok', 'Bronevik', '101 Hotels'][i % 3]},
+            'status': {'name': 'Заселен' if i % 4 == 0 else 'Новое'}
+        }
+        for i in range(1, total + 1)
+    ]
+
+
+def start_stub_server(total: int = TOTAL_BOOKINGS, with_meta: bool = True):
+    """Запустить stub-сервер Bnovo API, вернуть (сервер, base_url, счетчик запросов)"""
+    bookings = make_bookings(total)
+    stats = {'requests': 0}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            params = parse_qs(parsed.query)
+            stats['requests'] += 1
+
+            if parsed.path != '/api/v1/bookings':
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            limit = int(params.get('limit', ['20'])[0])
+            offset = int(params.get('offset', ['0'])[0])
+            time.sleep(PAGE_LATENCY)
+
+            data = {'bookings': bookings[offset:offset + limit]}
+            if with_meta:
+                data['meta'] = {'total': total, 'limit': limit, 'offset': offset}
+            body = json.dumps({'data': data}).encode()
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", stats
+
+
+def test_bnovo_client_pagination():
+    """Тест полной выгрузки всех страниц через потоковый итератор"""
+    print("🔍 Тестирование постраничной выгрузки Bnovo...")
+
+    server, base_url, stats = start_stub_server()
+    try:
+        async def fetch():
+            async with BnovoClient('test-key', base_url, max_concurrency=8) as client:
+                started = time.perf_counter()
+                ids = [booking['id'] async for booking in client.iter_bookings('2025-01-01', '2025-01-31')]
+                return ids, time.perf_counter() - started
+
+        ids, elapsed = asyncio.run(fetch())
+
+        assert ids == list(range(1, TOTAL_BOOKINGS + 1))
+        assert stats['requests'] == TOTAL_BOOKINGS // 20
+        print(f"✅ Получено {len(ids)} бронирований за {elapsed:.2f}с "
+              f"({len(ids) / elapsed:.0f} бронирований/с, {stats['requests']} запросов)")
+    finally:
+        server.shutdown()
+
+
+def test_bnovo_client_without_total():
+    """Тест выгрузки, когда API не сообщает общее количество"""
+    print("🔍 Тестирование выгрузки без meta.total...")
+
+    server, base_url, stats = start_stub_server(total=1234, with_meta=False)
+    try:
+        client = BnovoClient('test-key', base_url, max_concurrency=4)
+        bookings = asyncio.run(client.get_bookings('2025-01-01', '2025-01-31'))
+
+        assert [b['id'] for b in bookings] == list(range(1, 1235))
+        print(f"✅ Получено {len(bookings)} бронирований ({stats['requests']} запросов)")
+    finally:
+        server.shutdown()
+
+
+def test_bnovo_manager_sync_wrapper():
+    """Тест синхронной обертки BnovoManager.get_bookings"""
+    print("🔍 Тестирование BnovoManager.get_bookings...")
+
+    server, base_url, _ = start_stub_server()
+    try:
+        manager = BnovoManager('test-key', base_url=base_url)
+        success, bookings = manager.get_bookings('2025-01-01', '2025-01-31')
+        assert success
+        assert len(bookings) == TOTAL_BOOKINGS
+
+        success, stats = manager.get_statistics('2025-01-01', '2025-01-31')
+        assert success
+        assert stats['total_bookings'] == TOTAL_BOOKINGS
+        print(f"✅ Статистика посчитана по {stats['total_bookings']} бронированиям")
+
+        success, message = BnovoManager('test-key', base_url=base_url + '/missing').get_bookings()
+        assert not success
+        print(f"✅ Ошибка API обработана: {message}")
+    finally:
+        server.shutdown()
+
+
+def main():
+    """Главная функция"""
+    print("🧪 Тестирование клиента Bnovo PMS")
+    print("=" * 50)
+
+    test_bnovo_client_pagination()
+    test_bnovo_client_without_total()
+    test_bnovo_manager_sync_wrapper()
+
+    print("\n🎉 Все тесты пройдены!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Тестирование векторной аналитики бронирований
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from bnovo_manager import BnovoManager
+from booking_analytics import BookingFrame, booking_summary, period_mask, window_metrics
+from booking_sync import BookingSyncEngine
+from db import Database
+from test_booking_sync import FakeBnovoManager
+
+
+def make_booking(booking_id, arrival, departure, amount, source='Booking.com', status='Новое',
+                 created='2024-05-01 10:00:00', hotel_id=None):
+    booking = {
+        'id': booking_id,
+        'amount': amount,
+        'source': {'name': source},
+        'status': {'name': status},
+        'dates': {'arrival': f'{arrival} 14:00:00+03:00', 'departure': f'{departure}T12:00:00'},
+        'create_date': created
+    }
+    if hotel_id is not None:
+        booking['hotel_id'] = hotel_id
+    return booking
+
+
+def test_window_metrics():
+    """Тест: загрузка, ADR, RevPAR, lead time и отмены за период"""
+    print("🔍 Тестирование показателей периода...")
+
+    frame = BookingFrame()
+    frame.upsert([
+        # 4 ночи, 2 из них в июне
+        make_booking(1, '2024-05-30', '2024-06-03', 4000, created='2024-05-20'),
+        make_booking(2, '2024-06-10', '2024-06-12', 3000, source='Ostrovok', created='2024-06-01'),
+        make_booking(3, '2024-06-15', '2024-06-16', 5000, status='Отменено'),
+        # Вне периода
+        make_booking(4, '2024-07-05', '2024-07-07', 9000),
+        {'id': 5, 'amount': 100},
+    ])
+
+    metrics = window_metrics(frame, '2024-06-01', '2024-07-01', rooms=2)
+    assert metrics['nights'] == 30
+    assert metrics['bookings'] == 2 and metrics['cancelled'] == 1
+    assert metrics['room_nights'] == 4
+    assert metrics['revenue'] == 2000 + 3000
+    assert metrics['adr'] == 5000 / 4
+    assert metrics['occupancy'] == 4 / 60
+    assert metrics['revpar'] == 5000 / 60
+    assert abs(metrics['cancellation_rate'] - 1 / 3) < 1e-9
+    # Lead time только у заезда внутри периода (бронирование 2: 9 дней)
+    assert metrics['lead_time_avg'] == 9 and metrics['lead_time_median'] == 9
+    assert metrics['channels']['Ostrovok']['revenue'] == 3000
+    assert metrics['channels']['Booking.com'] == {
+        'bookings': 1, 'cancelled': 1, 'room_nights': 2, 'revenue': 2000.0, 'adr': 1000.0, 'share': 0.4
+    }
+
+    # Без номерного фонда загрузка неизвестна
+    assert window_metrics(frame, '2024-06-01', '2024-07-01')['occupancy'] is None
+    print("✅ Показатели периода считаются верно")
+
+
+def test_upsert_and_properties():
+    """Тест: обновление бронирований на месте и фильтр по объекту"""
+    print("🔍 Тестирование инкрементального обновления...")
+
+    frame = BookingFrame(capacity=2)
+    added, updated = frame.upsert([
+        make_booking(1, '2024-06-01', '2024-06-03', 2000, hotel_id='A'),
+        make_booking(2, '2024-06-01', '2024-06-02', 1000, hotel_id='B'),
+    ])
+    assert (added, updated) == (2, 0)
+
+    added, updated = frame.upsert([
+        make_booking(1, '2024-06-01', '2024-06-03', 2000, status='Отменено', hotel_id='A'),
+        make_booking(3, '2024-06-05', '2024-06-06', 1500, status='Заселен', hotel_id='B'),
+    ])
+    assert (added, updated) == (1, 1)
+    assert len(frame) == 3
+
+    summary = booking_summary(frame)
+    assert summary['total_bookings'] == 3 and summary['total_revenue'] == 4500
+    assert summary['confirmed_bookings'] == 1
+    assert summary['platforms'] == {'Booking.com': {'count': 3, 'revenue': 4500.0}}
+
+    metrics = window_metrics(frame, '2024-06-01', '2024-06-08', rooms={'A': 1, 'B': 1}, property_name='B')
+    assert metrics['bookings'] == 2 and metrics['cancelled'] == 0
+    assert metrics['occupancy'] == 2 / 7
+    assert set(metrics['properties']) == {'B'}
+    print("✅ Бронирования обновляются на месте")
+
+
+def test_sync_engine_analytics():
+    """Тест: колоночная копия синхронизации следует за изменениями"""
+    print("🔍 Тестирование аналитики синхронизации...")
+
+    manager = FakeBnovoManager([make_booking(1, '2024-06-01', '2024-06-03', 2000)])
+    db = Database(':memory:')
+    engine = BookingSyncEngine(manager, db)
+    asyncio.run(engine.sync())
+
+    # Загружается из базы при первом обращении
+    assert len(engine.analytics) == 1
+
+    manager.bookings.append(make_booking(2, '2024-06-02', '2024-06-04', 3000))
+    manager.bookings[0]['status'] = {'name': 'Отменено'}
+    asyncio.run(engine.sync())
+
+    metrics = window_metrics(engine.analytics, '2024-06-01', '2024-06-05')
+    assert metrics['bookings'] == 1 and metrics['cancelled'] == 1
+    assert metrics['revenue'] == 3000
+
+    db.close()
+    print("✅ Аналитика обновляется по мере синхронизации")
+
+
+def test_statistics_from_sync_frame():
+    """Тест: статистика Bnovo по колонкам синхронизации без запросов к API"""
+    print("🔍 Тестирование статистики по колонкам синхронизации...")
+
+    frame = BookingFrame()
+    frame.upsert([
+        make_booking(1, '2024-05-30', '2024-06-03', 4000, status='Заселен'),
+        make_booking(2, '2024-06-30', '2024-07-02', 2000, source='Ostrovok'),
+        make_booking(3, '2024-07-05', '2024-07-07', 9000),
+        {'id': 4, 'amount': 100},
+    ])
+    assert period_mask(frame, '2024-06-01', '2024-07-01').tolist() == [True, True, False, False]
+
+    manager = BnovoManager('test-key', base_url='http://127.0.0.1:9')
+
+    def offline(*args, **kwargs):
+        raise AssertionError("при переданных колонках бронирования не выгружаются")
+
+    manager.get_bookings = offline
+    success, stats = manager.get_statistics('2024-06-01', '2024-06-30', rooms=2, frame=frame)
+    assert success, stats
+    assert stats['total_bookings'] == 2 and stats['total_revenue'] == '6000.00 ₽'
+    assert stats['confirmed_bookings'] == 1
+    assert set(stats['platforms']) == {'Booking.com', 'Ostrovok'}
+    # 2 ночи брони 1 и 1 ночь брони 2 в июне при двух номерах
+    assert stats['analytics']['room_nights'] == 3 and stats['analytics']['occupancy'] == 3 / 60
+    assert 'RevPAR' in manager.format_statistics_message(stats)
+    print("✅ Статистика считается по колонкам синхронизации")
+
+
+def test_statistics_beyond_synced_range():
+    """Тест: период статистики шире синхронизированного - недостающая часть догружается один раз"""
+    print("🔍 Тестирование статистики за период шире синхронизации...")
+
+    today = datetime.now()
+    day = lambda offset: (today + timedelta(days=offset)).strftime('%Y-%m-%d')
+    bookings = [
+        make_booking(1, day(-15), day(-13), 4000, created=f'{day(-15)} 10:00:00'),
+        make_booking(2, day(-5), day(-3), 2000, created=f'{day(-5)} 10:00:00'),
+        make_booking(3, day(0), day(2), 3000, created=f'{day(0)} 09:00:00'),
+    ]
+    manager = BnovoManager('test-key', base_url='http://127.0.0.1:9')
+    calls = []
+
+    async def get_bookings_async(date_from=None, date_to=None):
+        # Bnovo отдает бронирования, созданные в периоде запроса
+        calls.append((date_from, date_to))
+        return True, [b for b in bookings if date_from <= b['create_date'][:10] <= date_to]
+
+    manager.get_bookings_async = get_bookings_async
+    db = Database(':memory:')
+    engine = BookingSyncEngine(manager, db)
+
+    # Первая синхронизация видит только последние сутки
+    asyncio.run(engine.sync())
+    assert calls == [(day(-1), day(1))]
+    assert len(asyncio.run(engine.load_analytics())) == 1
+    assert not engine.covers(day(-20), day(5))
+
+    success, stats = asyncio.run(engine.statistics(day(-20), day(5), rooms=2))
+    assert success, stats
+    assert stats['total_bookings'] == 3 and stats['total_revenue'] == '9000.00 ₽'
+    # Догружено только начало периода, до синхронизированного отрезка
+    assert calls[-1] == (day(-20), day(-1))
+    assert len(db.get_bookings_data(engine.account_id)) == 3
+
+    # Дальше период покрыт - статистика считается без запросов
+    assert engine.covers(day(-20), day(5))
+    success, stats = asyncio.run(engine.statistics(day(-20), day(5), rooms=2))
+    assert success and stats['total_bookings'] == 3 and len(calls) == 2
+
+    db.close()
+    print("✅ Недостающая часть периода догружается в хранилище")
+
+
+if __name__ == "__main__":
+    test_window_metrics()
+    test_upsert_and_properties()
+    test_sync_engine_analytics()
+    test_statistics_from_sync_frame()
+    test_statistics_beyond_synced_range()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Тестирование инкрементальной синхронизации бронирований
+"""
+
+import asyncio
+
+from booking_sync import BookingSyncEngine
+from db import Database
+
+
+class FakeBnovoManager:
+    """Подмена BnovoManager: отдает заранее заданный список бронирований"""
+
+    def __init__(self, bookings):
+        self.api_key = 'test-key'
+        self.bookings = bookings
+        self.calls = []
+
+    async def get_bookings_async(self, date_from=None, date_to=None):
+        self.calls.append((date_from, date_to))
+        return True, [dict(b) for b in self.bookings]
+
+
+def test_booking_sync_deltas():
+    """Тест: повторная синхронизация отдает только изменения"""
+    print("🔍 Тестирование инкрементальной синхронизации...")
+
+    bookings = [
+        {'id': 1, 'amount': 1000, 'create_date': '2025-01-10 10:00:00'},
+        {'id': 2, 'amount': 2000, 'create_date': '2025-01-10 11:00:00'},
+    ]
+    manager = FakeBnovoManager(bookings)
+    db = Database(':memory:')
+    engine = BookingSyncEngine(manager, db)
+
+    # Первая синхронизация наполняет хранилище без уведомлений
+    success, changes = asyncio.run(engine.sync())
+    assert success and changes == []
+    assert engine.last_stats['new'] == 2
+
+    # Без изменений - пусто
+    success, changes = asyncio.run(engine.sync())
+    assert success and changes == []
+
+    # Новое и измененное бронирование
+    manager.bookings.append({'id': 3, 'amount': 3000, 'create_date': '2025-01-11 09:00:00'})
+    manager.bookings[0]['amount'] = 1500
+    success, changes = asyncio.run(engine.sync())
+    assert success
+    assert sorted(b['id'] for b in changes) == [1, 3]
+    assert engine.last_stats == {'fetched': 3, 'new': 1, 'updated': 1}
+
+    # Отметка синхронизации продвинулась, запрос идет от нее
+    state = db.get_sync_state(engine.account_id)
+    assert state[0] == '3' and state[1] == '2025-01-11 09:00:00'
+    assert manager.calls[-1][0] == '2025-01-09'  # 2025-01-10 11:00 минус день перекрытия
+
+    db.close()
+    print("✅ Синхронизация отдает только новые и измененные бронирования")
+
+
+if __name__ == "__main__":
+    test_booking_sync_deltas()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Тестирование пула браузеров на подменном WebDriver
+"""
+
+import threading
+import time
+
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    """Подмена WebDriver: запоминает очистки и закрытие"""
+
+    def __init__(self, headless, extra_args):
+        self.headless = headless
+        self.cookies = {}
+        self.heap_mb = 10
+        self.quit_called = False
+        self.alive = True
+        self.window_handles = ['main']
+        self.switch_to = self
+        self.url = 'about:blank'
+
+    def window(self, handle):
+        pass
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise RuntimeError("браузер упал")
+        if 'usedJSHeapSize' in script:
+            return self.heap_mb * 1024 * 1024
+        if 'location.origin' in script:
+            return 'https://extranet.101hotels.com'
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Network.clearBrowserCookies':
+            self.cookies.clear()
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_pool_reuses_resets_and_recycles():
+    """Тест: повторное использование, очистка между арендами и пересоздание"""
+    print("🔍 Тестирование пула браузеров...")
+
+    created = []
+
+    def factory(headless, extra_args):
+        created.append(FakeDriver(headless, extra_args))
+        return created[-1]
+
+    pool = BrowserPool(size=1, max_browsers=2, max_uses=3, max_memory_growth_mb=100,
+                       headless=True, driver_factory=factory)
+    pool.warm_up()
+    assert len(created) == 1
+
+    # Аренда получает прогретый браузер, cookies предыдущего пользователя очищаются
+    with pool.lease() as driver:
+        assert driver is created[0]
+        driver.cookies['session'] = 'user-1'
+    with pool.lease() as driver:
+        assert driver is created[0] and driver.cookies == {}
+        driver.heap_mb = 500  # утечка памяти - браузер пересоздается
+    assert created[0].quit_called
+
+    # Пересоздание после max_uses
+    for _ in range(3):
+        with pool.lease() as driver:
+            assert driver is created[1]
+    assert created[1].quit_called
+
+    # Браузер, упавший во время простоя, отбраковывается при выдаче
+    with pool.lease() as driver:
+        crashed = driver
+    crashed.alive = False
+    with pool.lease() as driver:
+        assert driver is not crashed
+        assert driver.alive
+    assert pool.stats['failed_health_checks'] == 1
+
+    # Не более max_browsers одновременно: третий ждет возврата
+    first = pool.acquire()
+    second = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+    waiter.start()
+    time.sleep(0.1)
+    assert not got
+    pool.release(first)
+    waiter.join()
+    assert got == [first]
+
+    pool.release(second)
+    pool.release(got[0])
+    pool.shutdown()
+    stats = pool.get_stats()
+    assert stats['total'] == 0 and stats['leased'] == 0
+    print(f"✅ Пул браузеров: {stats}")
+
+
+if __name__ == "__main__":
+    test_pool_reuses_resets_and_recycles()
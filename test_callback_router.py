@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Тестирование таблицы маршрутов inline-кнопок
+"""
+
+import asyncio
+
+from callback_router import CallbackRouter, PrefixTrie
+
+
+class FakeQuery:
+    def __init__(self, data):
+        self.data = data
+        self.answers = []
+
+    async def answer(self, text=None):
+        self.answers.append(text)
+
+
+class FakeUpdate:
+    def __init__(self, data):
+        self.callback_query = FakeQuery(data)
+
+
+def test_prefix_trie():
+    """Тест: побеждает самый длинный префикс"""
+    print("🔍 Тестирование префиксного дерева...")
+
+    trie = PrefixTrie()
+    trie.insert('rpa_', 'rpa')
+    trie.insert('rpa_platform_', 'platform')
+    assert trie.longest('rpa_platform_ostrovok') == ('platform', len('rpa_platform_'))
+    assert trie.longest('rpa_menu') == ('rpa', len('rpa_'))
+    assert trie.longest('bnovo') == (None, 0)
+    print("✅ Префиксы разрешаются верно")
+
+
+def test_router_dispatch():
+    """Тест: точные маршруты, префиксы с параметром, ответ на callback и метрики"""
+    print("🔍 Тестирование маршрутизации кнопок...")
+
+    calls = []
+    router = CallbackRouter()
+
+    async def exact(update, context):
+        calls.append(('exact', update.callback_query.data))
+
+    async def country(update, context, country_id):
+        calls.append(('country', country_id))
+
+    async def answers_itself(update, context):
+        await update.callback_query.answer("готово")
+
+    async def broken(update, context):
+        raise RuntimeError("сбой")
+
+    router.add('101hotels_country_list', exact)
+    router.add_prefix('101hotels_country_', country)
+    router.add('smart_templates', answers_itself, answer=False)
+    router.add('broken', broken)
+    assert len(router) == 4 and 'broken' in router and 'unknown' not in router
+
+    try:
+        router.add('broken', broken)
+        assert False, "повторная регистрация должна быть ошибкой"
+    except ValueError:
+        pass
+
+    # Точное совпадение важнее префикса
+    update = FakeUpdate('101hotels_country_list')
+    assert asyncio.run(router.dispatch(update, None))
+    assert calls == [('exact', '101hotels_country_list')]
+    assert update.callback_query.answers == [None]
+
+    assert asyncio.run(router.dispatch(FakeUpdate('101hotels_country_42'), None))
+    assert calls[-1] == ('country', '42')
+
+    update = FakeUpdate('smart_templates')
+    asyncio.run(router.dispatch(update, None))
+    assert update.callback_query.answers == ["готово"]
+
+    # Неизвестная кнопка: ответить, чтобы у пользователя не висели «часики»
+    update = FakeUpdate('unknown')
+    assert not asyncio.run(router.dispatch(update, None))
+    assert update.callback_query.answers == [None]
+
+    try:
+        asyncio.run(router.dispatch(FakeUpdate('broken'), None))
+        assert False, "ошибка обработчика должна пробрасываться"
+    except RuntimeError:
+        pass
+
+    stats = router.get_stats()
+    assert stats['101hotels_country_*']['calls'] == 1
+    assert stats['broken']['errors'] == 1 and stats['broken']['in_flight'] == 0
+    assert 'unknown' not in stats
+    print("✅ Кнопки разбираются таблицей маршрутов")
+
+
+if __name__ == "__main__":
+    test_prefix_trie()
+    test_router_dispatch()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Тестирование слоя хранения (WAL, миграции, пакетная запись, многопоточность)
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+
+from db import Database, SCHEMA_VERSION
+
+
+def test_migrates_legacy_database():
+    """Тест: база старого формата догоняет схему без потери данных"""
+    print("🔍 Тестирование миграций...")
+
+    path = os.path.join(tempfile.mkdtemp(), 'legacy.db')
+    legacy = sqlite3.connect(path)
+    legacy.execute('''
+        CREATE TABLE account_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id TEXT NOT NULL,
+            session_data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    legacy.execute("INSERT INTO account_sessions (account_id, session_data) VALUES ('acc', 'old')")
+    legacy.commit()
+    legacy.close()
+
+    db = Database(path)
+    assert db.schema_version == SCHEMA_VERSION
+    assert db.get_account_session('acc')[2] == 'old'
+    db.add_account_session('acc', 'new')
+    assert db.get_account_session('acc')[2] == 'new'
+
+    plan = db.conn.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM account_sessions WHERE account_id = ? '
+        'ORDER BY created_at DESC, id DESC LIMIT 1', ('acc',)
+    ).fetchall()
+    assert 'idx_account_sessions_account' in str(plan) and 'TEMP B-TREE' not in str(plan)
+    db.close()
+    print("✅ Схема обновлена до версии", SCHEMA_VERSION)
+
+
+def test_bulk_writes_transactions_and_threads():
+    """Тест: пакетная запись, откат транзакции и запись из нескольких потоков"""
+    print("🔍 Тестирование пакетной записи и транзакций...")
+
+    db = Database(os.path.join(tempfile.mkdtemp(), 'bulk.db'))
+    assert db.bulk_add_listings((f'L{i}', '{}', 'pending') for i in range(2500)) == 2500
+    assert db.get_new_listing('L2499')[1] == 'L2499'
+
+    try:
+        with db.transaction():
+            db.update_listing_status('L1', 'published')
+            raise RuntimeError('сбой посреди транзакции')
+    except RuntimeError:
+        pass
+    assert db.get_new_listing('L1')[3] == 'pending'
+
+    def writer(thread_no):
+        for i in range(50):
+            db.add_new_listing(f'T{thread_no}-{i}', '{}')
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    count = db.conn.execute("SELECT COUNT(*) FROM new_listings WHERE listing_id LIKE 'T%'").fetchone()[0]
+    assert count == 200
+    assert asyncio.run(db.run_async(db.get_new_listing, 'T3-49')) is not None
+    assert db.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    db.close()
+    print("✅ Пакетная запись и транзакции работают")
+
+
+if __name__ == "__main__":
+    test_migrates_legacy_database()
+    test_bulk_writes_transactions_and_threads()
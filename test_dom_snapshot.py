@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Тестирование снимков страницы для ручной записи
+"""
+
+from dom_snapshot import DomSnapshotter, SNAPSHOT_JS
+from manual_recorder import ManualRecorder
+
+BUTTON_CLASS = 'whitespace-nowrap transition-colors font-regular relative flex flex-row'
+
+
+class FakeDriver:
+    """Отдает снимок так, как его возвращает SNAPSHOT_JS, и считает запросы"""
+
+    def __init__(self):
+        self.calls = 0
+        self.url = 'https://extranet.ostrovok.ru/v3/hotels'
+        self.rows = [
+            ['input', 'input', '', '', 'text-m w-full', 'text', '', 'Название, адрес или ID', '', '', None,
+             "//input[contains(@class, 'text-m')]"],
+            ['button', 'button', '', '', BUTTON_CLASS, '', '', '', 'Добавить объект', '', None,
+             "//button[contains(@class, 'whitespace-nowrap')]"],
+            ['link', 'a', '', '', '', '', '', '', 'Добавить объект', 'https://extranet.ostrovok.ru/v3/registration',
+             None, '//a'],
+            ['select', 'select', 'city', 'city', '', '', '', '', '', '', [['msk', 'Москва'], ['spb', 'Санкт-Петербург']],
+             "//*[@id='city']"],
+        ]
+
+    def execute_script(self, script, *args):
+        assert script == SNAPSHOT_JS
+        self.calls += 1
+        return {'url': self.url, 'title': 'Мои объекты', 'rows': [list(row) for row in self.rows]}
+
+
+def test_single_round_trip_snapshot_and_diff():
+    """Тест: снимок за один запрос в прежнем формате и режим diff"""
+    print("🔍 Тестирование снимков страницы...")
+
+    driver = FakeDriver()
+    recorder = ManualRecorder('ostrovok', diff_snapshots=True)
+    recorder.driver = driver
+
+    state = recorder.record_current_page_state()
+    assert driver.calls == 1
+    assert state['type'] == 'page_state' and state['url'] == driver.url and 'diff' not in state
+    inp, button, link, select = state['elements']
+    assert inp == {'type': 'input', 'tagName': 'input', 'id': '', 'name': '', 'className': 'text-m w-full',
+                   'type_attr': 'text', 'value': '', 'placeholder': 'Название, адрес или ID',
+                   'xpath': "//input[contains(@class, 'text-m')]"}
+    assert set(button) == {'type', 'tagName', 'id', 'name', 'className', 'text', 'xpath'}
+    assert link['href'] == 'https://extranet.ostrovok.ru/v3/registration' and 'name' not in link
+    assert select['options'] == [{'value': 'msk', 'text': 'Москва'}, {'value': 'spb', 'text': 'Санкт-Петербург'}]
+
+    # Второй снимок той же страницы: изменилось поле ввода, исчезла ссылка
+    driver.rows[0][6] = 'Отель Москва'
+    del driver.rows[2]
+    diff = recorder.record_current_page_state()
+    assert driver.calls == 2
+    assert diff['diff'] is True and diff['unchanged'] == 2
+    assert [e['value'] for e in diff['elements']] == ['Отель Москва']
+    assert diff['removed'] == [{'type': 'link', 'xpath': '//a', 'index': 0}]
+
+    # Новая страница снимается целиком
+    driver.url = 'https://extranet.ostrovok.ru/v3/registration'
+    assert len(recorder.record_current_page_state()['elements']) == 3
+
+    assert len(DomSnapshotter().capture(driver)['elements']) == 3
+    print("✅ Снимок страницы за один запрос, diff хранит только изменения")
+
+
+if __name__ == "__main__":
+    test_single_round_trip_snapshot_and_diff()
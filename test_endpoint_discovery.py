@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Тестирование запоминания рабочих эндпоинтов API (перебор, повторное обнаружение, фоновая проверка)
+"""
+
+import os
+import tempfile
+import time
+
+import requests
+
+import endpoint_discovery
+from db import Database
+from endpoint_discovery import EndpointDiscovery
+from hotels101_manager import HOTELS_URLS, HOTEL_URLS, Hotels101Manager
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+        self.text = str(self._data)
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    """Сессия без сети: отвечает по таблице URL, остальное - 404"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    def _respond(self, method, url):
+        self.requests.append((method, url))
+        route = self.routes.get((method, url))
+        if isinstance(route, Exception):
+            raise route
+        return route or FakeResponse(404)
+
+    def get(self, url, **kwargs):
+        return self._respond('GET', url)
+
+    def delete(self, url, **kwargs):
+        return self._respond('DELETE', url)
+
+
+def make_manager(routes, email='owner@example.com'):
+    manager = Hotels101Manager()
+    manager.email = email
+    manager.session = FakeSession(routes)
+    return manager
+
+
+def test_discovery_memoizes_working_endpoint():
+    print("🧪 Запоминание рабочего эндпоинта")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'endpoints.db'))
+        endpoint_discovery._discovery = EndpointDiscovery(db=db)
+        try:
+            hotels = FakeResponse(200, {'hotels': [{'id': 1}, {'id': 2}]})
+            manager = make_manager({('GET', HOTELS_URLS[2]): hotels})
+
+            assert manager.get_my_hotels() == (True, [{'id': 1}, {'id': 2}])
+            assert len(manager.session.requests) == 3
+            manager.session.requests.clear()
+            assert manager.get_my_hotels()[0]
+            assert manager.session.requests == [('GET', HOTELS_URLS[2])]
+            print("✅ Повторный вызов - один запрос вместо перебора")
+
+            # Память переживает перезапуск процесса
+            endpoint_discovery._discovery = EndpointDiscovery(db=db)
+            manager = make_manager({('GET', HOTELS_URLS[2]): hotels})
+            assert manager.get_my_hotels()[0]
+            assert len(manager.session.requests) == 1
+            learned = endpoint_discovery._discovery.snapshot('101hotels')
+            assert [(e['operation'], e['account'], e['template']) for e in learned] == [
+                ('get_my_hotels', 'owner@example.com', HOTELS_URLS[2])
+            ]
+
+            # Шаблоны с параметрами: запоминается шаблон, а не URL конкретного отеля
+            delete_url = HOTEL_URLS[1].format(hotel_id=7)
+            manager = make_manager({('DELETE', delete_url): FakeResponse(204)})
+            assert manager.delete_hotel(7)[0]
+            manager.session.routes = {('DELETE', HOTEL_URLS[1].format(hotel_id=8)): FakeResponse(204)}
+            manager.session.requests.clear()
+            assert manager.delete_hotel(8)[0] and len(manager.session.requests) == 1
+            print("✅ Память хранится по операции и аккаунту")
+
+            # Эндпоинт переехал - перебор в том же вызове
+            manager = make_manager({('GET', HOTELS_URLS[0]): hotels})
+            assert manager.get_my_hotels()[0]
+            assert manager.session.requests[0] == ('GET', HOTELS_URLS[2])
+            assert endpoint_discovery._discovery.learned('101hotels', 'get_my_hotels', 'owner@example.com') == HOTELS_URLS[0]
+            print("✅ После 404 рабочий URL находится заново")
+        finally:
+            endpoint_discovery._discovery = None
+
+
+def test_server_errors_probe_in_background():
+    print("🧪 Ошибки сервера и фоновая проверка")
+    with tempfile.TemporaryDirectory() as tmp:
+        discovery = EndpointDiscovery(db=Database(os.path.join(tmp, 'endpoints.db')), max_failures=2)
+        routes = {'a': FakeResponse(200), 'b': FakeResponse(200)}
+        sent = []
+
+        def send(url):
+            sent.append(url)
+            route = routes[url]
+            if isinstance(route, Exception):
+                raise route
+            return route
+
+        assert discovery.request('x', 'read', None, ['a', 'b'], send, safe=True).status_code == 200
+        routes['a'] = FakeResponse(503)
+        sent.clear()
+        # Ошибка возвращается сразу, без перебора остальных кандидатов
+        assert discovery.request('x', 'read', None, ['a', 'b'], send, safe=True).status_code == 503
+        deadline = time.time() + 2
+        while discovery.learned('x', 'read') != 'b' and time.time() < deadline:
+            time.sleep(0.01)
+        assert discovery.learned('x', 'read') == 'b'
+        assert discovery.stats['background_probes'] == 1
+        print("✅ Безопасная операция перепроверяется в фоне")
+
+        # Запись не повторяется в фоне, а забывается после нескольких сбоев
+        routes['a'] = FakeResponse(200)
+        discovery.request('x', 'write', None, ['a', 'b'], send)
+        routes['a'] = requests.exceptions.Timeout('timeout')
+        assert discovery.request('x', 'write', None, ['a', 'b'], send) is None
+        assert discovery.learned('x', 'write') == 'a'
+        discovery.request('x', 'write', None, ['a', 'b'], send)
+        assert discovery.learned('x', 'write') is None
+        assert discovery.request('x', 'write', None, ['a', 'b'], send).status_code == 200
+        assert discovery.learned('x', 'write') == 'b'
+        print("✅ Запись забывается после сбоев подряд")
+
+
+def test_client_errors_pass_through():
+    print("🧪 Ответы 4xx и ошибки без таймаута")
+    with tempfile.TemporaryDirectory() as tmp:
+        discovery = EndpointDiscovery(db=Database(os.path.join(tmp, 'endpoints.db')), max_failures=1)
+        routes = {'a': FakeResponse(200), 'b': FakeResponse(200)}
+        sent = []
+
+        def send(url):
+            sent.append(url)
+            route = routes[url]
+            if isinstance(route, Exception):
+                raise route
+            return route
+
+        discovery.request('x', 'read', None, ['a', 'b'], send, safe=True)
+        discovery.request('x', 'write', None, ['a', 'b'], send)
+        sent.clear()
+        for status in (400, 401, 403):
+            routes['a'] = FakeResponse(status)
+            assert discovery.request('x', 'read', None, ['a', 'b'], send, safe=True).status_code == status
+            assert discovery.request('x', 'write', None, ['a', 'b'], send).status_code == status
+        routes['a'] = ValueError('bad payload')
+        assert discovery.request('x', 'write', None, ['a', 'b'], send) is None
+
+        # Ни перебора, ни фоновой проверки, ни счета сбоев
+        assert sent == ['a'] * 7
+        assert discovery.stats['background_probes'] == 0
+        assert discovery.learned('x', 'read') == 'a' and discovery.learned('x', 'write') == 'a'
+        assert discovery._failures(('x', 'write', '')) == 0
+        print("✅ Ошибки запроса возвращаются без перепроверки эндпоинта")
+
+
+if __name__ == "__main__":
+    test_discovery_memoizes_working_endpoint()
+    test_server_errors_probe_in_background()
+    test_client_errors_pass_through()
+    print("🎉 Все тесты пройдены")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Тестирование выполнения блокирующих вызовов вне event loop
+"""
+
+import asyncio
+import threading
+import time
+
+from executors import BlockingExecutor
+
+
+class SlowManager:
+    """Подмена менеджера площадки с блокирующими методами"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def get_bookings(self):
+        time.sleep(0.2)
+        return True, []
+
+    def click_button(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return True
+
+
+def test_blocking_calls_do_not_freeze_loop():
+    """Тест: HTTP-вызовы идут параллельно, браузер одного менеджера - по очереди"""
+    print("🔍 Тестирование пула блокирующих вызовов...")
+
+    executor = BlockingExecutor()
+    manager = SlowManager()
+
+    async def ticker(stop):
+        ticks = 0
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return ticks
+
+    async def run():
+        stop = asyncio.Event()
+        tick_task = asyncio.create_task(ticker(stop))
+        started = time.monotonic()
+        results = await asyncio.gather(*[executor.run(manager.get_bookings) for _ in range(8)])
+        elapsed = time.monotonic() - started
+        await asyncio.gather(*[executor.run(manager.click_button, kind='browser') for _ in range(4)])
+        try:
+            await executor.run(time.sleep, 0.5, timeout=0.05)
+            timed_out = False
+        except asyncio.TimeoutError:
+            timed_out = True
+        stop.set()
+        return results, elapsed, await tick_task, timed_out
+
+    results, elapsed, ticks, timed_out = asyncio.run(run())
+    metrics = executor.get_metrics()
+    executor.shutdown()
+
+    assert results == [(True, [])] * 8
+    assert elapsed < 0.6  # последовательно было бы 1.6с
+    assert ticks > 10  # event loop продолжал работать
+    assert manager.max_active == 1
+    assert timed_out
+    assert metrics['http:SlowManager.get_bookings']['calls'] == 8
+    assert metrics['http:sleep']['timeouts'] == 1
+    print(f"✅ 8 вызовов за {elapsed:.2f}с, event loop сделал {ticks} тиков")
+
+
+if __name__ == "__main__":
+    test_blocking_calls_do_not_freeze_loop()
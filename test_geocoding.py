@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Тестирование общего геокодера (кэш, отрицательный кэш, перебор провайдеров, пачки адресов)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from db import Database
+from geocoding import Geocoder, GeocodingUnavailable, normalize_address
+
+KNOWN = {
+    normalize_address('Москва, Тверская 1'): (55.757, 37.613),
+    normalize_address('Сочи, Морская 3'): (43.58, 39.72),
+}
+
+
+class CountingProvider:
+    """Провайдер без сети: считает запросы"""
+
+    def __init__(self, known=None, fail=False, delay=0.0):
+        self.known = KNOWN if known is None else known
+        self.fail = fail
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, address):
+        with self.lock:
+            self.calls.append(address)
+        time.sleep(self.delay)
+        if self.fail:
+            raise GeocodingUnavailable('нет связи')
+        return self.known.get(normalize_address(address))
+
+
+def make_geocoder(tmp, providers, **kwargs):
+    return Geocoder(db=Database(os.path.join(tmp, 'geo.db')), providers=providers, **kwargs)
+
+
+def test_cache_and_fallback():
+    print("🧪 Кэш геокодинга и запасные провайдеры")
+    with tempfile.TemporaryDirectory() as tmp:
+        primary = CountingProvider(fail=True)
+        fallback = CountingProvider()
+        geocoder = make_geocoder(tmp, [('yandex', fallback)])
+
+        coords = geocoder.geocode('Москва, Тверская 1', providers=[('101hotels', primary)])
+        assert coords == (55.757, 37.613)
+        assert len(primary.calls) == 1 and len(fallback.calls) == 1
+
+        # Тот же адрес в другом написании - из памяти, без запросов
+        assert geocoder.geocode('  москва тверская 1. ', providers=[('101hotels', primary)]) == coords
+        assert len(primary.calls) == 1 and len(fallback.calls) == 1
+        print("✅ Повторный адрес берется из памяти")
+
+        # Новый процесс: память пуста, но SQLite помнит
+        fresh = make_geocoder(tmp, [('yandex', fallback)])
+        assert fresh.geocode('Москва, Тверская 1') == coords
+        assert fresh.stats['db_hits'] == 1 and len(fallback.calls) == 1
+        print("✅ Результат переживает перезапуск")
+
+        # Ненайденный адрес кэшируется, если все провайдеры ответили
+        assert geocoder.geocode('Нигде, 0') is None
+        assert geocoder.geocode('нигде 0') is None
+        assert len(fallback.calls) == 2 and geocoder.stats['negative_hits'] == 1
+
+        # При сбое провайдера «не найден» не запоминается
+        broken = make_geocoder(tmp, [('yandex', CountingProvider(fail=True))])
+        assert broken.geocode('Пермь, Ленина 5') is None
+        assert broken.geocode('Пермь, Ленина 5') is None
+        assert broken.stats['lookups'] == 2
+        print("✅ Отрицательный кэш только для ответивших провайдеров")
+
+        # Истекший TTL - запрос повторяется
+        short = make_geocoder(tmp, [('yandex', fallback)], negative_ttl=0.05)
+        assert short.geocode('Казань, Баумана 7') is None
+        time.sleep(0.1)
+        short.geocode('Казань, Баумана 7')
+        assert fallback.calls.count('Казань, Баумана 7') == 2
+        print("✅ Записи с истекшим TTL обновляются")
+
+
+def test_geocode_many():
+    print("🧪 Геокодинг пачки адресов")
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = CountingProvider(delay=0.1)
+        geocoder = make_geocoder(tmp, [('yandex', provider)])
+        addresses = ['Москва, Тверская 1', 'москва тверская 1', 'Сочи, Морская 3', 'Нигде, 0'] * 3
+
+        started = time.perf_counter()
+        found = geocoder.geocode_many(addresses, max_workers=4)
+        elapsed = time.perf_counter() - started
+
+        assert found['Сочи, Морская 3'] == (43.58, 39.72)
+        assert found['москва тверская 1'] == (55.757, 37.613)
+        assert found['Нигде, 0'] is None
+        assert len(provider.calls) == 3, provider.calls
+        assert elapsed < 0.25, elapsed
+        print(f"✅ {len(addresses)} адресов, {len(provider.calls)} запроса за {elapsed:.2f}с")
+
+
+if __name__ == "__main__":
+    test_cache_and_fallback()
+    test_geocode_many()
+    print("🎉 Все тесты пройдены")
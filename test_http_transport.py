@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Тестирование общего HTTP-транспорта (повторы, таймауты, общий пул, лимит на хост, гистограммы)
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.adapters import HTTPAdapter
+
+import http_transport
+from http_transport import create_session, get_http_metrics, host_slot, make_retry, reset_http_metrics
+
+
+def start_stub_server():
+    """Stub-сервер: /flaky дважды отвечает 503, /slow отвечает с задержкой"""
+    stats = {'flaky': 0, 'post': 0, 'encoding': None}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _reply(self, status, body=b'{}'):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            stats['encoding'] = self.headers.get('Accept-Encoding')
+            if self.path.startswith('/flaky'):
+                stats['flaky'] += 1
+                self._reply(503 if stats['flaky'] <= 2 else 200)
+            elif self.path.startswith('/slow'):
+                time.sleep(0.5)
+                self._reply(200)
+            else:
+                self._reply(200)
+
+        def do_POST(self):
+            stats['post'] += 1
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self._reply(503)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", stats
+
+
+def fast_adapter():
+    """Адаптер с политикой повторов по умолчанию, но с короткими задержками"""
+    backoff, jitter = http_transport.RETRY_BACKOFF, http_transport.RETRY_JITTER
+    http_transport.RETRY_BACKOFF, http_transport.RETRY_JITTER = 0.01, 0.01
+    try:
+        return HTTPAdapter(max_retries=make_retry())
+    finally:
+        http_transport.RETRY_BACKOFF, http_transport.RETRY_JITTER = backoff, jitter
+
+
+def test_retries_timeouts_and_metrics():
+    print("🧪 Повторы, таймауты и гистограммы")
+    server, base_url, stats = start_stub_server()
+    reset_http_metrics()
+    try:
+        session = create_session('101hotels', adapter=fast_adapter())
+
+        response = session.get(f"{base_url}/flaky/15")
+        assert response.status_code == 200 and stats['flaky'] == 3
+        assert 'gzip' in stats['encoding']
+        print("✅ GET повторяется после 503")
+
+        # POST не идемпотентен - без повторов
+        assert session.post(f"{base_url}/hotels", json={'name': 'x'}).status_code == 503
+        assert stats['post'] == 1
+        print("✅ POST не повторяется")
+
+        # Таймаут по умолчанию задается сессией
+        session.timeout = (1, 0.1)
+        try:
+            session.get(f"{base_url}/slow")
+            assert False, "ожидался таймаут"
+        except Exception as e:
+            assert 'timed out' in str(e).lower() or 'timeout' in type(e).__name__.lower(), e
+        print("✅ Таймаут чтения срабатывает")
+
+        metrics = get_http_metrics()
+        flaky = metrics['GET 127.0.0.1/flaky/{id}']
+        assert flaky['count'] == 1 and flaky['statuses'] == {200: 1}
+        assert metrics['POST 127.0.0.1/hotels']['statuses'] == {503: 1}
+        assert metrics['GET 127.0.0.1/slow']['errors'] == 1
+        assert sum(flaky['buckets'].values()) == 1
+        print(f"✅ Гистограммы: {sorted(metrics)}")
+    finally:
+        server.shutdown()
+
+
+def test_shared_pool_and_host_limit():
+    print("🧪 Общий пул и лимит на хост")
+    first, second = create_session('101hotels'), create_session('bronevik')
+    assert first.get_adapter('https://101hotels.com') is second.get_adapter('https://bronevik.com')
+    first.cookies.set('sid', 'one')
+    assert 'sid' not in second.cookies
+    assert second.headers['Origin'] == 'https://bronevik.com'
+    first.close()
+    assert second.get_adapter('https://bronevik.com') is http_transport.get_adapter()
+    print("✅ Пул общий, cookies у каждой сессии свои")
+
+    active = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def worker():
+        with host_slot('limited.example', limit=2):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.05)
+            with lock:
+                active['now'] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert active['max'] == 2, active
+    print("✅ Не больше 2 одновременных запросов к хосту")
+
+
+if __name__ == "__main__":
+    test_retries_timeouts_and_metrics()
+    test_shared_pool_and_host_limit()
+    print("🎉 Все тесты пройдены")
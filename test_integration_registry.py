@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Тестирование реестра интеграций (общие экземпляры, хуки запуска и остановки)
+"""
+
+import asyncio
+import subprocess
+import sys
+
+from integration_registry import IntegrationRegistry, get_integration_registry
+
+
+class Resource:
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+        events.append(('create', name))
+
+
+def test_lazy_shared_instances():
+    """Тест: экземпляр создается при первом обращении и дальше переиспользуется"""
+    print("🔍 Тестирование ленивого создания интеграций...")
+
+    events = []
+    registry = IntegrationRegistry()
+    registry.register('manager', lambda: Resource('manager', events))
+    registry.register('smart', lambda: (registry.get('manager'), Resource('smart', events))[1])
+    assert events == [] and registry.peek('smart') is None
+
+    smart = registry.get('smart')
+    assert registry.get('smart') is smart
+    # Зависимость создана один раз и раньше зависящей интеграции
+    assert events == [('create', 'manager'), ('create', 'smart')]
+    assert registry.snapshot()['manager']['created']
+
+    try:
+        registry.register('smart', lambda: None)
+        assert False, "повторная регистрация должна быть ошибкой"
+    except ValueError:
+        pass
+    try:
+        registry.get('unknown')
+        assert False, "незарегистрированная интеграция должна быть ошибкой"
+    except KeyError:
+        pass
+
+    # Путь "модуль:атрибут" импортируется при первом обращении
+    registry.register('router', 'callback_router:CallbackRouter')
+    assert len(registry.get('router')) == 0
+    print("✅ Интеграции создаются один раз")
+
+
+def test_lifecycle_hooks():
+    """Тест: startup для созданных интеграций, shutdown в обратном порядке создания"""
+    print("🔍 Тестирование хуков жизненного цикла...")
+
+    events = []
+    registry = IntegrationRegistry()
+
+    async def stop_async(resource):
+        events.append(('stop', resource.name))
+
+    for name in ('first', 'second', 'late'):
+        registry.register(
+            name, lambda name=name: Resource(name, events),
+            startup=lambda resource: events.append(('start', resource.name)),
+            shutdown=stop_async
+        )
+    registry.register('broken', lambda: Resource('broken', events),
+                      shutdown=lambda resource: 1 / 0)
+
+    async def scenario():
+        registry.get('first')
+        registry.get('broken')
+        registry.get('second')
+        await registry.startup()
+        # Созданная после запуска интеграция запускается сразу
+        registry.get('late')
+        await registry.shutdown()
+
+    asyncio.run(scenario())
+    assert events == [
+        ('create', 'first'), ('create', 'broken'), ('create', 'second'),
+        ('start', 'first'), ('start', 'second'),
+        ('create', 'late'), ('start', 'late'),
+        # Ошибка остановки одной интеграции не мешает остальным
+        ('stop', 'late'), ('stop', 'second'), ('stop', 'first')
+    ]
+    assert registry.peek('first') is None
+    print("✅ Хуки выполняются в нужном порядке")
+
+
+def test_proxy_defers_creation():
+    """Тест: ленивая ссылка создает интеграцию при первом обращении к атрибуту"""
+    print("🔍 Тестирование ленивых ссылок на интеграции...")
+
+    events = []
+    registry = IntegrationRegistry()
+    registry.register('manager', lambda: Resource('manager', events))
+    manager = registry.proxy('manager')
+    assert events == [] and registry.peek('manager') is None
+
+    assert manager.name == 'manager' and events == [('create', 'manager')]
+    first = registry.peek('manager')
+
+    # После перезапуска реестра ссылка ведет на новый экземпляр
+    asyncio.run(registry.shutdown())
+    assert manager.name == 'manager' and registry.peek('manager') is not first
+    try:
+        registry.proxy('unknown')
+        assert False, "ссылка на незарегистрированную интеграцию должна быть ошибкой"
+    except KeyError:
+        pass
+    print("✅ Интеграция создается при первом обращении через ссылку")
+
+
+def test_bot_build_without_selenium():
+    """Тест: бот создается без импорта Selenium (обработчики интеграций) и NumPy (статистика Bnovo)"""
+    print("🔍 Тестирование создания бота без Selenium...")
+
+    code = (
+        "import sys\n"
+        "from startup_profile import DUMMY_TOKEN, offline_bot_request\n"
+        "from bot import HotelBot\n"
+        "HotelBot(DUMMY_TOKEN, request=offline_bot_request())\n"
+        "print(sorted(m for m in ('selenium', 'action_recorder', 'browser_pool', 'numpy') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+    print("✅ Selenium загружается только при первом использовании")
+
+
+def test_default_integrations():
+    """Тест: интеграции бота по умолчанию зарегистрированы в общем реестре"""
+    print("🔍 Тестирование общего реестра...")
+
+    registry = get_integration_registry()
+    assert registry is get_integration_registry()
+    assert all(name in registry for name in ('recording_manager', 'smart', 'recording'))
+    print("✅ Общий реестр настроен")
+
+
+if __name__ == "__main__":
+    test_lazy_shared_instances()
+    test_lifecycle_hooks()
+    test_proxy_defers_creation()
+    test_bot_build_without_selenium()
+    test_default_integrations()
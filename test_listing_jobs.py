@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Тестирование очереди пакетного создания объявлений (шаги, возобновление, лимиты площадок)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from bronevik_manager import BronevikManager
+from db import Database
+from listing_jobs import ListingJobQueue, ListingJobWorkers, read_hotels_csv
+
+HOTELS_CSV = """name,address,city,region,type,latitude,longitude,stars
+Отель Центр,Москва Тверская 1,Москва,Москва,hotel,"55,75",37.61,4
+Гостиница Нева,Невский 10,Санкт-Петербург,СПб,hotel,,,
+Хостел Юг,Сочи Морская 3,Сочи,Краснодарский край,hostel,43.58,39.72,
+"""
+
+
+class Crash(BaseException):
+    """Падение процесса посреди регистрации"""
+
+
+class FakeBronevik(BronevikManager):
+    """Площадка без сети: считает вызовы и следит за числом одновременных заданий"""
+
+    calls = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+    crash_on = None
+    fail_once = set()
+
+    def __init__(self, email=None):
+        self.email = email
+
+    def _track(self, name, hotel_id):
+        with FakeBronevik.lock:
+            FakeBronevik.calls.append((name, hotel_id))
+            if (name, hotel_id) in FakeBronevik.fail_once:
+                FakeBronevik.fail_once.discard((name, hotel_id))
+                return False
+        if (name, hotel_id) == FakeBronevik.crash_on:
+            FakeBronevik.crash_on = None
+            raise Crash()
+        return True
+
+    def geocode_address_bronevik(self, address):
+        return (59.93, 30.36)
+
+    def create_hotel(self, hotel_data):
+        with FakeBronevik.lock:
+            FakeBronevik.active += 1
+            FakeBronevik.max_active = max(FakeBronevik.max_active, FakeBronevik.active)
+        time.sleep(0.02)
+        with FakeBronevik.lock:
+            FakeBronevik.active -= 1
+        hotel_id = f"H-{hotel_data['name']}"
+        self._track('create', hotel_id)
+        return 200, {'hotelId': hotel_id}
+
+    def update_hotel_step(self, hotel_id, step, step_data=None):
+        if not self._track(step, hotel_id):
+            return False, "Ошибка API: 502"
+        return True, {'id': hotel_id}
+
+
+def test_csv_parsing():
+    """Тест: разбор CSV с числами и пустыми полями"""
+    hotels = read_hotels_csv(HOTELS_CSV)
+    assert len(hotels) == 3
+    assert hotels[0]['latitude'] == 55.75 and hotels[0]['stars'] == 4
+    assert 'latitude' not in hotels[1]
+    try:
+        read_hotels_csv("name,address\nБез адреса,\n")
+        assert False, "ожидалась ошибка"
+    except ValueError as e:
+        assert 'Строка 2' in str(e)
+
+
+def test_jobs_resume_after_crash_and_respect_limits():
+    """Тест: задание продолжается с последнего шага после падения, повторы и лимит площадки"""
+    print("🔍 Тестирование очереди объявлений...")
+
+    db = Database(os.path.join(tempfile.mkdtemp(), 'jobs.db'))
+    queue = ListingJobQueue(db)
+    batch_id, ids = queue.submit_csv(HOTELS_CSV, ['bronevik'], email='owner@example.com')
+    assert len(ids) == 3 and queue.batch_status(batch_id)['counts'] == {'pending': 3}
+
+    factory = lambda platform, email: FakeBronevik(email)
+
+    # Первый процесс падает на шаге "name" первого отеля
+    FakeBronevik.crash_on = ('name', 'H-Отель Центр')
+    crashed = ListingJobWorkers(db, workers=1, manager_factory=factory, lease_seconds=0.05)
+    try:
+        crashed.process(db.claim_listing_job(['bronevik'], 'w0', time.time(), 0.05))
+        assert False, "ожидалось падение"
+    except Crash:
+        pass
+    job = queue.job(ids[0])
+    assert job['status'] == 'running' and job['steps'] == ['geocode', 'create', 'category']
+    time.sleep(0.06)
+
+    # Новый процесс: аренда истекла, задание продолжается с шага "name"; один шаг падает и повторяется
+    FakeBronevik.calls = []
+    FakeBronevik.fail_once = {('address', 'H-Хостел Юг')}
+    workers = ListingJobWorkers(db, workers=4, manager_factory=factory,
+                                platform_limits={'bronevik': 2}, retry_base_delay=0)
+    workers.run_until_idle()
+
+    assert queue.batch_status(batch_id)['counts'] == {'done': 3}
+    assert workers.stats['resumed'] >= 1 and workers.stats['retried'] == 1
+    assert ('create', 'H-Отель Центр') not in FakeBronevik.calls
+    assert ('name', 'H-Отель Центр') in FakeBronevik.calls
+    assert FakeBronevik.calls.count(('create', 'H-Хостел Юг')) == 1
+    assert FakeBronevik.max_active <= 2
+
+    job = queue.job(ids[1])
+    assert job['state']['latitude'] == 59.93 and job['state']['hotel_id'] == 'H-Гостиница Нева'
+    assert job['hotel']['idempotency_key']
+    assert db.get_new_listing('bronevik:H-Отель Центр')[3] == 'created'
+    print(f"✅ Очередь: {workers.stats}")
+
+
+if __name__ == "__main__":
+    test_csv_parsing()
+    test_jobs_resume_after_crash_and_respect_limits()
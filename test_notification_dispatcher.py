@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Тестирование диспетчера уведомлений на подменном боте
+"""
+
+import asyncio
+import time
+
+from telegram.error import Forbidden, RetryAfter
+
+from notification_dispatcher import NotificationDispatcher
+
+
+class FakeBot:
+    """Подмена telegram.Bot: запоминает отправленные сообщения"""
+
+    def __init__(self, send_delay: float = 0.0, retry_after_chats=(), blocked_chats=()):
+        self.sent = []
+        self.send_delay = send_delay
+        self.retry_after_chats = set(retry_after_chats)
+        self.blocked_chats = set(blocked_chats)
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        if chat_id in self.blocked_chats:
+            raise Forbidden("bot was blocked by the user")
+        if chat_id in self.retry_after_chats:
+            self.retry_after_chats.discard(chat_id)
+            raise RetryAfter(1)
+        await asyncio.sleep(self.send_delay)
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+def test_dispatcher_coalesces_and_parallelizes():
+    """Тест: по одному сообщению на пользователя, отправка идет параллельно"""
+    print("🔍 Тестирование объединения и параллельной отправки...")
+
+    async def run():
+        bot = FakeBot(send_delay=0.05)
+        dispatcher = NotificationDispatcher(bot, workers=20, global_rate=1000)
+        started = time.monotonic()
+        dispatcher.broadcast(range(100), [f"Бронирование #{i}" for i in range(5)])
+        await dispatcher.stop()
+        return bot, dispatcher, time.monotonic() - started
+
+    bot, dispatcher, elapsed = asyncio.run(run())
+    metrics = dispatcher.get_metrics()
+
+    assert len(bot.sent) == 100
+    assert all(text.count("Бронирование #") == 5 for _, text, _ in bot.sent)
+    assert metrics['coalesced'] == 400 and metrics['queue_depth'] == 0
+    # Последовательно это заняло бы 100 * 0.05 = 5с
+    assert elapsed < 2.0
+    print(f"✅ 500 уведомлений -> {len(bot.sent)} сообщений за {elapsed:.2f}с, "
+          f"задержка p95 {metrics['delivery_latency']['p95']:.3f}с")
+
+
+def test_dispatcher_rate_limits_and_retry_after():
+    """Тест: соблюдение лимита на чат, RetryAfter и заблокированные чаты"""
+    print("🔍 Тестирование лимитов и RetryAfter...")
+
+    async def run():
+        bot = FakeBot(retry_after_chats={2}, blocked_chats={3})
+        dispatcher = NotificationDispatcher(bot, workers=4, per_chat_rate=10)
+        dispatcher.enqueue(1, "первое")
+        await dispatcher.join()
+        dispatcher.enqueue(1, "второе")
+        dispatcher.enqueue(2, "после паузы")
+        dispatcher.enqueue(3, "не дойдет")
+        await dispatcher.stop()
+        return bot, dispatcher
+
+    bot, dispatcher = asyncio.run(run())
+    times = [sent_at for chat_id, _, sent_at in bot.sent if chat_id == 1]
+    metrics = dispatcher.get_metrics()
+
+    assert [text for chat_id, text, _ in bot.sent if chat_id == 1] == ["первое", "второе"]
+    assert times[1] - times[0] >= 0.09  # не чаще 10 сообщений/с в один чат
+    assert any(chat_id == 2 for chat_id, _, _ in bot.sent)
+    assert metrics['retries'] == 1 and metrics['failed'] == 1
+    print(f"✅ Лимиты соблюдены, метрики: sent={metrics['sent']} retries={metrics['retries']} failed={metrics['failed']}")
+
+
+def test_dispatcher_evicts_idle_chat_buckets():
+    """Тест: ведра чатов, которым давно не писали, не копятся"""
+    print("🔍 Тестирование удаления ведер неактивных чатов...")
+
+    async def run():
+        bot = FakeBot()
+        dispatcher = NotificationDispatcher(bot, workers=10, global_rate=1000, per_chat_rate=20,
+                                            bucket_sweep_interval=0.1)
+        dispatcher.broadcast(range(50), ["Бронирование"])
+        await dispatcher.join()
+        assert len(dispatcher.chat_buckets) == 50
+        # Ведра наполнились (1/20 с), следующая отправка их удаляет
+        await asyncio.sleep(0.15)
+        dispatcher.enqueue(100, "Новое бронирование")
+        await dispatcher.stop()
+        return bot, dispatcher
+
+    bot, dispatcher = asyncio.run(run())
+    assert len(bot.sent) == 51
+    assert list(dispatcher.chat_buckets) == [100]
+    assert dispatcher.get_metrics()['chat_buckets'] == 1
+    print("✅ Наполнившиеся ведра удаляются")
+
+
+if __name__ == "__main__":
+    test_dispatcher_coalesces_and_parallelizes()
+    test_dispatcher_rate_limits_and_retry_after()
+    test_dispatcher_evicts_idle_chat_buckets()
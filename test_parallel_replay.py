@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Тестирование параллельного создания объявлений на нескольких платформах
+"""
+
+import asyncio
+import time
+
+from parallel_replay import ParallelReplayRun
+
+# Длительность воспроизведения на каждой платформе (по 0.05с на действие)
+ACTIONS = {'ostrovok': 6, 'bronevik': 2, '101hotels': 4, 'slow': 100}
+
+
+class FakeRecorder:
+    """Подмена ActionRecorder: каждое действие занимает 0.05с"""
+
+    def __init__(self, platform_name):
+        self.platform_name = platform_name
+        self.actions = []
+
+    def get_available_recordings(self):
+        if self.platform_name == 'empty':
+            return []
+        filename = f'{self.platform_name}_actions.json'
+        return [{'filename': filename, 'filepath': filename}]
+
+    def load_recording(self, filename):
+        self.actions = ['click'] * ACTIONS[self.platform_name]
+        return True
+
+    def replay_actions(self, user_data, delay=1.0, cancel_event=None):
+        for _ in self.actions:
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            time.sleep(0.05)
+        return True
+
+
+def test_platforms_run_concurrently_with_progress():
+    """Тест: платформы идут параллельно, прогресс приходит по мере готовности"""
+    print("🔍 Тестирование параллельного воспроизведения...")
+
+    progress = []
+
+    async def on_progress(platform, result):
+        progress.append(platform)
+
+    async def run():
+        replay = ParallelReplayRun(['ostrovok', 'bronevik', '101hotels', 'empty'], {}, recorder_factory=FakeRecorder)
+        started = time.monotonic()
+        results = await replay.run(on_progress=on_progress)
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(run())
+
+    assert [results[p]['success'] for p in ('ostrovok', 'bronevik', '101hotels')] == [True] * 3
+    assert results['empty'] == {'success': False, 'error': 'Нет доступных шаблонов'}
+    assert progress[0] == 'empty' and progress[1:] == ['bronevik', '101hotels', 'ostrovok']
+    assert elapsed < 0.5  # последовательно - 0.6с
+    print(f"✅ 4 платформы за {elapsed:.2f}с, порядок готовности: {progress}")
+
+
+def test_deadline_and_cancel_stop_replay():
+    """Тест: дедлайн и отмена останавливают незавершенные платформы"""
+    print("🔍 Тестирование дедлайна и отмены...")
+
+    async def run_with_deadline():
+        replay = ParallelReplayRun(['bronevik', 'slow'], {}, recorder_factory=FakeRecorder)
+        return await replay.run(deadline=0.3)
+
+    async def run_with_cancel():
+        replay = ParallelReplayRun(['slow'], {}, recorder_factory=FakeRecorder)
+        task = asyncio.create_task(replay.run())
+        await asyncio.sleep(0.2)
+        replay.cancel()
+        return await task
+
+    started = time.monotonic()
+    results = asyncio.run(run_with_deadline())
+    assert results['bronevik']['success']
+    assert results['slow']['error'] == 'Превышено время ожидания'
+
+    results = asyncio.run(run_with_cancel())
+    assert results['slow']['error'] == 'Отменено'
+    assert time.monotonic() - started < 2.0  # 'slow' целиком занял бы 5с
+    print("✅ Дедлайн и отмена работают")
+
+
+if __name__ == "__main__":
+    test_platforms_run_concurrently_with_progress()
+    test_deadline_and_cancel_stop_replay()
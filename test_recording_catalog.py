@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Тестирование каталога записей (индекс метаданных вместо чтения всех JSON)
+"""
+
+import json
+import os
+import tempfile
+
+from db import Database
+from recording_catalog import RecordingCatalog
+from recording_format import save_recording
+
+
+def write_recording(directory, filename, **data):
+    path = os.path.join(directory, filename)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'actions': [{'type': 'click'}] * data.pop('actions', 1), **data}, f)
+    return path
+
+
+def test_catalog_lookups_and_incremental_refresh():
+    """Тест: выборки по платформе/пользователю и перечитывание только измененных файлов"""
+    print("🔍 Тестирование каталога записей...")
+
+    workdir = tempfile.mkdtemp()
+    db = Database(os.path.join(tempfile.mkdtemp(), 'catalog.db'))
+    write_recording(workdir, 'ostrovok_old.json', platform='Ostrovok', created_at='2024-01-01T10:00:00')
+    write_recording(workdir, 'ostrovok_new.json', platform='Ostrovok', created_at='2024-02-01T10:00:00', actions=3)
+    write_recording(workdir, 'bronevik_own.json', platform='Bronevik', created_at='2024-03-01T10:00:00', user_id=42)
+    write_recording(workdir, 'bronevik_other.json', platform='Bronevik', created_at='2024-04-01T10:00:00', user_id=7)
+    write_recording(workdir, 'ostrovok_new.profile.json', runs=1)
+    with open(os.path.join(workdir, 'broken.json'), 'w') as f:
+        f.write('{not json')
+
+    catalog = RecordingCatalog(workdir, db)
+    ostrovok = catalog.recordings(platform='ostrovok')
+    assert [r['filename'] for r in ostrovok] == ['ostrovok_new.json', 'ostrovok_old.json']
+    assert ostrovok[0]['total_actions'] == 3
+    assert ostrovok[0]['filepath'] == os.path.join(workdir, 'ostrovok_new.json')
+    assert [r['filename'] for r in catalog.recordings(platform='Bronevik', user_id=42)] == ['bronevik_own.json']
+    assert len(catalog.recordings(user_id='42')) == 3
+    assert catalog.stats['parsed'] == 4
+
+    # Папка не менялась - повторный запрос не трогает файлы
+    assert catalog.refresh() is False
+    catalog.recordings()
+    assert catalog.stats['scans'] == 1 and catalog.stats['parsed'] == 4
+
+    # Новый файл и удаление: разбирается только новый
+    path = write_recording(workdir, 'ostrovok_latest.json', platform='Ostrovok', created_at='2024-05-01T10:00:00')
+    catalog.register(path)
+    os.remove(os.path.join(workdir, 'ostrovok_old.json'))
+    assert catalog.latest('Ostrovok')['filename'] == 'ostrovok_latest.json'
+    assert [r['filename'] for r in catalog.recordings(platform='ostrovok')] == ['ostrovok_latest.json', 'ostrovok_new.json']
+    assert catalog.stats['parsed'] == 5
+
+    # Потоковые записи индексируются по заголовку
+    save_recording(os.path.join(workdir, 'bronevik_stream.rec.gz'),
+                   {'platform': 'Bronevik', 'created_at': '2024-06-01T10:00:00'}, [{'type': 'click'}] * 2)
+    latest = catalog.latest('bronevik', user_id=42)
+    assert latest['filename'] == 'bronevik_stream.rec.gz' and latest['total_actions'] == 2
+    os.remove(latest['filepath'])
+
+    # Индекс переживает перезапуск: новый экземпляр не перечитывает файлы
+    restarted = RecordingCatalog(workdir, db)
+    assert len(restarted.recordings()) == 4
+    assert restarted.stats['parsed'] == 0
+
+    plan = db.conn.execute(
+        'EXPLAIN QUERY PLAN SELECT filename FROM recordings WHERE recordings_dir = ? AND platform_key = ? '
+        'ORDER BY created_at DESC', (catalog.key, 'ostrovok')
+    ).fetchall()
+    assert 'idx_recordings_platform' in str(plan) and 'TEMP B-TREE' not in str(plan)
+    db.close()
+    print("✅ Каталог отдает записи по индексу и перечитывает только измененные файлы")
+
+
+if __name__ == "__main__":
+    test_catalog_lookups_and_incremental_refresh()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Тестирование сбора событий при записи (скрипт через CDP, долгий опрос, очередь)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from action_recorder import ActionRecorder, RECORDER_JS, STOP_RECORDER_JS
+from recording_format import load_recording
+
+
+class FakeDriver:
+    """Браузер, который отдает события пачками и один раз теряет скрипт записи при переходе"""
+
+    def __init__(self):
+        self.batches = [
+            {'events': [{'type': 'navigation', 'url': 'https://extranet.ostrovok.ru/'}], 'dropped': 0},
+            {'events': [{'type': 'click', 'xpath': '//button[1]'},
+                        {'type': 'navigation', 'url': 'https://extranet.ostrovok.ru/'}], 'dropped': 0},
+            None,
+            {'events': [{'type': 'navigation', 'url': 'https://extranet.ostrovok.ru/v3/hotels'},
+                        {'type': 'input', 'xpath': '//input[1]', 'value': 'Отель'}], 'dropped': 2},
+        ]
+        self.cdp_calls = []
+        self.injections = 0
+        self.polls = 0
+        self.script_timeout = None
+        self.lock = threading.Lock()
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_calls.append(cmd)
+        return {'identifier': '1'} if cmd == 'Page.addScriptToEvaluateOnNewDocument' else {}
+
+    def get(self, url):
+        pass
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def execute_script(self, script, *args):
+        if script == RECORDER_JS:
+            self.injections += 1
+            return None
+        if script == STOP_RECORDER_JS:
+            return {'events': [{'type': 'click', 'xpath': '//a[1]'}], 'dropped': 0}
+        return None
+
+    def execute_async_script(self, script, timeout_ms):
+        with self.lock:
+            self.polls += 1
+            if self.batches:
+                return self.batches.pop(0)
+        time.sleep(timeout_ms / 1000 / 20)
+        return {'events': [], 'dropped': 0}
+
+    def quit(self):
+        pass
+
+
+def test_event_driven_capture():
+    """Тест: события приходят пачками, навигация не дублируется, скрипт переустанавливается"""
+    print("🔍 Тестирование сбора событий записи...")
+
+    driver = FakeDriver()
+    recorder = ActionRecorder('ostrovok')
+    recorder.recordings_dir = tempfile.mkdtemp()
+    recorder.setup_driver = lambda headless=False: setattr(recorder, 'driver', driver) or driver
+
+    assert recorder.start_recording('https://extranet.ostrovok.ru/')
+    deadline = time.time() + 5
+    while driver.batches and time.time() < deadline:
+        time.sleep(0.01)
+    filename = recorder.stop_recording()
+
+    assert driver.cdp_calls == ['Page.addScriptToEvaluateOnNewDocument', 'Page.removeScriptToEvaluateOnNewDocument']
+    # Первая установка после загрузки + повторная, когда документ пришел без скрипта
+    assert driver.injections == 2
+    assert driver.script_timeout == 30
+    types = [(a['type'], a.get('url') or a.get('xpath')) for a in recorder.actions]
+    assert types == [
+        ('navigation', 'https://extranet.ostrovok.ru/'),
+        ('click', '//button[1]'),
+        ('navigation', 'https://extranet.ostrovok.ru/v3/hotels'),
+        ('input', '//input[1]'),
+        ('click', '//a[1]'),
+    ]
+    _, saved = load_recording(filename)
+    assert len(saved) == 5
+    os.remove(filename)
+    print(f"✅ Записано {len(types)} действий за {driver.polls} опросов браузера")
+
+
+if __name__ == "__main__":
+    test_event_driven_capture()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Тестирование потокового формата записей действий
+"""
+
+import json
+import os
+import tempfile
+
+from recording_format import (ActionSequence, convert_recording, iter_actions, load_recording,
+                              read_header, save_recording)
+
+
+def page_state(i):
+    return {
+        'type': 'page_state',
+        'url': 'https://extranet.ostrovok.ru/v3/hotels',
+        'elements': [
+            {'type': 'button', 'tagName': 'button', 'id': '', 'text': f'Кнопка {i}',
+             'className': 'whitespace-nowrap transition-colors font-regular relative flex flex-row',
+             'xpath': "//button[contains(@class, 'whitespace-nowrap')]"}
+        ] * 5,
+        'timestamp': f'2025-08-05T17:11:{i:02d}'
+    }
+
+
+def test_roundtrip_streaming_and_conversion():
+    """Тест: запись/чтение с интернированием, ленивое чтение, обрыв файла и конвертация JSON"""
+    print("🔍 Тестирование формата записей...")
+
+    workdir = tempfile.mkdtemp()
+    actions = [{'type': 'navigation', 'url': 'https://extranet.ostrovok.ru', 'id': 7}] + [page_state(i) for i in range(30)]
+
+    for extension in ('.rec', '.rec.gz'):
+        path = os.path.join(workdir, 'ostrovok_actions' + extension)
+        save_recording(path, {'platform': 'ostrovok', 'created_at': '2025-08-05T17:11:33'}, actions)
+        header, loaded = load_recording(path)
+        assert header['platform'] == 'ostrovok' and header['total_actions'] == len(actions)
+        assert list(loaded) == actions
+        assert read_header(path)['total_actions'] == len(actions)
+    assert not [f for f in os.listdir(workdir) if f.endswith('.tmp')]
+
+    # Повторяющиеся классы и xpath хранятся один раз
+    with open(os.path.join(workdir, 'ostrovok_actions.rec'), encoding='utf-8') as f:
+        assert f.read().count('whitespace-nowrap transition-colors') == 1
+
+    # Первое действие доступно без чтения остального файла
+    _, lazy = load_recording(os.path.join(workdir, 'ostrovok_actions.rec.gz'))
+    assert isinstance(lazy, ActionSequence)
+    assert lazy[0]['url'] == 'https://extranet.ostrovok.ru' and len(lazy._cache) == 1
+    assert len(lazy) == len(actions) and len(lazy._cache) == 1
+    assert lazy[:3] == actions[:3]
+
+    # Оборванная запись читается до последнего целого действия
+    truncated = os.path.join(workdir, 'truncated.rec')
+    with open(os.path.join(workdir, 'ostrovok_actions.rec'), encoding='utf-8') as f:
+        content = f.read()
+    with open(truncated, 'w', encoding='utf-8') as f:
+        f.write(content[:len(content) - 40])
+    assert list(iter_actions(truncated)) == actions[:-1]
+
+    # Конвертация старого JSON
+    legacy = os.path.join(workdir, 'legacy.json')
+    with open(legacy, 'w', encoding='utf-8') as f:
+        json.dump({'platform': 'ostrovok', 'recording_type': 'manual', 'created_at': '2025-08-05',
+                   'total_actions': len(actions), 'actions': actions}, f, ensure_ascii=False, indent=2)
+    target = convert_recording(legacy, compression='gzip', remove_source=True)
+    assert target.endswith('legacy.rec.gz') and not os.path.exists(legacy)
+    header, loaded = load_recording(target)
+    assert header['recording_type'] == 'manual' and list(loaded) == actions
+    print(f"✅ Формат работает: {os.path.getsize(target):,} байт вместо {len(content):,} несжатых")
+
+
+def test_at_prefixed_keys_roundtrip():
+    """Тест: собственные ключи с '@' не путаются со ссылками на таблицу строк"""
+    print("🔍 Тестирование ключей с префиксом '@'...")
+
+    workdir = tempfile.mkdtemp()
+    actions = [
+        {'type': 'click', 'url': 'https://extranet.ostrovok.ru', 'details': {'@click': 'open()', '@id': 0}},
+        {'type': 'input', 'details': {'@@model': 'hotel.name', 'id': 'hotel-name', '@type': ['a', {'@x': 1}]}},
+    ]
+    path = os.path.join(workdir, 'at_keys.rec')
+    save_recording(path, {'platform': 'ostrovok'}, actions)
+    _, loaded = load_recording(path)
+    assert list(loaded) == actions
+    print("✅ Ключи с '@' сохраняются без изменений")
+
+
+if __name__ == "__main__":
+    test_roundtrip_streaming_and_conversion()
+    test_at_prefixed_keys_roundtrip()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Тестирование воспроизведения с ожиданием готовности вместо фиксированных пауз
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from selenium.common.exceptions import NoSuchElementException
+
+from action_recorder import ActionRecorder
+from replay_profile import ReplayProfile, profile_path
+
+
+class FakeElement:
+    def __init__(self, driver, name):
+        self.driver = driver
+        self.name = name
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.driver.clicks.append(self.name)
+
+    def clear(self):
+        pass
+
+    def send_keys(self, value):
+        self.driver.typed.append((self.name, value))
+
+
+class FakeDriver:
+    """Подмена WebDriver: элементы появляются через 0.2с после загрузки страницы"""
+
+    def __init__(self):
+        self.current_url = 'about:blank'
+        self.loaded_at = time.monotonic()
+        self.clicks = []
+        self.typed = []
+        self.js_resolves = 0
+        self.lookups = []
+
+    def get(self, url):
+        self.current_url = url
+        self.loaded_at = time.monotonic()
+
+    def execute_script(self, script, *args):
+        if 'readyState' in script:
+            ready = time.monotonic() - self.loaded_at > 0.1
+            return ['complete' if ready else 'loading', 10]
+        if 'candidates' in script:
+            # Разрешение всех селекторов одним вызовом: на странице есть только #email и кнопка
+            self.js_resolves += 1
+            if time.monotonic() - self.loaded_at < 0.2:
+                return None
+            for index, (kind, value) in enumerate(args[0]):
+                if value in ('email', "//button[@type='submit']"):
+                    return [FakeElement(self, value), index]
+            return None
+        return None
+
+    def find_element(self, by, value):
+        self.lookups.append(value)
+        if time.monotonic() - self.loaded_at < 0.2:
+            raise NoSuchElementException(value)
+        return FakeElement(self, value)
+
+
+class FakeRecorder(ActionRecorder):
+    def setup_driver(self, headless=False):
+        self.driver = FakeDriver()
+        return self.driver
+
+    def release_driver(self):
+        self.driver = None
+
+
+def test_wait_mode_replay_learns_profile():
+    """Тест: ожидание условий вместо пауз и запись профиля рядом с записью"""
+    print("🔍 Тестирование воспроизведения с ожиданиями...")
+
+    workdir = tempfile.mkdtemp()
+    recording = os.path.join(workdir, 'ostrovok_actions_test.json')
+    with open(recording, 'w', encoding='utf-8') as f:
+        json.dump({'platform': 'ostrovok', 'actions': [
+            {'type': 'navigation', 'url': 'https://extranet.ostrovok.ru'},
+            {'type': 'input', 'xpath': "//input[@name='login']", 'id': 'email', 'value': '{{email}}'},
+            {'type': 'click', 'xpath': "//button[@type='submit']"},
+        ]}, f)
+
+    recorder = FakeRecorder('ostrovok')
+    recorder.recordings_dir = workdir
+    assert recorder.load_recording(recording)
+
+    started = time.monotonic()
+    assert recorder.replay_actions({'email': 'owner@example.com'}, delay=1.5)
+    elapsed = time.monotonic() - started
+
+    # С фиксированными паузами было бы 3 * 1.5 + 0.5 = 5с
+    assert elapsed < 2.0
+    report = recorder.last_replay_report
+    assert [step['condition'] for step in report['steps']] == ['network_idle', 'present', 'clickable']
+    assert recorder.driver is None
+
+    profile = ReplayProfile(recording)
+    assert os.path.exists(profile_path(recording))
+    assert profile.data['runs'] == 1
+    assert profile.timeout_for(1) < 15.0  # таймаут подстроился под прошлые замеры
+    # Второй запуск: сработавший селектор пробуется первым, без JS-перебора кандидатов
+    assert profile.cached_selector(1)['strategy'] == 'id'
+    assert recorder.load_recording(recording)
+    drivers = []
+    original_setup = recorder.setup_driver
+    recorder.setup_driver = lambda headless=False: drivers.append(original_setup()) or drivers[-1]
+    assert recorder.replay_actions({'email': 'owner@example.com'}, delay=1.5)
+    assert 'email' in drivers[0].lookups and "//input[@name='login']" not in drivers[0].lookups
+    assert ReplayProfile(recording).cached_selector(1)['hits'] >= 2
+
+    # Профиль не попадает в список записей
+    assert [r['filename'] for r in recorder.get_available_recordings()] == ['ostrovok_actions_test.json']
+    print(f"✅ Воспроизведение за {elapsed:.2f}с, шаги: "
+          f"{[(s['condition'], s['seconds']) for s in report['steps']]}")
+
+
+if __name__ == "__main__":
+    test_wait_mode_replay_learns_profile()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Тестирование кэша чтений (TTL, stale-while-revalidate, объединение запросов, сброс после записи)
+"""
+
+import asyncio
+import threading
+
+from response_cache import ResponseCache
+
+
+class Upstream:
+    """Площадка без сети: считает вызовы, отвечает с задержкой"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    async def fetch(self):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return False, "Ошибка API: 503"
+        return True, {'total_bookings': call}
+
+
+def test_ttl_and_stale_while_revalidate():
+    print("🧪 TTL и stale-while-revalidate")
+
+    async def scenario():
+        cache = ResponseCache(ttls={'statistics': 0.1}, stale_ttl=0.5)
+        upstream = Upstream()
+
+        assert await cache.get('bronevik', 'a@x.ru', 'statistics', upstream.fetch) == (True, {'total_bookings': 1})
+        assert await cache.get('bronevik', 'a@x.ru', 'statistics', upstream.fetch) == (True, {'total_bookings': 1})
+        assert upstream.calls == 1
+        print("✅ Свежий ответ из кэша")
+
+        # Другой аккаунт - свои данные
+        await cache.get('bronevik', 'b@x.ru', 'statistics', upstream.fetch)
+        assert upstream.calls == 2
+
+        await asyncio.sleep(0.15)
+        # Устаревший ответ отдается сразу, обновление идет в фоне
+        assert await cache.get('bronevik', 'a@x.ru', 'statistics', upstream.fetch) == (True, {'total_bookings': 1})
+        assert cache.stats['stale_hits'] == 1
+        await asyncio.sleep(0.1)
+        assert await cache.get('bronevik', 'a@x.ru', 'statistics', upstream.fetch) == (True, {'total_bookings': 3})
+        print("✅ Устаревший ответ обновляется в фоне")
+
+        # Ошибки не кэшируются
+        upstream.fail = True
+        assert (await cache.get('bronevik', 'c@x.ru', 'statistics', upstream.fetch))[0] is False
+        upstream.fail = False
+        assert (await cache.get('bronevik', 'c@x.ru', 'statistics', upstream.fetch))[0] is True
+        print("✅ Ошибки площадки не кэшируются")
+
+    asyncio.run(scenario())
+
+
+def test_coalescing_and_invalidation():
+    print("🧪 Объединение запросов и сброс после записи")
+
+    async def scenario():
+        cache = ResponseCache()
+        upstream = Upstream(delay=0.1)
+
+        results = await asyncio.gather(*[
+            cache.get('101hotels', 'a@x.ru', 'hotels', upstream.fetch) for _ in range(10)
+        ])
+        assert upstream.calls == 1 and len(set(map(str, results))) == 1
+        assert cache.stats['coalesced'] == 9
+        print("✅ 10 одновременных нажатий - один запрос к площадке")
+
+        # Запись из другого потока (как очередь заданий) сбрасывает кэш аккаунта
+        writer = threading.Thread(target=cache.invalidate, args=('101hotels', 'a@x.ru'))
+        writer.start()
+        writer.join()
+        await cache.get('101hotels', 'a@x.ru', 'hotels', upstream.fetch)
+        assert upstream.calls == 2
+
+        # Ответ, запрошенный до сброса, не попадает в кэш
+        pending = asyncio.ensure_future(cache.get('101hotels', 'b@x.ru', 'hotels', upstream.fetch))
+        await asyncio.sleep(0.02)
+        cache.invalidate('101hotels')
+        await pending
+        await cache.get('101hotels', 'b@x.ru', 'hotels', upstream.fetch)
+        assert upstream.calls == 4
+        print("✅ Запись сбрасывает кэш, в том числе незавершенные запросы")
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_ttl_and_stale_while_revalidate()
+    test_coalescing_and_invalidation()
+    print("🎉 Все тесты пройдены")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Тестирование постоянного хранилища сессий пользователей
+"""
+
+import os
+import tempfile
+
+from db import Database
+from session_store import SessionStore, SQLiteSessionBackend
+
+
+def test_session_store_persists_across_restarts():
+    """Тест: сессии переживают перезапуск, рассылка берет только подписанных"""
+    print("🔍 Тестирование хранилища сессий...")
+
+    path = os.path.join(tempfile.mkdtemp(), 'sessions.db')
+    db = Database(path)
+    sessions = SessionStore(SQLiteSessionBackend(db))
+
+    # Та же работа со словарем, что и в HotelBot
+    sessions[1] = {}
+    sessions[1]['ostrovok_logged_in'] = True
+    sessions[1]['ostrovok_email'] = 'owner@example.com'
+    sessions[1]['pending_listing'] = {'title': 'Номер у моря'}
+    sessions[2] = {}
+    sessions[2]['bnovo_notifications_enabled'] = False
+    sessions[3] = {'bronevik_logged_in': True}
+    sessions[3].pop('bronevik_logged_in', None)
+    db.close()
+
+    # "Перезапуск" бота
+    db = Database(path)
+    sessions = SessionStore(SQLiteSessionBackend(db))
+
+    assert 1 in sessions and 4 not in sessions
+    assert sessions.get(4, {}) == {}
+    assert sessions[1]['ostrovok_email'] == 'owner@example.com'
+    assert sessions[1]['pending_listing'] == {'title': 'Номер у моря'}
+    assert sessions[2]['bnovo_notifications_enabled'] is False
+    assert 'bronevik_logged_in' not in sessions[3]
+    assert sorted(sessions.subscribed_users()) == [1, 3]
+    assert len(sessions) == 3
+
+    del sessions[3]
+    assert 3 not in sessions
+    db.close()
+    print("✅ Сессии сохраняются между перезапусками")
+
+
+if __name__ == "__main__":
+    test_session_store_persists_across_restarts()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Тестирование профилирования старта (--profile-startup)
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from startup_profile import DUMMY_TOKEN, PROFILE_ENV, ImportTimer, StartupProfiler, offline_bot_request, probe_application
+
+PARENT_SOURCE = """
+import time
+import profile_child_mod
+time.sleep(0.02)
+"""
+
+CHILD_SOURCE = """
+import time
+time.sleep(0.05)
+"""
+
+
+def test_import_timer():
+    """Тест: собственное время модуля не включает вложенные импорты"""
+    print("🔍 Тестирование замера импортов...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, source in (('profile_parent_mod', PARENT_SOURCE), ('profile_child_mod', CHILD_SOURCE)):
+            with open(os.path.join(tmp, f'{name}.py'), 'w', encoding='utf-8') as f:
+                f.write(source)
+        sys.path.insert(0, tmp)
+        timer = ImportTimer()
+        timer.install()
+        try:
+            import profile_parent_mod  # noqa: F401
+        finally:
+            timer.uninstall()
+            sys.path.remove(tmp)
+            sys.modules.pop('profile_parent_mod', None)
+            sys.modules.pop('profile_child_mod', None)
+
+    parent_total, parent_self = timer.records['profile_parent_mod']
+    child_total, child_self = timer.records['profile_child_mod']
+    assert child_self >= 0.04 and parent_total >= child_total + 0.015
+    assert 0.015 <= parent_self < child_total
+    summary = timer.summary()
+    assert summary['slowest'][0]['module'] == 'profile_child_mod' and summary['count'] == 2
+    print("✅ Время импорта считается по модулям")
+
+
+def test_offline_first_request():
+    """Тест: /start обрабатывается через офлайн Bot API и попадает в отчет"""
+    print("🔍 Тестирование первого запроса бота без сети...")
+
+    from telegram.ext import Application, CommandHandler
+
+    async def start(update, context):
+        await update.message.reply_text("Добро пожаловать")
+
+    request = offline_bot_request()
+    application = Application.builder().token(DUMMY_TOKEN).request(request).get_updates_request(request).build()
+    application.add_handler(CommandHandler('start', start))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'report.json')
+        profiler = StartupProfiler('test', output)
+        assert profiler.run(lambda profiler: probe_application(profiler, application, request)) == 0
+        with open(output, encoding='utf-8') as f:
+            report = json.load(f)
+
+    assert request.calls == ['getMe', 'sendMessage']
+    assert report['time_to_first_request_ms'] == report['first_request_ms']['bot'] > 0
+    assert [phase['name'] for phase in report['phases']] == ['bot: initialize', 'bot: first /start']
+    assert report['errors'] == []
+    print("✅ Первый запрос замерен офлайн")
+
+
+def test_entry_point_report():
+    """Тест: точка входа с --profile-startup выдает JSON-отчет, config работает без BOT_TOKEN"""
+    print("🔍 Тестирование отчета точки входа...")
+
+    env = dict(os.environ, BOT_TOKEN='', BNOVO_API_KEY='')
+    env.pop(PROFILE_ENV, None)
+    result = subprocess.run([sys.executable, 'api/index.py', '--profile-startup'],
+                            env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report['entry_point'] == 'api/index' and 'handler' in report['first_request_ms']
+
+    env[PROFILE_ENV] = '1'
+    token = subprocess.run([sys.executable, '-c', 'import config; print(config.BOT_TOKEN)'],
+                           env=env, capture_output=True, text=True, timeout=60)
+    assert token.stdout.strip().splitlines()[-1] == DUMMY_TOKEN
+    print("✅ Отчет машиночитаемый")
+
+
+if __name__ == "__main__":
+    test_import_timer()
+    test_offline_first_request()
+    test_entry_point_report()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Тестирование приема обновлений через webhook (шардирование по чату, воркер-процессы)
+"""
+
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bench_webhook import FAKE_API_ENV, FakeTelegram, make_update
+from webhook import WebhookWorkers, chat_key, mount_webhook, shard_for, webhook_lifespan
+
+
+def test_chat_sharding():
+    """Тест: обновления одного чата всегда попадают в один шард"""
+    print("🔍 Тестирование шардирования по чату...")
+
+    assert chat_key(make_update(1, 42, 'привет')) == 42
+    callback = {'update_id': 2, 'callback_query': {'id': '1', 'from': {'id': 7}, 'data': 'x',
+                                                    'message': {'chat': {'id': -100}}}}
+    assert chat_key(callback) == -100
+    assert chat_key({'update_id': 3, 'inline_query': {'id': '1', 'from': {'id': 9}, 'query': ''}}) == 9
+    assert chat_key({'update_id': 4}) is None
+
+    assert all(shard_for(chat, 4) == shard_for(chat, 4) for chat in range(100))
+    assert {shard_for(chat, 4) for chat in range(100)} == {0, 1, 2, 3}
+
+    workers = WebhookWorkers(shards=3, queue_size=1)
+    shard = workers.dispatch(make_update(1, 42, 'a'))
+    assert shard == shard_for(42, 3)
+    # Очередь шарда заполнена - обновление отклоняется, чтобы Telegram повторил его
+    assert workers.dispatch(make_update(2, 42, 'b')) is None
+    assert workers.stats['rejected'] == 1
+    print("✅ Шард определяется по чату")
+
+
+def test_webhook_end_to_end():
+    """Тест: обновления через webhook обрабатываются воркерами по порядку внутри чата"""
+    print("🔍 Тестирование webhook с воркер-процессами...")
+
+    fake = FakeTelegram()
+    os.environ[FAKE_API_ENV] = fake.api_url
+    workers = WebhookWorkers(shards=2, factory='bench_webhook:echo_application')
+    app = FastAPI(lifespan=lambda app: webhook_lifespan(workers, token=None))
+    mount_webhook(app, workers, path='/hook', secret='s3cret')
+    try:
+        with TestClient(app) as client:
+            assert client.post('/hook', json=make_update(1, 1, 'x')).status_code == 403
+
+            headers = {'X-Telegram-Bot-Api-Secret-Token': 's3cret'}
+            for seq in range(5):
+                for chat_id in (1, 2, 3):
+                    response = client.post('/hook', json=make_update(seq * 3 + chat_id, chat_id, str(seq)),
+                                           headers=headers)
+                    assert response.status_code == 200
+            assert fake.wait_for(15, timeout=60)
+            assert client.get('/hook/stats').json()['received'] == 15
+    finally:
+        fake.close()
+
+    expected = [str(seq) for seq in range(5)]
+    assert all(fake.replies[chat_id] == expected for chat_id in (1, 2, 3))
+    assert not workers.processes
+    print("✅ Ответы каждого чата пришли по порядку")
+
+
+if __name__ == "__main__":
+    test_chat_sharding()
+    test_webhook_end_to_end()
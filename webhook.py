@@ -0,0 +1,281 @@
+"""
+Прием обновлений Telegram через webhook с обработкой в нескольких процессах
+Telegram присылает обновления POST-запросом на FastAPI-приложение; обработчик только
+кладет их в очередь шарда и сразу отвечает 200. Шард выбирается по chat id (sticky hashing),
+и каждый воркер-процесс обрабатывает свою очередь по одному обновлению, поэтому
+обновления одного чата выполняются строго по порядку, а разные чаты - параллельно на всех ядрах.
+
+Запуск (только бот, без Mini App):
+    WEBHOOK_URL=https://example.com python webhook.py --workers 4 --port 8080
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import zlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram/webhook')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', str(os.cpu_count() or 2)))
+# Сколько обновлений может ждать в очереди одного шарда; при переполнении Telegram повторит позже
+QUEUE_SIZE = 1000
+# Сколько параллельных соединений Telegram открывает к webhook
+MAX_CONNECTIONS = 40
+
+# Фабрика приложения воркера: "модуль:функция(shard) -> telegram.ext.Application"
+BOT_FACTORY = 'webhook:bot_application'
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+# Поля обновления, в которых есть чат или пользователь
+CHAT_FIELDS = ('message', 'edited_message', 'channel_post', 'edited_channel_post', 'my_chat_member',
+               'chat_member', 'chat_join_request')
+USER_FIELDS = ('inline_query', 'chosen_inline_result', 'shipping_query', 'pre_checkout_query',
+               'poll_answer', 'callback_query')
+
+
+def webhook_enabled() -> bool:
+    return bool(WEBHOOK_URL)
+
+
+def chat_key(update: Dict[str, Any]) -> Optional[int]:
+    """Чат обновления (для обновлений без чата - пользователь)"""
+    for field in CHAT_FIELDS:
+        payload = update.get(field)
+        if payload and payload.get('chat'):
+            return payload['chat'].get('id')
+    callback = update.get('callback_query')
+    if callback and (callback.get('message') or {}).get('chat'):
+        return callback['message']['chat'].get('id')
+    for field in USER_FIELDS:
+        payload = update.get(field)
+        if payload:
+            user = payload.get('from') or payload.get('user')
+            if user:
+                return user.get('id')
+    return None
+
+
+def shard_for(key: Any, shards: int) -> int:
+    """Стабильный номер шарда: одинаков во всех процессах и между перезапусками"""
+    return zlib.crc32(str(key).encode('utf-8')) % shards
+
+
+def load_factory(path: str) -> Callable[[int], Any]:
+    module, _, name = path.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def bot_application(shard: int):
+    """
+    Приложение HotelBot для воркера; фоновые задачи (уведомления Bnovo) и прогрев браузеров
+    и бэкендов - только в шарде 0, остальные шарды запускают их по требованию
+    """
+    from bot import HotelBot
+    from config import BOT_TOKEN
+
+    bot = HotelBot(BOT_TOKEN, warm_up=shard == 0)
+    if shard == 0:
+        bot.schedule_jobs()
+    return bot.application
+
+
+# --- Воркеры ---
+async def consume_updates(shard: int, updates, factory: Callable[[int], Any]) -> int:
+    """
+    Обрабатывать обновления из очереди шарда, пока не придет None
+
+    Returns:
+        int: Сколько обновлений обработано
+    """
+    from telegram import Update
+
+    application = factory(shard)
+    await application.initialize()
+    # post_init/post_shutdown PTB вызывает только в run_polling/run_webhook
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    loop = asyncio.get_running_loop()
+    processed = 0
+    try:
+        while True:
+            data = await loop.run_in_executor(None, updates.get)
+            if data is None:
+                break
+            try:
+                # По одному: следующее обновление чата начнется только после текущего
+                await application.process_update(Update.de_json(data, application.bot))
+            except Exception as e:
+                logger.error(f"Шард {shard}: ошибка обработки обновления {data.get('update_id')}: {e}")
+            processed += 1
+    finally:
+        await application.stop()
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+    logger.info(f"Шард {shard} остановлен, обработано {processed} обновлений")
+    return processed
+
+
+def _worker_main(shard: int, updates, factory_path: str):
+    logging.basicConfig(
+        format=f'%(asctime)s - shard {shard} - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    # httpx пишет INFO на каждый запрос к Bot API
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    asyncio.run(consume_updates(shard, updates, load_factory(factory_path)))
+
+
+class WebhookWorkers:
+    """
+    Очереди шардов и процессы-воркеры
+
+    Пример:
+        workers = WebhookWorkers(shards=4)
+        workers.start()
+        workers.dispatch(update_dict)
+    """
+
+    def __init__(self, shards: int = WEBHOOK_WORKERS, factory: str = BOT_FACTORY, queue_size: int = QUEUE_SIZE):
+        self.shards = max(1, shards)
+        self.factory = factory
+        # spawn: воркеры не наследуют event loop, потоки и соединения процесса-приемника
+        self._context = multiprocessing.get_context('spawn')
+        self.queues = [self._context.Queue(queue_size) for _ in range(self.shards)]
+        self.processes: List[multiprocessing.Process] = []
+        self.stats = {'received': 0, 'rejected': 0, 'per_shard': [0] * self.shards}
+
+    def start(self):
+        if self.processes:
+            return
+        for shard, updates in enumerate(self.queues):
+            process = self._context.Process(target=_worker_main, args=(shard, updates, self.factory),
+                                            name=f'webhook-shard-{shard}', daemon=True)
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Запущено {self.shards} воркеров webhook ({self.factory})")
+
+    def dispatch(self, update: Dict[str, Any]) -> Optional[int]:
+        """
+        Поставить обновление в очередь его шарда
+
+        Returns:
+            Номер шарда или None, если очередь переполнена
+        """
+        self.stats['received'] += 1
+        key = chat_key(update)
+        shard = shard_for(key if key is not None else update.get('update_id'), self.shards)
+        try:
+            self.queues[shard].put_nowait(update)
+        except queue.Full:
+            self.stats['rejected'] += 1
+            logger.warning(f"Очередь шарда {shard} переполнена, обновление {update.get('update_id')} отклонено")
+            return None
+        self.stats['per_shard'][shard] += 1
+        return shard
+
+    def stop(self, timeout: float = 10):
+        """Дообработать очереди и остановить воркеры"""
+        for updates in self.queues:
+            updates.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Воркер {process.name} не остановился за {timeout}с, завершаем")
+                process.terminate()
+        self.processes.clear()
+
+
+# --- FastAPI ---
+async def register_webhook(token: str, url: str, secret: Optional[str] = WEBHOOK_SECRET,
+                           max_connections: int = MAX_CONNECTIONS):
+    """Сообщить Telegram адрес webhook"""
+    from telegram import Bot, Update
+
+    async with Bot(token) as bot:
+        await bot.set_webhook(url, secret_token=secret, max_connections=max_connections,
+                              allowed_updates=Update.ALL_TYPES)
+    logger.info(f"Webhook зарегистрирован: {url}")
+
+
+def mount_webhook(app: FastAPI, workers: WebhookWorkers, path: str = WEBHOOK_PATH,
+                  secret: Optional[str] = WEBHOOK_SECRET):
+    """
+    Подключить маршруты приема обновлений к FastAPI-приложению
+
+    Воркеры запускает webhook_lifespan, его нужно включить в lifespan приложения.
+    """
+
+    @app.post(path)
+    async def telegram_webhook(request: Request):
+        if secret and request.headers.get(SECRET_HEADER) != secret:
+            return JSONResponse(status_code=403, content={"ok": False})
+        try:
+            update = await request.json()
+        except ValueError:
+            return JSONResponse(status_code=400, content={"ok": False})
+        if workers.dispatch(update) is None:
+            # Не 2xx - Telegram повторит доставку позже
+            return JSONResponse(status_code=503, content={"ok": False})
+        return JSONResponse(content={"ok": True})
+
+    @app.get(f"{path}/stats")
+    async def telegram_webhook_stats():
+        return JSONResponse(content={"ok": True, "shards": workers.shards, **workers.stats})
+
+
+@asynccontextmanager
+async def webhook_lifespan(workers: WebhookWorkers, path: str = WEBHOOK_PATH,
+                           secret: Optional[str] = WEBHOOK_SECRET, token: Optional[str] = None,
+                           public_url: Optional[str] = WEBHOOK_URL) -> AsyncIterator[None]:
+    """
+    Воркеры webhook на время работы приложения (для lifespan FastAPI)
+
+    Если переданы token и public_url, при старте webhook регистрируется в Telegram.
+    """
+    workers.start()
+    try:
+        if token and public_url:
+            try:
+                await register_webhook(token, public_url.rstrip('/') + path, secret)
+            except Exception as e:
+                logger.error(f"Не удалось зарегистрировать webhook: {e}")
+        yield
+    finally:
+        workers.stop(timeout=5)
+
+
+def serve(host: str = '0.0.0.0', port: int = 8080, shards: int = WEBHOOK_WORKERS):
+    """Отдельный сервер webhook (без Mini App)"""
+    import uvicorn
+    from config import BOT_TOKEN
+
+    workers = WebhookWorkers(shards)
+    app = FastAPI(title="Hotel Bot Webhook", lifespan=lambda app: webhook_lifespan(workers, token=BOT_TOKEN))
+    mount_webhook(app, workers)
+    uvicorn.run(app, host=host, port=port, log_level="info")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Прием обновлений Telegram через webhook')
+    parser.add_argument('--workers', type=int, default=WEBHOOK_WORKERS, help='число воркер-процессов (шардов)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('WEBHOOK_PORT', '8080')))
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)